@@ -24,9 +24,19 @@ if config.config_file_name is not None:
 from app.db.base import Base
 from app.db.models import *  # important so Alembic sees models
 
+from app.db.hnsw import TENANT_INDEX_PREFIX
+
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Per-tenant HNSW indexes are created at runtime, not declared on the
+    # model; autogenerate must not emit drops for them.
+    if type_ == "index" and reflected and name.startswith(TENANT_INDEX_PREFIX):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +61,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -72,7 +83,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,46 @@
+"""index document_embeddings by (document_id, organization_id)
+
+Searches filtered by document_ids count the selected rows, and rank them
+exactly when the HNSW scan came back short. Both now read only those
+documents' rows. The index also serves ON DELETE CASCADE from documents,
+which until now scanned the whole table.
+
+Built CONCURRENTLY so writes continue during the build.
+
+Revision ID: 2f8d6b3e9a47
+Revises: 9e4c7a2d5b18
+Create Date: 2026-10-18 22:03:51.264810
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2f8d6b3e9a47"
+down_revision: Union[str, Sequence[str], None] = "9e4c7a2d5b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_document_embeddings_document_org",
+            "document_embeddings",
+            ["document_id", "organization_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_document_embeddings_document_org",
+            table_name="document_embeddings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,37 @@
+"""add corpus_generation to organizations
+
+A per-org counter bumped in the same transaction as any embedding insert
+or delete. The semantic answer cache stamps entries with it, so an upload
+or delete invalidates cached answers in every worker process.
+
+Revision ID: 3c1f5e9a2b7d
+Revises: 7028b5cf9731
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1f5e9a2b7d"
+down_revision: Union[str, Sequence[str], None] = "7028b5cf9731"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # server_default backfills existing rows without a table rewrite
+    # (Postgres 11+ stores a constant default in the catalog).
+    op.add_column(
+        "organizations",
+        sa.Column(
+            "corpus_generation", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("organizations", "corpus_generation")
@@ -0,0 +1,56 @@
+"""rebuild the hnsw index with vector_ip_ops
+
+Embeddings are L2-normalized at encode time, so ordering by negative
+inner product (<#>) ranks exactly like L2 distance (<->) at the cost of
+one dot product per candidate. The queries now ORDER BY <#>, which only
+an index built with vector_ip_ops can serve. Same build parameters (m,
+ef_construction) as before; only the operator class changes.
+
+No downtime: the new index is built CONCURRENTLY under a temporary name
+while the old one still serves queries, the old one is dropped
+CONCURRENTLY, and the new one takes its name. Nothing holds an ACCESS
+EXCLUSIVE lock for the length of the build. If the migration is
+interrupted, rerun it: a leftover temporary index, valid or not, is
+dropped and built again. The DDL is written out here, not taken from
+app.db.hnsw, so the revision does the same thing whenever it runs.
+
+Revision ID: 4d9b2f61c8a3
+Revises: c7a3e1f08d52
+Create Date: 2026-10-18 19:05:41.102937
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4d9b2f61c8a3"
+down_revision: Union[str, Sequence[str], None] = "c7a3e1f08d52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_document_embeddings_embedding_hnsw"
+_REBUILT = f"{INDEX}_rebuilt"
+
+
+def _swap_in(opclass: str) -> None:
+    """Replace the global index with one built on `opclass`, online."""
+    # CREATE/DROP INDEX CONCURRENTLY refuse to run in a transaction block.
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {_REBUILT}")
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY {_REBUILT} ON document_embeddings "
+            f"USING hnsw (embedding {opclass}) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX}")
+        op.execute(f"ALTER INDEX {_REBUILT} RENAME TO {INDEX}")
+
+
+def upgrade() -> None:
+    _swap_in("vector_ip_ops")
+
+
+def downgrade() -> None:
+    _swap_in("vector_l2_ops")
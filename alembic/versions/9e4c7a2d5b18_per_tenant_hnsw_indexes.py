@@ -0,0 +1,90 @@
+"""replace the global hnsw index with per-tenant partial indexes
+
+The global graph is filtered by organization_id only after the
+approximate scan, so small tenants in a large table got poor recall. Orgs
+with at least MIN_CHUNKS embeddings get a partial index over their own
+rows. Smaller orgs are searched exactly. Orgs that grow past the
+threshold later get theirs from ensure_tenant_vector_index_task.
+
+The DDL, the index names and the threshold are written out here rather
+than imported from app.db.hnsw and app.core.config. A revision must do
+the same thing whenever it runs, whatever the app code or the deploy
+environment say by then. MIN_CHUNKS is TENANT_VECTOR_INDEX_MIN_CHUNKS'
+default when this revision was written; if a deployment sets another
+value, ensure_tenant_vector_index and scripts/rebuild_vector_indexes.py
+build the indexes it calls for.
+
+No downtime: every statement runs CONCURRENTLY outside a transaction, so
+reads and writes continue throughout. The tenant indexes are built while
+the global index still serves queries, and the global index is dropped
+last. If the migration is interrupted, rerun it. IF [NOT] EXISTS makes
+each step idempotent. An invalid leftover from a killed build is rebuilt
+by ensure_tenant_vector_index.
+
+Revision ID: 9e4c7a2d5b18
+Revises: 4d9b2f61c8a3
+Create Date: 2026-10-18 21:12:07.518344
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4c7a2d5b18"
+down_revision: Union[str, Sequence[str], None] = "4d9b2f61c8a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MIN_CHUNKS = 5000
+GLOBAL_INDEX = "ix_document_embeddings_embedding_hnsw"
+TENANT_INDEX_PREFIX = "ix_document_embeddings_hnsw_org_"
+_HNSW = "USING hnsw (embedding vector_ip_ops) WITH (m = 16, ef_construction = 64)"
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        org_ids = (
+            op.get_bind()
+            .execute(
+                sa.text(
+                    "SELECT organization_id FROM document_embeddings "
+                    "GROUP BY organization_id HAVING count(*) >= :min_chunks "
+                    "ORDER BY organization_id"
+                ),
+                {"min_chunks": MIN_CHUNKS},
+            )
+            .scalars()
+        )
+        for org_id in list(org_ids):
+            org_id = int(org_id)
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                f"{TENANT_INDEX_PREFIX}{org_id} ON document_embeddings {_HNSW} "
+                f"WHERE organization_id = {org_id}"
+            )
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {GLOBAL_INDEX}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {GLOBAL_INDEX} "
+            f"ON document_embeddings {_HNSW}"
+        )
+        names = (
+            op.get_bind()
+            .execute(
+                sa.text(
+                    "SELECT indexname FROM pg_indexes "
+                    "WHERE tablename = 'document_embeddings' "
+                    "AND starts_with(indexname, :prefix)"
+                ),
+                {"prefix": TENANT_INDEX_PREFIX},
+            )
+            .scalars()
+        )
+        for name in list(names):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,74 @@
+"""add content hashes to documents and document_embeddings
+
+documents.content_hash (SHA-256 of the file) makes an identical re-upload
+resolve to the existing document; document_embeddings.chunk_hash lets a
+revised file reuse stored vectors for unchanged chunks. Both are nullable:
+existing rows keep NULL and simply never match.
+
+The columns are added without a default, which only touches the catalog.
+Their indexes are built (and, on downgrade, dropped) CONCURRENTLY, so
+uploads keep writing to both tables meanwhile. A build that fails leaves
+an INVALID index behind; drop it before rerunning, as IF NOT EXISTS
+would otherwise keep it.
+
+Revision ID: c7a3e1f08d52
+Revises: b5e2d7c94f10
+Create Date: 2026-10-18 16:42:07.318264
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c7a3e1f08d52"
+down_revision: Union[str, Sequence[str], None] = "b5e2d7c94f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "documents", sa.Column("content_hash", sa.String(length=64), nullable=True)
+    )
+    op.add_column(
+        "document_embeddings",
+        sa.Column("chunk_hash", sa.String(length=64), nullable=True),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_documents_org_content_hash",
+            "documents",
+            ["organization_id", "content_hash"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_document_embeddings_org_chunk_hash",
+            "document_embeddings",
+            ["organization_id", "chunk_hash"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_document_embeddings_org_chunk_hash",
+            table_name="document_embeddings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_documents_org_content_hash",
+            table_name="documents",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("document_embeddings", "chunk_hash")
+    op.drop_column("documents", "content_hash")
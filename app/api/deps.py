@@ -1,13 +1,16 @@
+import secrets
+
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.cookies import ACCESS_COOKIE
 from app.core.security import ALGORITHM
 from app.db.models.user import User
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 
 
 def get_db():
@@ -22,6 +25,14 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Provides an asyncpg-backed session per request (the async chat path).
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_token_service(db: Session = Depends(get_db)):
     """Refresh-token service, composed here so routes depend on the
     abstraction and tests can override it without a database."""
@@ -41,13 +52,9 @@ def get_token_service(db: Session = Depends(get_db)):
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
-def get_current_user(
-    request: Request,
-    token: str | None = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+def _access_token_user_id(request: Request, token: str | None) -> int:
     """
-    Validates the JWT and returns the current user.
+    Validates the JWT and returns the user id it was issued to.
 
     Accepts the access token from the Authorization header (programmatic
     clients) OR the httpOnly access-token cookie (browser). The header
@@ -85,17 +92,40 @@ def get_current_user(
             detail="Invalid or expired token",
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return int(user_id)
+
 
+def _active_user(user: User | None) -> User:
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive",
         )
-
     return user
 
 
+def get_current_user(
+    request: Request,
+    token: str | None = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """Validates the JWT and returns the current user."""
+    user_id = _access_token_user_id(request, token)
+    return _active_user(db.query(User).filter(User.id == user_id).first())
+
+
+async def get_current_user_async(
+    request: Request,
+    token: str | None = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """get_current_user for async routes: the lookup runs on the request's
+    async session, so no threadpool thread or sync pool connection is
+    tied up for the life of a long (streaming) request."""
+    user_id = _access_token_user_id(request, token)
+    return _active_user(await db.get(User, user_id))
+
+
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
     """Function-level authorization (OWASP A01): a valid session is not
     enough to mutate the shared knowledge base. Any active member may
@@ -113,3 +143,22 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
             detail="Administrator privileges required",
         )
     return current_user
+
+
+def require_metrics_token(request: Request) -> None:
+    """Operator-only access for GET /metrics. The counters are per process,
+    not per tenant, so an org admin (require_admin) must not see them. The
+    caller presents settings.METRICS_TOKEN as a Bearer credential; with no
+    token configured the endpoint does not exist."""
+    expected = settings.METRICS_TOKEN
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    scheme, _, presented = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        presented.encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -2,9 +2,9 @@ import json
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_async_db, get_current_user_async
 from app.api.schemas.chat import ChatRequest, ChatResponse
 from app.core.config import settings
 from app.core.ratelimit import limiter
@@ -16,14 +16,14 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 
 @router.post("", response_model=ChatResponse)
 @limiter.limit(settings.RATE_LIMIT_CHAT)
-def chat(
+async def chat(
     request: Request,
     payload: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     use_case = build_chat_router_use_case(db)
-    return use_case.execute(
+    return await use_case.execute(
         question=payload.question,
         user=current_user,
         top_k=payload.top_k,
@@ -33,19 +33,19 @@ def chat(
 
 @router.post("/stream")
 @limiter.limit(settings.RATE_LIMIT_CHAT)
-def chat_stream(
+async def chat_stream(
     request: Request,
     payload: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Server-Sent Events: `token` events carry answer fragments as
     they leave the model; the final `done` event carries sources and
     confidence. Data payloads are JSON so newlines survive framing."""
     use_case = build_chat_router_use_case(db)
 
-    def event_source():
-        for event, data in use_case.execute_stream(
+    async def event_source():
+        async for event, data in use_case.execute_stream(
             question=payload.question,
             user=current_user,
             top_k=payload.top_k,
@@ -3,21 +3,29 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db, require_admin
 from app.api.schemas.common import MessageResponse
-from app.api.schemas.documents import DocumentOut, UploadResponse
-from app.composition.singletons import get_embedding_service
+from app.api.schemas.documents import (
+    DocumentOut,
+    IngestionJobOut,
+    UploadAcceptedResponse,
+)
+from app.composition.singletons import get_rerank_score_cache
 from app.core.config import settings
 from app.core.ratelimit import limiter
 from app.db.models.user import User
-from app.tasks.faq_tasks import generate_faqs_task
+from app.infrastructure.db.ingestion_job_repository import DBIngestionJobRepository
+from app.tasks.ingest_tasks import ingest_document_task
 from app.use_cases.delete_document import DeleteDocumentUseCase, DocumentNotFoundError
+from app.use_cases.ingestion_jobs import (
+    GetIngestionJobUseCase,
+    IngestionJobNotFoundError,
+)
 from app.use_cases.list_documents import ListDocumentsUseCase
 from app.use_cases.upload_document import (
     DocumentQuotaExceededError,
     FileTooLargeError,
+    IngestionUnavailableError,
     InvalidContentTypeError,
     NotAPdfError,
-    UnreadablePdfError,
-    EmbeddingStorageError,
     UploadDocumentUseCase,
 )
 
@@ -31,7 +39,7 @@ def list_documents(
     return ListDocumentsUseCase(db).execute(user=current_user)
 
 
-@router.post("/upload", status_code=201, response_model=UploadResponse)
+@router.post("/upload", status_code=202, response_model=UploadAcceptedResponse)
 @limiter.limit(settings.RATE_LIMIT_UPLOAD)
 def upload_document(
     request: Request,
@@ -39,15 +47,16 @@ def upload_document(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),  # mutates shared corpus
 ):
+    # Only validation and the file write happen in the request; parsing
+    # and embedding run in the worker, so no embedding model is needed here.
     use_case = UploadDocumentUseCase(
         db,
-        embedding_service=get_embedding_service(),
-        schedule_faq_generation=lambda chunks, doc_id, org_id: (
-            generate_faqs_task.delay(chunks, doc_id, org_id)
-        ),
+        embedding_service=None,
+        jobs=DBIngestionJobRepository(db),
+        schedule_ingestion=lambda job_id: ingest_document_task.delay(job_id),
     )
     try:
-        return use_case.execute(file=file, user=current_user)
+        return use_case.enqueue(file=file, user=current_user)
     except InvalidContentTypeError as exc:
         raise HTTPException(400, str(exc)) from exc
     except NotAPdfError as exc:
@@ -56,10 +65,22 @@ def upload_document(
         raise HTTPException(413, str(exc)) from exc
     except DocumentQuotaExceededError as exc:
         raise HTTPException(403, str(exc)) from exc
-    except UnreadablePdfError as exc:
-        raise HTTPException(400, str(exc)) from exc
-    except EmbeddingStorageError as exc:
-        raise HTTPException(500, str(exc)) from exc
+    except IngestionUnavailableError as exc:
+        raise HTTPException(503, str(exc)) from exc
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobOut)
+def get_ingestion_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        return GetIngestionJobUseCase(DBIngestionJobRepository(db)).execute(
+            job_id=job_id, user=current_user
+        )
+    except IngestionJobNotFoundError as exc:
+        raise HTTPException(404, str(exc)) from exc
 
 
 @router.delete("/{document_id}", status_code=200, response_model=MessageResponse)
@@ -71,7 +92,7 @@ def delete_document(
     current_user: User = Depends(require_admin),  # mutates shared corpus
 ):
     try:
-        return DeleteDocumentUseCase(db).execute(
+        return DeleteDocumentUseCase(db, rerank_cache=get_rerank_score_cache()).execute(
             document_id=document_id,
             user=current_user,
         )
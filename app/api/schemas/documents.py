@@ -16,8 +16,25 @@ class DocumentOut(BaseModel):
     updated_at: datetime
 
 
-class UploadResponse(BaseModel):
+class UploadAcceptedResponse(BaseModel):
+    """202 body: the upload is saved and queued for ingestion."""
+
+    job_id: int
+    filename: str
+    stage: str
+
+
+class IngestionJobOut(BaseModel):
+    """Progress of a background ingestion (GET /documents/jobs/{id})."""
+
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     filename: str
-    organization_id: int
-    chunks_stored: int
+    stage: str  # queued | extracting | embedding | done | failed
+    chunks_done: int
+    document_id: int | None
+    error_type: str | None  # PdfIngestError subclass name when failed
+    error: str | None
+    created_at: datetime | None
+    updated_at: datetime | None
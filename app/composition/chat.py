@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.use_cases.chat_router import ChatRouterUseCase
@@ -7,29 +7,37 @@ from app.use_cases.chitchat import ChitChatUseCase
 from app.domain.intent_classifier import IntentClassifier
 
 from app.composition.singletons import (
+    get_answer_cache,
+    get_async_llm_service,
+    get_dense_retriever,
     get_embedding_service,
-    get_llm_service,
+    get_hybrid_retriever,
     get_reranker,
 )
-from app.infrastructure.db.chat_history_repository import DBChatHistoryRepository
+from app.infrastructure.db.chat_history_repository import (
+    AsyncDBChatHistoryRepository,
+)
 from app.infrastructure.db.summary_repository import (
-    DBConversationSummaryRepository,
+    AsyncDBConversationSummaryRepository,
 )
 from app.tasks.summary_tasks import update_summary_task
 
 
-def build_chat_router_use_case(db: Session) -> ChatRouterUseCase:
+def build_chat_router_use_case(db: AsyncSession) -> ChatRouterUseCase:
     knowledge_uc = ChatWithKnowledgeBaseUseCase(
         embedding_service=get_embedding_service(),
-        llm_service=get_llm_service(),
-        chat_history=DBChatHistoryRepository(db),
+        llm_service=get_async_llm_service(),
+        chat_history=AsyncDBChatHistoryRepository(db),
         db=db,
-        summary_repo=DBConversationSummaryRepository(db),
+        summary_repo=AsyncDBConversationSummaryRepository(db),
         schedule_summary_update=lambda user_id, org_id: update_summary_task.delay(
             user_id, org_id
         ),
         reranker=get_reranker(),
         use_hybrid=settings.HYBRID_ENABLED,
+        hybrid_retriever=get_hybrid_retriever(),
+        dense_retriever=get_dense_retriever(),
+        answer_cache=get_answer_cache(),
     )
 
     return ChatRouterUseCase(
@@ -13,22 +13,137 @@ doesn't pay the model-load cost either.
 from functools import lru_cache
 
 from app.core.config import settings
-from app.domain.llm_service import LLMService
-from app.domain.reranker import Reranker
+from app.core.metrics import register_collector
+from app.domain.answer_cache import AnswerCache
+from app.domain.dense_retriever import DenseRetriever
+from app.domain.embedding_service import EmbeddingService
+from app.domain.hybrid_retriever import HybridRetriever
+from app.domain.llm_service import AsyncLLMService, LLMService
+from app.domain.reranker import ChunkScoreCache, Reranker
+from app.infrastructure.vector_index.snapshot import SnapshotSource
 from app.infrastructure.embeddings.sentence_transformer import (
+    EMBEDDING_MODEL,
     SentenceTransformerEmbeddingService,
 )
-from app.infrastructure.llm.factory import build_llm_service
+from app.infrastructure.llm.factory import build_async_llm_service, build_llm_service
+from app.infrastructure.llm.http_transport import (
+    LLMTransportStats,
+    build_async_http_client,
+    build_http_client,
+)
+
+
+def _build_embedding_backend() -> tuple[EmbeddingService, str]:
+    """The model runtime selected by EMBEDDING_BACKEND, plus a name that
+    identifies its vectors (keys the shared query-embedding cache)."""
+    backend = settings.EMBEDDING_BACKEND.lower()
+    if backend == "torch":
+        return SentenceTransformerEmbeddingService(), EMBEDDING_MODEL
+    if backend == "onnx":
+        # Lazy: onnxruntime is an optional dependency.
+        from app.infrastructure.embeddings.onnx_embedder import OnnxEmbeddingService
+
+        quantize = settings.EMBEDDING_ONNX_QUANTIZE
+        name = f"{EMBEDDING_MODEL}:onnx{'-int8' if quantize else ''}"
+        return OnnxEmbeddingService(quantize=quantize), name
+    raise RuntimeError(
+        f"Unknown EMBEDDING_BACKEND '{settings.EMBEDDING_BACKEND}'. "
+        "Valid options: torch, onnx"
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_service() -> EmbeddingService:
+    service, vector_space = _build_embedding_backend()
+    # Layering, outermost first: cache -> batcher -> model. A cache hit
+    # never waits in the batch queue.
+    if settings.EMBED_BATCHING_ENABLED:
+        from app.infrastructure.embeddings.batcher import (
+            MicroBatchingEmbeddingService,
+        )
+
+        service = MicroBatchingEmbeddingService(
+            service,
+            max_batch_size=settings.EMBED_BATCH_MAX_SIZE,
+            max_wait_ms=settings.EMBED_BATCH_MAX_WAIT_MS,
+        )
+        register_collector("embedding_batcher", service.stats)
+    if settings.QUERY_EMBEDDING_CACHE_MB > 0:
+        from app.infrastructure.embeddings.query_cache import QueryEmbeddingCache
+
+        service = QueryEmbeddingCache(
+            service,
+            max_bytes=settings.QUERY_EMBEDDING_CACHE_MB * 1024 * 1024,
+            namespace=vector_space,
+            redis_client=_query_cache_redis(),
+            redis_ttl_seconds=settings.QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS,
+        )
+        register_collector("query_embedding_cache", service.stats)
+    return service
+
+
+def _query_cache_redis():
+    """Redis client for the shared query-embedding tier, or None.
+
+    Timeouts are tight on purpose: a local MiniLM encode is ~10 ms, so
+    waiting longer than that on Redis would make the cache a slowdown."""
+    if not settings.QUERY_EMBEDDING_CACHE_REDIS_URL:
+        return None
+    import redis
+
+    return redis.Redis.from_url(
+        settings.QUERY_EMBEDDING_CACHE_REDIS_URL,
+        socket_timeout=0.05,
+        socket_connect_timeout=0.05,
+    )
 
 
 @lru_cache(maxsize=1)
-def get_embedding_service() -> SentenceTransformerEmbeddingService:
-    return SentenceTransformerEmbeddingService()
+def get_llm_transport_stats() -> LLMTransportStats:
+    """Connection counters shared by the process's LLM HTTP clients."""
+    stats = LLMTransportStats(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        http2=settings.LLM_HTTP2,
+    )
+    register_collector("llm_http", stats.stats)
+    return stats
 
 
 @lru_cache(maxsize=1)
 def get_llm_service() -> LLMService:
-    return build_llm_service()
+    return build_llm_service(build_http_client(get_llm_transport_stats()))
+
+
+@lru_cache(maxsize=1)
+def get_async_llm_service() -> AsyncLLMService:
+    """The chat routes' LLM client. get_llm_service stays for the sync
+    callers (Celery summary task, FAQ generation)."""
+    return build_async_llm_service(build_async_http_client(get_llm_transport_stats()))
+
+
+def build_rerank_backend():
+    """The cross-encoder runtime selected by RERANK_BACKEND, unwrapped
+    (no batcher or score cache); evals/retrieval_eval.py scores with it
+    too, so --rerank measures the configured backend."""
+    backend = settings.RERANK_BACKEND.lower()
+    if backend == "torch":
+        from app.infrastructure.rerank.cross_encoder import CrossEncoderReranker
+
+        return CrossEncoderReranker(max_seq_length=settings.RERANK_MAX_SEQ_LENGTH)
+    if backend == "onnx":
+        # Lazy: onnxruntime is an optional dependency.
+        from app.infrastructure.rerank.onnx_cross_encoder import (
+            OnnxCrossEncoderReranker,
+        )
+
+        return OnnxCrossEncoderReranker(
+            quantize=settings.RERANK_ONNX_QUANTIZE,
+            max_seq_length=settings.RERANK_MAX_SEQ_LENGTH,
+        )
+    raise RuntimeError(
+        f"Unknown RERANK_BACKEND '{settings.RERANK_BACKEND}'. "
+        "Valid options: torch, onnx"
+    )
 
 
 @lru_cache(maxsize=1)
@@ -39,6 +154,107 @@ def get_reranker() -> Reranker | None:
     even imported — unless reranking is actually turned on."""
     if not settings.RERANK_ENABLED:
         return None
-    from app.infrastructure.rerank.cross_encoder import CrossEncoderReranker
+    reranker = build_rerank_backend()
+    if settings.RERANK_BATCHING_ENABLED:
+        from app.infrastructure.rerank.batcher import MicroBatchingReranker
+
+        reranker = MicroBatchingReranker(
+            reranker,
+            max_batch_pairs=settings.RERANK_BATCH_MAX_PAIRS,
+            max_wait_ms=settings.RERANK_BATCH_MAX_WAIT_MS,
+        )
+        register_collector("rerank_batcher", reranker.stats)
+    # Layering, outermost first: score cache -> batcher -> model. Only
+    # the pairs the cache misses wait in the batch queue.
+    if settings.RERANK_SCORE_CACHE_ENTRIES > 0:
+        from app.infrastructure.rerank.score_cache import RerankScoreCache
+
+        reranker = RerankScoreCache(
+            reranker, max_entries=settings.RERANK_SCORE_CACHE_ENTRIES
+        )
+        register_collector("rerank_score_cache", reranker.stats)
+    return reranker
+
 
-    return CrossEncoderReranker()
+def get_rerank_score_cache() -> ChunkScoreCache | None:
+    """The reranker's score cache, for invalidation on document delete;
+    None when reranking or the cache is off."""
+    from app.infrastructure.rerank.score_cache import RerankScoreCache
+
+    reranker = get_reranker()
+    return reranker if isinstance(reranker, RerankScoreCache) else None
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache | None:
+    """The semantic answer cache, or None when ANSWER_CACHE_ENABLED is off.
+
+    Must be a process-wide singleton — a per-request cache never hits."""
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+    from app.infrastructure.cache.semantic_answer_cache import SemanticAnswerCache
+
+    cache = SemanticAnswerCache(
+        similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+        ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+        max_entries_per_org=settings.ANSWER_CACHE_MAX_ENTRIES,
+    )
+    register_collector("answer_cache", cache.stats)
+    return cache
+
+
+@lru_cache(maxsize=1)
+def get_hybrid_retriever() -> HybridRetriever | None:
+    """The concurrent-arms hybrid retriever, or None unless both
+    HYBRID_ENABLED and HYBRID_CONCURRENT_ARMS are on (then hybrid runs as
+    one fused SQL statement on the request's session).
+
+    A singleton so its worker threads and per-arm timings are shared by
+    every request in the process."""
+    if not (settings.HYBRID_ENABLED and settings.HYBRID_CONCURRENT_ARMS):
+        return None
+    from app.db.session import SessionLocal
+    from app.infrastructure.db.concurrent_hybrid_retriever import (
+        ConcurrentHybridRetriever,
+    )
+
+    retriever = ConcurrentHybridRetriever(SessionLocal)
+    register_collector("hybrid_retrieval", retriever.stats)
+    return retriever
+
+
+@lru_cache(maxsize=1)
+def get_dense_retriever() -> DenseRetriever | None:
+    """The in-memory dense retriever when VECTOR_BACKEND is "memory", or
+    None to search with pgvector directly.
+
+    Must be a process-wide singleton: the loaded org vectors are the
+    whole point, and a per-request instance would reload them each time."""
+    backend = settings.VECTOR_BACKEND.lower()
+    if backend == "pgvector":
+        return None
+    if backend != "memory":
+        raise RuntimeError(
+            f"Unknown VECTOR_BACKEND '{settings.VECTOR_BACKEND}'. "
+            "Valid options: pgvector, memory"
+        )
+    from app.infrastructure.vector_index.in_memory import InMemoryDenseRetriever
+
+    retriever = InMemoryDenseRetriever(
+        max_rows_per_org=settings.MEMORY_VECTOR_INDEX_MAX_ROWS_PER_ORG,
+        max_bytes=settings.MEMORY_VECTOR_INDEX_MAX_MB * 1024 * 1024,
+        snapshots=get_vector_snapshots(),
+    )
+    register_collector("dense_retrieval", retriever.stats)
+    return retriever
+
+
+@lru_cache(maxsize=1)
+def get_vector_snapshots() -> SnapshotSource | None:
+    """The embedding snapshots under VECTOR_SNAPSHOT_DIR, or None when
+    unset. A singleton so the mapping is opened once per process."""
+    if not settings.VECTOR_SNAPSHOT_DIR:
+        return None
+    snapshots = SnapshotSource(settings.VECTOR_SNAPSHOT_DIR)
+    register_collector("vector_snapshot", snapshots.stats)
+    return snapshots
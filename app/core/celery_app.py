@@ -11,7 +11,9 @@ celery = Celery(
 # Task modules Celery must import to register the tasks.
 celery.conf.imports = (
     "app.tasks.faq_tasks",
+    "app.tasks.ingest_tasks",
     "app.tasks.summary_tasks",
+    "app.tasks.vector_index_tasks",
 )
 
 celery.conf.task_routes = {
@@ -17,6 +17,10 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Bearer token for GET /metrics. The counters are process-wide, so they
+    # describe every tenant's traffic and are for operators (a Prometheus
+    # scraper), never for an org's admin. Unset disables the endpoint (404).
+    METRICS_TOKEN: str | None = None
 
     # Rate limiting (per client IP; in-memory per worker process)
     RATE_LIMIT_ENABLED: bool = True
@@ -39,6 +43,17 @@ class Settings(BaseSettings):
     # defenses (see UploadDocumentUseCase)
     MAX_UPLOAD_MB: int = 25
 
+    # Ingestion streams a PDF page by page and embeds/writes its chunks in
+    # batches of this many, so a worker's peak memory is set by the batch,
+    # not by the document (a 25 MB PDF can yield tens of thousands of
+    # chunks). Larger batches amortize encoder calls; smaller ones cap RSS.
+    INGEST_BATCH_CHUNKS: int = 256
+    # Uploads are ingested by a Celery worker (the request returns 202 once
+    # the file is saved). Per-task soft limit for that work; the hard kill
+    # follows 60 s later. Far above the 120 s global limit meant for LLM
+    # tasks, since a 25 MB PDF can take minutes to embed on CPU.
+    INGEST_TASK_TIME_LIMIT_SECONDS: int = 900
+
     # Abuse controls on the ingestion pipeline. Rate limiting bounds
     # requests per minute; these bound the damage of the requests that do
     # get through — total corpus size per tenant, and how many LLM calls a
@@ -71,6 +86,25 @@ class Settings(BaseSettings):
     # per-request token cost. Raise it if answers get truncated.
     LLM_MAX_TOKENS: int = 512
 
+    # HTTP connection pool shared by each process's LLM client (one for the
+    # sync adapters, one for the async ones). Keeping connections alive
+    # takes the TCP connect and TLS handshake out of the first-token path.
+    # httpx's default 5 s keep-alive expiry drops them between requests at
+    # modest load, hence the longer LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS.
+    # MAX_CONNECTIONS bounds concurrent requests per process (more wait up
+    # to the read timeout for a free one); MAX_KEEPALIVE_CONNECTIONS is how
+    # many idle ones are kept. LLM_HTTP2 multiplexes requests over one
+    # connection where the provider negotiates it (needs the h2 package:
+    # pip install 'httpx[http2]'). The read timeout also bounds the wait
+    # for the first streamed token. Reuse rate, handshakes and in-flight
+    # requests vs the pool size are in /metrics under llm_http.
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    LLM_HTTP2: bool = False
+    LLM_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_HTTP_READ_TIMEOUT_SECONDS: float = 60.0
+
     # Retrieval fan-out (single source of truth for the whole chat path —
     # request schema default, use-case defaults, and the SQL LIMIT). Higher
     # top_k trades prompt cost and latency for recall; MAX bounds what a
@@ -78,6 +112,36 @@ class Settings(BaseSettings):
     DEFAULT_TOP_K: int = 5
     MAX_TOP_K: int = 20
 
+    # Embedding backend for all-MiniLM-L6-v2: "torch" (sentence-transformers,
+    # the default) or "onnx" (ONNX Runtime; needs requirements/onnx.txt).
+    # Same weights, same vector space — switching needs no re-ingestion.
+    # EMBEDDING_ONNX_QUANTIZE applies dynamic int8 weight quantization to
+    # the ONNX model: faster on CPU, with a small, measured cosine drift
+    # (benchmarks/embedding_backends.py) — check retrieval_eval before
+    # shipping it.
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_QUANTIZE: bool = False
+
+    # Query-embedding memo: repeated questions skip the MiniLM forward pass.
+    # Tier 1 is an in-process LRU capped at QUERY_EMBEDDING_CACHE_MB per
+    # worker (0 disables the cache); a 384-dim vector plus key is ~2 KB, so
+    # 16 MB holds ~8k distinct queries. Tier 2, optional, is Redis at
+    # QUERY_EMBEDDING_CACHE_REDIS_URL, shared by every uvicorn worker —
+    # unset keeps the cache process-local.
+    QUERY_EMBEDDING_CACHE_MB: int = 16
+    QUERY_EMBEDDING_CACHE_REDIS_URL: str | None = None
+    QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS: int = 86400
+
+    # Micro-batching for query embeddings: concurrent embed_query calls are
+    # coalesced into one encode of up to EMBED_BATCH_MAX_SIZE queries,
+    # waiting at most EMBED_BATCH_MAX_WAIT_MS for the batch to fill (0 =
+    # never wait, only batch what queued up during the previous encode).
+    # Helps under concurrency, where batch-size-1 forward passes fight for
+    # cores; at low load it only adds the wait. Off by default.
+    EMBED_BATCHING_ENABLED: bool = False
+    EMBED_BATCH_MAX_SIZE: int = 32
+    EMBED_BATCH_MAX_WAIT_MS: float = 5.0
+
     # Cross-encoder reranking: retrieve a wider RERANK_CANDIDATES pool by
     # dense similarity, then reorder by a query-passage relevance model and
     # keep the top_k. Off by default — enable only if the retrieval eval
@@ -87,12 +151,132 @@ class Settings(BaseSettings):
     RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     RERANK_CANDIDATES: int = 20
 
+    # Cross-encoder runtime: "torch" (sentence-transformers, the default)
+    # or "onnx" (ONNX Runtime; needs requirements/onnx.txt), with dynamic
+    # int8 weight quantization unless RERANK_ONNX_QUANTIZE is off. Same
+    # weights; the int8 model's rank agreement with torch is checked in
+    # tests/chat/test_onnx_rerank_parity.py and its speed in
+    # benchmarks/rerank_backends.py. Rerun retrieval_eval --rerank before
+    # shipping it. RERANK_MAX_SEQ_LENGTH truncates each (query, passage)
+    # pair, in tokens, on either backend; a chunk plus a question rarely
+    # needs more than 256, and shorter sequences are cheaper.
+    RERANK_BACKEND: str = "torch"
+    RERANK_ONNX_QUANTIZE: bool = True
+    RERANK_MAX_SEQ_LENGTH: int = 512
+
+    # Coalesce concurrent rerank calls: their (query, passage) pairs are
+    # scored in one cross-encoder pass of up to RERANK_BATCH_MAX_PAIRS,
+    # waiting at most RERANK_BATCH_MAX_WAIT_MS for the batch to fill (0 =
+    # only batch what queued up during the previous pass). Pays off when
+    # several chats rerank at once; batch sizes and latencies are in
+    # /metrics. Compare with benchmarks/rerank_batching.py. Off by default.
+    RERANK_BATCHING_ENABLED: bool = False
+    RERANK_BATCH_MAX_PAIRS: int = 256
+    RERANK_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Cross-encoder score memo, keyed on (normalized query, chunk id): a
+    # repeated question re-scores only candidates it hasn't seen with
+    # that chunk before. Holds up to RERANK_SCORE_CACHE_ENTRIES scores per
+    # worker, LRU (0 disables); an entry is ~200 bytes, so 50k is ~10 MB.
+    # Deleting a document drops its chunks' scores. Hit rate in /metrics.
+    RERANK_SCORE_CACHE_ENTRIES: int = 50_000
+
+    # Skip the cross-encoder when dense retrieval is already confident: if
+    # the L2 distance gap between the rank-1 and rank-top_k candidates is
+    # at least RERANK_SKIP_MARGIN, the dense order is kept as-is. None
+    # always reranks. Dense pools only (a hybrid pool has no distances).
+    # Calibrate on this corpus with evals/retrieval_eval.py --rerank
+    # --sweep-skip-margin, which reports the recall given up against the
+    # reranker calls saved at each margin.
+    RERANK_SKIP_MARGIN: float | None = None
+
+    # HNSW search breadth (hnsw.ef_search, set per retrieval transaction):
+    # higher finds more of the true nearest neighbours at the cost of
+    # query latency. None keeps pgvector's default of 40. Either way it is
+    # raised to the candidate pool size when that is larger, since the
+    # index scan returns at most ef_search rows. Pick a value from the
+    # recall/latency sweep in evals/retrieval_eval.py --sweep-ef-search.
+    HNSW_EF_SEARCH: int | None = None
+
+    # An org gets its own partial HNSW index (app/db/tenant_vector_index.py)
+    # once it holds this many chunks. Smaller orgs are searched exactly,
+    # which at this size is fast and has perfect recall. A filtered global
+    # graph would return them only the few candidates that happen to be
+    # theirs.
+    TENANT_VECTOR_INDEX_MIN_CHUNKS: int = 5000
+
+    # Searches narrowed by document_ids. The filter applies to the rows the
+    # HNSW scan returns, so it can leave fewer than top_k. An iterative
+    # scan (hnsw.iterative_scan, pgvector >= 0.8) keeps walking the graph
+    # until enough rows pass the filter. strict_order keeps results in
+    # exact distance order. Set to None on an older pgvector, which lacks
+    # the setting. A result that is still short is re-ranked exactly when
+    # the filtered documents hold at most FILTERED_EXACT_SCAN_MAX_ROWS
+    # chunks. Larger sets return what was found, with a logged warning.
+    HNSW_ITERATIVE_SCAN: str | None = "strict_order"
+    FILTERED_EXACT_SCAN_MAX_ROWS: int = 20000
+
+    # What the per-tenant HNSW indexes are built over (app/db/hnsw.py).
+    # "none" uses the float32 vectors. "halfvec" (2 bytes/dim) and
+    # "binary" (1 bit/dim) build a much smaller graph over a compact copy
+    # of each vector. Retrieval then fetches QUANTIZED_CANDIDATES_FACTOR
+    # times the rows from it and re-ranks them at full precision. Compare
+    # the modes with evals/retrieval_eval.py --sweep-quantization. Build
+    # the new mode's indexes with scripts/rebuild_vector_indexes.py
+    # before switching.
+    VECTOR_INDEX_QUANTIZATION: str = "none"
+    QUANTIZED_CANDIDATES_FACTOR: int = 4
+
+    # Where chat's dense retrieval runs. "pgvector" (the default) asks
+    # Postgres every time. "memory" keeps each org's vectors in a float32
+    # matrix in the worker process and ranks them exactly there, synced
+    # incrementally when the org's corpus generation changes. Orgs above
+    # MEMORY_VECTOR_INDEX_MAX_ROWS_PER_ORG chunks stay on pgvector, and
+    # loaded orgs are evicted LRU beyond MEMORY_VECTOR_INDEX_MAX_MB per
+    # process (vectors plus chunk text). Compare the two on your corpus
+    # with benchmarks/vector_backends.py.
+    VECTOR_BACKEND: str = "pgvector"
+    MEMORY_VECTOR_INDEX_MAX_ROWS_PER_ORG: int = 100_000
+    MEMORY_VECTOR_INDEX_MAX_MB: int = 1024
+
+    # Directory of memory-mapped document_embeddings snapshots, written by
+    # scripts/export_vector_snapshot.py. When set, the memory backend maps
+    # an org's vectors from the current snapshot on first load instead of
+    # reading them from Postgres, and offline jobs (retrieval_eval
+    # --snapshot) rank against it. An org's slice is only used while the
+    # org's corpus generation has not moved past it.
+    VECTOR_SNAPSHOT_DIR: str | None = None
+
     # Hybrid retrieval: fuse the dense vector ranking with a Postgres
     # full-text (keyword) ranking via Reciprocal Rank Fusion. Recovers
     # queries where the answer hinges on an exact term a dense embedding
     # blurs (proper nouns, IDs). Measured +Recall@5 and a higher pool
     # ceiling on the eval set; off by default. Composes with reranking.
     HYBRID_ENABLED: bool = False
+    # How hybrid runs. Off: both arms and the fusion in ONE SQL statement
+    # (one round-trip, only the fused rows come back). On: the two arms
+    # run concurrently on separate pooled connections, with the keyword
+    # query already in flight while the question is embedded — latency
+    # ~max(dense, lexical) instead of embed-then-query, at the cost of two
+    # extra pool connections per chat request. Off by default; compare
+    # with benchmarks/hybrid_retrieval.py on your deployment.
+    HYBRID_CONCURRENT_ARMS: bool = False
+
+    # Semantic answer cache: a near-duplicate question (cosine similarity of
+    # the query embeddings >= ANSWER_CACHE_SIMILARITY) from the same user,
+    # with the same top_k and document filter, gets the previously
+    # generated answer and sources — no vector search, no LLM call. Entries
+    # expire after ANSWER_CACHE_TTL_SECONDS, are evicted LRU beyond
+    # ANSWER_CACHE_MAX_ENTRIES per org, and die as soon as the org's corpus
+    # changes (upload/delete bump its corpus generation). In-memory per
+    # worker process. Off by default. Entries are per user, because an
+    # answer is generated with the asker's chat history and summary. The
+    # threshold is strict too: that history has moved on by the next ask,
+    # so loosely matched follow-ups ("what about it?") must not collide.
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_MAX_ENTRIES: int = 256
 
     # API keys — only the one matching LLM_PROVIDER is required
     # (ollama runs locally and needs no key)
@@ -0,0 +1,70 @@
+"""In-process performance metrics.
+
+Components that trade memory or batching for latency (caches, batchers)
+keep their own counters and register a collector here; GET /metrics
+returns every collector's snapshot. No metrics client library is needed
+for numbers this coarse.
+
+Like the rate limiter, state is per worker process — with N uvicorn
+workers each scrape sees the one worker that served it.
+"""
+
+import bisect
+import threading
+from typing import Callable, Sequence
+
+_collectors: dict[str, Callable[[], dict]] = {}
+_lock = threading.Lock()
+
+
+def register_collector(name: str, collector: Callable[[], dict]) -> None:
+    """Expose `collector()` under `name` in the /metrics snapshot.
+
+    Re-registering a name replaces the previous collector, so rebuilding
+    a singleton (tests, cache_clear) never leaves a stale one behind.
+    """
+    with _lock:
+        _collectors[name] = collector
+
+
+def snapshot() -> dict:
+    with _lock:
+        collectors = dict(_collectors)
+    return {name: collect() for name, collect in sorted(collectors.items())}
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative, Prometheus-style `le` buckets).
+
+    Cheap enough to observe on every request: one bisect and two adds
+    under a lock.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = {}, 0
+        for bound, n in zip([*self.buckets, "+Inf"], counts):
+            running += n
+            cumulative[str(bound)] = running
+        return {
+            "count": count,
+            "sum": round(total, 3),
+            "mean": round(total / count, 3) if count else 0.0,
+            "le": cumulative,
+        }
@@ -0,0 +1,125 @@
+"""Binary COPY loader for document_embeddings.
+
+bulk_save_objects still sends batched INSERTs with every row's parameters
+bound and every vector rendered as '[0.0123,...]' text for pgvector to
+parse back. COPY ... FROM STDIN (FORMAT binary) streams rows in
+Postgres's wire format instead: integers as int4, content as UTF-8, and
+each vector as pgvector's own binary form (int2 dim, int2 unused, dim x
+float4, all big-endian) — serialized straight from the float32 matrix
+with one byte-swap.
+
+Every row also carries chunk_hash, the SHA-256 of its content, computed
+here from the same UTF-8 bytes that are sent — so no writer can store a
+row whose hash disagrees with its text. Re-ingestion looks vectors up by
+it (see store_embeddings).
+
+The COPY runs on the Session's own connection, so it joins whatever
+transaction the session has open (e.g. the flushed Document row) and
+commits or rolls back with it.
+"""
+
+import hashlib
+import struct
+from typing import Iterable, Iterator, List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+_COPY_SQL = (
+    "COPY document_embeddings "
+    "(organization_id, document_id, content, chunk_hash, embedding) "
+    "FROM STDIN WITH (FORMAT binary)"
+)
+
+# Signature, flags (int4), header-extension length (int4).
+_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_TRAILER = struct.pack(">h", -1)
+
+# How much encoded data to hand psycopg2 per read() call.
+_READ_SIZE = 64 * 1024
+
+
+def chunk_hash(content: str) -> str:
+    """Hex SHA-256 of a chunk's text, as stored in chunk_hash."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def encode_embedding_rows(
+    *,
+    organization_id: int,
+    document_id: int,
+    contents: List[str],
+    vectors: np.ndarray,
+) -> Iterator[bytes]:
+    """Yield the binary COPY stream for one document's rows, a row at a
+    time — the whole payload is never materialized."""
+    vectors = np.asarray(vectors, dtype=">f4")  # big-endian float4
+    if vectors.ndim != 2 or len(vectors) != len(contents):
+        raise ValueError("need one vector row per content string")
+    dim = vectors.shape[1]
+
+    # Field count, then org_id and document_id as length-prefixed int4.
+    row_prefix = struct.pack(">hiiii", 5, 4, organization_id, 4, document_id)
+    vector_header = struct.pack(">ihh", 4 + 4 * dim, dim, 0)
+
+    yield _HEADER
+    for content, vector in zip(contents, vectors):
+        text = content.encode("utf-8")
+        yield b"".join(
+            (
+                row_prefix,
+                struct.pack(">i", len(text)),
+                text,
+                struct.pack(">i", 64),
+                hashlib.sha256(text).hexdigest().encode("ascii"),
+                vector_header,
+                vector.tobytes(),
+            )
+        )
+    yield _TRAILER
+
+
+class _StreamReader:
+    """Minimal file-like view of an iterator of byte blocks, which is what
+    psycopg2's copy_expert reads from."""
+
+    def __init__(self, blocks: Iterable[bytes]):
+        self._blocks = iter(blocks)
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._buffer += block
+        if size < 0:
+            size = len(self._buffer)
+        out = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return out
+
+
+def copy_document_embeddings(
+    db: Session,
+    *,
+    organization_id: int,
+    document_id: int,
+    contents: List[str],
+    vectors: np.ndarray,
+) -> None:
+    """COPY one document's chunks into document_embeddings inside the
+    session's current transaction. Does not commit."""
+    if not contents:
+        return
+    stream = _StreamReader(
+        encode_embedding_rows(
+            organization_id=organization_id,
+            document_id=document_id,
+            contents=contents,
+            vectors=vectors,
+        )
+    )
+    raw = db.connection().connection  # the psycopg2 connection under the pool
+    with raw.cursor() as cursor:
+        cursor.copy_expert(_COPY_SQL, stream, size=_READ_SIZE)
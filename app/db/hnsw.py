@@ -0,0 +1,211 @@
+"""HNSW index parameters for document_embeddings.embedding.
+
+Build time (fixed when the index is built):
+    m                — graph neighbours kept per node; more means better
+                       recall and a bigger, slower-to-build index.
+    ef_construction  — candidate list size while inserting; more means a
+                       better graph and a slower build.
+
+Query time (per transaction, see search_ef_search):
+    hnsw.ef_search   — candidate list size while searching; more means
+                       higher recall and slower queries. The index scan
+                       also returns at most ef_search rows, so it must be
+                       at least the LIMIT asked for.
+
+The build defaults below are pgvector's own. The operator class is
+vector_ip_ops (migration 4d9b2f61c8a3; ff662c4e4bba built vector_l2_ops):
+embeddings are unit length, so inner-product order IS L2 order, and a
+dot product is cheaper per candidate than a squared difference.
+
+Per-tenant indexes (migration 9e4c7a2d5b18): one global graph over every
+tenant's rows serves `WHERE organization_id = ?` badly, because the filter
+applies AFTER the approximate scan. A small tenant in a big table gets
+back the few of ef_search candidates that happen to be its own, so it gets
+low recall, and the big tenants' neighbours are walked for nothing. Each
+large org therefore gets a partial HNSW index (WHERE organization_id = N)
+over its own rows only, built on demand by app/db/tenant_vector_index.py.
+Orgs below TENANT_VECTOR_INDEX_MIN_CHUNKS have no graph. Their queries
+are an exact scan of the org's rows through the (organization_id,
+chunk_hash) btree, which is both fast and exact at that size.
+
+Quantized indexes (VECTOR_INDEX_QUANTIZATION): the tenant graph can be
+built over a compact form of each embedding instead of the float32
+vector. The compact form is an expression index, so the table keeps
+only the full-precision column, with nothing to backfill and no rewrite.
+
+    none     — vector(384), 4 bytes/dim, vector_ip_ops on <#>.
+    halfvec  — embedding::halfvec(384), 2 bytes/dim, halfvec_ip_ops.
+               About half the index size, with near-identical ranking.
+    binary   — binary_quantize(embedding)::bit(384), 1 bit/dim, Hamming
+               distance (<~>). About 1/32 of the vector storage; a coarse
+               first pass only.
+
+Quantized searches fetch a wider pool from the compact index and re-rank
+it by the full-precision <#> (embedding_service._similarity_statement).
+Orgs without a compact index, small ones included, are still ranked by
+<#> directly.
+Each mode's index has its own name, so switching modes means building
+the new indexes before the app uses them (scripts/rebuild_vector_indexes.py)
+and dropping the old ones after.
+
+To change the build parameters, write a migration that rebuilds the
+tenant indexes (tenant_index_ddl) and update the defaults below.
+evals/retrieval_eval.py --sweep-build measures candidates first.
+"""
+
+from dataclasses import dataclass
+
+# The single global index built by ff662c4e4bba / 4d9b2f61c8a3 and dropped
+# by 9e4c7a2d5b18. Still named here for those migrations.
+HNSW_INDEX_NAME = "ix_document_embeddings_embedding_hnsw"
+
+# Partial per-tenant indexes are named <prefix><organization_id>. They are
+# created at runtime, not declared on the model, so Alembic's autogenerate
+# skips anything with this prefix (alembic/env.py).
+TENANT_INDEX_PREFIX = "ix_document_embeddings_hnsw_org_"
+
+# Must match the distance operator the queries ORDER BY (<#>), or the
+# planner cannot use the index at all.
+HNSW_OPCLASS = "vector_ip_ops"
+
+EMBEDDING_DIM = 384
+
+
+@dataclass(frozen=True)
+class _IndexKey:
+    # {col} is the embedding column, bare in DDL and qualified in queries.
+    expression: str
+    opclass: str
+    operator: str
+    name_suffix: str
+
+
+_INDEX_KEYS = {
+    "none": _IndexKey("{col}", HNSW_OPCLASS, "<#>", ""),
+    "halfvec": _IndexKey(
+        f"({{col}}::halfvec({EMBEDDING_DIM}))", "halfvec_ip_ops", "<#>", "_halfvec"
+    ),
+    "binary": _IndexKey(
+        f"(binary_quantize({{col}})::bit({EMBEDDING_DIM}))",
+        "bit_hamming_ops",
+        "<~>",
+        "_bit",
+    ),
+}
+QUANTIZATIONS = tuple(_INDEX_KEYS)
+
+
+def _index_key(quantization: str) -> _IndexKey:
+    try:
+        return _INDEX_KEYS[quantization]
+    except KeyError:
+        raise ValueError(
+            f"unknown vector index quantization {quantization!r}; "
+            f"expected one of {', '.join(QUANTIZATIONS)}"
+        ) from None
+
+
+def quantized_distance(quantization: str, *, column: str, query: str) -> str:
+    """SQL distance between `column` and the vector expression `query`,
+    in the form the mode's index serves. Used for ORDER BY only."""
+    key = _index_key(quantization)
+    return (
+        f"{key.expression.format(col=column)} {key.operator} "
+        f"{key.expression.format(col=query)}"
+    )
+
+
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 64
+DEFAULT_EF_SEARCH = 40
+
+
+def _index_ddl(
+    name: str,
+    *,
+    m: int,
+    ef_construction: int,
+    concurrently: bool,
+    if_not_exists: bool,
+    where: str = "",
+    quantization: str = "none",
+) -> str:
+    key = _index_key(quantization)
+    return (
+        "CREATE INDEX "
+        + ("CONCURRENTLY " if concurrently else "")
+        + ("IF NOT EXISTS " if if_not_exists else "")
+        + f"{name} ON document_embeddings "
+        f"USING hnsw ({key.expression.format(col='embedding')} {key.opclass}) "
+        f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})"
+        + (f" WHERE {where}" if where else "")
+    )
+
+
+def hnsw_index_ddl(
+    *,
+    m: int = DEFAULT_M,
+    ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+    concurrently: bool = False,
+    if_not_exists: bool = False,
+) -> str:
+    """The global index as raw DDL, for benchmarks/tenant_retrieval.py's
+    global-index baseline."""
+    return _index_ddl(
+        HNSW_INDEX_NAME,
+        m=m,
+        ef_construction=ef_construction,
+        concurrently=concurrently,
+        if_not_exists=if_not_exists,
+    )
+
+
+def tenant_index_name(organization_id: int, quantization: str = "none") -> str:
+    suffix = _index_key(quantization).name_suffix
+    return f"{TENANT_INDEX_PREFIX}{int(organization_id)}{suffix}"
+
+
+def tenant_index_ddl(
+    organization_id: int,
+    *,
+    m: int = DEFAULT_M,
+    ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+    concurrently: bool = False,
+    if_not_exists: bool = False,
+    quantization: str = "none",
+) -> str:
+    """CREATE INDEX for one org's partial HNSW index.
+
+    The predicate is a literal, not a bind parameter. The planner only
+    uses a partial index when it can prove that the query's WHERE
+    implies the index predicate, and that proof needs a constant on both
+    sides. CONCURRENTLY builds without blocking writes, but cannot run
+    inside a transaction. Without it, the DDL is transactional, so the
+    retrieval eval can rebuild an org's index inside a transaction and
+    roll back.
+    """
+    org_id = int(organization_id)
+    return _index_ddl(
+        tenant_index_name(org_id, quantization),
+        m=m,
+        ef_construction=ef_construction,
+        concurrently=concurrently,
+        if_not_exists=if_not_exists,
+        where=f"organization_id = {org_id}",
+        quantization=quantization,
+    )
+
+
+def search_ef_search(*, limit: int, ef_search: int | None) -> int | None:
+    """The hnsw.ef_search to set for a query fetching `limit` rows, or
+    None to leave the server's setting alone.
+
+    Raised to `limit` when needed, because the index scan stops after
+    ef_search rows. Without that, a candidate pool larger than 40 would
+    come back silently short.
+    """
+    if ef_search is None:
+        if limit <= DEFAULT_EF_SEARCH:
+            return None
+        ef_search = DEFAULT_EF_SEARCH
+    return max(ef_search, limit)
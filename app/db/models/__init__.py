@@ -2,6 +2,7 @@ from app.db.models.chat_history import ChatHistory
 from app.db.models.conversation_summary import ConversationSummary
 from app.db.models.document import Document
 from app.db.models.embedding import DocumentEmbedding
+from app.db.models.ingestion_job import IngestionJob
 from app.db.models.organization import Organization
 from app.db.models.refresh_token import RefreshToken
 from app.db.models.user import User
@@ -11,6 +12,7 @@ __all__ = [
     "ConversationSummary",
     "Document",
     "DocumentEmbedding",
+    "IngestionJob",
     "Organization",
     "RefreshToken",
     "User",
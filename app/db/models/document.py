@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy import DateTime
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Index, Integer, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -15,11 +15,25 @@ class Document(Base):
     """
 
     __tablename__ = "documents"
+    __table_args__ = (
+        # One copy of a given file per org: an identical re-upload resolves
+        # to the existing document instead of being ingested again.
+        Index(
+            "ix_documents_org_content_hash",
+            "organization_id",
+            "content_hash",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filename: Mapped[str] = mapped_column(String(255))
     content_type: Mapped[str] = mapped_column(String(100))
 
+    # SHA-256 of the file bytes. NULL for documents uploaded before it
+    # was recorded (NULLs never collide in the unique index).
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
     organization_id: Mapped[int] = mapped_column(
         ForeignKey("organizations.id"), nullable=False
     )
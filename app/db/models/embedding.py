@@ -1,27 +1,39 @@
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Computed, ForeignKey, Index, Integer, Text
+from sqlalchemy import Computed, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.hnsw import EMBEDDING_DIM
 
 
 class DocumentEmbedding(Base):
     __tablename__ = "document_embeddings"
     __table_args__ = (
-        # Mirrors migration ff662c4e4bba so autogenerate sees it as expected
-        Index(
-            "ix_document_embeddings_embedding_hnsw",
-            "embedding",
-            postgresql_using="hnsw",
-            postgresql_ops={"embedding": "vector_l2_ops"},
-        ),
         # GIN index backing the lexical (keyword) arm of hybrid retrieval.
         Index(
             "ix_document_embeddings_content_tsv",
             "content_tsv",
             postgresql_using="gin",
         ),
+        # Re-ingestion looks stored vectors up by chunk text hash per org.
+        # Also the exact-search path for orgs too small for their own HNSW
+        # index. Those indexes are partial, one per large org, and created
+        # at runtime rather than declared here (app/db/hnsw.py).
+        Index(
+            "ix_document_embeddings_org_chunk_hash",
+            "organization_id",
+            "chunk_hash",
+        ),
+        # Searches filtered by document_ids count and rank the selected
+        # rows through this index. Because document_id leads, it also serves
+        # the foreign key's ON DELETE CASCADE, which otherwise scans the
+        # whole table.
+        Index(
+            "ix_document_embeddings_document_org",
+            "document_id",
+            "organization_id",
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -37,6 +49,11 @@ class DocumentEmbedding(Base):
 
     content: Mapped[str] = mapped_column(Text, nullable=False)
 
+    # SHA-256 of `content`, written by the COPY loader. A chunk whose text
+    # is already stored in the org reuses that row's vector instead of
+    # being re-embedded. NULL on rows ingested before the column existed.
+    chunk_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
     # Postgres full-text vector, maintained by the DB from `content` (a
     # STORED generated column — the app never writes it). Backs the lexical
     # arm of hybrid retrieval so keyword matches complement dense vectors.
@@ -46,7 +63,7 @@ class DocumentEmbedding(Base):
         nullable=True,
     )
 
-    embedding = mapped_column(Vector(384), nullable=False)
+    embedding = mapped_column(Vector(EMBEDDING_DIM), nullable=False)
 
     organization = relationship("Organization")
     document = relationship("Document")
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class IngestionJob(Base):
+    """One row per accepted upload, tracking its background ingestion.
+
+    The web tier creates it (stage "queued") right after the file is
+    validated and saved; the Celery worker advances it through
+    extracting -> embedding -> done/failed. Progress is committed on its
+    own session, independently of the ingestion transaction, so clients
+    polling GET /documents/jobs/{id} see it while the document is still
+    being written.
+    """
+
+    __tablename__ = "ingestion_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    uploaded_by: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Server-side location of the saved upload; never exposed by the API.
+    file_path: Mapped[str] = mapped_column(String(512), nullable=False)
+
+    stage: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    chunks_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Set once ingestion commits; cleared if the document is later deleted.
+    document_id: Mapped[int | None] = mapped_column(
+        ForeignKey("documents.id", ondelete="SET NULL"), nullable=True
+    )
+
+    # PdfIngestError subclass name and message when stage == "failed".
+    error_type: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    error: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
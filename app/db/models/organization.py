@@ -15,6 +15,13 @@ class Organization(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
 
+    # Bumped whenever the org's documents/embeddings change (see
+    # app.services.corpus). Caches keyed on the corpus compare against it,
+    # so invalidation reaches every worker process, not just the writer.
+    corpus_generation: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
     # Relationship: one organization → many users
     users = relationship(
         "User", back_populates="organization", cascade="all, delete-orphan"
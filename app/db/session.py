@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
@@ -6,3 +8,26 @@ from app.core.config import settings
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# The chat path runs on asyncio: the same database through asyncpg, so a
+# request waiting on Postgres (or on the LLM) holds no thread. Same URL,
+# driver swapped; no connection is made until first use.
+#
+# asyncpg runs every query as a prepared statement. After five executions
+# Postgres may switch one to a generic plan, which has no value for
+# :org_id and so cannot prove that a per-tenant partial HNSW index applies
+# (app/db/hnsw.py). A large org's search would then scan its rows exactly.
+# Forcing custom plans keeps the index in play, for one extra planning
+# pass per query. psycopg2 inlines parameters, so the sync engine always
+# gets a custom plan.
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_pre_ping=True,
+    connect_args={"server_settings": {"plan_cache_mode": "force_custom_plan"}},
+)
+
+# expire_on_commit=False: rows read before a commit stay usable after it
+# without an (awaited) refresh.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
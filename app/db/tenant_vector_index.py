@@ -0,0 +1,170 @@
+"""On-demand per-tenant HNSW indexes (see app/db/hnsw.py for why).
+
+An org gets its partial index once it holds TENANT_VECTOR_INDEX_MIN_CHUNKS
+embeddings. Below that, an exact scan of its rows is cheap and has perfect
+recall. ensure_tenant_vector_index runs after each ingestion (the
+ensure_tenant_vector_index_task) and is cheap when there is nothing to do:
+one catalog lookup, and a row count capped at the threshold.
+
+The index is built CONCURRENTLY, so uploads and chats for the org keep
+running while its graph is built. Retrieval switches to the new index as
+soon as the build commits. The SQL stays the same; the planner picks the
+partial index because the query's org filter implies its predicate.
+
+The index is built in the form VECTOR_INDEX_QUANTIZATION selects, and
+each form has its own index name, so several can exist side by side.
+Queries follow the setting, not the indexes: the ORDER BY changes the
+moment the setting does. So a form is changed build-first, as in
+scripts/rebuild_vector_indexes.py: build the new form's indexes
+CONCURRENTLY while the app still runs on the old setting, then flip the
+setting, then remove the old forms with drop_stale. Flipped first, a
+large org without the new index is ranked by the full-precision
+distance, which is a full scan of its rows unless the old form was
+"none", until its next upload builds the index here.
+"""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.db.hnsw import QUANTIZATIONS, tenant_index_ddl, tenant_index_name
+
+logger = logging.getLogger(__name__)
+
+# First key of the two-int advisory lock taken per org while building, so
+# two workers finishing uploads for one org don't both start a build.
+_LOCK_CLASS = 0x686E7377  # "hnsw"
+
+# indisvalid of the named index, no row if there is none. Also read per
+# quantized search, to tell whether the org has a compact index.
+INDEX_STATE = text(
+    """
+    SELECT i.indisvalid
+    FROM pg_class c
+    JOIN pg_index i ON i.indexrelid = c.oid
+    WHERE c.relname = :name
+    """
+)
+
+# Counting stops at the threshold: a big org's count costs no more than
+# a small one's.
+_ROWS_UP_TO = text(
+    """
+    SELECT count(*) FROM (
+        SELECT 1 FROM document_embeddings
+        WHERE organization_id = :org_id
+        LIMIT :cap
+    ) rows
+    """
+)
+
+_ORGS_AT_LEAST = text(
+    """
+    SELECT organization_id FROM document_embeddings
+    GROUP BY organization_id
+    HAVING count(*) >= :min_chunks
+    ORDER BY organization_id
+    """
+)
+
+
+def orgs_needing_vector_index(conn: Connection, *, min_chunks: int) -> list[int]:
+    """Orgs large enough for their own index (the migration's backfill)."""
+    return list(conn.execute(_ORGS_AT_LEAST, {"min_chunks": min_chunks}).scalars())
+
+
+def ensure_tenant_vector_index(
+    engine: Engine,
+    *,
+    organization_id: int,
+    min_chunks: int | None = None,
+    quantization: str | None = None,
+    drop_stale: bool = False,
+) -> bool:
+    """Build the org's partial HNSW index if it is due. Returns True if
+    this call built it.
+
+    A CONCURRENTLY build that fails (a killed worker, a deadlock) leaves
+    an INVALID index behind. The planner ignores it, but IF NOT EXISTS
+    would skip rebuilding it. So an invalid index is dropped and built
+    again.
+
+    With drop_stale, the org's indexes in other quantization forms are
+    dropped once this form's index is in place.
+    """
+    if min_chunks is None:
+        min_chunks = settings.TENANT_VECTOR_INDEX_MIN_CHUNKS
+    if quantization is None:
+        quantization = settings.VECTOR_INDEX_QUANTIZATION
+    name = tenant_index_name(organization_id, quantization)
+    lock = {"cls": _LOCK_CLASS, "org_id": organization_id}
+
+    # CREATE/DROP INDEX CONCURRENTLY refuse to run in a transaction block.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not conn.execute(
+            text("SELECT pg_try_advisory_lock(:cls, :org_id)"), lock
+        ).scalar():
+            return False  # another worker is on it
+        try:
+            built = _build_if_due(
+                conn,
+                organization_id=organization_id,
+                name=name,
+                min_chunks=min_chunks,
+                quantization=quantization,
+            )
+            if drop_stale and (built or _index_valid(conn, name)):
+                for stale in QUANTIZATIONS:
+                    if stale != quantization:
+                        _drop(conn, tenant_index_name(organization_id, stale))
+            return built
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:cls, :org_id)"), lock)
+
+
+def _index_valid(conn: Connection, name: str) -> bool | None:
+    """True/False for a valid/invalid index, None if there is none."""
+    return conn.execute(INDEX_STATE, {"name": name}).scalar()
+
+
+def _drop(conn: Connection, name: str) -> None:
+    if _index_valid(conn, name) is not None:
+        logger.info("dropping vector index %s", name)
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def _build_if_due(
+    conn: Connection,
+    *,
+    organization_id: int,
+    name: str,
+    min_chunks: int,
+    quantization: str,
+) -> bool:
+    valid = _index_valid(conn, name)
+    if valid:
+        return False
+    if valid is not None:
+        logger.warning("dropping invalid vector index %s", name)
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+    rows = conn.execute(
+        _ROWS_UP_TO, {"org_id": organization_id, "cap": min_chunks}
+    ).scalar()
+    if rows < min_chunks:
+        return False
+
+    logger.info("building vector index %s", name)
+    conn.execute(
+        text(
+            tenant_index_ddl(
+                organization_id,
+                concurrently=True,
+                if_not_exists=True,
+                quantization=quantization,
+            )
+        )
+    )
+    return True
@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+from typing import Protocol, Sequence
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    """A previously generated grounded answer and the sources it cited."""
+
+    answer: str
+    confidence: str
+    sources: tuple[str, ...]
+
+
+class AnswerCache(Protocol):
+    """Semantic cache of grounded answers, scoped per organization.
+
+    `scope` holds whatever else shaped the answer besides the question
+    (top_k, the document filter), so only like-for-like requests match.
+    `generation` is the org's corpus generation when the answer was
+    produced; an entry from an older generation is never served.
+    """
+
+    def lookup(
+        self,
+        *,
+        organization_id: int,
+        query_embedding: Sequence[float],
+        scope: tuple,
+        generation: int,
+    ) -> CachedAnswer | None: ...
+
+    def store(
+        self,
+        *,
+        organization_id: int,
+        query_embedding: Sequence[float],
+        scope: tuple,
+        generation: int,
+        answer: CachedAnswer,
+    ) -> None: ...
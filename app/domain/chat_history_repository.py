@@ -23,3 +23,18 @@ class ChatHistoryRepository(Protocol):
         role: str,
         message: str,
     ) -> None: ...
+
+
+class AsyncChatHistoryRepository(Protocol):
+    """ChatHistoryRepository for the async chat path (AsyncSession)."""
+
+    async def get_recent_history(self, *, user_id: int) -> List[ChatMessage]: ...
+
+    async def save_message(
+        self,
+        *,
+        user_id: int,
+        organization_id: int,
+        role: str,
+        message: str,
+    ) -> None: ...
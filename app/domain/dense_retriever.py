@@ -0,0 +1,27 @@
+from typing import List, Protocol
+
+import numpy as np
+
+
+class DenseRetriever(Protocol):
+    """Nearest-neighbour search over one org's chunk embeddings.
+
+    The default (no retriever wired) is async_similarity_search, run by
+    Postgres. An implementation may answer from elsewhere, such as an
+    in-process copy of the org's vectors, but must return the same rows:
+    objects with `id`, `content`, `document_id`, `filename` and the L2
+    `distance`, nearest first. `db` is the request's AsyncSession, for
+    anything the implementation still reads from Postgres.
+    """
+
+    async def search(
+        self,
+        db,
+        *,
+        organization_id: int,
+        query_embedding: np.ndarray,
+        limit: int,
+        document_ids: List[int] | None = None,
+    ) -> list:
+        """Return up to `limit` rows of the org, nearest first."""
+        ...
@@ -1,11 +1,18 @@
 from typing import List, Protocol
 
+import numpy as np
+
 
 class EmbeddingService(Protocol):
     """
     Abstraction for embedding generation.
+
+    Vectors are contiguous float32 NumPy arrays — embed_texts returns one
+    (n, dim) matrix, embed_query one (dim,) row — never Python lists: a
+    384-dim list is 384 boxed floats, and a large PDF's worth of them
+    dominates ingest memory. pgvector binds arrays directly.
     """
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]: ...
+    def embed_texts(self, texts: List[str]) -> np.ndarray: ...
 
-    def embed_query(self, text: str) -> List[float]: ...
+    def embed_query(self, text: str) -> np.ndarray: ...
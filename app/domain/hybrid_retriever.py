@@ -0,0 +1,24 @@
+from typing import Callable, List, Protocol
+
+import numpy as np
+
+
+class HybridRetriever(Protocol):
+    """Runs the dense and lexical retrieval arms and fuses their rankings.
+
+    `embed` produces the query embedding on demand, so an implementation
+    can start the keyword arm — which never needs it — before the encoder
+    has run.
+    """
+
+    def retrieve(
+        self,
+        *,
+        organization_id: int,
+        query_text: str,
+        embed: Callable[[], np.ndarray],
+        limit: int,
+        document_ids: List[int] | None = None,
+    ) -> list:
+        """Return up to `limit` fused rows, best first."""
+        ...
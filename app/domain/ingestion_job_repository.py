@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Protocol
+
+
+class JobStage:
+    """Lifecycle of a background ingestion job."""
+
+    QUEUED = "queued"  # saved and accepted, waiting for a worker
+    EXTRACTING = "extracting"  # worker is parsing the PDF
+    EMBEDDING = "embedding"  # chunks are being embedded and stored
+    DONE = "done"
+    FAILED = "failed"
+
+    ACTIVE = (QUEUED, EXTRACTING, EMBEDDING)
+
+
+@dataclass(frozen=True)
+class IngestionJobRecord:
+    """Read model for an ingestion job — no ORM type crosses the port
+    (mirrors RefreshTokenRecord)."""
+
+    id: int
+    organization_id: int
+    uploaded_by: int
+    filename: str
+    file_path: str
+    stage: str
+    chunks_done: int
+    document_id: int | None
+    error_type: str | None
+    error: str | None
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
+class IngestionJobRepository(Protocol):
+    """Every mutation commits immediately: job state must be visible to
+    pollers while the ingestion transaction itself is still open."""
+
+    def create(
+        self, *, organization_id: int, uploaded_by: int, filename: str, file_path: str
+    ) -> IngestionJobRecord: ...
+
+    def get(self, *, job_id: int) -> IngestionJobRecord | None: ...
+
+    def count_active(self, *, organization_id: int) -> int: ...
+
+    def update_progress(self, *, job_id: int, stage: str, chunks_done: int) -> None: ...
+
+    def mark_done(self, *, job_id: int, document_id: int, chunks_done: int) -> None: ...
+
+    def mark_failed(self, *, job_id: int, error_type: str, error: str) -> None: ...
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Iterator, Protocol
+from typing import AsyncIterator, Iterator, Protocol
 
 
 @dataclass(frozen=True)
@@ -26,3 +26,22 @@ class LLMService(Protocol):
         CONFIDENCE marker line the caller parses off (see
         app.prompts.split_confidence_marker)."""
         ...
+
+
+class AsyncLLMService(Protocol):
+    """
+    The chat path's view of the LLM: the same grounded calls as
+    LLMService, awaited, so a request waiting on the provider holds no
+    worker thread.
+    """
+
+    async def generate_grounded_answer(
+        self, *, question: str, context: str
+    ) -> GroundedAnswer: ...
+
+    def stream_grounded_answer(
+        self, *, question: str, context: str
+    ) -> AsyncIterator[str]:
+        """Async-iterate the answer as text fragments, ending with the
+        CONFIDENCE marker line (see LLMService.stream_grounded_answer)."""
+        ...
@@ -1,4 +1,4 @@
-from typing import List, Protocol
+from typing import Iterable, List, Protocol, Sequence, Tuple
 
 
 class Reranker(Protocol):
@@ -10,11 +10,38 @@ class Reranker(Protocol):
     pool, not the whole corpus. Hence the retrieve-wide-then-rerank shape.
     """
 
-    def rerank(self, *, query: str, passages: List[str]) -> List[int]:
+    def rerank(
+        self,
+        *,
+        query: str,
+        passages: List[str],
+        passage_ids: Sequence[int] | None = None,
+    ) -> List[int]:
         """Return passage indices ordered most- to least-relevant.
 
         Indices reference the input `passages` list, so the caller reorders
         its own richer objects (rows, chunks) without this port needing to
-        know their shape.
+        know their shape. `passage_ids`, when given, are the passages'
+        chunk ids (de.id), parallel to `passages`: a chunk's text never
+        changes under its id, so a score cache may key on it.
         """
         ...
+
+
+class PairScorer(Protocol):
+    """The model under a reranker: one relevance score per (query,
+    passage) pair, higher = more relevant.
+
+    Pairs may come from different queries — a cross-encoder scores each
+    pair on its own — which is what lets concurrent requests share one
+    forward pass.
+    """
+
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> Sequence[float]: ...
+
+
+class ChunkScoreCache(Protocol):
+    """Cached reranker scores that can be dropped by chunk id, for when
+    the chunks themselves are deleted."""
+
+    def invalidate_chunks(self, chunk_ids: Iterable[int]) -> None: ...
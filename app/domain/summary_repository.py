@@ -7,3 +7,10 @@ class ConversationSummaryRepository(Protocol):
     def upsert_summary(
         self, *, user_id: int, organization_id: int, summary: str
     ) -> None: ...
+
+
+class AsyncConversationSummaryRepository(Protocol):
+    """Read side of the summary store for the async chat path; the
+    summary itself is written by the (sync) Celery task."""
+
+    async def get_summary(self, *, user_id: int) -> str | None: ...
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+import numpy as np
+
+from app.domain.answer_cache import CachedAnswer
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    scope: tuple
+    answer: CachedAnswer
+    expires_at: float
+
+
+@dataclass
+class _OrgEntries:
+    generation: int
+    entries: "OrderedDict[int, _Entry]" = field(default_factory=OrderedDict)
+
+
+class SemanticAnswerCache:
+    """In-memory semantic answer cache: one LRU per organization.
+
+    A lookup matches the most similar live entry with the same scope whose
+    cosine similarity to the query clears the threshold. Entries expire
+    after `ttl_seconds`, and each org holds at most `max_entries_per_org`
+    (least recently used evicted first). When a lookup or store arrives
+    with a newer corpus generation, the org's entries are all dropped —
+    answers grounded on the old corpus must not outlive it.
+
+    The async chat path calls it from the event loop thread; the lock
+    keeps it safe for callers on other threads too. One instance per
+    process; see app.composition.singletons.
+    """
+
+    def __init__(
+        self,
+        *,
+        similarity_threshold: float,
+        ttl_seconds: float,
+        max_entries_per_org: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_org = max_entries_per_org
+        self._clock = clock
+        self._orgs: dict[int, _OrgEntries] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _org_entries(self, organization_id: int, generation: int) -> _OrgEntries:
+        """The org's entries, reset first if the corpus has moved on.
+        Caller holds the lock."""
+        org = self._orgs.get(organization_id)
+        if org is None:
+            org = self._orgs[organization_id] = _OrgEntries(generation=generation)
+        elif generation > org.generation:
+            self._invalidations += len(org.entries)
+            org.entries.clear()
+            org.generation = generation
+        return org
+
+    def lookup(
+        self,
+        *,
+        organization_id: int,
+        query_embedding: Sequence[float],
+        scope: tuple,
+        generation: int,
+    ) -> CachedAnswer | None:
+        query = _unit(query_embedding)
+        now = self._clock()
+        with self._lock:
+            org = self._org_entries(organization_id, generation)
+            if generation < org.generation:  # caller read a stale generation
+                self._misses += 1
+                return None
+
+            expired = [k for k, e in org.entries.items() if e.expires_at <= now]
+            for key in expired:
+                del org.entries[key]
+            self._evictions += len(expired)
+
+            candidates = [(k, e) for k, e in org.entries.items() if e.scope == scope]
+            if candidates:
+                sims = np.stack([e.vector for _, e in candidates]) @ query
+                best = int(np.argmax(sims))
+                if sims[best] >= self.similarity_threshold:
+                    key, entry = candidates[best]
+                    org.entries.move_to_end(key)
+                    self._hits += 1
+                    return entry.answer
+
+            self._misses += 1
+            return None
+
+    def store(
+        self,
+        *,
+        organization_id: int,
+        query_embedding: Sequence[float],
+        scope: tuple,
+        generation: int,
+        answer: CachedAnswer,
+    ) -> None:
+        vector = _unit(query_embedding)
+        with self._lock:
+            org = self._org_entries(organization_id, generation)
+            if generation < org.generation:
+                return  # answered from a corpus that has since changed
+            self._next_id += 1
+            org.entries[self._next_id] = _Entry(
+                vector=vector,
+                scope=scope,
+                answer=answer,
+                expires_at=self._clock() + self.ttl_seconds,
+            )
+            while len(org.entries) > self.max_entries_per_org:
+                org.entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                # every hit is a grounded-answer LLM call (and a vector
+                # search) that did not happen
+                "llm_calls_saved": self._hits,
+                "entries": sum(len(o.entries) for o in self._orgs.values()),
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(v))
+    return v / norm if norm else v
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -40,3 +42,39 @@ class DBChatHistoryRepository:
             )
         )
         self.db.commit()
+
+
+class AsyncDBChatHistoryRepository:
+    """DBChatHistoryRepository on an AsyncSession, for the async chat path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_recent_history(self, *, user_id: int) -> List[ChatMessage]:
+        rows = (
+            await self.db.scalars(
+                select(ChatHistory)
+                .where(ChatHistory.user_id == user_id)
+                .order_by(ChatHistory.created_at.desc())
+                .limit(HISTORY_LIMIT)
+            )
+        ).all()[::-1]
+        return [ChatMessage(role=r.role, message=r.message) for r in rows]
+
+    async def save_message(
+        self,
+        *,
+        user_id: int,
+        organization_id: int,
+        role: str,
+        message: str,
+    ) -> None:
+        self.db.add(
+            ChatHistory(
+                user_id=user_id,
+                organization_id=organization_id,
+                role=role,
+                message=message,
+            )
+        )
+        await self.db.commit()
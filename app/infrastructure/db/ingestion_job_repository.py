@@ -0,0 +1,78 @@
+from sqlalchemy.orm import Session
+
+from app.db.models.ingestion_job import IngestionJob
+from app.domain.ingestion_job_repository import IngestionJobRecord, JobStage
+
+
+def _to_record(row: IngestionJob) -> IngestionJobRecord:
+    return IngestionJobRecord(
+        id=row.id,
+        organization_id=row.organization_id,
+        uploaded_by=row.uploaded_by,
+        filename=row.filename,
+        file_path=row.file_path,
+        stage=row.stage,
+        chunks_done=row.chunks_done,
+        document_id=row.document_id,
+        error_type=row.error_type,
+        error=row.error,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+class DBIngestionJobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(
+        self, *, organization_id: int, uploaded_by: int, filename: str, file_path: str
+    ) -> IngestionJobRecord:
+        row = IngestionJob(
+            organization_id=organization_id,
+            uploaded_by=uploaded_by,
+            filename=filename,
+            file_path=file_path,
+            stage=JobStage.QUEUED,
+            chunks_done=0,
+        )
+        self.db.add(row)
+        self.db.commit()
+        self.db.refresh(row)
+        return _to_record(row)
+
+    def get(self, *, job_id: int) -> IngestionJobRecord | None:
+        row = self.db.get(IngestionJob, job_id)
+        return _to_record(row) if row else None
+
+    def count_active(self, *, organization_id: int) -> int:
+        return (
+            self.db.query(IngestionJob)
+            .filter(
+                IngestionJob.organization_id == organization_id,
+                IngestionJob.stage.in_(JobStage.ACTIVE),
+            )
+            .count()
+        )
+
+    def update_progress(self, *, job_id: int, stage: str, chunks_done: int) -> None:
+        self._update(job_id, stage=stage, chunks_done=chunks_done)
+
+    def mark_done(self, *, job_id: int, document_id: int, chunks_done: int) -> None:
+        self._update(
+            job_id,
+            stage=JobStage.DONE,
+            document_id=document_id,
+            chunks_done=chunks_done,
+        )
+
+    def mark_failed(self, *, job_id: int, error_type: str, error: str) -> None:
+        self._update(
+            job_id, stage=JobStage.FAILED, error_type=error_type, error=error[:255]
+        )
+
+    def _update(self, job_id: int, **values) -> None:
+        self.db.query(IngestionJob).filter(IngestionJob.id == job_id).update(
+            values, synchronize_session=False
+        )
+        self.db.commit()
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.models.conversation_summary import ConversationSummary
@@ -34,3 +36,17 @@ class DBConversationSummaryRepository:
                 )
             )
         self.db.commit()
+
+
+class AsyncDBConversationSummaryRepository:
+    """Summary reads on an AsyncSession, for the async chat path."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_summary(self, *, user_id: int) -> str | None:
+        return await self.db.scalar(
+            select(ConversationSummary.summary).where(
+                ConversationSummary.user_id == user_id
+            )
+        )
@@ -0,0 +1,114 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+from app.core.metrics import Histogram
+from app.domain.embedding_service import EmbeddingService
+
+_BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+_QUEUE_DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class MicroBatchingEmbeddingService:
+    """EmbeddingService decorator that coalesces concurrent embed_query calls.
+
+    Under load, dozens of chat threads each running a batch-size-1 MiniLM
+    forward pass fight over the same cores. Here every embed_query call
+    enqueues its text and blocks on a Future; one background thread takes
+    the first waiting query, keeps collecting for up to `max_wait_ms` or
+    until `max_batch_size` queries are in hand, runs ONE embed_texts over
+    the batch, and resolves each caller's Future with its own row.
+
+    max_wait_ms bounds the latency a lone request can pay for batching;
+    0 means "never wait — just take whatever queued up while the previous
+    batch was encoding", which adds no latency at low load and still
+    batches under contention.
+
+    embed_texts (ingestion) is already batched and passes straight through.
+    """
+
+    def __init__(
+        self,
+        inner: EmbeddingService,
+        *,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.inner = inner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = Histogram(_BATCH_SIZE_BUCKETS)
+        self.queue_depths = Histogram(_QUEUE_DEPTH_BUCKETS)
+        self._queue: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        return self.inner.embed_texts(texts)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        # Started lazily and re-started after a fork: a forked worker
+        # process inherits the object but not the parent's thread.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="embedding-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def _collect(self) -> list[tuple[str, Future]]:
+        batch = [self._queue.get()]
+        # How many were already waiting behind the first — the contention
+        # this batcher exists to absorb.
+        self.queue_depths.observe(self._queue.qsize())
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            self.batch_sizes.observe(len(batch))
+            try:
+                vectors = self.inner.embed_texts([text for text, _ in batch])
+            except Exception as exc:  # every waiter gets the failure
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            # Each caller gets its own row copy, not a view that would
+            # keep the whole batch matrix alive as long as any one row.
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(np.array(vector, dtype=np.float32))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth": self.queue_depths.snapshot(),
+        }
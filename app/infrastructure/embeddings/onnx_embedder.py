@@ -0,0 +1,102 @@
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from app.infrastructure.embeddings.sentence_transformer import EMBEDDING_MODEL
+
+# The Hub repo publishes an ONNX export of the exact same weights next to
+# the PyTorch ones, so no export step (and no optimum dependency) is needed.
+MODEL_REPO = f"sentence-transformers/{EMBEDDING_MODEL}"
+ONNX_FILE = "onnx/model.onnx"
+
+# all-MiniLM-L6-v2's sentence-transformers config: longer inputs are
+# truncated, exactly as SentenceTransformer.encode does.
+MAX_SEQ_LENGTH = 256
+
+# Chunks per forward pass in embed_texts; matches encode()'s default.
+BATCH_SIZE = 32
+
+
+class OnnxEmbeddingService:
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime instead of PyTorch, optionally with
+    dynamic int8 weight quantization.
+
+    Reproduces the sentence-transformers pipeline by hand: tokenize, run
+    the transformer, mean-pool over the attention mask, L2-normalize. The
+    vectors live in the same space as the torch backend's (see
+    tests/embeddings/test_onnx_parity.py), so switching backends needs no
+    re-ingestion.
+
+    onnxruntime is an optional dependency (requirements/onnx.txt) —
+    imported here, never at module load, so the torch deployment doesn't
+    need it installed.
+    """
+
+    def __init__(self, *, quantize: bool = False):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from transformers import AutoTokenizer
+
+        model_path = hf_hub_download(MODEL_REPO, ONNX_FILE)
+        if quantize:
+            model_path = quantized_copy(model_path)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(MODEL_REPO)
+        self.session = ort.InferenceSession(
+            model_path, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=MAX_SEQ_LENGTH,
+            return_tensors="np",
+        )
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self.input_names
+        }
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens only (padding masked out).
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32, copy=False)
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.concatenate(
+            [
+                self._encode(texts[start : start + BATCH_SIZE])
+                for start in range(0, len(texts), BATCH_SIZE)
+            ]
+        )
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._encode([text])[0]
+
+
+def quantized_copy(model_path: str) -> str:
+    """Dynamic int8 quantization of the fp32 export, done once and cached
+    beside it. Weights become int8; activations are quantized on the fly
+    per batch, so no calibration data is needed."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target = Path(model_path).with_name("model_dynamic_qint8.onnx")
+    if not target.exists():
+        # Several worker processes may race to build it: write to a
+        # private temp name and atomically rename into place.
+        tmp = target.with_name(f"{target.stem}.{os.getpid()}.tmp.onnx")
+        quantize_dynamic(model_path, str(tmp), weight_type=QuantType.QInt8)
+        os.replace(tmp, target)
+    return str(target)
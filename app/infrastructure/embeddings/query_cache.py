@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+from app.domain.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost (OrderedDict slot, key str header, array
+# header) added to the vector and key bytes, so max_bytes tracks real RSS
+# rather than just the payload.
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for a query: case-folded, whitespace-collapsed.
+
+    Only ever a key; the text embedded on a miss is the query as asked.
+    MiniLM's tokenizer is uncased and splits on whitespace, so these
+    variants already produce the identical embedding — folding them just
+    lets "What is X?" and "what is  x?" share one entry.
+    """
+    return " ".join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+    """EmbeddingService decorator that memoizes embed_query.
+
+    Tier 1 is an in-process LRU bounded by bytes (thread-safe — sync routes
+    run in a threadpool). Tier 2, optional, is Redis: a vector one uvicorn
+    worker computed is reused by every other worker. Redis is strictly an
+    accelerator — any error there is logged and the query is encoded
+    locally, so a Redis outage degrades to tier 1, never to a failed chat.
+
+    embed_texts (the ingestion path) passes straight through: document
+    chunks are embedded once and never looked up again.
+    """
+
+    def __init__(
+        self,
+        inner: EmbeddingService,
+        *,
+        max_bytes: int,
+        namespace: str,
+        redis_client=None,
+        redis_ttl_seconds: int = 86400,
+    ):
+        self.inner = inner
+        self.max_bytes = max_bytes
+        # Vectors from different models (or backends) must never mix in
+        # the shared Redis tier.
+        self.namespace = namespace
+        self.redis = redis_client
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._redis_errors = 0
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        return self.inner.embed_texts(texts)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        key = normalize_query(text)
+
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return vector
+
+        vector = self._redis_get(key)
+        if vector is not None:
+            with self._lock:
+                self._redis_hits += 1
+        else:
+            with self._lock:
+                self._misses += 1
+            vector = np.asarray(self.inner.embed_query(text), dtype=np.float32)
+            self._redis_set(key, vector)
+
+        # The same array is handed to every caller that hits this entry;
+        # freezing it means none of them can corrupt the others' copy.
+        vector.flags.writeable = False
+        self._insert(key, vector)
+        return vector
+
+    def _insert(self, key: str, vector: np.ndarray) -> None:
+        size = _entry_bytes(key, vector)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:  # a concurrent miss got here first
+                return
+            self._entries[key] = vector
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_vector = self._entries.popitem(last=False)
+                self._bytes -= _entry_bytes(old_key, old_vector)
+                self._evictions += 1
+
+    def _redis_key(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"qemb:{self.namespace}:{digest}"
+
+    def _redis_get(self, key: str) -> np.ndarray | None:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(self._redis_key(key))
+        except Exception:
+            self._redis_failed()
+            return None
+        if raw is None:
+            return None
+        return np.frombuffer(raw, dtype=np.float32).copy()
+
+    def _redis_set(self, key: str, vector: np.ndarray) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.setex(
+                self._redis_key(key), self.redis_ttl_seconds, vector.tobytes()
+            )
+        except Exception:
+            self._redis_failed()
+
+    def _redis_failed(self) -> None:
+        with self._lock:
+            self._redis_errors += 1
+        logger.warning("query embedding cache: redis unavailable", exc_info=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._redis_hits + self._misses
+            return {
+                "hits": self._hits,
+                "redis_hits": self._redis_hits,
+                "misses": self._misses,
+                "hit_rate": (
+                    round((self._hits + self._redis_hits) / lookups, 4)
+                    if lookups
+                    else 0.0
+                ),
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "redis_errors": self._redis_errors,
+            }
+
+
+def _entry_bytes(key: str, vector: np.ndarray) -> int:
+    return vector.nbytes + len(key.encode("utf-8")) + _ENTRY_OVERHEAD_BYTES
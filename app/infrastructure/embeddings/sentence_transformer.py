@@ -1,6 +1,10 @@
 from typing import List
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
 
 class SentenceTransformerEmbeddingService:
     """
@@ -9,14 +13,14 @@ class SentenceTransformerEmbeddingService:
 
     def __init__(self):
         # Load model ONCE
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.model = SentenceTransformer(EMBEDDING_MODEL)
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
         return self.model.encode(
             texts, convert_to_numpy=True, normalize_embeddings=True
-        ).tolist()
+        ).astype(np.float32, copy=False)
 
-    def embed_query(self, text: str) -> List[float]:
+    def embed_query(self, text: str) -> np.ndarray:
         return self.model.encode(
             text, convert_to_numpy=True, normalize_embeddings=True
-        ).tolist()
+        ).astype(np.float32, copy=False)
@@ -1,8 +1,10 @@
-from typing import Iterator
+from typing import AsyncIterator, Iterator
 
-from anthropic import Anthropic
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
 
 from app.domain.llm_service import GroundedAnswer
+from app.infrastructure.llm.http_transport import sdk_client_kwargs
 from app.prompts import (
     SYSTEM_PROMPT,
     build_grounded_rag_prompt,
@@ -12,11 +14,27 @@ from app.prompts import (
 )
 
 
-class AnthropicLLMService:
+class _AnthropicRequests:
+    model: str
+    max_tokens: int
+    temperature: float
+
+    def _request(self, user_prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": user_prompt}],
+            "temperature": self.temperature,
+        }
+
+
+class AnthropicLLMService(_AnthropicRequests):
     """
     Claude adapter. Anthropic's Messages API is not OpenAI-compatible
     (own SDK, system prompt is a top-level parameter, max_tokens is
     required), so it gets a dedicated adapter instead of a base_url swap.
+    `http_client` is as for OpenAICompatibleLLMService.
     """
 
     def __init__(
@@ -26,24 +44,16 @@ class AnthropicLLMService:
         model: str,
         temperature: float = 0.1,
         max_tokens: int = 1024,
+        http_client: httpx.Client | None = None,
     ):
-        self.client = Anthropic(api_key=api_key)
+        self.client = Anthropic(api_key=api_key, **sdk_client_kwargs(http_client))
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
 
     def generate_answer(self, *, question: str, context: str) -> str:
         response = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": build_rag_prompt(question=question, context=context),
-                }
-            ],
-            temperature=self.temperature,
+            **self._request(build_rag_prompt(question=question, context=context))
         )
         return response.content[0].text
 
@@ -51,34 +61,55 @@ class AnthropicLLMService:
         self, *, question: str, context: str
     ) -> GroundedAnswer:
         response = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": build_grounded_rag_prompt(
-                        question=question, context=context
-                    ),
-                }
-            ],
-            temperature=self.temperature,
+            **self._request(
+                build_grounded_rag_prompt(question=question, context=context)
+            )
         )
         return parse_grounded_answer(response.content[0].text)
 
     def stream_grounded_answer(self, *, question: str, context: str) -> Iterator[str]:
         with self.client.messages.stream(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": build_streamed_grounded_prompt(
-                        question=question, context=context
-                    ),
-                }
-            ],
-            temperature=self.temperature,
+            **self._request(
+                build_streamed_grounded_prompt(question=question, context=context)
+            )
         ) as stream:
             yield from stream.text_stream
+
+
+class AsyncAnthropicLLMService(_AnthropicRequests):
+    """AnthropicLLMService on AsyncAnthropic, for the async chat path."""
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        temperature: float = 0.1,
+        max_tokens: int = 1024,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        self.client = AsyncAnthropic(api_key=api_key, **sdk_client_kwargs(http_client))
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    async def generate_grounded_answer(
+        self, *, question: str, context: str
+    ) -> GroundedAnswer:
+        response = await self.client.messages.create(
+            **self._request(
+                build_grounded_rag_prompt(question=question, context=context)
+            )
+        )
+        return parse_grounded_answer(response.content[0].text)
+
+    async def stream_grounded_answer(
+        self, *, question: str, context: str
+    ) -> AsyncIterator[str]:
+        async with self.client.messages.stream(
+            **self._request(
+                build_streamed_grounded_prompt(question=question, context=context)
+            )
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
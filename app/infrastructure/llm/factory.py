@@ -1,9 +1,17 @@
 from dataclasses import dataclass
 
+import httpx
+
 from app.core.config import settings
-from app.domain.llm_service import LLMService
-from app.infrastructure.llm.anthropic_llm import AnthropicLLMService
-from app.infrastructure.llm.openai_compatible import OpenAICompatibleLLMService
+from app.domain.llm_service import AsyncLLMService, LLMService
+from app.infrastructure.llm.anthropic_llm import (
+    AnthropicLLMService,
+    AsyncAnthropicLLMService,
+)
+from app.infrastructure.llm.openai_compatible import (
+    AsyncOpenAICompatibleLLMService,
+    OpenAICompatibleLLMService,
+)
 
 
 @dataclass(frozen=True)
@@ -41,11 +49,33 @@ _OPENAI_COMPATIBLE: dict[str, ProviderDefaults] = {
 _ANTHROPIC_DEFAULT_MODEL = "claude-haiku-4-5-20251001"
 
 
-def build_llm_service() -> LLMService:
+def build_llm_service(http_client: httpx.Client | None = None) -> LLMService:
     """
     Build the LLM adapter selected by LLM_PROVIDER in .env.
     LLM_MODEL / LLM_BASE_URL / LLM_TEMPERATURE override the defaults.
+    `http_client`, when given, carries the adapter's requests (see
+    app.infrastructure.llm.http_transport).
     """
+    provider, kwargs = _resolve_provider()
+    if provider == "anthropic":
+        return AnthropicLLMService(**kwargs, http_client=http_client)
+    return OpenAICompatibleLLMService(**kwargs, http_client=http_client)
+
+
+def build_async_llm_service(
+    http_client: httpx.AsyncClient | None = None,
+) -> AsyncLLMService:
+    """The async counterpart of build_llm_service, for the chat routes —
+    same provider, model and settings, on the SDK's async client."""
+    provider, kwargs = _resolve_provider()
+    if provider == "anthropic":
+        return AsyncAnthropicLLMService(**kwargs, http_client=http_client)
+    return AsyncOpenAICompatibleLLMService(**kwargs, http_client=http_client)
+
+
+def _resolve_provider() -> tuple[str, dict]:
+    """(provider, adapter constructor kwargs) for LLM_PROVIDER; raises
+    RuntimeError on an unknown provider or a missing API key."""
     provider = settings.LLM_PROVIDER.lower()
 
     if provider == "anthropic":
@@ -53,12 +83,12 @@ def build_llm_service() -> LLMService:
             raise RuntimeError(
                 "LLM_PROVIDER=anthropic but ANTHROPIC_API_KEY is not set in .env"
             )
-        return AnthropicLLMService(
-            api_key=settings.ANTHROPIC_API_KEY,
-            model=settings.LLM_MODEL or _ANTHROPIC_DEFAULT_MODEL,
-            temperature=settings.LLM_TEMPERATURE,
-            max_tokens=settings.LLM_MAX_TOKENS,
-        )
+        return provider, {
+            "api_key": settings.ANTHROPIC_API_KEY,
+            "model": settings.LLM_MODEL or _ANTHROPIC_DEFAULT_MODEL,
+            "temperature": settings.LLM_TEMPERATURE,
+            "max_tokens": settings.LLM_MAX_TOKENS,
+        }
 
     defaults = _OPENAI_COMPATIBLE.get(provider)
     if defaults is None:
@@ -77,10 +107,10 @@ def build_llm_service() -> LLMService:
                 "is not set in .env"
             )
 
-    return OpenAICompatibleLLMService(
-        api_key=api_key,
-        base_url=settings.LLM_BASE_URL or defaults.base_url,
-        model=settings.LLM_MODEL or defaults.model,
-        temperature=settings.LLM_TEMPERATURE,
-        max_tokens=settings.LLM_MAX_TOKENS,
-    )
+    return provider, {
+        "api_key": api_key,
+        "base_url": settings.LLM_BASE_URL or defaults.base_url,
+        "model": settings.LLM_MODEL or defaults.model,
+        "temperature": settings.LLM_TEMPERATURE,
+        "max_tokens": settings.LLM_MAX_TOKENS,
+    }
@@ -0,0 +1,142 @@
+import threading
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+_IN_FLIGHT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class LLMTransportStats:
+    """Connection-level counters for the LLM HTTP clients, fed by httpcore's
+    `trace` request extension (attached to every request by a hook, see
+    build_http_client), so no private pool state is read.
+
+    new_connections counts TCP connects, tls_handshakes the TLS handshakes
+    on them; every request beyond those rode a kept-alive connection.
+    in_flight is requests between sending headers and the response being
+    closed (a stream counts until its last token). The in_flight_at_start
+    histogram, read against max_connections, is the pool's utilization:
+    requests that find it full wait for a free connection. Under HTTP/2,
+    several requests share one connection, so in_flight can exceed the
+    connections opened.
+    """
+
+    def __init__(self, *, max_connections: int, http2: bool):
+        self.max_connections = max_connections
+        self.http2 = http2
+        self.in_flight_at_start = Histogram(_IN_FLIGHT_BUCKETS)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._connects = 0
+        self._tls_handshakes = 0
+        self._connect_failures = 0
+        self._http2_requests = 0
+
+    def trace(self, event: str, info: dict) -> None:
+        """httpcore trace callback for the sync client. Events are
+        "<connection|http11|http2>.<step>.<started|complete|failed>"."""
+        prefix, _, rest = event.partition(".")
+        step, _, phase = rest.rpartition(".")
+        with self._lock:
+            if step == "send_request_headers" and phase == "started":
+                self.in_flight_at_start.observe(self._in_flight)
+                self._requests += 1
+                self._in_flight += 1
+                self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+                if prefix == "http2":
+                    self._http2_requests += 1
+            elif step == "response_closed" and phase != "started":
+                self._in_flight = max(self._in_flight - 1, 0)
+            elif step == "connect_tcp" and phase == "complete":
+                self._connects += 1
+            elif step == "connect_tcp" and phase == "failed":
+                self._connect_failures += 1
+            elif step == "start_tls" and phase == "complete":
+                self._tls_handshakes += 1
+
+    async def atrace(self, event: str, info: dict) -> None:
+        """The same callback for the async client, which awaits it."""
+        self.trace(event, info)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_connections": self.max_connections,
+                "http2": self.http2,
+                "requests": self._requests,
+                "http2_requests": self._http2_requests,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "new_connections": self._connects,
+                "tls_handshakes": self._tls_handshakes,
+                "connect_failures": self._connect_failures,
+                "connection_reuse_rate": (
+                    round(1 - self._connects / self._requests, 4)
+                    if self._requests
+                    else 0.0
+                ),
+                "in_flight_at_start": self.in_flight_at_start.snapshot(),
+            }
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    # read also bounds the wait for the first streamed token; pool is
+    # the wait for a free connection when all of them are busy.
+    return httpx.Timeout(
+        settings.LLM_HTTP_READ_TIMEOUT_SECONDS,
+        connect=settings.LLM_HTTP_CONNECT_TIMEOUT_SECONDS,
+    )
+
+
+def build_http_client(stats: LLMTransportStats) -> httpx.Client:
+    """The sync SDK clients' httpx.Client: pool limits, keep-alive expiry,
+    timeouts and HTTP/2 from Settings. HTTP/2 is negotiated per host
+    (ALPN), so a provider without it is served over HTTP/1.1.
+    LLM_HTTP2 needs the h2 package; httpx raises ImportError here if it
+    is missing."""
+
+    def attach_trace(request: httpx.Request) -> None:
+        request.extensions["trace"] = stats.trace
+
+    return httpx.Client(
+        limits=_limits(),
+        timeout=_timeout(),
+        http2=settings.LLM_HTTP2,
+        event_hooks={"request": [attach_trace]},
+    )
+
+
+def build_async_http_client(stats: LLMTransportStats) -> httpx.AsyncClient:
+    """build_http_client's async twin, for the chat routes' adapters."""
+
+    async def attach_trace(request: httpx.Request) -> None:
+        request.extensions["trace"] = stats.atrace
+
+    return httpx.AsyncClient(
+        limits=_limits(),
+        timeout=_timeout(),
+        http2=settings.LLM_HTTP2,
+        event_hooks={"request": [attach_trace]},
+    )
+
+
+def sdk_client_kwargs(http_client: httpx.Client | httpx.AsyncClient | None) -> dict:
+    """Constructor kwargs handing `http_client` to an OpenAI or Anthropic
+    SDK client. The timeout is passed explicitly: the SDKs only adopt the
+    client's own when it differs from httpx's default, and fall back to
+    their 10-minute one otherwise."""
+    if http_client is None:
+        return {}
+    return {"http_client": http_client, "timeout": http_client.timeout}
@@ -1,8 +1,10 @@
-from typing import Iterator
+from typing import AsyncIterator, Iterator
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
 
 from app.domain.llm_service import GroundedAnswer
+from app.infrastructure.llm.http_transport import sdk_client_kwargs
 from app.prompts import (
     SYSTEM_PROMPT,
     build_grounded_rag_prompt,
@@ -12,12 +14,23 @@ from app.prompts import (
 )
 
 
+def _messages(user_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
 class OpenAICompatibleLLMService:
     """
     LLM adapter for any provider that speaks the OpenAI chat-completions
     API: OpenAI itself, Groq, Google Gemini (via its OpenAI-compatible
     endpoint), and local Ollama. The provider is selected purely by
     base_url + api_key + model — no per-provider code needed.
+
+    `http_client` is the process's shared, explicitly tuned connection
+    pool (app/infrastructure/llm/http_transport.py); None keeps the
+    SDK's own default client.
     """
 
     def __init__(
@@ -28,8 +41,11 @@ class OpenAICompatibleLLMService:
         base_url: str | None = None,
         temperature: float = 0.1,
         max_tokens: int = 512,
+        http_client: httpx.Client | None = None,
     ):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.client = OpenAI(
+            api_key=api_key, base_url=base_url, **sdk_client_kwargs(http_client)
+        )
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
@@ -37,13 +53,7 @@ class OpenAICompatibleLLMService:
     def generate_answer(self, *, question: str, context: str) -> str:
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": build_rag_prompt(question=question, context=context),
-                },
-            ],
+            messages=_messages(build_rag_prompt(question=question, context=context)),
             temperature=self.temperature,
             max_tokens=self.max_tokens,
         )
@@ -54,15 +64,9 @@ class OpenAICompatibleLLMService:
     ) -> GroundedAnswer:
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": build_grounded_rag_prompt(
-                        question=question, context=context
-                    ),
-                },
-            ],
+            messages=_messages(
+                build_grounded_rag_prompt(question=question, context=context)
+            ),
             temperature=self.temperature,
             max_tokens=self.max_tokens,
         )
@@ -71,15 +75,9 @@ class OpenAICompatibleLLMService:
     def stream_grounded_answer(self, *, question: str, context: str) -> Iterator[str]:
         stream = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": build_streamed_grounded_prompt(
-                        question=question, context=context
-                    ),
-                },
-            ],
+            messages=_messages(
+                build_streamed_grounded_prompt(question=question, context=context)
+            ),
             temperature=self.temperature,
             max_tokens=self.max_tokens,
             stream=True,
@@ -88,3 +86,55 @@ class OpenAICompatibleLLMService:
             # some providers send keep-alive/usage chunks with no choices
             if chunk.choices and chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
+
+
+class AsyncOpenAICompatibleLLMService:
+    """OpenAICompatibleLLMService on AsyncOpenAI, for the async chat path:
+    same requests, awaited on the event loop instead of blocking a
+    thread for the length of the completion."""
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        base_url: str | None = None,
+        temperature: float = 0.1,
+        max_tokens: int = 512,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        self.client = AsyncOpenAI(
+            api_key=api_key, base_url=base_url, **sdk_client_kwargs(http_client)
+        )
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    async def generate_grounded_answer(
+        self, *, question: str, context: str
+    ) -> GroundedAnswer:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=_messages(
+                build_grounded_rag_prompt(question=question, context=context)
+            ),
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+        )
+        return parse_grounded_answer(response.choices[0].message.content)
+
+    async def stream_grounded_answer(
+        self, *, question: str, context: str
+    ) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=_messages(
+                build_streamed_grounded_prompt(question=question, context=context)
+            ),
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Sequence, Tuple
 
 from sentence_transformers import CrossEncoder
 
@@ -12,10 +12,27 @@ class CrossEncoderReranker:
     process-wide singleton, like the embedding model, not per request.
     """
 
-    def __init__(self, model_name: str | None = None):
-        self.model = CrossEncoder(model_name or settings.RERANK_MODEL)
+    def __init__(
+        self, model_name: str | None = None, *, max_seq_length: int | None = None
+    ):
+        # max_length truncates each (query, passage) pair; None keeps the
+        # model's own limit (512 tokens for the MiniLM cross-encoders).
+        self.model = CrossEncoder(
+            model_name or settings.RERANK_MODEL, max_length=max_seq_length
+        )
 
-    def rerank(self, *, query: str, passages: List[str]) -> List[int]:
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> Sequence[float]:
+        # The whole list as one padded batch: predict would otherwise split
+        # it into forward passes of 32, undoing any coalescing upstream.
+        return self.model.predict(pairs, batch_size=max(len(pairs), 1))
+
+    def rerank(
+        self,
+        *,
+        query: str,
+        passages: List[str],
+        passage_ids: Sequence[int] | None = None,
+    ) -> List[int]:
         if not passages:
             return []
         # One forward pass per (query, passage) pair; higher score = more
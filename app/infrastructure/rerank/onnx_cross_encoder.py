@@ -0,0 +1,87 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.infrastructure.embeddings.onnx_embedder import quantized_copy
+
+# cross-encoder/ms-marco-MiniLM-L-6-v2 publishes an ONNX export of the same
+# weights beside the PyTorch ones, as the embedding model's repo does.
+ONNX_FILE = "onnx/model.onnx"
+
+
+class OnnxCrossEncoderReranker:
+    """
+    The rerank cross-encoder on ONNX Runtime instead of PyTorch, with
+    dynamic int8 weight quantization by default.
+
+    Reproduces CrossEncoder.predict by hand: tokenize each (query,
+    passage) pair as one sequence, truncated to `max_seq_length` tokens,
+    run the model, and read the single relevance logit. The logit is the
+    model's raw score, before any activation. Only the order matters
+    here, and a monotonic activation wouldn't change it. Rank agreement
+    with the torch backend is checked in
+    tests/chat/test_onnx_rerank_parity.py.
+
+    max_seq_length caps the pair's length in tokens. Cost grows with it,
+    and a 500-character chunk plus a question is well under 256 tokens,
+    so lowering it from the model's 512 mostly trims padding.
+
+    onnxruntime is an optional dependency (requirements/onnx.txt),
+    imported here and never at module load.
+    """
+
+    def __init__(
+        self,
+        model_name: str | None = None,
+        *,
+        quantize: bool = True,
+        max_seq_length: int = 512,
+    ):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from transformers import AutoTokenizer
+
+        repo = model_name or settings.RERANK_MODEL
+        model_path = hf_hub_download(repo, ONNX_FILE)
+        if quantize:
+            model_path = quantized_copy(model_path)
+
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(repo)
+        self.session = ort.InferenceSession(
+            model_path, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> Sequence[float]:
+        if not pairs:
+            return []
+        # One padded batch for the whole list, like the torch backend.
+        encoded = self.tokenizer(
+            [query for query, _ in pairs],
+            [passage for _, passage in pairs],
+            padding=True,
+            truncation="longest_first",
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self.input_names
+        }
+        logits = self.session.run(None, feeds)[0]
+        return logits[:, 0].astype(np.float32).tolist()
+
+    def rerank(
+        self,
+        *,
+        query: str,
+        passages: List[str],
+        passage_ids: Sequence[int] | None = None,
+    ) -> List[int]:
+        if not passages:
+            return []
+        scores = self.score_pairs([(query, p) for p in passages])
+        return sorted(range(len(passages)), key=lambda i: scores[i], reverse=True)
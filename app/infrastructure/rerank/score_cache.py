@@ -0,0 +1,127 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Sequence
+
+from app.domain.reranker import PairScorer
+from app.infrastructure.embeddings.query_cache import normalize_query
+
+
+class RerankScoreCache:
+    """Reranker that memoizes cross-encoder scores per (query, chunk).
+
+    A popular question retrieves the same candidate chunks every time, and
+    each of them would be re-scored. Here a score is keyed on the
+    normalized query plus the chunk id (de.id); a rerank call looks up
+    every candidate, sends ONLY the misses to `scorer` in one
+    score_pairs call, and orders the pool from the merged scores. A call
+    whose candidates were all seen before runs no model at all.
+
+    Only the key is normalized (normalize_query). A miss is scored with
+    the query as asked, so a fresh score is exactly what the bare model
+    would return, cache or not. A hit may have been scored for a variant
+    of the query that differs only in case, spacing or punctuation. The
+    default model's tokenizer is uncased, so for it those scores agree.
+
+    Keying on the id is safe because a chunk's text never changes under
+    it, and ids are never reused. invalidate_chunks drops a deleted
+    document's entries so they stop holding memory. Other worker processes
+    can't reach those entries any more either, and LRU eviction
+    reclaims them.
+
+    Calls without passage_ids (evals, benchmarks) pass straight through.
+    Thread-safe; one instance per process, see app.composition.singletons.
+    """
+
+    def __init__(self, scorer: PairScorer, *, max_entries: int):
+        self.scorer = scorer
+        self.max_entries = max_entries
+        self._scores: "OrderedDict[tuple[str, int], float]" = OrderedDict()
+        # chunk id -> the queries it has a score under, for invalidation
+        self._by_chunk: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._model_calls_saved = 0
+
+    def rerank(
+        self,
+        *,
+        query: str,
+        passages: List[str],
+        passage_ids: Sequence[int] | None = None,
+    ) -> List[int]:
+        if not passages:
+            return []
+        if passage_ids is None:
+            scores = self.scorer.score_pairs([(query, p) for p in passages])
+        else:
+            scores = self._scores_for(query, passages, passage_ids)
+        return sorted(range(len(passages)), key=lambda i: scores[i], reverse=True)
+
+    def _scores_for(
+        self, query: str, passages: List[str], passage_ids: Sequence[int]
+    ) -> list[float]:
+        key = normalize_query(query)
+        scores: list[float | None] = []
+        with self._lock:
+            for chunk_id in passage_ids:
+                score = self._scores.get((key, chunk_id))
+                if score is not None:
+                    self._scores.move_to_end((key, chunk_id))
+                scores.append(score)
+            missing = [i for i, s in enumerate(scores) if s is None]
+            self._hits += len(scores) - len(missing)
+            self._misses += len(missing)
+            if not missing:
+                self._model_calls_saved += 1
+
+        if missing:
+            fresh = self.scorer.score_pairs([(query, passages[i]) for i in missing])
+            with self._lock:
+                for i, score in zip(missing, fresh):
+                    scores[i] = float(score)
+                    self._insert(key, passage_ids[i], float(score))
+        return scores
+
+    def _insert(self, query: str, chunk_id: int, score: float) -> None:
+        """Caller holds the lock."""
+        key = (query, chunk_id)
+        if key in self._scores:  # a concurrent miss got here first
+            return
+        self._scores[key] = score
+        self._by_chunk.setdefault(chunk_id, set()).add(query)
+        while len(self._scores) > self.max_entries:
+            (old_query, old_chunk), _ = self._scores.popitem(last=False)
+            self._forget(old_query, old_chunk)
+            self._evictions += 1
+
+    def _forget(self, query: str, chunk_id: int) -> None:
+        queries = self._by_chunk.get(chunk_id)
+        if queries is not None:
+            queries.discard(query)
+            if not queries:
+                del self._by_chunk[chunk_id]
+
+    def invalidate_chunks(self, chunk_ids: Iterable[int]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                for query in self._by_chunk.pop(chunk_id, ()):
+                    del self._scores[(query, chunk_id)]
+                    self._invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                # reranks answered without any cross-encoder pass
+                "model_calls_saved": self._model_calls_saved,
+                "entries": len(self._scores),
+                "max_entries": self.max_entries,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
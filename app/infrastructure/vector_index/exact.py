@@ -0,0 +1,43 @@
+from typing import List, NamedTuple
+
+import numpy as np
+
+
+class VectorHit(NamedTuple):
+    """One search result, shaped like a similarity_search row."""
+
+    id: int
+    content: str
+    document_id: int
+    filename: str
+    distance: float
+
+
+def exact_top_k(
+    matrix: np.ndarray,
+    row_document_ids: np.ndarray,
+    query: np.ndarray,
+    *,
+    limit: int,
+    document_ids: List[int] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(row indices, L2 distances) of the `limit` rows nearest `query`,
+    nearest first, optionally only among rows of `document_ids`.
+
+    Rows and query are unit length, so the largest inner product is the
+    smallest L2 distance, |a - b| = sqrt(2 - 2 a.b): the `distance`
+    similarity_search reports. One matrix-vector product, then a partial
+    sort of the top `limit` only.
+    """
+    scores = matrix @ query
+    rows = None
+    if document_ids:
+        rows = np.flatnonzero(np.isin(row_document_ids, document_ids))
+        scores = scores[rows]
+    k = min(limit, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    distances = np.sqrt(np.maximum(2.0 - 2.0 * scores[top], 0.0))
+    return (top if rows is None else rows[top]), distances
@@ -0,0 +1,416 @@
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List
+
+import anyio
+import numpy as np
+from anyio import to_thread
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.hnsw import EMBEDDING_DIM
+from app.db.models.document import Document
+from app.db.models.embedding import DocumentEmbedding
+from app.infrastructure.vector_index.exact import VectorHit, exact_top_k
+from app.infrastructure.vector_index.snapshot import SnapshotSource
+from app.services.corpus import async_get_corpus_generation
+from app.services.embedding_service import async_similarity_search
+
+
+@dataclass(frozen=True)
+class _OrgVectors:
+    """An org's corpus as of `generation`. Never mutated: a sync builds a
+    new one, so a search running in a worker thread reads a consistent
+    copy while the event loop replaces it."""
+
+    generation: int
+    ids: np.ndarray  # int64, one per row
+    document_ids: np.ndarray  # int64, one per row
+    contents: tuple[str, ...]
+    filenames: dict[int, str]
+    matrix: np.ndarray  # float32 (rows, dim), unit-length rows
+    # document_id -> (row count, max row id), as last loaded
+    signatures: dict[int, tuple[int, int]]
+    nbytes: int
+
+    def nearest(
+        self, query: np.ndarray, *, limit: int, document_ids: List[int] | None
+    ) -> list[VectorHit]:
+        picked, distances = exact_top_k(
+            self.matrix,
+            self.document_ids,
+            query,
+            limit=limit,
+            document_ids=document_ids,
+        )
+        return [
+            VectorHit(
+                id=int(self.ids[i]),
+                content=self.contents[i],
+                document_id=int(self.document_ids[i]),
+                filename=self.filenames[int(self.document_ids[i])],
+                distance=float(d),
+            )
+            for i, d in zip(picked, distances)
+        ]
+
+
+# Counting stops just past the cap: an org far too large to hold costs no
+# more to rule out than one barely over.
+_ROWS_UP_TO = text(
+    """
+    SELECT count(*) FROM (
+        SELECT 1 FROM document_embeddings
+        WHERE organization_id = :org_id
+        LIMIT :cap
+    ) rows
+    """
+)
+
+# What changed since the last load, per document. A re-ingested or
+# extended document (FAQ chunks appended) changes its count or max id; a
+# deleted one drops out.
+_SIGNATURES = text(
+    """
+    SELECT document_id, count(*), max(id)
+    FROM document_embeddings
+    WHERE organization_id = :org_id
+    GROUP BY document_id
+    """
+)
+
+
+class InMemoryDenseRetriever:
+    """DenseRetriever answering from a per-org float32 matrix in RAM.
+
+    Small and mid-size tenants fit in memory, and for them the Postgres
+    round trip and planning cost more than ranking the rows: one
+    matrix-vector product over the org's vectors is exact (perfect
+    recall) and takes well under a millisecond for tens of thousands of
+    chunks. Each search still does one primary-key read, of the org's
+    corpus generation, so an upload or delete through any worker process
+    is seen on the next query.
+
+    When the generation has moved on, the org is synced incrementally:
+    one grouped read compares each document's (row count, max id) with
+    what is held, and only new or changed documents' rows are fetched.
+    Rows of deleted documents are dropped. An org's first load fetches
+    all its rows.
+
+    Orgs above `max_rows_per_org` are searched by Postgres instead
+    (async_similarity_search, which has their HNSW index). Loaded orgs
+    are evicted least recently used once the copies together exceed
+    `max_bytes`.
+
+    With `snapshots` wired, an org's first load maps its vectors from the
+    current snapshot (app.infrastructure.vector_index.snapshot) when that
+    is up to date, and reads only the chunk text from Postgres. The
+    mapped pages are shared with every other process on the host and
+    are not counted against `max_bytes`.
+
+    The ranking runs in anyio's thread pool, so a large org's product
+    never blocks the event loop. One instance per process; see
+    app.composition.singletons.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_rows_per_org: int,
+        max_bytes: int,
+        snapshots: SnapshotSource | None = None,
+    ):
+        self.max_rows_per_org = max_rows_per_org
+        self.max_bytes = max_bytes
+        self.snapshots = snapshots
+        self._orgs: "OrderedDict[int, _OrgVectors]" = OrderedDict()
+        # org -> the generation at which it was found too large to hold
+        self._oversized: dict[int, int] = {}
+        self._sync_locks: dict[int, anyio.Lock] = {}
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._postgres_fallbacks = 0
+        self._syncs = 0
+        self._rows_loaded = 0
+        self._snapshot_loads = 0
+        self._evictions = 0
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        organization_id: int,
+        query_embedding: np.ndarray,
+        limit: int,
+        document_ids: List[int] | None = None,
+    ) -> list:
+        generation = await async_get_corpus_generation(
+            db, organization_id=organization_id
+        )
+        state = await self._current(db, organization_id, generation)
+        if state is None:
+            with self._lock:
+                self._postgres_fallbacks += 1
+            return await async_similarity_search(
+                db,
+                organization_id=organization_id,
+                query_embedding=query_embedding,
+                limit=limit,
+                document_ids=document_ids,
+            )
+
+        with self._lock:
+            self._memory_hits += 1
+        query = np.asarray(query_embedding, dtype=np.float32)
+        return await to_thread.run_sync(
+            lambda: state.nearest(query, limit=limit, document_ids=document_ids)
+        )
+
+    def _fresh(self, organization_id: int, generation: int) -> _OrgVectors | None:
+        with self._lock:
+            state = self._orgs.get(organization_id)
+            if state is not None and state.generation >= generation:
+                self._orgs.move_to_end(organization_id)
+                return state
+            return None
+
+    async def _current(
+        self, db: AsyncSession, organization_id: int, generation: int
+    ) -> _OrgVectors | None:
+        """The org's vectors at `generation` or newer, syncing them first if
+        needed; None if the org is too large to hold."""
+        state = self._fresh(organization_id, generation)
+        if state is not None:
+            return state
+        if self._oversized.get(organization_id, -1) >= generation:
+            return None
+
+        # One sync per org at a time; requests that queued behind it find
+        # the result fresh.
+        lock = self._sync_locks.setdefault(organization_id, anyio.Lock())
+        async with lock:
+            state = self._fresh(organization_id, generation)
+            if state is not None:
+                return state
+            if self._oversized.get(organization_id, -1) >= generation:
+                return None
+            return await self._sync(db, organization_id, generation)
+
+    async def _sync(
+        self, db: AsyncSession, organization_id: int, generation: int
+    ) -> _OrgVectors | None:
+        with self._lock:
+            held = self._orgs.get(organization_id)
+            self._syncs += 1
+
+        if held is None:
+            rows = (
+                await db.execute(
+                    _ROWS_UP_TO,
+                    {"org_id": organization_id, "cap": self.max_rows_per_org + 1},
+                )
+            ).scalar()
+            if rows > self.max_rows_per_org:
+                return self._mark_oversized(organization_id, generation)
+
+        signatures = {
+            document_id: (rows, max_id)
+            for document_id, rows, max_id in (
+                await db.execute(_SIGNATURES, {"org_id": organization_id})
+            ).all()
+        }
+        if sum(rows for rows, _ in signatures.values()) > self.max_rows_per_org:
+            return self._mark_oversized(organization_id, generation)
+
+        if held is None:
+            state = await self._load_from_snapshot(db, organization_id, generation)
+            if state is not None:
+                return self._hold(organization_id, state, fetched_rows=0)
+            changed = None  # first load: every row
+        else:
+            changed = [
+                d for d, sig in signatures.items() if held.signatures.get(d) != sig
+            ]
+        fetched = await self._fetch_rows(db, organization_id, changed)
+        state = _merge(
+            held,
+            fetched,
+            keep=signatures.keys(),
+            replaced=changed or (),
+            generation=generation,
+        )
+
+        return self._hold(organization_id, state, fetched_rows=len(fetched))
+
+    def _hold(
+        self, organization_id: int, state: _OrgVectors, *, fetched_rows: int
+    ) -> _OrgVectors:
+        with self._lock:
+            self._rows_loaded += fetched_rows
+            self._oversized.pop(organization_id, None)
+            self._orgs[organization_id] = state
+            self._orgs.move_to_end(organization_id)
+            self._evict()
+        return state
+
+    async def _load_from_snapshot(
+        self, db: AsyncSession, organization_id: int, generation: int
+    ) -> _OrgVectors | None:
+        """The org built around its snapshot slice, or None if there is no
+        current one. The slice must hold exactly the rows Postgres has."""
+        if self.snapshots is None:
+            return None
+        found = self.snapshots.org(organization_id, generation)
+        if found is None:
+            return None
+        rows = await self._fetch_rows(db, organization_id, None, with_vectors=False)
+        if not np.array_equal(found.ids, [r.id for r in rows]):
+            return None  # moved on since the generation was read
+        with self._lock:
+            self._snapshot_loads += 1
+        contents = tuple(r.content for r in rows)
+        return _OrgVectors(
+            generation=found.generation,
+            ids=np.asarray(found.ids, dtype=np.int64),
+            document_ids=np.asarray(found.document_ids, dtype=np.int64),
+            contents=contents,
+            filenames={r.document_id: r.filename for r in rows},
+            matrix=found.matrix,
+            signatures=_signatures(rows),
+            nbytes=sum(sys.getsizeof(c) for c in contents),
+        )
+
+    def _mark_oversized(self, organization_id: int, generation: int) -> None:
+        with self._lock:
+            self._oversized[organization_id] = generation
+            self._orgs.pop(organization_id, None)
+        return None
+
+    async def _fetch_rows(
+        self,
+        db: AsyncSession,
+        organization_id: int,
+        document_ids: list[int] | None,
+        *,
+        with_vectors: bool = True,
+    ) -> list:
+        if document_ids is not None and not document_ids:
+            return []
+        columns = [
+            DocumentEmbedding.id,
+            DocumentEmbedding.document_id,
+            DocumentEmbedding.content,
+            Document.filename,
+        ]
+        if with_vectors:
+            columns.append(DocumentEmbedding.embedding)
+        stmt = (
+            select(*columns)
+            .join(Document, Document.id == DocumentEmbedding.document_id)
+            .where(DocumentEmbedding.organization_id == organization_id)
+            .order_by(DocumentEmbedding.id)
+        )
+        if document_ids is not None:
+            stmt = stmt.where(
+                DocumentEmbedding.document_id.in_(
+                    bindparam("doc_ids", value=document_ids, expanding=True)
+                )
+            )
+        return (await db.execute(stmt)).all()
+
+    def _evict(self) -> None:
+        """Drop least recently used orgs beyond max_bytes, never the last
+        one. Caller holds the lock."""
+        while len(self._orgs) > 1 and self._held_bytes() > self.max_bytes:
+            self._orgs.popitem(last=False)
+            self._evictions += 1
+
+    def _held_bytes(self) -> int:
+        return sum(state.nbytes for state in self._orgs.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            searches = self._memory_hits + self._postgres_fallbacks
+            return {
+                "memory_searches": self._memory_hits,
+                "postgres_fallbacks": self._postgres_fallbacks,
+                "memory_rate": (
+                    round(self._memory_hits / searches, 4) if searches else 0.0
+                ),
+                "syncs": self._syncs,
+                "rows_loaded": self._rows_loaded,
+                "snapshot_loads": self._snapshot_loads,
+                "orgs": len(self._orgs),
+                "oversized_orgs": len(self._oversized),
+                "rows": sum(len(state.ids) for state in self._orgs.values()),
+                "bytes": self._held_bytes(),
+                "evictions": self._evictions,
+            }
+
+
+def _merge(
+    held: _OrgVectors | None, fetched: list, *, keep, replaced, generation: int
+) -> _OrgVectors:
+    """`held` minus the `replaced` documents and any outside `keep`, plus
+    the `fetched` rows."""
+    retained_docs = set(keep) - set(replaced)
+    ids, document_ids, contents, vectors = [], [], [], []
+    filenames: dict[int, str] = {}
+    signatures: dict[int, tuple[int, int]] = {}
+
+    if held is not None:
+        retained = np.flatnonzero(
+            np.isin(held.document_ids, list(retained_docs))
+        ).tolist()
+        ids.append(held.ids[retained])
+        document_ids.append(held.document_ids[retained])
+        contents.extend(held.contents[i] for i in retained)
+        vectors.append(held.matrix[retained])
+        for d in retained_docs:
+            if d in held.signatures:
+                filenames[d] = held.filenames[d]
+                signatures[d] = held.signatures[d]
+
+    if fetched:
+        ids.append(np.fromiter((r.id for r in fetched), dtype=np.int64))
+        document_ids.append(np.fromiter((r.document_id for r in fetched), np.int64))
+        contents.extend(r.content for r in fetched)
+        vectors.append(np.stack([np.asarray(r.embedding, np.float32) for r in fetched]))
+        filenames.update((r.document_id, r.filename) for r in fetched)
+        signatures.update(_signatures(fetched))
+
+    if ids:
+        ids_arr = np.concatenate(ids)
+        doc_arr = np.concatenate(document_ids)
+        matrix = np.ascontiguousarray(np.concatenate(vectors), dtype=np.float32)
+    else:
+        ids_arr = doc_arr = np.empty(0, dtype=np.int64)
+        matrix = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    nbytes = (
+        matrix.nbytes
+        + ids_arr.nbytes
+        + doc_arr.nbytes
+        + sum(sys.getsizeof(c) for c in contents)
+    )
+    return _OrgVectors(
+        generation=generation,
+        ids=ids_arr,
+        document_ids=doc_arr,
+        contents=tuple(contents),
+        filenames=filenames,
+        matrix=matrix,
+        signatures=signatures,
+        nbytes=nbytes,
+    )
+
+
+def _signatures(rows) -> dict[int, tuple[int, int]]:
+    """document_id -> (row count, max row id) of `rows`, as _SIGNATURES
+    reports them."""
+    signatures: dict[int, tuple[int, int]] = {}
+    for r in rows:
+        count, max_id = signatures.get(r.document_id, (0, 0))
+        signatures[r.document_id] = (count + 1, max(max_id, r.id))
+    return signatures
@@ -0,0 +1,407 @@
+"""Memory-mapped snapshots of document_embeddings.
+
+Reading an org's vectors out of Postgres means pgvector rendering each
+one as '[0.0123,...]' text and the client parsing it back, row by row.
+A snapshot pays that once: scripts/export_vector_snapshot.py streams the
+whole table out with binary COPY into two flat files, and every process
+that needs the vectors maps them instead of querying.
+
+On disk, under VECTOR_SNAPSHOT_DIR:
+
+    CURRENT                      name of the live snapshot
+    snapshot-<UTC timestamp>/
+        manifest.json            format version, dim, row count, and per
+                                 org: [start, stop) row range and the
+                                 corpus generation it was exported at
+        vectors.f32              rows x dim float32, little-endian
+        rows.i64                 rows x (id, document_id, organization_id)
+
+Rows are sorted by (organization_id, id), so an org's vectors are one
+contiguous slice: a view into the mapping, never a copy. Pages come from
+the OS page cache, which every worker process on the host shares, so N
+workers hold one copy of the vectors between them and a new worker
+starts with them already warm.
+
+Each org's slice is only used while its generation is not behind the
+org's live corpus_generation (app.services.corpus). A snapshot is a new
+directory published by atomically replacing CURRENT. SnapshotSource
+notices it the next time an org's generation has moved past the
+snapshot it holds, and reopens. Old directories can be deleted once
+published over: a process that still maps one keeps its pages until it
+lets go.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.hnsw import EMBEDDING_DIM
+from app.infrastructure.vector_index.exact import VectorHit, exact_top_k
+from app.services.corpus import get_corpus_generation
+from app.services.embedding_service import similarity_search
+
+FORMAT_VERSION = 1
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+ROWS_FILE = "rows.i64"
+
+_GENERATIONS = text("SELECT id, corpus_generation FROM organizations")
+
+_COPY_OUT = (
+    "COPY (SELECT id, document_id, organization_id, embedding "
+    "FROM document_embeddings ORDER BY organization_id, id) "
+    "TO STDOUT WITH (FORMAT binary)"
+)
+
+_HYDRATE = text(
+    """
+    SELECT de.id, de.content, de.document_id, d.filename
+    FROM document_embeddings de
+    JOIN documents d ON d.id = de.document_id
+    WHERE de.organization_id = :org_id AND de.id IN :ids
+    """
+).bindparams(bindparam("ids", expanding=True))
+
+
+def _copy_record(dim: int) -> np.dtype:
+    """One binary COPY tuple of _COPY_OUT: a field count, then each field
+    as a length-prefixed big-endian value. Every field is fixed size, so
+    the stream parses as a flat array of these."""
+    return np.dtype(
+        [
+            ("fields", ">i2"),
+            ("id_len", ">i4"),
+            ("id", ">i4"),
+            ("document_len", ">i4"),
+            ("document_id", ">i4"),
+            ("org_len", ">i4"),
+            ("organization_id", ">i4"),
+            ("vector_len", ">i4"),
+            ("dim", ">i2"),
+            ("unused", ">i2"),
+            ("vector", ">f4", (dim,)),
+        ]
+    )
+
+
+# Signature, flags (int4), header-extension length (int4).
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_HEADER_SIZE = len(_COPY_SIGNATURE) + 8
+_COPY_TRAILER = b"\xff\xff"
+
+
+class _CopyDecoder:
+    """File-like sink for copy_expert: decodes the binary COPY stream a
+    block of whole records at a time and appends them to the snapshot's
+    files, so the table never has to fit in memory."""
+
+    def __init__(self, vectors_file, rows_file, *, dim: int):
+        self._vectors = vectors_file
+        self._rows = rows_file
+        self._dim = dim
+        self._record = _copy_record(dim)
+        self._buffer = bytearray()
+        self._header_done = False
+        self.rows = 0
+
+    def write(self, data) -> int:
+        self._buffer += data
+        if not self._header_done:
+            if len(self._buffer) < _COPY_HEADER_SIZE:
+                return len(data)
+            if not self._buffer.startswith(_COPY_SIGNATURE):
+                raise ValueError("not a binary COPY stream")
+            extension = int.from_bytes(self._buffer[15:19], "big")
+            if len(self._buffer) < _COPY_HEADER_SIZE + extension:
+                return len(data)
+            del self._buffer[: _COPY_HEADER_SIZE + extension]
+            self._header_done = True
+
+        count = len(self._buffer) // self._record.itemsize
+        if count:
+            records = np.frombuffer(self._buffer, dtype=self._record, count=count)
+            self._check(records)
+            self._vectors.write(records["vector"].astype("<f4").tobytes())
+            rows = np.stack(
+                [records["id"], records["document_id"], records["organization_id"]],
+                axis=1,
+            )
+            self._rows.write(rows.astype("<i8").tobytes())
+            self.rows += count
+            del records
+            del self._buffer[: count * self._record.itemsize]
+        return len(data)
+
+    def _check(self, records: np.ndarray) -> None:
+        if not (
+            np.all(records["fields"] == 4)
+            and np.all(records["id_len"] == 4)
+            and np.all(records["document_len"] == 4)
+            and np.all(records["org_len"] == 4)
+            and np.all(records["vector_len"] == 4 + 4 * self._dim)
+            and np.all(records["dim"] == self._dim)
+        ):
+            raise ValueError(f"unexpected COPY record (expected {self._dim}-d rows)")
+
+    def finish(self) -> None:
+        if not self._header_done or bytes(self._buffer) != _COPY_TRAILER:
+            raise ValueError("truncated binary COPY stream")
+
+
+def export_snapshot(engine: Engine, directory: str | Path) -> Path:
+    """Export every org's embeddings as a new snapshot and publish it.
+    Returns the snapshot's directory.
+
+    The generations and the rows are read in one REPEATABLE READ
+    transaction, so each org's recorded generation describes exactly
+    the rows exported for it.
+    """
+    with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+        with conn.begin():
+            generations = dict(conn.execute(_GENERATIONS).all())
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                return _write(
+                    Path(directory),
+                    generations,
+                    lambda sink: cursor.copy_expert(_COPY_OUT, sink),
+                )
+            finally:
+                cursor.close()
+
+
+def _write(
+    directory: Path,
+    generations: dict[int, int],
+    copy_out: Callable[[object], None],
+    *,
+    dim: int = EMBEDDING_DIM,
+) -> Path:
+    """Write the stream `copy_out` produces as a snapshot, then publish it."""
+    directory.mkdir(parents=True, exist_ok=True)
+    name = "snapshot-" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    staging = directory / f".{name}.tmp"
+    staging.mkdir()
+
+    with open(staging / VECTORS_FILE, "wb") as vectors, open(
+        staging / ROWS_FILE, "wb"
+    ) as rows:
+        decoder = _CopyDecoder(vectors, rows, dim=dim)
+        copy_out(decoder)
+        decoder.finish()
+
+    orgs = {}
+    if decoder.rows:
+        org_column = np.fromfile(staging / ROWS_FILE, dtype="<i8").reshape(-1, 3)[:, 2]
+        org_ids, starts, counts = np.unique(
+            org_column, return_index=True, return_counts=True
+        )
+        for org_id, start, count in zip(org_ids, starts, counts):
+            orgs[str(org_id)] = {
+                "start": int(start),
+                "stop": int(start + count),
+                "generation": generations.get(int(org_id), 0),
+            }
+    manifest = {
+        "format": FORMAT_VERSION,
+        "dim": dim,
+        "rows": decoder.rows,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "orgs": orgs,
+    }
+    (staging / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+
+    final = directory / name
+    staging.rename(final)
+    pointer = directory / f".{CURRENT_FILE}.tmp"
+    pointer.write_text(name, encoding="utf-8")
+    os.replace(pointer, directory / CURRENT_FILE)  # atomic publish
+    return final
+
+
+@dataclass(frozen=True)
+class SnapshotSlice:
+    """One org's rows in a snapshot, as views into the mapped files."""
+
+    generation: int
+    ids: np.ndarray  # int64
+    document_ids: np.ndarray  # int64
+    matrix: np.ndarray  # float32 (rows, dim), memory-mapped
+
+
+class VectorSnapshot:
+    """A published snapshot, mapped read-only."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        manifest = json.loads((self.path / MANIFEST_FILE).read_text("utf-8"))
+        if manifest["format"] != FORMAT_VERSION:
+            raise ValueError(
+                f"snapshot {self.path.name} has format {manifest['format']}, "
+                f"expected {FORMAT_VERSION}; export a new one"
+            )
+        if manifest["dim"] != EMBEDDING_DIM:
+            raise ValueError(
+                f"snapshot {self.path.name} holds {manifest['dim']}-d vectors, "
+                f"expected {EMBEDDING_DIM}"
+            )
+        self.name = self.path.name
+        self.rows = manifest["rows"]
+        self._orgs = {int(k): v for k, v in manifest["orgs"].items()}
+        if self.rows:
+            self._vectors = np.memmap(
+                self.path / VECTORS_FILE,
+                dtype="<f4",
+                mode="r",
+                shape=(self.rows, EMBEDDING_DIM),
+            )
+            self._row_table = np.memmap(
+                self.path / ROWS_FILE, dtype="<i8", mode="r", shape=(self.rows, 3)
+            )
+        else:
+            self._vectors = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+            self._row_table = np.empty((0, 3), dtype=np.int64)
+
+    @classmethod
+    def current(cls, directory: str | Path) -> "VectorSnapshot | None":
+        """The snapshot CURRENT points to, or None if none is published."""
+        try:
+            name = (Path(directory) / CURRENT_FILE).read_text("utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return cls(Path(directory) / name)
+
+    def org(self, organization_id: int) -> SnapshotSlice | None:
+        entry = self._orgs.get(organization_id)
+        if entry is None:
+            return None
+        rows = slice(entry["start"], entry["stop"])
+        return SnapshotSlice(
+            generation=entry["generation"],
+            ids=self._row_table[rows, 0],
+            document_ids=self._row_table[rows, 1],
+            matrix=self._vectors[rows],
+        )
+
+
+class SnapshotSource:
+    """The latest snapshot in a directory, reopened when it is stale.
+
+    org() returns an org's slice only if it is at least as new as the
+    generation the caller read from Postgres. Otherwise the source
+    checks CURRENT for a newer snapshot and retries once in it; if there
+    is none, the caller reads the org from Postgres. One instance per
+    process; see app.composition.singletons.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._snapshot: VectorSnapshot | None = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._stale = 0
+        self._reloads = 0
+
+    def org(self, organization_id: int, generation: int) -> SnapshotSlice | None:
+        with self._lock:
+            found = self._fresh(organization_id, generation)
+            if found is None and self._reopen():
+                found = self._fresh(organization_id, generation)
+            if found is None:
+                self._stale += 1
+            else:
+                self._hits += 1
+            return found
+
+    def _fresh(self, organization_id: int, generation: int) -> SnapshotSlice | None:
+        if self._snapshot is None:
+            return None
+        found = self._snapshot.org(organization_id)
+        if found is None or found.generation < generation:
+            return None
+        return found
+
+    def _reopen(self) -> bool:
+        """Map the published snapshot if it is not the one held. Caller
+        holds the lock."""
+        try:
+            name = (self.directory / CURRENT_FILE).read_text("utf-8").strip()
+        except FileNotFoundError:
+            return False
+        if self._snapshot is not None and self._snapshot.name == name:
+            return False
+        self._snapshot = VectorSnapshot(self.directory / name)
+        self._reloads += 1
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "snapshot": self._snapshot.name if self._snapshot else None,
+                "rows": self._snapshot.rows if self._snapshot else 0,
+                "hits": self._hits,
+                "stale": self._stale,
+                "reloads": self._reloads,
+            }
+
+
+def snapshot_similarity_search(
+    db: Session,
+    snapshots: SnapshotSource,
+    *,
+    organization_id: int,
+    query_embedding: np.ndarray,
+    limit: int,
+    document_ids: List[int] | None = None,
+) -> list:
+    """similarity_search answered from the snapshot when the org's slice
+    is current: an exact ranking over the mapped vectors, then one
+    primary-key read for the winners' text and filenames. Falls back to
+    similarity_search when it is not.
+    """
+    generation = get_corpus_generation(db, organization_id=organization_id)
+    found = snapshots.org(organization_id, generation)
+    if found is None:
+        return similarity_search(
+            db,
+            organization_id=organization_id,
+            query_embedding=query_embedding,
+            limit=limit,
+            document_ids=document_ids,
+        )
+
+    picked, distances = exact_top_k(
+        found.matrix,
+        found.document_ids,
+        np.asarray(query_embedding, dtype=np.float32),
+        limit=limit,
+        document_ids=document_ids,
+    )
+    if not len(picked):
+        return []
+    ids = [int(found.ids[i]) for i in picked]
+    rows = {
+        row.id: row
+        for row in db.execute(_HYDRATE, {"org_id": organization_id, "ids": ids})
+    }
+    return [
+        VectorHit(
+            id=row_id,
+            content=rows[row_id].content,
+            document_id=rows[row_id].document_id,
+            filename=rows[row_id].filename,
+            distance=float(distance),
+        )
+        for row_id, distance in zip(ids, distances)
+        if row_id in rows
+    ]
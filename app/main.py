@@ -9,18 +9,24 @@ from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, require_metrics_token
 from app.api.routes import auth, documents, chat
 from app.composition.singletons import (
+    get_answer_cache,
+    get_async_llm_service,
+    get_dense_retriever,
     get_embedding_service,
+    get_hybrid_retriever,
     get_llm_service,
     get_reranker,
 )
 from app.core.config import settings
 from app.core.cookies import ACCESS_COOKIE, CSRF_COOKIE, CSRF_HEADER
 from app.core.logging import request_id_var, setup_logging
+from app.core.metrics import snapshot as metrics_snapshot
 from app.core.ratelimit import limiter
 from app.db import models  # noqa: F401
+from app.db.session import async_engine
 from app.db.models.user import User
 
 # Requests that can't be forged cross-site to mutate state (they're
@@ -65,10 +71,15 @@ async def lifespan(app: FastAPI):
     # the MiniLM model load (~4s) or the LLM client construction.
     get_embedding_service()
     get_llm_service()
+    get_async_llm_service()
     get_reranker()  # loads the cross-encoder only if RERANK_ENABLED
+    get_answer_cache()  # registers its /metrics collector if enabled
+    get_hybrid_retriever()  # likewise, if concurrent hybrid arms are on
+    get_dense_retriever()  # and if VECTOR_BACKEND=memory (orgs load lazily)
     logger.info("models warmed, ready to serve")
     yield
     logger.info("app shutting down")
+    await async_engine.dispose()
 
 
 # Interactive API docs map the entire attack surface, so they are
@@ -190,6 +201,15 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["system"], dependencies=[Depends(require_metrics_token)])
+def read_metrics():
+    """
+    Per-process performance counters (cache hit rates and the like).
+    Operator-only (METRICS_TOKEN): the numbers span every tenant's traffic.
+    """
+    return metrics_snapshot()
+
+
 @app.get("/me")
 def read_me(current_user: User = Depends(get_current_user)):
     """
@@ -0,0 +1,35 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.models.organization import Organization
+
+
+def bump_corpus_generation(db: Session, *, organization_id: int) -> None:
+    """Record that the org's searchable corpus changed.
+
+    Call it inside the transaction that adds or removes embeddings, so the
+    new generation becomes visible exactly when the new corpus does. Every
+    worker process compares against the committed value, which is how an
+    upload served by one uvicorn worker invalidates another's caches.
+    """
+    db.query(Organization).filter(Organization.id == organization_id).update(
+        {Organization.corpus_generation: Organization.corpus_generation + 1},
+        synchronize_session=False,
+    )
+
+
+def get_corpus_generation(db: Session, *, organization_id: int) -> int:
+    generation = (
+        db.query(Organization.corpus_generation)
+        .filter(Organization.id == organization_id)
+        .scalar()
+    )
+    return generation or 0
+
+
+async def async_get_corpus_generation(db: AsyncSession, *, organization_id: int) -> int:
+    generation = await db.scalar(
+        select(Organization.corpus_generation).where(Organization.id == organization_id)
+    )
+    return generation or 0
@@ -1,44 +1,24 @@
-import re
-from pathlib import Path
-
-from pypdf import PdfReader
+"""PDF text pipeline: pages -> normalized text -> overlapping chunks.
 
+Each stage is a generator over the previous one, so ingestion holds one
+page of text and one chunk window at a time rather than several
+full-document copies. The whole-text functions (extract_text_from_pdf,
+normalize_text, chunk_text) are thin wrappers over the same generators
+and produce identical output.
+"""
 
-def normalize_text(text: str) -> str:
-    """
-    Normalize PDF-extracted text by merging broken lines
-    and cleaning excessive whitespace.
-    """
-
-    # Split into raw lines
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-
-    merged_lines: list[str] = []
-    buffer = ""
-
-    for line in lines:
-        # If line ends with sentence punctuation, flush buffer
-        if re.search(r"[.!?]$", line):
-            buffer = f"{buffer} {line}".strip()
-            merged_lines.append(buffer)
-            buffer = ""
-        else:
-            # Otherwise, assume line continues
-            buffer = f"{buffer} {line}".strip()
+from pathlib import Path
+from typing import Iterable, Iterator
 
-    # Flush remaining buffer
-    if buffer:
-        merged_lines.append(buffer)
+from pypdf import PdfReader
 
-    # Output is deliberately one whitespace-normalized line: chunking
-    # is character-based, so sentence boundaries matter here but
-    # paragraph structure does not.
-    return re.sub(r"\s+", " ", " ".join(merged_lines)).strip()
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
 
 
-def extract_text_from_pdf(file_path: str) -> str:
+def iter_pdf_pages(file_path: str) -> Iterator[str]:
     """
-    Extracts and returns all text from a PDF file.
+    Yield the text of each PDF page that has any, one page at a time.
 
     Assumptions:
     - PDF is text-based (not scanned images)
@@ -52,50 +32,113 @@ def extract_text_from_pdf(file_path: str) -> str:
 
     reader = PdfReader(pdf_path)
 
-    extracted_text: list[str] = []
-
-    for page_number, page in enumerate(reader.pages):
+    for page in reader.pages:
         text = page.extract_text()
 
         if text:
-            extracted_text.append(text)
+            yield text
 
-    return "\n".join(extracted_text)
 
+def iter_normalized_text(pages: Iterable[str]) -> Iterator[str]:
+    """
+    Normalize page texts into one whitespace-collapsed stream.
 
-def chunk_text(
-    text: str,
-    chunk_size: int = 500,
-    overlap: int = 100,
-) -> list[str]:
+    Yields pieces whose concatenation is the whole document as a single
+    line: every run of whitespace (line breaks inside a page, the break
+    between pages) becomes one space. Broken PDF lines are thereby merged
+    back into sentences; chunking is character-based, so paragraph
+    structure is deliberately not kept.
     """
-    Split text into overlapping chunks.
+    separator = ""
+    for page in pages:
+        text = " ".join(page.split())
+        if text:
+            yield separator + text
+            separator = " "
+
+
+def iter_chunks(
+    pieces: Iterable[str],
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+) -> Iterator[str]:
+    """
+    Split a text stream into overlapping chunks as it arrives.
+
+    A chunk is emitted as soon as its full window is available; the last
+    `overlap` characters are carried into the next window, across page
+    boundaries. Only the current window is held, never the whole text.
 
     Args:
-        text: Full extracted document text
+        pieces: Consecutive pieces of the text (e.g. normalized pages)
         chunk_size: Number of characters per chunk
         overlap: Number of overlapping characters
-
-    Returns:
-        List of text chunks
     """
 
     if overlap >= chunk_size:
         raise ValueError("overlap must be smaller than chunk_size")
 
-    chunks: list[str] = []
-    start = 0
-    text_length = len(text)
+    step = chunk_size - overlap
+    window = ""
+    start = 0  # offset of the next chunk within window
+
+    for piece in pieces:
+        window = window[start:] + piece
+        start = 0
+        while len(window) - start >= chunk_size:
+            yield from _non_empty(window[start : start + chunk_size])
+            start += step
 
-    while start < text_length:
-        end = start + chunk_size
-        chunk = text[start:end].strip()
+    # Input exhausted: the remaining (shorter) windows, as chunk_text
+    # has always produced them.
+    while start < len(window):
+        yield from _non_empty(window[start : start + chunk_size])
+        start += step
 
-        # A whitespace-only tail would otherwise be embedded and stored
-        # as a retrievable (and useless) row.
-        if chunk:
-            chunks.append(chunk)
 
-        start = end - overlap
+def _non_empty(chunk: str) -> Iterator[str]:
+    # A whitespace-only tail would otherwise be embedded and stored
+    # as a retrievable (and useless) row.
+    chunk = chunk.strip()
+    if chunk:
+        yield chunk
 
-    return chunks
+
+def iter_pdf_chunks(file_path: str) -> Iterator[str]:
+    """The full streaming pipeline for one PDF."""
+    return iter_chunks(iter_normalized_text(iter_pdf_pages(file_path)))
+
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """
+    Extracts and returns all text from a PDF file, pages joined by
+    newlines.
+    """
+    return "\n".join(iter_pdf_pages(file_path))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize PDF-extracted text by merging broken lines
+    and cleaning excessive whitespace.
+    """
+    return "".join(iter_normalized_text([text]))
+
+
+def chunk_text(
+    text: str,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+) -> list[str]:
+    """
+    Split text into overlapping chunks.
+
+    Args:
+        text: Full extracted document text
+        chunk_size: Number of characters per chunk
+        overlap: Number of overlapping characters
+
+    Returns:
+        List of text chunks
+    """
+    return list(iter_chunks([text], chunk_size, overlap))
@@ -1,12 +1,23 @@
+import logging
 import re
-from typing import List
+from itertools import islice
+from typing import Callable, Iterable, List
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import bindparam, text
 
 from app.core.config import settings
+from app.db.bulk_copy import chunk_hash, copy_document_embeddings
+from app.db.hnsw import quantized_distance, search_ef_search, tenant_index_name
 from app.db.models.document import Document
 from app.db.models.embedding import DocumentEmbedding
+from app.db.tenant_vector_index import INDEX_STATE
 from app.domain.embedding_service import EmbeddingService
+from app.services.corpus import bump_corpus_generation
+
+logger = logging.getLogger(__name__)
 
 
 def store_embeddings(
@@ -14,22 +25,101 @@ def store_embeddings(
     *,
     organization_id: int,
     document: Document,
-    chunks: List[str],
+    chunks: Iterable[str],
     embedding_service: EmbeddingService,
-):
-    embeddings = embedding_service.embed_texts(chunks)
+    batch_size: int = settings.INGEST_BATCH_CHUNKS,
+    on_batch: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Embed and store a document's chunks, then commit once.
+
+    `chunks` may be a generator (the streaming PDF pipeline): it is
+    consumed batch_size chunks at a time, each batch embedded and COPY'd
+    before the next is read, so only one batch of text and vectors is
+    alive at once. Everything lands in one transaction with the
+    (flushed) Document row. on_batch, if given, receives the running
+    chunk count after each batch. Returns the number of chunks stored.
 
-    records = [
-        DocumentEmbedding(
+    Only chunks whose text is new to the organization go through the
+    encoder: the vector of a chunk already stored (an unchanged section
+    of a revised file, boilerplate repeated across documents) is read
+    back by chunk_hash and reused.
+    """
+    db.flush()
+    stored = 0
+    chunk_iter = iter(chunks)
+    while batch := list(islice(chunk_iter, batch_size)):
+        hashes = [chunk_hash(chunk) for chunk in batch]
+        vectors_by_hash = stored_vectors_by_hash(
+            db, organization_id=organization_id, hashes=hashes
+        )
+        new_chunks = {
+            h: chunk for h, chunk in zip(hashes, batch) if h not in vectors_by_hash
+        }
+        if new_chunks:
+            fresh = embedding_service.embed_texts(list(new_chunks.values()))
+            vectors_by_hash.update(zip(new_chunks, fresh))
+        copy_document_embeddings(
+            db,
             organization_id=organization_id,
             document_id=document.id,
-            content=chunk,
-            embedding=vector,
+            contents=batch,
+            vectors=np.stack([vectors_by_hash[h] for h in hashes]),
+        )
+        stored += len(batch)
+        if on_batch is not None:
+            on_batch(stored)
+    bump_corpus_generation(db, organization_id=organization_id)
+    db.commit()
+    return stored
+
+
+def stored_vectors_by_hash(
+    db: Session, *, organization_id: int, hashes: Iterable[str]
+) -> dict[str, np.ndarray]:
+    """Vectors already stored in the org for any of `hashes`, one per
+    hash (identical text embeds identically, so any row will do)."""
+    unique = set(hashes)
+    if not unique:
+        return {}
+    rows = (
+        db.query(DocumentEmbedding.chunk_hash, DocumentEmbedding.embedding)
+        .filter(
+            DocumentEmbedding.organization_id == organization_id,
+            DocumentEmbedding.chunk_hash.in_(unique),
         )
-        for chunk, vector in zip(chunks, embeddings)
-    ]
+        .distinct(DocumentEmbedding.chunk_hash)
+        .all()
+    )
+    return {row.chunk_hash: np.asarray(row.embedding, dtype=np.float32) for row in rows}
+
 
-    db.bulk_save_objects(records)
+def insert_embeddings(
+    db: Session,
+    *,
+    organization_id: int,
+    document_id: int,
+    contents: List[str],
+    vectors: np.ndarray,
+):
+    """
+    Write already-computed vectors for one document and commit.
+
+    Split from embedding so callers that batch the encoder across several
+    documents (bulk ingestion) share the same write path. Rows are
+    streamed with binary COPY (app.db.bulk_copy) rather than ORM INSERTs;
+    anything the caller added to the session (e.g. the Document row
+    itself) is flushed first and commits in the same transaction.
+    """
+    db.flush()
+    copy_document_embeddings(
+        db,
+        organization_id=organization_id,
+        document_id=document_id,
+        contents=contents,
+        vectors=vectors,
+    )
+    bump_corpus_generation(db, organization_id=organization_id)
     db.commit()
 
 
@@ -46,45 +136,344 @@ def store_generated_faq_embeddings(
     """
     texts = [f"Q: {f['question']} A: {f['answer']}" for f in faqs]
     embeddings = embedding_service.embed_texts(texts)
+    insert_embeddings(
+        db,
+        organization_id=organization_id,
+        document_id=document_id,
+        contents=texts,
+        vectors=embeddings,
+    )
 
-    records = [
-        DocumentEmbedding(
-            organization_id=organization_id,
-            document_id=document_id,
-            content=text,
-            embedding=vector,
-        )
-        for text, vector in zip(texts, embeddings)
-    ]
 
-    db.bulk_save_objects(records)
-    db.commit()
+# set_config(..., is_local => true) is SET LOCAL with a bindable value:
+# it lasts until the end of the current transaction, so it never leaks to
+# the next request that checks out this pooled connection.
+_SET_EF_SEARCH = text("SELECT set_config('hnsw.ef_search', :ef_search, true)")
+
+
+def _ef_search_params(*, limit: int, ef_search: int | None) -> dict | None:
+    """Bind params for _SET_EF_SEARCH, or None when the server default
+    already serves this query. An explicit ef_search wins over
+    settings.HNSW_EF_SEARCH."""
+    value = search_ef_search(
+        limit=limit,
+        ef_search=settings.HNSW_EF_SEARCH if ef_search is None else ef_search,
+    )
+    return None if value is None else {"ef_search": str(value)}
+
+
+# Iterative index scans (pgvector >= 0.8): when rows the index returns are
+# filtered away, keep walking the graph until LIMIT rows pass the filter,
+# instead of stopping after ef_search candidates. Set only for filtered
+# (document_ids) searches. Otherwise the tenant's own partial index already
+# matches the org filter exactly (app/db/hnsw.py).
+_SET_ITERATIVE_SCAN = text("SELECT set_config('hnsw.iterative_scan', :mode, true)")
+
+# How many rows a document_ids filter selects, counted up to a cap. Served
+# from the (document_id, organization_id) index alone.
+_FILTERED_ROWS_UP_TO = text(
+    """
+    SELECT count(*) FROM (
+        SELECT 1 FROM document_embeddings
+        WHERE organization_id = :org_id AND document_id IN :doc_ids
+        LIMIT :cap
+    ) rows
+    """
+).bindparams(bindparam("doc_ids", expanding=True))
+
+
+def _iterative_scan_params(document_ids: List[int] | None) -> dict | None:
+    mode = settings.HNSW_ITERATIVE_SCAN
+    return {"mode": mode} if document_ids and mode else None
+
+
+def _filtered_count_params(organization_id: int, document_ids: List[int]) -> dict:
+    return {
+        "org_id": organization_id,
+        "doc_ids": document_ids,
+        # One past the cap is enough to tell "too many to scan exactly".
+        "cap": settings.FILTERED_EXACT_SCAN_MAX_ROWS + 1,
+    }
+
+
+def _short_result_plan(*, found: int, limit: int, filtered_rows: int) -> str:
+    """What to do about a filtered search that came back with fewer than
+    `limit` rows:
+
+        complete  — the filter selects no more rows than were found;
+        exact     — rows were lost to the filter, and the filtered set is
+                    small enough to rank in full;
+        short     — rows were lost, but an exhaustive scan would be too
+                    costly. The result is returned as is.
+    """
+    if filtered_rows <= found:
+        return "complete"
+    if filtered_rows <= settings.FILTERED_EXACT_SCAN_MAX_ROWS:
+        return "exact"
+    return "short"
+
+
+def _log_short_result(
+    plan: str, *, organization_id: int, found: int, limit: int, filtered_rows: int
+) -> None:
+    log = logger.warning if plan == "short" else logger.info
+    log(
+        "filtered similarity search returned %d/%d rows (org=%d, filtered "
+        "rows=%s, iterative_scan=%s): %s",
+        found,
+        limit,
+        organization_id,
+        (
+            f">{settings.FILTERED_EXACT_SCAN_MAX_ROWS}"
+            if filtered_rows > settings.FILTERED_EXACT_SCAN_MAX_ROWS
+            else filtered_rows
+        ),
+        settings.HNSW_ITERATIVE_SCAN or "off",
+        plan,
+    )
 
 
 def similarity_search(
     db: Session,
     *,
     organization_id: int,
-    query_embedding: List[float],
+    query_embedding: np.ndarray,
     limit: int = settings.DEFAULT_TOP_K,
     document_ids: List[int] | None = None,
+    ef_search: int | None = None,
+    quantization: str | None = None,
+):
+    """The org's `limit` nearest chunks, optionally only from document_ids.
+
+    A document_ids filter is applied to what the HNSW scan returns, so it
+    can leave fewer than `limit` rows even when the documents hold more.
+    Iterative scans are enabled for filtered searches to prevent that. If
+    the result is still short, the filtered rows are counted, and a small
+    filtered set is ranked exactly (see _short_result_plan). Unfiltered
+    searches take one round trip, as before.
+
+    quantization overrides settings.VECTOR_INDEX_QUANTIZATION. It selects
+    which index form the first pass orders by (see _dense_nearest), for
+    orgs that have an index in that form (see _compact_index_params).
+    """
+    quantization = _quantization(quantization)
+    check = _compact_index_params(organization_id, quantization)
+    if check and not db.execute(INDEX_STATE, check).scalar():
+        quantization = "none"
+    sql, params = _similarity_statement(
+        organization_id=organization_id,
+        query_embedding=query_embedding,
+        limit=limit,
+        document_ids=document_ids,
+        quantization=quantization,
+    )
+    ef = _ef_search_params(limit=_dense_pool(limit, quantization), ef_search=ef_search)
+    if ef:
+        db.execute(_SET_EF_SEARCH, ef)
+    iterative = _iterative_scan_params(document_ids)
+    if iterative:
+        db.execute(_SET_ITERATIVE_SCAN, iterative)
+    rows = db.execute(sql, params).fetchall()
+    if not document_ids or len(rows) >= limit:
+        return rows
+
+    filtered_rows = db.execute(
+        _FILTERED_ROWS_UP_TO, _filtered_count_params(organization_id, document_ids)
+    ).scalar()
+    plan = _short_result_plan(found=len(rows), limit=limit, filtered_rows=filtered_rows)
+    _log_short_result(
+        plan,
+        organization_id=organization_id,
+        found=len(rows),
+        limit=limit,
+        filtered_rows=filtered_rows,
+    )
+    if plan == "exact":
+        sql, params = _similarity_statement(
+            organization_id=organization_id,
+            query_embedding=query_embedding,
+            limit=limit,
+            document_ids=document_ids,
+            exact=True,
+        )
+        rows = db.execute(sql, params).fetchall()
+    return rows
+
+
+async def async_similarity_search(
+    db: AsyncSession,
+    *,
+    organization_id: int,
+    query_embedding: np.ndarray,
+    limit: int = settings.DEFAULT_TOP_K,
+    document_ids: List[int] | None = None,
+    ef_search: int | None = None,
+    quantization: str | None = None,
+):
+    """similarity_search on an async (asyncpg) session."""
+    quantization = _quantization(quantization)
+    check = _compact_index_params(organization_id, quantization)
+    if check and not (await db.execute(INDEX_STATE, check)).scalar():
+        quantization = "none"
+    sql, params = _similarity_statement(
+        organization_id=organization_id,
+        query_embedding=query_embedding,
+        limit=limit,
+        document_ids=document_ids,
+        quantization=quantization,
+    )
+    ef = _ef_search_params(limit=_dense_pool(limit, quantization), ef_search=ef_search)
+    if ef:
+        await db.execute(_SET_EF_SEARCH, ef)
+    iterative = _iterative_scan_params(document_ids)
+    if iterative:
+        await db.execute(_SET_ITERATIVE_SCAN, iterative)
+    rows = (await db.execute(sql, params)).fetchall()
+    if not document_ids or len(rows) >= limit:
+        return rows
+
+    filtered_rows = (
+        await db.execute(
+            _FILTERED_ROWS_UP_TO,
+            _filtered_count_params(organization_id, document_ids),
+        )
+    ).scalar()
+    plan = _short_result_plan(found=len(rows), limit=limit, filtered_rows=filtered_rows)
+    _log_short_result(
+        plan,
+        organization_id=organization_id,
+        found=len(rows),
+        limit=limit,
+        filtered_rows=filtered_rows,
+    )
+    if plan == "exact":
+        sql, params = _similarity_statement(
+            organization_id=organization_id,
+            query_embedding=query_embedding,
+            limit=limit,
+            document_ids=document_ids,
+            exact=True,
+        )
+        rows = (await db.execute(sql, params)).fetchall()
+    return rows
+
+
+# Embeddings are unit length (the embedders L2-normalize), so ordering by
+# negative inner product (<#>, served by the vector_ip_ops HNSW index) is
+# exactly L2 order, with one dot product per candidate instead of a
+# difference and a sum of squares. `distance` is still reported as L2:
+# for unit a, b, |a - b|^2 = 2 - 2 a.b = 2 + 2 (a <#> b). GREATEST absorbs
+# float rounding just below zero for a self-match.
+_QUERY_VECTOR = "CAST(:query_embedding AS vector)"
+_NEG_INNER_PRODUCT = f"de.embedding <#> {_QUERY_VECTOR}"
+_L2_DISTANCE = f"sqrt(GREATEST(2 + 2 * ({_NEG_INNER_PRODUCT}), 0))"
+
+
+def _quantization(quantization: str | None) -> str:
+    return settings.VECTOR_INDEX_QUANTIZATION if quantization is None else quantization
+
+
+def _compact_index_params(organization_id: int, quantization: str) -> dict | None:
+    """Bind params for the INDEX_STATE lookup of the org's index in the
+    compact form, or None on the full-precision form (nothing to check).
+
+    Only an org with TENANT_VECTOR_INDEX_MIN_CHUNKS rows has an index,
+    and until it does, its rows are meant to be ranked exactly. Ordering
+    them by the compact distance would instead keep a lossy :pool of
+    them. So without a valid compact index, the search runs as "none".
+    A large org whose compact index is not built yet falls back the same
+    way, onto its full-precision index if it still has one.
+    """
+    if quantization == "none":
+        return None
+    return {"name": tenant_index_name(organization_id, quantization)}
+
+
+def _dense_pool(limit: int, quantization: str) -> int:
+    """Rows the first pass fetches: `limit` itself on the full-precision
+    index, QUANTIZED_CANDIDATES_FACTOR times it on a compact one. The
+    compact distances misorder near neighbours, so the true top `limit`
+    is usually inside the larger pool and the re-rank restores it."""
+    if quantization == "none":
+        return limit
+    return limit * settings.QUANTIZED_CANDIDATES_FACTOR
+
+
+def _dense_nearest(
+    *, columns: str, doc_filter: str, joins: str = "", limit: str, quantization: str
+) -> str:
+    """SELECT of the `limit` nearest org rows, each with its L2 `distance`.
+
+    On a quantized index the scan orders by the compact distance the
+    index serves, fetching :pool rows. An outer query then re-ranks them
+    by the full-precision distance and keeps `limit`.
+    """
+    quantized = quantization != "none"
+    order_by = quantized_distance(
+        quantization, column="de.embedding", query=_QUERY_VECTOR
+    )
+    nearest = f"""
+        SELECT {columns}, {_L2_DISTANCE} AS distance
+        FROM document_embeddings de
+        {joins}
+        WHERE de.organization_id = :org_id
+        {doc_filter}
+        ORDER BY {order_by}
+        LIMIT {":pool" if quantized else limit}
+    """
+    if not quantized:
+        return nearest
+    return f"SELECT * FROM ({nearest}) pool ORDER BY distance LIMIT {limit}"
+
+
+def _similarity_statement(
+    *,
+    organization_id: int,
+    query_embedding: np.ndarray,
+    limit: int,
+    document_ids: List[int] | None,
+    exact: bool = False,
+    quantization: str = "none",
 ):
     # The org filter is unconditional — tenant isolation must hold no
     # matter what the caller passes. document_ids only narrows WITHIN
     # the org: another org's document id simply matches nothing.
     doc_filter = "AND de.document_id IN :doc_ids" if document_ids else ""
+    columns = "de.id, de.content, de.document_id, d.filename"
+    joins = "JOIN documents d ON d.id = de.document_id"
 
-    sql = text(
-        f"""
-        SELECT de.id, de.content, de.document_id, d.filename,
-            (de.embedding <-> CAST(:query_embedding AS vector)) AS distance
-        FROM document_embeddings de
-        JOIN documents d ON d.id = de.document_id
-        WHERE de.organization_id = :org_id
-        {doc_filter}
-        ORDER BY de.embedding <-> CAST(:query_embedding AS vector)
-        LIMIT :limit
-        """
+    if exact:
+        # Ordered by the reported L2 distance instead. It ranks the same,
+        # but it is not the indexed operator, so the HNSW index cannot serve
+        # it and every filtered row is ranked at full precision. Unlike SET
+        # LOCAL enable_indexscan, this leaves later statements in the
+        # transaction alone.
+        sql = text(
+            f"""
+            SELECT {columns}, {_L2_DISTANCE} AS distance
+            FROM document_embeddings de
+            {joins}
+            WHERE de.organization_id = :org_id
+            {doc_filter}
+            ORDER BY distance
+            LIMIT :limit
+            """
+        )
+    else:
+        sql = text(
+            _dense_nearest(
+                columns=columns,
+                joins=joins,
+                doc_filter=doc_filter,
+                limit=":limit",
+                quantization=quantization,
+            )
+        )
+    # Typed as a pgvector parameter: the float32 array is serialized
+    # straight to vector text, instead of psycopg2 adapting a Python list
+    # into a float8[] literal for Postgres to cast.
+    sql = sql.bindparams(
+        bindparam("query_embedding", type_=DocumentEmbedding.embedding.type)
     )
 
     params = {
@@ -92,11 +481,21 @@ def similarity_search(
         "query_embedding": query_embedding,
         "limit": limit,
     }
+    if not exact and quantization != "none":
+        params["pool"] = _dense_pool(limit, quantization)
     if document_ids:
         sql = sql.bindparams(bindparam("doc_ids", expanding=True))
         params["doc_ids"] = document_ids
 
-    return db.execute(sql, params).fetchall()
+    return sql, params
+
+
+def _or_tsquery(query_text: str) -> str | None:
+    """OR-joined tsquery of the query's [a-z0-9] terms, or None if it has
+    none. The strict allowlist is what keeps user text from ever
+    becoming a tsquery operator."""
+    terms = re.findall(r"[a-z0-9]+", query_text.lower())
+    return " | ".join(terms) if terms else None
 
 
 def lexical_search(
@@ -116,10 +515,9 @@ def lexical_search(
     can become a tsquery operator. Returns [] when the query has no usable
     terms. Matches ride the GIN index on content_tsv.
     """
-    terms = re.findall(r"[a-z0-9]+", query_text.lower())
-    if not terms:
+    ts_query = _or_tsquery(query_text)
+    if ts_query is None:
         return []
-    ts_query = " | ".join(terms)
 
     doc_filter = "AND de.document_id IN :doc_ids" if document_ids else ""
     sql = text(
@@ -143,7 +541,196 @@ def lexical_search(
     return db.execute(sql, params).fetchall()
 
 
-def reciprocal_rank_fusion(*result_lists, k: int = 60, limit: int):
+# RRF damping constant: 60 is the value from the original RRF paper and
+# keeps one arm's top rank from swamping the other's.
+RRF_K = 60
+
+
+def hybrid_search(
+    db: Session,
+    *,
+    organization_id: int,
+    query_embedding: np.ndarray,
+    query_text: str,
+    limit: int,
+    candidates: int | None = None,
+    document_ids: List[int] | None = None,
+    ef_search: int | None = None,
+    quantization: str | None = None,
+):
+    """Dense + lexical retrieval fused by RRF in ONE statement.
+
+    Same result as running similarity_search and lexical_search for
+    `candidates` rows each and fusing them with reciprocal_rank_fusion,
+    but both rankings and the fused score are computed in Postgres CTEs:
+    one round-trip, and only the fused top `limit` rows (not two
+    candidate pools) come back over the wire.
+
+    Each arm keeps its own ORDER BY ... LIMIT in a subquery so it still
+    rides its index (HNSW, GIN); ranks are numbered over those few rows
+    only. Ties on the fused score break the way reciprocal_rank_fusion
+    breaks them: dense order first, then lexical-only rows in lexical
+    order. Rows carry `distance` (NULL when only the keyword arm found
+    them) and the fused `score`.
+
+    With document_ids, the dense arm runs with iterative index scans, as
+    in similarity_search. It has no exact fallback: a short dense arm
+    still fuses with the keyword arm.
+
+    On a quantized index (VECTOR_INDEX_QUANTIZATION) the dense arm's pool
+    is re-ranked at full precision before it is fused.
+    """
+    quantization = _quantization(quantization)
+    check = _compact_index_params(organization_id, quantization)
+    if check and not db.execute(INDEX_STATE, check).scalar():
+        quantization = "none"
+    sql, params = _hybrid_statement(
+        organization_id=organization_id,
+        query_embedding=query_embedding,
+        query_text=query_text,
+        limit=limit,
+        candidates=candidates,
+        document_ids=document_ids,
+        quantization=quantization,
+    )
+    ef = _ef_search_params(
+        limit=_dense_pool(candidates or limit, quantization), ef_search=ef_search
+    )
+    if ef:
+        db.execute(_SET_EF_SEARCH, ef)
+    iterative = _iterative_scan_params(document_ids)
+    if iterative:
+        db.execute(_SET_ITERATIVE_SCAN, iterative)
+    return db.execute(sql, params).fetchall()
+
+
+async def async_hybrid_search(
+    db: AsyncSession,
+    *,
+    organization_id: int,
+    query_embedding: np.ndarray,
+    query_text: str,
+    limit: int,
+    candidates: int | None = None,
+    document_ids: List[int] | None = None,
+    ef_search: int | None = None,
+    quantization: str | None = None,
+):
+    """hybrid_search on an async (asyncpg) session."""
+    quantization = _quantization(quantization)
+    check = _compact_index_params(organization_id, quantization)
+    if check and not (await db.execute(INDEX_STATE, check)).scalar():
+        quantization = "none"
+    sql, params = _hybrid_statement(
+        organization_id=organization_id,
+        query_embedding=query_embedding,
+        query_text=query_text,
+        limit=limit,
+        candidates=candidates,
+        document_ids=document_ids,
+        quantization=quantization,
+    )
+    ef = _ef_search_params(
+        limit=_dense_pool(candidates or limit, quantization), ef_search=ef_search
+    )
+    if ef:
+        await db.execute(_SET_EF_SEARCH, ef)
+    iterative = _iterative_scan_params(document_ids)
+    if iterative:
+        await db.execute(_SET_ITERATIVE_SCAN, iterative)
+    return (await db.execute(sql, params)).fetchall()
+
+
+def _hybrid_statement(
+    *,
+    organization_id: int,
+    query_embedding: np.ndarray,
+    query_text: str,
+    limit: int,
+    candidates: int | None,
+    document_ids: List[int] | None,
+    quantization: str = "none",
+):
+    ts_query = _or_tsquery(query_text)
+    if ts_query is None:
+        # No keyword arm: fusing one ranking returns that ranking.
+        return _similarity_statement(
+            organization_id=organization_id,
+            query_embedding=query_embedding,
+            limit=limit,
+            document_ids=document_ids,
+            quantization=quantization,
+        )
+
+    doc_filter = "AND de.document_id IN :doc_ids" if document_ids else ""
+    nearest = _dense_nearest(
+        columns="de.id",
+        doc_filter=doc_filter,
+        limit=":candidates",
+        quantization=quantization,
+    )
+    sql = text(
+        f"""
+        WITH dense AS (
+            SELECT id, distance, ROW_NUMBER() OVER (ORDER BY distance) AS rank
+            FROM ({nearest}) nearest
+        ),
+        lexical AS (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY text_rank DESC) AS rank
+            FROM (
+                SELECT de.id,
+                    ts_rank_cd(de.content_tsv, to_tsquery('english', :ts_query))
+                        AS text_rank
+                FROM document_embeddings de
+                WHERE de.organization_id = :org_id
+                  AND de.content_tsv @@ to_tsquery('english', :ts_query)
+                {doc_filter}
+                ORDER BY text_rank DESC
+                LIMIT :candidates
+            ) matched
+        ),
+        fused AS (
+            SELECT COALESCE(dense.id, lexical.id) AS id,
+                dense.distance,
+                COALESCE(1.0 / (:rrf_k + dense.rank), 0)
+                    + COALESCE(1.0 / (:rrf_k + lexical.rank), 0) AS score,
+                dense.rank AS dense_rank,
+                lexical.rank AS lexical_rank
+            FROM dense FULL OUTER JOIN lexical ON lexical.id = dense.id
+        )
+        SELECT de.id, de.content, de.document_id, d.filename,
+            fused.distance, fused.score
+        FROM fused
+        JOIN document_embeddings de ON de.id = fused.id
+        JOIN documents d ON d.id = de.document_id
+        ORDER BY fused.score DESC,
+            fused.dense_rank NULLS LAST,
+            fused.lexical_rank NULLS LAST
+        LIMIT :limit
+        """
+    )
+    sql = sql.bindparams(
+        bindparam("query_embedding", type_=DocumentEmbedding.embedding.type)
+    )
+
+    params = {
+        "org_id": organization_id,
+        "query_embedding": query_embedding,
+        "ts_query": ts_query,
+        "candidates": candidates or limit,
+        "rrf_k": RRF_K,
+        "limit": limit,
+    }
+    if quantization != "none":
+        params["pool"] = _dense_pool(candidates or limit, quantization)
+    if document_ids:
+        sql = sql.bindparams(bindparam("doc_ids", expanding=True))
+        params["doc_ids"] = document_ids
+
+    return sql, params
+
+
+def reciprocal_rank_fusion(*result_lists, k: int = RRF_K, limit: int):
     """Fuse several ranked result lists into one by Reciprocal Rank Fusion.
 
     Each list contributes 1/(k + rank) to a row's score, so a chunk ranked
@@ -160,3 +747,17 @@ def reciprocal_rank_fusion(*result_lists, k: int = 60, limit: int):
             rows_by_id[row.id] = row
     ranked_ids = sorted(scores, key=lambda cid: scores[cid], reverse=True)
     return [rows_by_id[cid] for cid in ranked_ids[:limit]]
+
+
+def dense_margin(rows, *, k: int) -> float | None:
+    """How far dense retrieval's rank 1 is ahead of its rank k: the L2
+    distance gap between rows[0] and rows[k - 1] (k capped at the pool).
+
+    A wide gap means the top hit stands well clear of the rest, which
+    is when a cross-encoder is least likely to change what the LLM
+    sees (RERANK_SKIP_MARGIN). None for pools of fewer than two rows.
+    """
+    if len(rows) < 2:
+        return None
+    last = max(min(k, len(rows)) - 1, 1)
+    return float(rows[last].distance) - float(rows[0].distance)
@@ -0,0 +1,47 @@
+from app.core.celery_app import celery
+from app.core.config import settings
+
+
+@celery.task(
+    name="app.tasks.ingest_document_task",
+    # A crashed worker's job is redelivered rather than lost; finished
+    # jobs are skipped, so a second delivery is harmless.
+    acks_late=True,
+    # Large PDFs legitimately outlast the global 120 s LLM-task limit.
+    soft_time_limit=settings.INGEST_TASK_TIME_LIMIT_SECONDS,
+    time_limit=settings.INGEST_TASK_TIME_LIMIT_SECONDS + 60,
+)
+def ingest_document_task(job_id: int):
+    """Ingest an upload the web tier accepted and saved (see
+    UploadDocumentUseCase.enqueue), recording progress on its job row."""
+    from app.composition.singletons import get_embedding_service
+    from app.db.session import SessionLocal
+    from app.infrastructure.db.ingestion_job_repository import (
+        DBIngestionJobRepository,
+    )
+    from app.tasks.faq_tasks import generate_faqs_task
+    from app.tasks.vector_index_tasks import ensure_tenant_vector_index_task
+    from app.use_cases.ingestion_jobs import RunIngestionJobUseCase
+    from app.use_cases.upload_document import UploadDocumentUseCase
+
+    db = SessionLocal()
+    # Job progress gets its own session: it must commit (and be visible to
+    # pollers) while the ingestion transaction on `db` is still open.
+    jobs_db = SessionLocal()
+    try:
+        upload = UploadDocumentUseCase(
+            db,
+            embedding_service=get_embedding_service(),
+            schedule_faq_generation=lambda chunks, doc_id, org_id: (
+                generate_faqs_task.delay(chunks, doc_id, org_id)
+            ),
+            schedule_vector_index=lambda org_id: (
+                ensure_tenant_vector_index_task.delay(org_id)
+            ),
+        )
+        RunIngestionJobUseCase(DBIngestionJobRepository(jobs_db), upload).execute(
+            job_id=job_id
+        )
+    finally:
+        db.close()
+        jobs_db.close()
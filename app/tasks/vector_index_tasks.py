@@ -0,0 +1,18 @@
+from app.core.celery_app import celery
+
+
+@celery.task(
+    name="app.tasks.ensure_tenant_vector_index_task",
+    # A concurrent HNSW build over a large org outlasts the global 120 s
+    # LLM-task limit. A killed build leaves an invalid index, which the
+    # next run drops and rebuilds.
+    soft_time_limit=3600,
+    time_limit=3660,
+)
+def ensure_tenant_vector_index_task(organization_id):
+    """Give the org its own HNSW index once it has grown large enough
+    (see app/db/tenant_vector_index.py)."""
+    from app.db.session import engine
+    from app.db.tenant_vector_index import ensure_tenant_vector_index
+
+    ensure_tenant_vector_index(engine, organization_id=organization_id)
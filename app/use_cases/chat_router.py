@@ -18,7 +18,7 @@ class ChatRouterUseCase:
         self.knowledge_uc = knowledge_uc
         self.chitchat_uc = chitchat_uc
 
-    def execute(
+    async def execute(
         self,
         *,
         question: str,
@@ -32,7 +32,7 @@ class ChatRouterUseCase:
             return self.chitchat_uc.execute(question=question)
 
         if intent == ChatIntent.KNOWLEDGE:
-            return self.knowledge_uc.execute(
+            return await self.knowledge_uc.execute(
                 question=question,
                 user=user,
                 top_k=top_k,
@@ -46,7 +46,7 @@ class ChatRouterUseCase:
             "confidence": "low",
         }
 
-    def execute_stream(
+    async def execute_stream(
         self,
         *,
         question: str,
@@ -64,9 +64,10 @@ class ChatRouterUseCase:
             yield "done", {"sources": [], "confidence": result["confidence"]}
             return
 
-        yield from self.knowledge_uc.execute_stream(
+        async for event in self.knowledge_uc.execute_stream(
             question=question,
             user=user,
             top_k=top_k,
             document_ids=document_ids,
-        )
+        ):
+            yield event
@@ -1,18 +1,24 @@
 import logging
-from typing import Callable, Iterator
+from typing import AsyncIterator, Callable
+
+from anyio import to_thread
 
 from app.core.config import settings
 from app.db.models.user import User
+from app.services.corpus import async_get_corpus_generation
 from app.services.embedding_service import (
-    lexical_search,
-    reciprocal_rank_fusion,
-    similarity_search,
+    async_hybrid_search,
+    async_similarity_search,
+    dense_margin,
 )
+from app.domain.answer_cache import AnswerCache, CachedAnswer
+from app.domain.dense_retriever import DenseRetriever
 from app.domain.embedding_service import EmbeddingService
-from app.domain.llm_service import LLMService
-from app.domain.chat_history_repository import ChatHistoryRepository
+from app.domain.hybrid_retriever import HybridRetriever
+from app.domain.llm_service import AsyncLLMService
+from app.domain.chat_history_repository import AsyncChatHistoryRepository
 from app.domain.reranker import Reranker
-from app.domain.summary_repository import ConversationSummaryRepository
+from app.domain.summary_repository import AsyncConversationSummaryRepository
 from app.prompts import split_confidence_marker
 
 # Rough prompt budget for injected chat history. The repository already
@@ -46,17 +52,32 @@ def trim_history(history, *, budget: int = HISTORY_CHAR_BUDGET) -> str:
 
 
 class ChatWithKnowledgeBaseUseCase:
+    """Retrieval-augmented answer for one question, on the event loop.
+
+    Database reads and the LLM call are awaited (asyncpg session, async
+    provider SDK), so a request waiting on either holds no worker
+    thread. The CPU-bound steps — query embedding, cross-encoder
+    reranking, the concurrent-arms hybrid retriever's sync sessions —
+    run in anyio's thread pool so they never block the loop. The DB
+    session is released before the LLM call: a connection sitting idle
+    for the seconds a completion takes is the pool slot another request
+    is waiting for.
+    """
+
     def __init__(
         self,
         *,
         embedding_service: EmbeddingService,
-        llm_service: LLMService,
-        chat_history: ChatHistoryRepository,
+        llm_service: AsyncLLMService,
+        chat_history: AsyncChatHistoryRepository,
         db,
-        summary_repo: ConversationSummaryRepository | None = None,
+        summary_repo: AsyncConversationSummaryRepository | None = None,
         schedule_summary_update: Callable[[int, int], None] | None = None,
         reranker: Reranker | None = None,
         use_hybrid: bool = False,
+        hybrid_retriever: HybridRetriever | None = None,
+        answer_cache: AnswerCache | None = None,
+        dense_retriever: DenseRetriever | None = None,
     ):
         self.embedding_service = embedding_service
         self.llm_service = llm_service
@@ -74,61 +95,140 @@ class ChatWithKnowledgeBaseUseCase:
         # independently switchable.
         self.reranker = reranker
         self.use_hybrid = use_hybrid
+        # With a hybrid_retriever wired, hybrid runs its two arms
+        # concurrently through it; otherwise as one fused SQL statement.
+        self.hybrid_retriever = hybrid_retriever
+        # Semantic answer cache (off unless wired): a near-duplicate
+        # question skips retrieval and the LLM round-trip entirely.
+        self.answer_cache = answer_cache
+        # Dense search backend (VECTOR_BACKEND); pgvector when not wired.
+        self.dense_retriever = dense_retriever
+
+    async def _dense_search(
+        self, *, user: User, query_embedding, limit: int, document_ids
+    ):
+        if self.dense_retriever is not None:
+            return await self.dense_retriever.search(
+                self.db,
+                organization_id=user.organization_id,
+                query_embedding=query_embedding,
+                limit=limit,
+                document_ids=document_ids,
+            )
+        return await async_similarity_search(
+            db=self.db,
+            organization_id=user.organization_id,
+            query_embedding=query_embedding,
+            limit=limit,
+            document_ids=document_ids,
+        )
 
-    def _retrieve(
+    async def _retrieve(
         self,
         *,
         question: str,
         user: User,
         top_k: int,
         document_ids: list[int] | None,
+        query_embedding=None,
     ):
-        query_embedding = self.embedding_service.embed_query(question)
+        def embed():
+            if query_embedding is not None:
+                return query_embedding
+            return self.embedding_service.embed_query(question)
+
+        async def embed_async():
+            if query_embedding is not None:
+                return query_embedding
+            return await to_thread.run_sync(embed)
 
         # Fast path: plain dense retrieval fetches exactly top_k. The wider
         # candidate pool is only worth its cost when hybrid or reranking
         # will actually rework the ordering.
         if not self.use_hybrid and self.reranker is None:
-            return similarity_search(
-                db=self.db,
-                organization_id=user.organization_id,
-                query_embedding=query_embedding,
+            return await self._dense_search(
+                user=user,
+                query_embedding=await embed_async(),
                 limit=top_k,
                 document_ids=document_ids,
             )
 
         pool_size = max(settings.RERANK_CANDIDATES, top_k)
-        pool = similarity_search(
-            db=self.db,
-            organization_id=user.organization_id,
-            query_embedding=query_embedding,
-            limit=pool_size,
-            document_ids=document_ids,
-        )
-        if self.use_hybrid:
-            lexical = lexical_search(
+        if self.use_hybrid and self.hybrid_retriever is not None:
+            # The keyword arm starts before embed() runs. The retriever
+            # blocks on its own pooled sync sessions, so it gets a thread.
+            pool = await to_thread.run_sync(
+                lambda: self.hybrid_retriever.retrieve(
+                    organization_id=user.organization_id,
+                    query_text=question,
+                    embed=embed,
+                    limit=pool_size,
+                    document_ids=document_ids,
+                )
+            )
+        elif self.use_hybrid:
+            # Both arms and the RRF fusion run in one statement.
+            pool = await async_hybrid_search(
                 db=self.db,
                 organization_id=user.organization_id,
+                query_embedding=await embed_async(),
                 query_text=question,
                 limit=pool_size,
                 document_ids=document_ids,
             )
-            pool = reciprocal_rank_fusion(pool, lexical, limit=pool_size)
+        else:
+            pool = await self._dense_search(
+                user=user,
+                query_embedding=await embed_async(),
+                limit=pool_size,
+                document_ids=document_ids,
+            )
 
         if not pool:
             return pool
 
-        if self.reranker is not None:
-            order = self.reranker.rerank(
-                query=question, passages=[row.content for row in pool]
+        if self.reranker is not None and not self._dense_is_confident(
+            pool, top_k=top_k
+        ):
+            order = await to_thread.run_sync(
+                lambda: self.reranker.rerank(
+                    query=question,
+                    passages=[row.content for row in pool],
+                    passage_ids=[row.id for row in pool],
+                )
             )
             pool = [pool[i] for i in order]
 
         return pool[:top_k]
 
-    def _build_full_context(self, *, user: User, matches) -> str:
+    def _dense_is_confident(self, pool, *, top_k: int) -> bool:
+        """True when the dense pool's rank 1 clears rank top_k by at least
+        RERANK_SKIP_MARGIN, so the cross-encoder pass can be skipped.
+        Never for a fused hybrid pool: its rows carry no distances."""
+        if settings.RERANK_SKIP_MARGIN is None or self.use_hybrid:
+            return False
+        margin = dense_margin(pool, k=top_k)
+        return margin is not None and margin >= settings.RERANK_SKIP_MARGIN
+
+    async def _cache_key(
+        self, *, user: User, top_k: int, document_ids: list[int] | None
+    ) -> dict:
+        """Everything besides the question that shaped the answer. That
+        includes the asker: the answer was written with their chat history
+        and summary, so it is never served to another user. The corpus
+        generation is read per request, so an upload or delete in any
+        worker process invalidates this worker's entries."""
+        return {
+            "organization_id": user.organization_id,
+            "scope": (user.id, top_k, tuple(sorted(document_ids or ()))),
+            "generation": await async_get_corpus_generation(
+                self.db, organization_id=user.organization_id
+            ),
+        }
+
+    async def _build_full_context(self, *, user: User, matches) -> str:
         context = "\n\n".join([row.content for row in matches])
-        history = self.chat_history.get_recent_history(user_id=user.id)
+        history = await self.chat_history.get_recent_history(user_id=user.id)
         history_text = trim_history(history)
 
         # Long-term memory: a compact rolling summary maintained
@@ -137,7 +237,7 @@ class ChatWithKnowledgeBaseUseCase:
         # covers that gap.
         summary_block = ""
         if self.summary_repo:
-            summary = self.summary_repo.get_summary(user_id=user.id)
+            summary = await self.summary_repo.get_summary(user_id=user.id)
             if summary:
                 summary_block = (
                     f"Important facts from earlier conversation:\n{summary}\n\n"
@@ -151,14 +251,21 @@ Knowledge base context:
 {context}
 """
 
-    def _save_exchange(self, *, user: User, question: str, answer: str):
-        self.chat_history.save_message(
+    async def _release_connection(self) -> None:
+        """Hand the session's pooled connection back before the LLM wait.
+        Nothing is pending (only reads so far), and the session checks a
+        connection out again when _save_exchange writes."""
+        if self.db is not None:
+            await self.db.close()
+
+    async def _save_exchange(self, *, user: User, question: str, answer: str):
+        await self.chat_history.save_message(
             user_id=user.id,
             organization_id=user.organization_id,
             role="user",
             message=question,
         )
-        self.chat_history.save_message(
+        await self.chat_history.save_message(
             user_id=user.id,
             organization_id=user.organization_id,
             role="assistant",
@@ -166,11 +273,33 @@ Knowledge base context:
         )
         if self.schedule_summary_update:
             try:
-                self.schedule_summary_update(user.id, user.organization_id)
+                # .delay() is a blocking broker round-trip.
+                await to_thread.run_sync(
+                    self.schedule_summary_update, user.id, user.organization_id
+                )
             except Exception:  # broker down must never fail the answer
                 logger.warning("summary update not scheduled", exc_info=True)
 
-    def execute(
+    async def _cached_answer(
+        self, *, question: str, user: User, top_k: int, document_ids
+    ) -> tuple:
+        """(query_embedding, cache_key, cached answer or None); all three
+        None when no answer cache is wired."""
+        if self.answer_cache is None:
+            return None, None, None
+        # The cache lookup needs the embedding up front; otherwise
+        # _retrieve computes it, overlapped with the keyword arm when
+        # hybrid arms run concurrently.
+        query_embedding = await to_thread.run_sync(
+            self.embedding_service.embed_query, question
+        )
+        cache_key = await self._cache_key(
+            user=user, top_k=top_k, document_ids=document_ids
+        )
+        cached = self.answer_cache.lookup(query_embedding=query_embedding, **cache_key)
+        return query_embedding, cache_key, cached
+
+    async def execute(
         self,
         *,
         question: str,
@@ -178,9 +307,27 @@ Knowledge base context:
         top_k: int = settings.DEFAULT_TOP_K,
         document_ids: list[int] | None = None,
     ) -> dict:
-        matches = self._retrieve(
+        query_embedding, cache_key, cached = await self._cached_answer(
             question=question, user=user, top_k=top_k, document_ids=document_ids
         )
+        if cached is not None:
+            await self._save_exchange(
+                user=user, question=question, answer=cached.answer
+            )
+            return {
+                "question": question,
+                "answer": cached.answer,
+                "sources": list(cached.sources),
+                "confidence": cached.confidence,
+            }
+
+        matches = await self._retrieve(
+            question=question,
+            user=user,
+            top_k=top_k,
+            document_ids=document_ids,
+            query_embedding=query_embedding,
+        )
 
         if not matches:
             return {
@@ -190,19 +337,31 @@ Knowledge base context:
                 "sources": [],
             }
 
-        full_context = self._build_full_context(user=user, matches=matches)
+        full_context = await self._build_full_context(user=user, matches=matches)
+        await self._release_connection()
 
         # One LLM round-trip returns the answer AND its grounding
         # self-grade (was two sequential calls before Phase 3).
-        result = self.llm_service.generate_grounded_answer(
+        result = await self.llm_service.generate_grounded_answer(
             question=question,
             context=full_context,
         )
 
-        self._save_exchange(user=user, question=question, answer=result.answer)
+        await self._save_exchange(user=user, question=question, answer=result.answer)
 
         sources = list({row.filename for row in matches})
 
+        if cache_key is not None:
+            self.answer_cache.store(
+                query_embedding=query_embedding,
+                answer=CachedAnswer(
+                    answer=result.answer,
+                    confidence=result.confidence,
+                    sources=tuple(sources),
+                ),
+                **cache_key,
+            )
+
         return {
             "question": question,
             "answer": result.answer,
@@ -210,35 +369,56 @@ Knowledge base context:
             "confidence": result.confidence,
         }
 
-    def execute_stream(
+    async def execute_stream(
         self,
         *,
         question: str,
         user: User,
         top_k: int = settings.DEFAULT_TOP_K,
         document_ids: list[int] | None = None,
-    ) -> Iterator[tuple[str, dict]]:
+    ) -> AsyncIterator[tuple[str, dict]]:
         """Streaming variant: yields ("token", {"text": ...}) events as
         the model produces them, then one ("done", {sources, confidence}).
 
         The last STREAM_HOLDBACK chars are buffered so the trailing
         CONFIDENCE marker is parsed off instead of reaching the client.
         HTTP concerns (SSE framing) live in the route, not here.
+
+        A semantic-cache hit is replayed as a single token event.
         """
-        matches = self._retrieve(
+        query_embedding, cache_key, cached = await self._cached_answer(
             question=question, user=user, top_k=top_k, document_ids=document_ids
         )
+        if cached is not None:
+            yield "token", {"text": cached.answer}
+            await self._save_exchange(
+                user=user, question=question, answer=cached.answer
+            )
+            yield "done", {
+                "sources": list(cached.sources),
+                "confidence": cached.confidence,
+            }
+            return
+
+        matches = await self._retrieve(
+            question=question,
+            user=user,
+            top_k=top_k,
+            document_ids=document_ids,
+            query_embedding=query_embedding,
+        )
 
         if not matches:
             yield "token", {"text": NO_MATCH_ANSWER}
             yield "done", {"sources": [], "confidence": "low"}
             return
 
-        full_context = self._build_full_context(user=user, matches=matches)
+        full_context = await self._build_full_context(user=user, matches=matches)
+        await self._release_connection()
 
         emitted: list[str] = []
         buffer = ""
-        for fragment in self.llm_service.stream_grounded_answer(
+        async for fragment in self.llm_service.stream_grounded_answer(
             question=question, context=full_context
         ):
             buffer += fragment
@@ -253,7 +433,17 @@ Knowledge base context:
             yield "token", {"text": tail}
 
         answer = "".join(emitted).strip()
-        self._save_exchange(user=user, question=question, answer=answer)
+        await self._save_exchange(user=user, question=question, answer=answer)
 
         sources = list({row.filename for row in matches})
+
+        if cache_key is not None and answer:
+            self.answer_cache.store(
+                query_embedding=query_embedding,
+                answer=CachedAnswer(
+                    answer=answer, confidence=confidence, sources=tuple(sources)
+                ),
+                **cache_key,
+            )
+
         yield "done", {"sources": sources, "confidence": confidence}
@@ -4,7 +4,10 @@ import os
 from sqlalchemy.orm import Session
 
 from app.db.models.document import Document
+from app.db.models.embedding import DocumentEmbedding
 from app.db.models.user import User
+from app.domain.reranker import ChunkScoreCache
+from app.services.corpus import bump_corpus_generation
 
 UPLOAD_BASE_DIR = "uploads"
 
@@ -26,8 +29,9 @@ class DeleteDocumentUseCase:
     its file is a document that can be cited but never served.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, rerank_cache: ChunkScoreCache | None = None):
         self.db = db
+        self.rerank_cache = rerank_cache
 
     def execute(self, *, document_id: int, user: User) -> dict:
         document = (
@@ -48,9 +52,26 @@ class DeleteDocumentUseCase:
             document.filename,
         )
 
+        # Read before the cascade removes them: the reranker's cached
+        # scores for these chunks go once the delete has committed.
+        chunk_ids = []
+        if self.rerank_cache is not None:
+            chunk_ids = [
+                chunk_id
+                for (chunk_id,) in self.db.query(DocumentEmbedding.id)
+                .filter(DocumentEmbedding.document_id == document.id)
+                .all()
+            ]
+
         self.db.delete(document)  # embeddings cascade at the DB level
+        # Same transaction as the delete: cached answers citing this
+        # document become stale exactly when it disappears.
+        bump_corpus_generation(self.db, organization_id=user.organization_id)
         self.db.commit()
 
+        if self.rerank_cache is not None:
+            self.rerank_cache.invalidate_chunks(chunk_ids)
+
         if os.path.exists(file_path):
             os.remove(file_path)
         else:
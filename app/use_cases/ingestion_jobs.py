@@ -0,0 +1,90 @@
+import logging
+
+from app.domain.ingestion_job_repository import (
+    IngestionJobRecord,
+    IngestionJobRepository,
+    JobStage,
+)
+from app.db.models.user import User
+from app.use_cases.upload_document import PdfIngestError, UploadDocumentUseCase
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionJobNotFoundError(Exception):
+    """No such job in this organization; the route maps to 404."""
+
+
+class GetIngestionJobUseCase:
+    """Org-scoped job lookup: another tenant's job id reads as not found,
+    never as forbidden, so ids leak nothing across organizations."""
+
+    def __init__(self, jobs: IngestionJobRepository):
+        self.jobs = jobs
+
+    def execute(self, *, job_id: int, user: User) -> IngestionJobRecord:
+        job = self.jobs.get(job_id=job_id)
+        if job is None or job.organization_id != user.organization_id:
+            raise IngestionJobNotFoundError("Ingestion job not found")
+        return job
+
+
+class RunIngestionJobUseCase:
+    """
+    Worker side of an enqueued upload: runs ingest_pdf for the job and
+    records its outcome.
+
+    Stage and chunk progress are written through `jobs` as ingestion
+    advances. Failures from the PdfIngestError hierarchy are expected
+    outcomes — recorded on the job by class name and message, not
+    raised. Anything else is recorded generically and re-raised so the
+    worker logs it. A finished job is never run twice, so a redelivered
+    task is harmless.
+    """
+
+    def __init__(self, jobs: IngestionJobRepository, upload: UploadDocumentUseCase):
+        self.jobs = jobs
+        self.upload = upload
+
+    def execute(self, *, job_id: int) -> None:
+        job = self.jobs.get(job_id=job_id)
+        if job is None:
+            logger.warning("ingestion job vanished", extra={"job_id": job_id})
+            return
+        if job.stage not in JobStage.ACTIVE:
+            return
+
+        def on_progress(stage: str, chunks_done: int) -> None:
+            self.jobs.update_progress(
+                job_id=job_id, stage=stage, chunks_done=chunks_done
+            )
+
+        try:
+            result = self.upload.ingest_pdf(
+                file_path=job.file_path,
+                organization_id=job.organization_id,
+                uploaded_by=job.uploaded_by,
+                on_progress=on_progress,
+            )
+        except PdfIngestError as exc:
+            self.jobs.mark_failed(
+                job_id=job_id, error_type=type(exc).__name__, error=str(exc)
+            )
+            return
+        except Exception:
+            self.jobs.mark_failed(
+                job_id=job_id,
+                error_type="InternalError",
+                error="Ingestion failed unexpectedly",
+            )
+            raise
+
+        self.jobs.mark_done(
+            job_id=job_id,
+            document_id=result["id"],
+            chunks_done=result["chunks_stored"],
+        )
+        logger.info(
+            "document ingested",
+            extra={"job_id": job_id, "document_id": result["id"]},
+        )
@@ -1,22 +1,24 @@
+import hashlib
+import logging
 import os
 import re
 import uuid
-from typing import Callable
+from itertools import chain
+from typing import Callable, Iterator
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 
 from app.core.config import settings
 from app.domain.embedding_service import EmbeddingService
+from app.domain.ingestion_job_repository import IngestionJobRepository, JobStage
 from app.db.models.document import Document
 from app.db.models.user import User
-from app.services.document_processing import (
-    extract_text_from_pdf,
-    normalize_text,
-    chunk_text,
-)
+from app.services.document_processing import iter_pdf_chunks
 from app.services.embedding_service import store_embeddings
 
+logger = logging.getLogger(__name__)
 
 UPLOAD_BASE_DIR = "uploads"
 
@@ -70,6 +72,13 @@ class DocumentQuotaExceededError(Exception):
     """
 
 
+class IngestionUnavailableError(Exception):
+    """The upload was saved, but no worker could be asked to ingest it
+    (the task broker is down). The file is removed and the job marked
+    failed, so it holds no quota. Route -> 503.
+    """
+
+
 class PdfIngestError(Exception):
     """The saved PDF could not be ingested; the file has been removed."""
 
@@ -82,43 +91,144 @@ class EmbeddingStorageError(PdfIngestError):
     """Chunks extracted but embedding generation or storage failed."""
 
 
+def iter_readable_chunks(file_path: str) -> Iterator[str]:
+    """Stream a saved PDF's chunks, reporting any extraction failure —
+    whenever it surfaces, even pages in — as UnreadablePdfError."""
+    try:
+        yield from iter_pdf_chunks(file_path)
+    except Exception as exc:
+        raise UnreadablePdfError("Corrupted or unreadable PDF") from exc
+
+
+def file_sha256(file_path: str) -> str:
+    """Hex SHA-256 of a saved file's bytes, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_pdf_chunks(file_path: str) -> list[str]:
+    """Extract, normalize and chunk a saved PDF — the CPU-bound half of
+    ingestion, with no DB or model access.
+
+    Module-level rather than a method so bulk ingestion can fan it out to
+    a process pool. Deletes the file and raises UnreadablePdfError when
+    nothing usable comes out.
+    """
+    try:
+        chunks = list(iter_readable_chunks(file_path))
+    except UnreadablePdfError:
+        os.remove(file_path)
+        raise
+
+    if not chunks:
+        os.remove(file_path)
+        raise UnreadablePdfError("No readable content found")
+    return chunks
+
+
 class UploadDocumentUseCase:
     """
     Handles document upload + ingestion into the RAG system.
 
     schedule_faq_generation is injected so the caller decides whether FAQ
-    generation happens: the API route wires the Celery task, while bulk
-    ingestion passes None (500 docs must not enqueue 500 LLM jobs).
+    generation happens: the ingestion worker wires the Celery task, while
+    bulk ingestion passes None (500 docs must not enqueue 500 LLM jobs).
+
+    jobs + schedule_ingestion enable enqueue(), the web path: the upload
+    is validated and saved in the request, and ingest_pdf() runs later in
+    a Celery worker (see RunIngestionJobUseCase).
+
+    schedule_vector_index(organization_id) runs after each stored document,
+    so an org that has just grown past TENANT_VECTOR_INDEX_MIN_CHUNKS gets
+    its own HNSW index built in the background (app/db/tenant_vector_index.py).
     """
 
     def __init__(
         self,
         db: Session,
         *,
-        embedding_service: EmbeddingService,
+        embedding_service: EmbeddingService | None,
         schedule_faq_generation: Callable[[list[str], int, int], None] | None = None,
+        jobs: IngestionJobRepository | None = None,
+        schedule_ingestion: Callable[[int], None] | None = None,
+        schedule_vector_index: Callable[[int], None] | None = None,
     ):
         self.db = db
         self.embedding_service = embedding_service
         self.schedule_faq_generation = schedule_faq_generation
+        self.jobs = jobs
+        self.schedule_ingestion = schedule_ingestion
+        self.schedule_vector_index = schedule_vector_index
 
     def execute(self, *, file: UploadFile, user: User) -> dict:
-        """HTTP-facing path: validate, save the upload, then ingest.
+        """Validate, save the upload, then ingest it in this call.
 
         Raises domain exceptions (not HTTPException) — the route owns the
-        status-code mapping. `file` stays a FastAPI UploadFile because this
-        method IS the web entry point; the HTTP-free reusable core is
-        ingest_pdf().
+        status-code mapping. The HTTP-free reusable core is ingest_pdf().
+        """
+        file_path = self._save_upload(file=file, user=user)
+        return self.ingest_pdf(
+            file_path=file_path,
+            organization_id=user.organization_id,
+            uploaded_by=user.id,
+        )
+
+    def enqueue(self, *, file: UploadFile, user: User) -> dict:
+        """HTTP-facing path: validate and save the upload, record a job,
+        and hand ingestion to a worker. Returns as soon as the file is on
+        disk, however large the PDF — parse and embedding errors surface
+        on the job, not here.
+        """
+        if self.jobs is None or self.schedule_ingestion is None:
+            raise RuntimeError("enqueue() needs jobs and schedule_ingestion")
+        file_path = self._save_upload(file=file, user=user)
+        job = self.jobs.create(
+            organization_id=user.organization_id,
+            uploaded_by=user.id,
+            filename=os.path.basename(file_path),
+            file_path=file_path,
+        )
+        try:
+            self.schedule_ingestion(job.id)
+        except Exception as exc:
+            # The job row is already committed (pollers need it), so undo
+            # it here: a job no worker will run would stay "queued", and
+            # count against the quota, forever.
+            logger.exception("could not schedule ingestion", extra={"job_id": job.id})
+            self.jobs.mark_failed(
+                job_id=job.id,
+                error_type=IngestionUnavailableError.__name__,
+                error="Ingestion could not be scheduled",
+            )
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise IngestionUnavailableError(
+                "Ingestion is temporarily unavailable; try again later"
+            ) from exc
+        return {"job_id": job.id, "filename": job.filename, "stage": job.stage}
+
+    def _save_upload(self, *, file: UploadFile, user: User) -> str:
+        """Validate the upload and stream it into the org's directory.
+
+        `file` stays a FastAPI UploadFile because this is the web entry
+        point. Returns the saved path.
         """
         if file.content_type != "application/pdf":
             raise InvalidContentTypeError("Only PDF files are supported")
 
         # Per-tenant corpus cap, checked before a single byte is written.
+        # Uploads still queued count too, or a burst of them could all
+        # pass the check before any becomes a Document row.
         existing = (
             self.db.query(Document)
             .filter(Document.organization_id == user.organization_id)
             .count()
         )
+        if self.jobs is not None:
+            existing += self.jobs.count_active(organization_id=user.organization_id)
         if existing >= settings.MAX_DOCUMENTS_PER_ORG:
             raise DocumentQuotaExceededError(
                 f"Organization document limit of "
@@ -170,30 +280,41 @@ class UploadDocumentUseCase:
             raise FileTooLargeError(
                 f"File exceeds the {settings.MAX_UPLOAD_MB} MB upload limit"
             )
-
-        return self.ingest_pdf(
-            file_path=file_path,
-            organization_id=user.organization_id,
-            uploaded_by=user.id,
-        )
+        return file_path
 
     def ingest_pdf(
-        self, *, file_path: str, organization_id: int, uploaded_by: int
+        self,
+        *,
+        file_path: str,
+        organization_id: int,
+        uploaded_by: int,
+        on_progress: Callable[[str, int], None] | None = None,
     ) -> dict:
         """Core ingestion for an already-saved PDF — no HTTP types.
 
         Deletes the file on failure so callers never accumulate PDFs that
-        can't be served as sources.
+        can't be served as sources. on_progress(stage, chunks_stored), if
+        given, is called as ingestion moves through the JobStage values.
+
+        A file byte-identical to one the org already has is not ingested:
+        the new copy is deleted and the existing document returned, with
+        "duplicate": True and nothing stored.
         """
-        try:
-            raw_text = extract_text_from_pdf(file_path)
-            clean_text = normalize_text(raw_text)
-            chunks = chunk_text(clean_text)
-        except Exception as exc:
+        report = on_progress or (lambda stage, chunks: None)
+        report(JobStage.EXTRACTING, 0)
+        content_hash = file_sha256(file_path)
+        existing = self._find_by_hash(organization_id, content_hash)
+        if existing is not None:
             os.remove(file_path)
-            raise UnreadablePdfError("Corrupted or unreadable PDF") from exc
+            return self._duplicate_result(existing)
 
-        if not chunks:
+        chunks = iter_readable_chunks(file_path)
+        try:
+            first_chunk = next(chunks, None)
+        except UnreadablePdfError:
+            os.remove(file_path)
+            raise
+        if first_chunk is None:
             os.remove(file_path)
             raise UnreadablePdfError("No readable content found")
 
@@ -203,37 +324,89 @@ class UploadDocumentUseCase:
             content_type="application/pdf",
             organization_id=organization_id,
             uploaded_by=uploaded_by,
+            content_hash=content_hash,
         )
 
+        # Flushed, not committed: the row gets its id but only becomes
+        # visible together with its embeddings, which store_embeddings
+        # commits in the same transaction. A failure rolls both back, so a
+        # document never exists without its vectors.
         self.db.add(document)
-        self.db.commit()
-        self.db.refresh(document)
-
+        try:
+            self.db.flush()
+        except IntegrityError:
+            # The same file, uploaded concurrently, got its row in first
+            # (the unique index made this flush wait for it to commit).
+            self.db.rollback()
+            os.remove(file_path)
+            existing = self._find_by_hash(organization_id, content_hash)
+            if existing is None:
+                raise
+            return self._duplicate_result(existing)
+
+        # FAQ generation costs ONE LLM call per chunk, so an unbounded
+        # chunk list turns a single upload into hundreds of paid calls.
+        # Cap it: the first N chunks are the most representative anyway.
+        # They are kept as the stream passes; the rest are not retained.
+        faq_chunks: list[str] = []
+        chunks_stored = 0
+
+        def tracked_chunks() -> Iterator[str]:
+            nonlocal chunks_stored
+            for chunk in chain([first_chunk], chunks):
+                if len(faq_chunks) < settings.MAX_FAQ_CHUNKS:
+                    faq_chunks.append(chunk)
+                chunks_stored += 1
+                yield chunk
+
+        report(JobStage.EMBEDDING, 0)
         try:
             store_embeddings(
                 db=self.db,
                 organization_id=organization_id,
                 document=document,
-                chunks=chunks,
+                chunks=tracked_chunks(),
                 embedding_service=self.embedding_service,
+                on_batch=lambda stored: report(JobStage.EMBEDDING, stored),
             )
+        except UnreadablePdfError:
+            # A page deep in the file failed after storing had begun.
+            self.db.rollback()
+            os.remove(file_path)
+            raise
         except Exception as exc:
-            self.db.delete(document)
-            self.db.commit()
+            self.db.rollback()
             os.remove(file_path)
             raise EmbeddingStorageError("Embedding generation failed") from exc
 
         if self.schedule_faq_generation is not None:
-            # FAQ generation costs ONE LLM call per chunk, so an unbounded
-            # chunk list turns a single upload into hundreds of paid calls.
-            # Cap it: the first N chunks are the most representative anyway.
-            self.schedule_faq_generation(
-                chunks[: settings.MAX_FAQ_CHUNKS], document.id, organization_id
-            )
+            self.schedule_faq_generation(faq_chunks, document.id, organization_id)
+        if self.schedule_vector_index is not None:
+            self.schedule_vector_index(organization_id)
 
         return {
             "id": document.id,
             "filename": document.filename,
             "organization_id": organization_id,
-            "chunks_stored": len(chunks),
+            "chunks_stored": chunks_stored,
+        }
+
+    def _find_by_hash(self, organization_id: int, content_hash: str):
+        return (
+            self.db.query(Document)
+            .filter(
+                Document.organization_id == organization_id,
+                Document.content_hash == content_hash,
+            )
+            .first()
+        )
+
+    @staticmethod
+    def _duplicate_result(document: Document) -> dict:
+        return {
+            "id": document.id,
+            "filename": document.filename,
+            "organization_id": document.organization_id,
+            "chunks_stored": 0,
+            "duplicate": True,
         }
@@ -0,0 +1,256 @@
+"""L2 (<->, vector_l2_ops) vs negative inner product (<#>, vector_ip_ops)
+for the unit-length MiniLM embeddings.
+
+Two parts:
+
+    in-process   — always runs, no model or DB: full-scan distance cost
+                   per query over N synthetic unit vectors (sum of
+                   squared differences vs one dot product), whether the
+                   two orderings agree on the top-k, and the error of
+                   recovering L2 distance as sqrt(2 + 2 * <#>), which is how
+                   retrieval keeps reporting `distance` in L2 units.
+    --db         — against the ingested eval corpus (scripts/bulk_ingest.py):
+                   for every golden question, exact top-k (index scans
+                   off), the eval org's vector_ip_ops HNSW index via
+                   similarity_search, and a partial L2 HNSW index built
+                   beside it for comparison. Reports each index's recall
+                   against exact search and p50/p95 latency. The comparison index
+                   is built inside a transaction that is rolled back, so
+                   the schema is left as the migrations made it. The
+                   table is locked meanwhile, so use the eval database.
+
+Usage:
+    python benchmarks/distance_ops.py
+    python benchmarks/distance_ops.py --vectors 12855 --queries 500
+    python benchmarks/distance_ops.py --db --k 20
+
+Writes benchmarks/results/distance_ops.json.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "distance_ops.json"
+DIM = 384
+
+
+def unit_vectors(rng, n: int) -> np.ndarray:
+    matrix = rng.standard_normal((n, DIM), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def in_process(*, vectors: int, queries: int, k: int) -> dict:
+    rng = np.random.default_rng(0)
+    corpus = unit_vectors(rng, vectors)
+    probes = unit_vectors(rng, queries)
+
+    def squared_l2(q):
+        diff = corpus - q
+        return np.einsum("ij,ij->i", diff, diff)
+
+    def neg_inner(q):
+        return -(corpus @ q)
+
+    timings = {"l2": [], "inner_product": []}
+    same_top_k = 0
+    max_distance_error = 0.0
+    for q in probes:
+        started = time.perf_counter()
+        l2 = squared_l2(q)
+        timings["l2"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        ip = neg_inner(q)
+        timings["inner_product"].append(time.perf_counter() - started)
+
+        top_l2 = np.argsort(l2, kind="stable")[:k]
+        top_ip = np.argsort(ip, kind="stable")[:k]
+        same_top_k += bool(np.array_equal(top_l2, top_ip))
+        recovered = np.sqrt(np.maximum(2 + 2 * ip[top_ip], 0))
+        max_distance_error = max(
+            max_distance_error,
+            float(np.max(np.abs(recovered - np.sqrt(l2[top_ip])))),
+        )
+
+    return {
+        "vectors": vectors,
+        "queries": queries,
+        "k": k,
+        "l2": summarize(timings["l2"]),
+        "inner_product": summarize(timings["inner_product"]),
+        "identical_top_k": same_top_k,
+        "max_l2_recovery_error": max_distance_error,
+    }
+
+
+def against_db(*, k: int) -> dict:
+    from sqlalchemy import bindparam, text
+
+    from app.composition.singletons import get_embedding_service
+    from app.db.hnsw import search_ef_search, tenant_index_name
+    from app.db.models.embedding import DocumentEmbedding
+    from app.db.session import SessionLocal
+    from app.services.embedding_service import similarity_search
+    from evals.common import GOLDEN_PATH, get_eval_user, read_jsonl
+
+    questions = [g["question"] for g in read_jsonl(GOLDEN_PATH)]
+    embedder = get_embedding_service()
+    embeddings = [embedder.embed_query(q) for q in questions]
+
+    def l2_query():
+        sql = text(
+            """
+            SELECT de.id FROM document_embeddings de
+            WHERE de.organization_id = :org_id
+            ORDER BY de.embedding <-> CAST(:query_embedding AS vector)
+            LIMIT :limit
+            """
+        )
+        return sql.bindparams(
+            bindparam("query_embedding", type_=DocumentEmbedding.embedding.type)
+        )
+
+    set_config = text("SELECT set_config(:name, :value, true)")
+    ef_search = str(search_ef_search(limit=k, ef_search=None) or 40)
+    latencies = {"exact": [], "hnsw_ip": [], "hnsw_l2": []}
+    hits = {"hnsw_ip": 0, "hnsw_l2": 0}
+    max_distance_gap = 0.0
+
+    db = SessionLocal()
+    try:
+        org_id = get_eval_user(db).organization_id
+        started = time.perf_counter()
+        db.execute(
+            text(
+                "CREATE INDEX bench_hnsw_l2 ON document_embeddings "
+                "USING hnsw (embedding vector_l2_ops) "
+                f"WHERE organization_id = {int(org_id)}"
+            )
+        )
+        l2_build_seconds = round(time.perf_counter() - started, 2)
+        db.execute(set_config, {"name": "hnsw.ef_search", "value": ef_search})
+
+        def timed(name, run):
+            started = time.perf_counter()
+            rows = run()
+            latencies[name].append(time.perf_counter() - started)
+            return rows
+
+        params = lambda e: {  # noqa: E731
+            "org_id": org_id,
+            "query_embedding": e,
+            "limit": k,
+        }
+        for embedding in embeddings:
+            db.execute(set_config, {"name": "enable_indexscan", "value": "off"})
+            exact = timed(
+                "exact", lambda: db.execute(l2_query(), params(embedding)).fetchall()
+            )
+            db.execute(set_config, {"name": "enable_indexscan", "value": "on"})
+            via_ip = timed(
+                "hnsw_ip",
+                lambda: similarity_search(
+                    db,
+                    organization_id=org_id,
+                    query_embedding=embedding,
+                    limit=k,
+                    quantization="none",
+                ),
+            )
+            via_l2 = timed(
+                "hnsw_l2",
+                lambda: db.execute(l2_query(), params(embedding)).fetchall(),
+            )
+            truth = {r.id for r in exact}
+            hits["hnsw_ip"] += len(truth & {r.id for r in via_ip})
+            hits["hnsw_l2"] += len(truth & {r.id for r in via_l2})
+            if via_ip:
+                exact_top = np.linalg.norm(
+                    np.asarray(embedding)
+                    - np.asarray(
+                        db.execute(
+                            text(
+                                "SELECT embedding FROM document_embeddings "
+                                "WHERE id = :id"
+                            ),
+                            {"id": via_ip[0].id},
+                        ).scalar(),
+                        dtype=np.float32,
+                    )
+                )
+                max_distance_gap = max(
+                    max_distance_gap, abs(float(via_ip[0].distance) - exact_top)
+                )
+    finally:
+        db.rollback()  # drops bench_hnsw_l2 again
+        db.close()
+
+    expected = k * len(embeddings)
+    return {
+        "index": tenant_index_name(org_id, "none"),
+        "questions": len(embeddings),
+        "k": k,
+        "ef_search": int(ef_search),
+        "l2_index_build_seconds": l2_build_seconds,
+        "exact": summarize(latencies["exact"]),
+        "hnsw_ip": {
+            **summarize(latencies["hnsw_ip"]),
+            "recall_vs_exact": round(hits["hnsw_ip"] / expected, 4),
+        },
+        "hnsw_l2": {
+            **summarize(latencies["hnsw_l2"]),
+            "recall_vs_exact": round(hits["hnsw_l2"] / expected, 4),
+        },
+        "max_reported_distance_error": max_distance_gap,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=12855)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument(
+        "--db", action="store_true", help="also measure against the eval corpus"
+    )
+    args = parser.parse_args()
+
+    report = {
+        "in_process": in_process(vectors=args.vectors, queries=args.queries, k=args.k)
+    }
+    print(json.dumps(report["in_process"], indent=2))
+    if args.db:
+        report["db"] = against_db(k=args.k)
+        print(json.dumps(report["db"], indent=2))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
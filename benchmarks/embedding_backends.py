@@ -0,0 +1,104 @@
+"""Embedding backends: PyTorch vs ONNX Runtime fp32 vs ONNX Runtime int8.
+
+For each backend, measures single-query latency (the chat path) and
+batch throughput over golden-set answers (the ingestion path), plus the
+cosine agreement of its vectors with the torch backend's — int8 trades
+some of that agreement for speed, and this is where to see how much.
+
+Usage:
+    python benchmarks/embedding_backends.py
+    python benchmarks/embedding_backends.py --queries 500 --batch 64
+
+Requires requirements/onnx.txt. Writes
+benchmarks/results/embedding_backends.json.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.infrastructure.embeddings.onnx_embedder import (  # noqa: E402
+    OnnxEmbeddingService,
+)
+from app.infrastructure.embeddings.sentence_transformer import (  # noqa: E402
+    SentenceTransformerEmbeddingService,
+)
+
+GOLDEN_PATH = REPO_ROOT / "evals" / "golden_qa.jsonl"
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "embedding_backends.json"
+
+
+def measure(service, questions: list[str], passages: list[str], args) -> dict:
+    service.embed_query("warm-up")
+
+    latencies = []
+    for i in range(args.queries):
+        started = time.perf_counter()
+        service.embed_query(questions[i % len(questions)])
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for start in range(0, len(passages), args.batch):
+        service.embed_texts(passages[start : start + args.batch])
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        "query_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "queries_per_second": round(len(latencies) / sum(latencies), 1),
+        "batch_texts_per_second": round(len(passages) / batch_seconds, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    items = [
+        json.loads(line)
+        for line in GOLDEN_PATH.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    questions = [i["question"] for i in items]
+    passages = [i["answer"] for i in items]
+
+    backends = {
+        "torch": SentenceTransformerEmbeddingService,
+        "onnx": lambda: OnnxEmbeddingService(quantize=False),
+        "onnx-int8": lambda: OnnxEmbeddingService(quantize=True),
+    }
+
+    results, reference = {}, None
+    for name, build in backends.items():
+        print(f"{name}: loading...")
+        service = build()
+        results[name] = measure(service, questions, passages, args)
+
+        vectors = np.asarray(service.embed_texts(questions))
+        if reference is None:
+            reference = vectors
+        cosines = (reference * vectors).sum(axis=1)
+        results[name]["cosine_vs_torch_mean"] = round(float(cosines.mean()), 5)
+        results[name]["cosine_vs_torch_min"] = round(float(cosines.min()), 5)
+        print(json.dumps(results[name]))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(
+        json.dumps({"queries": args.queries, "batch": args.batch, **results}, indent=2),
+        encoding="utf-8",
+    )
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Query-embedding throughput under concurrency: per-request vs micro-batched.
+
+Reproduces the Locust shape in-process: N threads each embed golden-set
+questions back to back, first against the bare MiniLM service (every call
+its own batch-size-1 forward pass), then through
+MicroBatchingEmbeddingService. No server, DB or LLM involved — this
+isolates the encoder, which is what the batcher changes.
+
+Usage:
+    python benchmarks/embedding_batching.py --threads 50 --seconds 20
+    python benchmarks/embedding_batching.py --max-wait-ms 0 --max-batch 64
+
+Writes benchmarks/results/embedding_batching.json.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.infrastructure.embeddings.batcher import (  # noqa: E402
+    MicroBatchingEmbeddingService,
+)
+from app.infrastructure.embeddings.sentence_transformer import (  # noqa: E402
+    SentenceTransformerEmbeddingService,
+)
+
+GOLDEN_PATH = REPO_ROOT / "evals" / "golden_qa.jsonl"
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "embedding_batching.json"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def drive(service, questions: list[str], *, threads: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def worker(offset: int):
+        i = offset
+        local: list[float] = []
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            service.embed_query(questions[i % len(questions)])
+            local.append(time.perf_counter() - started)
+            i += threads
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    return {
+        "queries": len(latencies),
+        "queries_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    questions = [
+        json.loads(line)["question"]
+        for line in GOLDEN_PATH.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+
+    print("Loading MiniLM...")
+    model = SentenceTransformerEmbeddingService()
+    model.embed_query("warm-up")
+
+    print(f"per-request: {args.threads} threads x {args.seconds}s")
+    baseline = drive(model, questions, threads=args.threads, seconds=args.seconds)
+    print(json.dumps(baseline))
+
+    batcher = MicroBatchingEmbeddingService(
+        model, max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms
+    )
+    print(f"micro-batched: max_batch={args.max_batch} max_wait={args.max_wait_ms}ms")
+    batched = drive(batcher, questions, threads=args.threads, seconds=args.seconds)
+    batched["batcher"] = batcher.stats()
+    print(json.dumps({k: v for k, v in batched.items() if k != "batcher"}))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(
+        json.dumps(
+            {
+                "threads": args.threads,
+                "seconds": args.seconds,
+                "per_request": baseline,
+                "micro_batched": batched,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""document_embeddings write throughput: ORM bulk_save_objects vs binary COPY.
+
+Writes one synthetic N-chunk document (random unit vectors, ~500-char
+chunks) both ways against the configured DATABASE_URL and reports
+rows/sec. Each run happens inside a transaction that is rolled back, so
+nothing is left behind — but it does need a migrated pgvector database
+and an existing organization/document id to satisfy the foreign keys
+(any will do; rows never commit).
+
+Usage:
+    python benchmarks/embedding_writes.py --org-id 1 --document-id 1
+    python benchmarks/embedding_writes.py --org-id 1 --document-id 1 --chunks 10000
+
+Writes benchmarks/results/embedding_writes.json.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.db.bulk_copy import copy_document_embeddings  # noqa: E402
+from app.db.models.embedding import DocumentEmbedding  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "embedding_writes.json"
+DIM = 384
+
+
+def orm_insert(db, *, organization_id, document_id, contents, vectors):
+    """The previous write path, kept here only as the baseline."""
+    db.bulk_save_objects(
+        [
+            DocumentEmbedding(
+                organization_id=organization_id,
+                document_id=document_id,
+                content=content,
+                embedding=vector,
+            )
+            for content, vector in zip(contents, vectors)
+        ]
+    )
+    db.flush()
+
+
+def timed(write, **kwargs) -> dict:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        write(db, **kwargs)
+        elapsed = time.perf_counter() - started
+        db.rollback()
+    finally:
+        db.close()
+    rows = len(kwargs["contents"])
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--org-id", type=int, required=True)
+    parser.add_argument("--document-id", type=int, required=True)
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.chunks, DIM), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    contents = [f"chunk {i} " + "lorem ipsum dolor " * 27 for i in range(args.chunks)]
+    data = {
+        "organization_id": args.org_id,
+        "document_id": args.document_id,
+        "contents": contents,
+        "vectors": vectors,
+    }
+
+    results = {"chunks": args.chunks}
+    for name, write in (
+        ("bulk_save_objects", orm_insert),
+        ("copy_binary", copy_document_embeddings),
+    ):
+        # best of N: the first run also pays for warming shared buffers
+        runs = [timed(write, **data) for _ in range(args.repeats)]
+        results[name] = max(runs, key=lambda r: r["rows_per_second"])
+        print(name, json.dumps(results[name]))
+    results["speedup"] = round(
+        results["copy_binary"]["rows_per_second"]
+        / results["bulk_save_objects"]["rows_per_second"],
+        2,
+    )
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Hybrid retrieval latency: sequential arms vs one fused statement vs
+concurrent arms.
+
+For every golden-set question, runs the hybrid candidate step each way
+against the eval org's corpus (scripts/bulk_ingest.py):
+
+    two_query   — similarity_search then lexical_search for --candidates
+                  rows each, fused in Python by reciprocal_rank_fusion;
+    one_query   — hybrid_search: both rankings and the RRF score in one
+                  CTE statement, only the fused top --candidates returned;
+    concurrent  — ConcurrentHybridRetriever (HYBRID_CONCURRENT_ARMS): the
+                  keyword arm in flight while the question is embedded,
+                  the dense arm on a second pooled connection.
+
+By default query embeddings are computed once up front, so only
+retrieval (round trips, SQL, transfer, fusion) is timed. --embed moves
+a fresh (uncached) MiniLM encode into every timed call, which is where
+the concurrent path's overlap shows. Paths are interleaved per question
+so cache warmth favours none, and the fused id lists are compared to
+confirm they return the same pool.
+
+Usage:
+    python benchmarks/hybrid_retrieval.py
+    python benchmarks/hybrid_retrieval.py --embed --candidates 50 --repeats 5
+
+Writes benchmarks/results/hybrid_retrieval.json.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.infrastructure.db.concurrent_hybrid_retriever import (  # noqa: E402
+    ConcurrentHybridRetriever,
+)
+from app.infrastructure.embeddings.sentence_transformer import (  # noqa: E402
+    SentenceTransformerEmbeddingService,
+)
+from app.services.embedding_service import (  # noqa: E402
+    hybrid_search,
+    lexical_search,
+    reciprocal_rank_fusion,
+    similarity_search,
+)
+from evals.common import GOLDEN_PATH, get_eval_user, read_jsonl  # noqa: E402
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "hybrid_retrieval.json"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def two_query(db, *, org_id, question, embed, candidates):
+    dense = similarity_search(
+        db, organization_id=org_id, query_embedding=embed(), limit=candidates
+    )
+    lexical = lexical_search(
+        db, organization_id=org_id, query_text=question, limit=candidates
+    )
+    return reciprocal_rank_fusion(dense, lexical, limit=candidates)
+
+
+def one_query(db, *, org_id, question, embed, candidates):
+    return hybrid_search(
+        db,
+        organization_id=org_id,
+        query_embedding=embed(),
+        query_text=question,
+        limit=candidates,
+    )
+
+
+def concurrent(retriever):
+    def run(db, *, org_id, question, embed, candidates):
+        return retriever.retrieve(
+            organization_id=org_id,
+            query_text=question,
+            embed=embed,
+            limit=candidates,
+        )
+
+    return run
+
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "queries": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--embed",
+        action="store_true",
+        help="encode the question inside every timed call",
+    )
+    args = parser.parse_args()
+
+    questions = [g["question"] for g in read_jsonl(GOLDEN_PATH)]
+    print(f"Embedding {len(questions)} golden questions...")
+    embedder = SentenceTransformerEmbeddingService()
+    embeddings = [embedder.embed_query(q) for q in questions]
+
+    retriever = ConcurrentHybridRetriever(SessionLocal)
+    paths = {
+        "two_query": two_query,
+        "one_query": one_query,
+        "concurrent": concurrent(retriever),
+    }
+    latencies = {name: [] for name in paths}
+    same_pool = 0
+
+    db = SessionLocal()
+    try:
+        org_id = get_eval_user(db).organization_id
+        for question, embedding in zip(questions, embeddings):
+            if args.embed:
+                embed = lambda q=question: embedder.embed_query(q)  # noqa: E731
+            else:
+                embed = lambda e=embedding: e  # noqa: E731
+            results = {}
+            for _ in range(args.repeats):
+                for name, run in paths.items():
+                    started = time.perf_counter()
+                    results[name] = run(
+                        db,
+                        org_id=org_id,
+                        question=question,
+                        embed=embed,
+                        candidates=args.candidates,
+                    )
+                    latencies[name].append(time.perf_counter() - started)
+            orders = {tuple(r.id for r in rows) for rows in results.values()}
+            same_pool += len(orders) == 1
+    finally:
+        db.close()
+
+    report = {
+        "candidates": args.candidates,
+        "repeats": args.repeats,
+        "embed_in_path": args.embed,
+        "questions": len(questions),
+        "identical_fused_order": same_pool,
+        **{name: summarize(values) for name, values in latencies.items()},
+        "concurrent_arms_ms": retriever.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Peak ingestion memory: whole-document vs streaming text pipeline.
+
+Ingests one large PDF's text both ways, each in a fresh subprocess so
+peak RSS (ru_maxrss) is measured cleanly:
+
+    whole      extract_text_from_pdf -> normalize_text -> chunk_text,
+               every chunk embedded at once (the pre-streaming path);
+    streaming  iter_pdf_chunks, embedded and COPY-encoded
+               INGEST_BATCH_CHUNKS at a time (the current path).
+
+The encoder is a stand-in returning MiniLM-shaped float32 zeros, so the
+numbers isolate the pipeline's own memory (pass --model to use the real
+MiniLM instead). pypdf still parses the file itself in both modes; that
+part of the footprint is unchanged.
+
+Without --pdf, a synthetic text PDF of --pages dense pages is generated
+first (needs fpdf2 from requirements/dev.txt).
+
+Usage:
+    python benchmarks/ingest_memory.py --pages 1500
+    python benchmarks/ingest_memory.py --pdf path/to/large.pdf --model
+
+Writes benchmarks/results/ingest_memory.json.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.db.bulk_copy import encode_embedding_rows  # noqa: E402
+from app.services.document_processing import (  # noqa: E402
+    chunk_text,
+    extract_text_from_pdf,
+    iter_pdf_chunks,
+    normalize_text,
+)
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "ingest_memory.json"
+DIM = 384
+
+
+class ShapeOnlyEncoder:
+    def embed_texts(self, texts):
+        return np.zeros((len(texts), DIM), dtype=np.float32)
+
+
+def drain(chunks: list[str], vectors) -> None:
+    for _ in encode_embedding_rows(
+        organization_id=1, document_id=1, contents=chunks, vectors=vectors
+    ):
+        pass
+
+
+def run_mode(mode: str, pdf: str, use_model: bool) -> dict:
+    if use_model:
+        from app.infrastructure.embeddings.sentence_transformer import (
+            SentenceTransformerEmbeddingService,
+        )
+
+        encoder = SentenceTransformerEmbeddingService()
+    else:
+        encoder = ShapeOnlyEncoder()
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    total = 0
+    if mode == "whole":
+        chunks = chunk_text(normalize_text(extract_text_from_pdf(pdf)))
+        drain(chunks, encoder.embed_texts(chunks))
+        total = len(chunks)
+    else:
+        stream = iter_pdf_chunks(pdf)
+        while batch := list(islice(stream, settings.INGEST_BATCH_CHUNKS)):
+            drain(batch, encoder.embed_texts(batch))
+            total += len(batch)
+    elapsed = time.perf_counter() - started
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "chunks": total,
+        "seconds": round(elapsed, 2),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "rss_growth_mb": round((peak_kb - baseline_kb) / 1024, 1),
+    }
+
+
+def synthetic_pdf(pages: int) -> str:
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=8)
+    line = "Synthetic ingestion benchmark text with ordinary words. " * 3
+    for page in range(pages):
+        pdf.add_page()
+        pdf.multi_cell(0, 3.5, f"Page {page}. " + line * 28)
+    path = Path(tempfile.gettempdir()) / f"ingest_memory_{pages}p.pdf"
+    pdf.output(str(path))
+    return str(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf")
+    parser.add_argument("--pages", type=int, default=1500)
+    parser.add_argument("--model", action="store_true")
+    parser.add_argument("--mode", choices=("whole", "streaming"))  # internal
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.pdf, args.model)))
+        return 0
+
+    pdf = args.pdf or synthetic_pdf(args.pages)
+    results = {
+        "pdf_mb": round(Path(pdf).stat().st_size / 2**20, 1),
+        "batch_chunks": settings.INGEST_BATCH_CHUNKS,
+        "encoder": "minilm" if args.model else "shape-only",
+    }
+    for mode in ("whole", "streaming"):
+        command = [sys.executable, __file__, "--mode", mode, "--pdf", pdf]
+        if args.model:
+            command.append("--model")
+        out = subprocess.run(command, check=True, capture_output=True, text=True)
+        results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+        print(mode, json.dumps(results[mode]))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Ingest-side cost of the embedding representation: Python lists vs
+float32 NumPy arrays.
+
+Replays the write preparation store_embeddings does after the encoder
+returns, for a synthetic PDF of N chunks. "lists" is the original path:
+encode(...).tolist(), one DocumentEmbedding per chunk, every vector
+rendered to pgvector text by the bind processor as a flush would.
+"arrays" is the current one: rows of the (N, 384) float32 matrix
+encoded into the binary COPY stream (app.db.bulk_copy). The encoder and
+the database round-trip are left out — the first is identical for both
+and needs the model; see embedding_writes.py for the second.
+
+Measures peak traced memory while the batch is held (tracemalloc) and
+CPU time per chunk.
+
+Usage:
+    python benchmarks/ingest_vectors.py --chunks 5000
+
+Writes benchmarks/results/ingest_vectors.json.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.db.bulk_copy import encode_embedding_rows  # noqa: E402
+from app.db.models.embedding import DocumentEmbedding  # noqa: E402
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "ingest_vectors.json"
+DIM = 384
+
+
+def encoder_output(chunks: int, as_lists: bool):
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((chunks, DIM), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix.tolist() if as_lists else matrix
+
+
+def orm_records(texts, vectors):
+    bind = DocumentEmbedding.embedding.type.bind_processor(
+        postgresql.psycopg2.dialect()
+    )
+    records = [
+        DocumentEmbedding(
+            organization_id=1, document_id=1, content=text, embedding=vector
+        )
+        for text, vector in zip(texts, vectors)
+    ]
+    held_bytes, _ = tracemalloc.get_traced_memory()
+    for record in records:
+        bind(record.embedding)
+    return held_bytes
+
+
+def copy_stream(texts, vectors):
+    held_bytes, _ = tracemalloc.get_traced_memory()
+    for _ in encode_embedding_rows(
+        organization_id=1, document_id=1, contents=texts, vectors=vectors
+    ):
+        pass
+    return held_bytes
+
+
+def ingest(chunks: int, as_lists: bool) -> dict:
+    texts = [f"chunk {i}" for i in range(chunks)]
+
+    tracemalloc.start()
+    cpu_started = time.process_time()
+
+    vectors = encoder_output(chunks, as_lists)
+    write = orm_records if as_lists else copy_stream
+    held_bytes = write(texts, vectors)
+
+    cpu_seconds = time.process_time() - cpu_started
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "held_mb": round(held_bytes / 2**20, 1),
+        "peak_mb": round(peak_bytes / 2**20, 1),
+        "cpu_us_per_chunk": round(cpu_seconds / chunks * 1e6, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = {"chunks": args.chunks}
+    for name, as_lists in (("lists", True), ("arrays", False)):
+        results[name] = ingest(args.chunks, as_lists)
+        print(name, json.dumps(results[name]))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
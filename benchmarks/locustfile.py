@@ -15,6 +15,11 @@ therefore measure OUR stack with token generation simulated at
 realistic pacing, not cloud LLM latency (that is measured separately
 by benchmarks/streaming_ttft.py).
 
+The chat routes are async (asyncpg + async LLM client), so a chat
+waiting on the model holds no threadpool thread. To see that, run one
+uvicorn worker with more users than its 40 threads (--users 200); see
+"Async chat pipeline" in benchmarks/README.md.
+
 Questions are sampled from the answerable half of the Phase 5 golden
 set so retrieval does real work (matching documents exist).
 
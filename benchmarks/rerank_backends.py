@@ -0,0 +1,150 @@
+"""Cross-encoder backends: PyTorch vs ONNX Runtime fp32 vs ONNX Runtime int8.
+
+For each backend, measures one rerank call's latency over a
+RERANK_CANDIDATES pool (the chat path) and its pairs/sec, plus how
+closely its ranking of each pool agrees with the torch backend's. That
+covers top-1 agreement and mean Spearman rank correlation: int8 trades
+some of that agreement for speed, and this is where to see how much.
+--max-seq-length applies to every backend (RERANK_MAX_SEQ_LENGTH).
+
+Pools are golden-set statements (question + reference answer), each
+question against its own and its neighbours', padded out to CHUNK_SIZE
+characters so the pairs are as long as real chunks.
+
+Usage:
+    python benchmarks/rerank_backends.py
+    python benchmarks/rerank_backends.py --requests 300 --max-seq-length 256
+
+Requires requirements/onnx.txt. Writes
+benchmarks/results/rerank_backends.json.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.infrastructure.rerank.cross_encoder import (  # noqa: E402
+    CrossEncoderReranker,
+)
+from app.infrastructure.rerank.onnx_cross_encoder import (  # noqa: E402
+    OnnxCrossEncoderReranker,
+)
+from app.services.document_processing import CHUNK_SIZE  # noqa: E402
+from evals.common import GOLDEN_PATH, read_jsonl  # noqa: E402
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "rerank_backends.json"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def golden_pools(candidates: int) -> list[tuple[str, list[str]]]:
+    items = [g for g in read_jsonl(GOLDEN_PATH) if g["type"] == "answerable"]
+    statements = [f"{g['question']} {g['reference_answer']}" for g in items]
+    # Pad each to chunk length with the statements that follow it.
+    padded = [
+        " ".join(statements[i:] + statements[:i])[:CHUNK_SIZE]
+        for i in range(len(statements))
+    ]
+    return [
+        (g["question"], [padded[(n + j) % len(items)] for j in range(candidates)])
+        for n, g in enumerate(items)
+    ]
+
+
+def spearman(a, b) -> float:
+    ra = np.argsort(np.argsort(a)).astype(float)
+    rb = np.argsort(np.argsort(b)).astype(float)
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def measure(reranker, pools, requests: int) -> dict:
+    reranker.rerank(query="warm-up", passages=pools[0][1])
+    latencies = []
+    for i in range(requests):
+        query, passages = pools[i % len(pools)]
+        started = time.perf_counter()
+        reranker.rerank(query=query, passages=passages)
+        latencies.append(time.perf_counter() - started)
+    pairs = requests * len(pools[0][1])
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "pairs_per_second": round(pairs / sum(latencies), 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=settings.RERANK_CANDIDATES)
+    parser.add_argument(
+        "--max-seq-length", type=int, default=settings.RERANK_MAX_SEQ_LENGTH
+    )
+    args = parser.parse_args()
+
+    pools = golden_pools(args.candidates)
+    backends = {
+        "torch": lambda: CrossEncoderReranker(max_seq_length=args.max_seq_length),
+        "onnx": lambda: OnnxCrossEncoderReranker(
+            quantize=False, max_seq_length=args.max_seq_length
+        ),
+        "onnx-int8": lambda: OnnxCrossEncoderReranker(
+            quantize=True, max_seq_length=args.max_seq_length
+        ),
+    }
+
+    results, reference = {}, None
+    for name, build in backends.items():
+        print(f"{name}: loading...")
+        reranker = build()
+        results[name] = measure(reranker, pools, args.requests)
+
+        scores = [
+            np.asarray(reranker.score_pairs([(q, p) for p in pool]))
+            for q, pool in pools
+        ]
+        if reference is None:
+            reference = scores
+        results[name]["top1_agreement_vs_torch"] = round(
+            float(
+                np.mean([r.argmax() == s.argmax() for r, s in zip(reference, scores)])
+            ),
+            4,
+        )
+        results[name]["spearman_vs_torch_mean"] = round(
+            statistics.fmean(spearman(r, s) for r, s in zip(reference, scores)), 4
+        )
+        print(json.dumps(results[name]))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(
+        json.dumps(
+            {
+                "requests": args.requests,
+                "candidates": args.candidates,
+                "max_seq_length": args.max_seq_length,
+                **results,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
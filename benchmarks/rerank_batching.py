@@ -0,0 +1,144 @@
+"""Cross-encoder reranking throughput under concurrency: per-request vs
+micro-batched.
+
+N threads each rerank a RERANK_CANDIDATES-passage pool for golden-set
+questions back to back, first against the bare CrossEncoderReranker
+(every request its own forward pass), then through MicroBatchingReranker
+(RERANK_BATCHING_ENABLED). No server, DB or LLM involved: this isolates
+the cross-encoder, which is what the batcher changes.
+
+Passages are CHUNK_SIZE-character windows over the golden questions and
+reference answers, the length of a real chunk. The model's cost depends
+on token count, not on what the text says.
+
+Usage:
+    python benchmarks/rerank_batching.py --threads 16 --seconds 20
+    python benchmarks/rerank_batching.py --max-wait-ms 0 --max-pairs 512
+
+Writes benchmarks/results/rerank_batching.json.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.infrastructure.rerank.batcher import MicroBatchingReranker  # noqa: E402
+from app.infrastructure.rerank.cross_encoder import (  # noqa: E402
+    CrossEncoderReranker,
+)
+from app.services.document_processing import CHUNK_SIZE  # noqa: E402
+from evals.common import GOLDEN_PATH, read_jsonl  # noqa: E402
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "rerank_batching.json"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def passage_pools(golden: list[dict], *, candidates: int) -> list[list[str]]:
+    text = " ".join(f"{g['question']} {g.get('reference_answer', '')}" for g in golden)
+    windows = [
+        text[start : start + CHUNK_SIZE]
+        for start in range(0, len(text) - CHUNK_SIZE, CHUNK_SIZE // 2)
+    ]
+    return [
+        [windows[(i * candidates + j) % len(windows)] for j in range(candidates)]
+        for i in range(len(golden))
+    ]
+
+
+def drive(reranker, questions, pools, *, threads: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def worker(offset: int):
+        i = offset
+        local: list[float] = []
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            n = i % len(questions)
+            reranker.rerank(query=questions[n], passages=pools[n])
+            local.append(time.perf_counter() - started)
+            i += threads
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--candidates", type=int, default=settings.RERANK_CANDIDATES)
+    parser.add_argument("--max-pairs", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    golden = read_jsonl(GOLDEN_PATH)
+    questions = [g["question"] for g in golden]
+    pools = passage_pools(golden, candidates=args.candidates)
+
+    print(f"Loading {settings.RERANK_MODEL}...")
+    model = CrossEncoderReranker()
+    model.rerank(query="warm-up", passages=pools[0])
+
+    print(f"per-request: {args.threads} threads x {args.seconds}s")
+    baseline = drive(
+        model, questions, pools, threads=args.threads, seconds=args.seconds
+    )
+    print(json.dumps(baseline))
+
+    batcher = MicroBatchingReranker(
+        model, max_batch_pairs=args.max_pairs, max_wait_ms=args.max_wait_ms
+    )
+    print(f"micro-batched: max_pairs={args.max_pairs} max_wait={args.max_wait_ms}ms")
+    batched = drive(
+        batcher, questions, pools, threads=args.threads, seconds=args.seconds
+    )
+    batched["batcher"] = batcher.stats()
+    print(json.dumps({k: v for k, v in batched.items() if k != "batcher"}))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(
+        json.dumps(
+            {
+                "threads": args.threads,
+                "seconds": args.seconds,
+                "candidates": args.candidates,
+                "per_request": baseline,
+                "micro_batched": batched,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
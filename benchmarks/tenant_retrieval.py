@@ -0,0 +1,270 @@
+"""Mixed-tenant dense retrieval: one global HNSW index vs per-tenant
+partial indexes (app/db/hnsw.py).
+
+Loads a synthetic multi-tenant corpus: one large org, one mid-size org
+and several small ones, each with its own clustered unit vectors. Every
+org's queries are then run through similarity_search under each layout:
+
+    global      — a single HNSW index over the whole table, with the org
+                  filter applied after the approximate scan (the layout
+                  before migration 9e4c7a2d5b18);
+    per_tenant  — a partial index for each org holding at least
+                  --min-chunks rows, in the VECTOR_INDEX_QUANTIZATION
+                  form; smaller orgs get an exact scan of their own rows.
+
+For each org and layout it reports recall@k against exact top-k
+(computed here in numpy from the same vectors), p50/p95 latency, and
+the plan the query used. Everything happens inside one transaction
+that is rolled back, so nothing is left behind. The index builds lock
+document_embeddings until then, so point it at the eval database. It
+needs a migrated pgvector database and an existing user id to own the
+synthetic documents (rows never commit).
+
+Usage:
+    python benchmarks/tenant_retrieval.py --user-id 1
+    python benchmarks/tenant_retrieval.py --user-id 1 --large 100000 --k 10
+
+Writes benchmarks/results/tenant_retrieval.json.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import bindparam, text
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.db.bulk_copy import copy_document_embeddings  # noqa: E402
+from app.db.hnsw import (  # noqa: E402
+    HNSW_INDEX_NAME,
+    TENANT_INDEX_PREFIX,
+    hnsw_index_ddl,
+    quantized_distance,
+    tenant_index_ddl,
+    tenant_index_name,
+)
+from app.db.models.document import Document  # noqa: E402
+from app.db.models.embedding import DocumentEmbedding  # noqa: E402
+from app.db.models.organization import Organization  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.db.tenant_vector_index import INDEX_STATE  # noqa: E402
+from app.services.embedding_service import similarity_search  # noqa: E402
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "tenant_retrieval.json"
+DIM = 384
+COPY_BATCH = 5000
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def clustered_unit_vectors(rng, n: int, *, clusters: int) -> np.ndarray:
+    """Topic-like data: noisy points around a few centres, so nearest
+    neighbours mean something (uniform random vectors have none)."""
+    centres = rng.standard_normal((clusters, DIM), dtype=np.float32)
+    points = centres[rng.integers(clusters, size=n)]
+    points += 0.35 * rng.standard_normal((n, DIM), dtype=np.float32)
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    return points
+
+
+def load_tenant(db, rng, *, name, size, user_id, queries) -> dict:
+    org = Organization(name=name)
+    db.add(org)
+    db.flush()
+    doc = Document(
+        filename=f"{name}.pdf",
+        content_type="application/pdf",
+        organization_id=org.id,
+        uploaded_by=user_id,
+    )
+    db.add(doc)
+    db.flush()
+
+    vectors = clustered_unit_vectors(rng, size, clusters=max(4, size // 500))
+    contents = [f"{name} chunk {i}" for i in range(size)]
+    for start in range(0, size, COPY_BATCH):
+        copy_document_embeddings(
+            db,
+            organization_id=org.id,
+            document_id=doc.id,
+            contents=contents[start : start + COPY_BATCH],
+            vectors=vectors[start : start + COPY_BATCH],
+        )
+
+    # Queries near the org's own data, as real questions are.
+    picks = vectors[rng.integers(size, size=queries)]
+    probes = picks + 0.2 * rng.standard_normal(picks.shape, dtype=np.float32)
+    probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+    return {
+        "name": name,
+        "org_id": org.id,
+        "size": size,
+        "vectors": vectors,
+        "probes": probes,
+    }
+
+
+def plan_of(db, tenant, probe, k, quantization) -> str:
+    name = tenant_index_name(tenant["org_id"], quantization)
+    if quantization != "none" and not db.execute(INDEX_STATE, {"name": name}).scalar():
+        quantization = "none"  # as similarity_search does without the index
+    order_by = quantized_distance(
+        quantization, column="de.embedding", query="CAST(:query_embedding AS vector)"
+    )
+    sql = text(
+        f"""
+        EXPLAIN SELECT de.id FROM document_embeddings de
+        WHERE de.organization_id = :org_id
+        ORDER BY {order_by}
+        LIMIT :limit
+        """
+    ).bindparams(bindparam("query_embedding", type_=DocumentEmbedding.embedding.type))
+    lines = db.execute(
+        sql, {"org_id": tenant["org_id"], "query_embedding": probe, "limit": k}
+    ).scalars()
+    for line in lines:
+        if "Scan" in line:
+            return line.strip().lstrip("-> ").split("  (")[0]
+    return "unknown"
+
+
+def measure(db, tenants, *, k, repeats, quantization) -> dict:
+    out = {}
+    for tenant in tenants:
+        latencies, hits = [], 0
+        for probe in tenant["probes"]:
+            truth = set(np.argsort(-(tenant["vectors"] @ probe), kind="stable")[:k])
+            for attempt in range(repeats + 1):
+                started = time.perf_counter()
+                rows = similarity_search(
+                    db,
+                    organization_id=tenant["org_id"],
+                    query_embedding=probe,
+                    limit=k,
+                    quantization=quantization,
+                )
+                if attempt:  # the first run only warms caches
+                    latencies.append(time.perf_counter() - started)
+            found = {int(r.content.rsplit(" ", 1)[1]) for r in rows}
+            hits += len(truth & found)
+        out[tenant["name"]] = {
+            "chunks": tenant["size"],
+            "recall_at_k": round(hits / (k * len(tenant["probes"])), 4),
+            "p50_ms": round(statistics.median(latencies) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "plan": plan_of(db, tenant, tenant["probes"][0], k, quantization),
+        }
+        print(tenant["name"], json.dumps(out[tenant["name"]]))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--large", type=int, default=50_000)
+    parser.add_argument("--mid", type=int, default=8_000)
+    parser.add_argument("--small", type=int, default=600)
+    parser.add_argument("--small-tenants", type=int, default=4)
+    parser.add_argument(
+        "--min-chunks", type=int, default=settings.TENANT_VECTOR_INDEX_MIN_CHUNKS
+    )
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    run = uuid.uuid4().hex[:8]
+    sizes = {"large": args.large, "mid": args.mid} | {
+        f"small_{i}": args.small for i in range(args.small_tenants)
+    }
+
+    db = SessionLocal()
+    report = {
+        "k": args.k,
+        "queries_per_tenant": args.queries,
+        "min_chunks": args.min_chunks,
+        "ef_search": settings.HNSW_EF_SEARCH or "server default",
+        "quantization": settings.VECTOR_INDEX_QUANTIZATION,
+    }
+    try:
+        print("Loading synthetic tenants...")
+        tenants = [
+            load_tenant(
+                db,
+                rng,
+                name=f"bench-{run}-{label}",
+                size=size,
+                user_id=args.user_id,
+                queries=args.queries,
+            )
+            for label, size in sizes.items()
+        ]
+        for tenant, label in zip(tenants, sizes):
+            tenant["name"] = label
+        db.execute(text("ANALYZE document_embeddings"))
+
+        existing = db.execute(
+            text(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE tablename = 'document_embeddings' "
+                "AND (indexname = :global OR starts_with(indexname, :prefix))"
+            ),
+            {"global": HNSW_INDEX_NAME, "prefix": TENANT_INDEX_PREFIX},
+        ).scalars()
+        for name in list(existing):
+            db.execute(text(f"DROP INDEX {name}"))
+
+        started = time.perf_counter()
+        db.execute(text(hnsw_index_ddl()))
+        report["global_build_seconds"] = round(time.perf_counter() - started, 2)
+        print("-- global index")
+        report["global"] = measure(
+            db, tenants, k=args.k, repeats=args.repeats, quantization="none"
+        )
+
+        db.execute(text(f"DROP INDEX {HNSW_INDEX_NAME}"))
+        started = time.perf_counter()
+        for tenant in tenants:
+            if tenant["size"] >= args.min_chunks:
+                db.execute(
+                    text(
+                        tenant_index_ddl(
+                            tenant["org_id"],
+                            quantization=settings.VECTOR_INDEX_QUANTIZATION,
+                        )
+                    )
+                )
+        report["per_tenant_build_seconds"] = round(time.perf_counter() - started, 2)
+        print("-- per-tenant indexes")
+        report["per_tenant"] = measure(
+            db,
+            tenants,
+            k=args.k,
+            repeats=args.repeats,
+            quantization=settings.VECTOR_INDEX_QUANTIZATION,
+        )
+    finally:
+        db.rollback()  # the synthetic tenants and every index change
+        db.close()
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Dense retrieval backends: pgvector vs the in-memory org matrix.
+
+For every golden-set question, runs the chat path's dense search
+against the eval org's corpus (scripts/bulk_ingest.py) on both
+VECTOR_BACKEND options, on the async session the chat route uses:
+
+    pgvector  — async_similarity_search (the org's HNSW index if it has
+                one, else an exact scan);
+    memory    — InMemoryDenseRetriever: the corpus-generation read, then
+                an exact matrix-vector product in the worker process.
+
+Query embeddings are computed once up front, so only retrieval is
+timed. The memory backend's first search loads the org; that cold load
+is timed and reported separately, with the bytes it holds and the
+process RSS growth it caused (ru_maxrss). Backends are interleaved per
+question so cache warmth favours neither. recall_at_k is pgvector's
+top-k against the in-memory exact top-k.
+
+With --snapshot DIR (scripts/export_vector_snapshot.py), a second cold
+load is timed with the vectors mapped from the snapshot, so only the
+chunk text comes from Postgres. Export the snapshot first; it must be
+current for the eval org.
+
+Usage:
+    python benchmarks/vector_backends.py
+    python benchmarks/vector_backends.py --k 10 --repeats 5
+    python benchmarks/vector_backends.py --snapshot /tmp/vector-snapshots
+
+Writes benchmarks/results/vector_backends.json.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import AsyncSessionLocal, SessionLocal  # noqa: E402
+from app.infrastructure.embeddings.sentence_transformer import (  # noqa: E402
+    SentenceTransformerEmbeddingService,
+)
+from app.infrastructure.vector_index.in_memory import (  # noqa: E402
+    InMemoryDenseRetriever,
+)
+from app.infrastructure.vector_index.snapshot import SnapshotSource  # noqa: E402
+from app.services.embedding_service import async_similarity_search  # noqa: E402
+from evals.common import GOLDEN_PATH, get_eval_user, read_jsonl  # noqa: E402
+
+RESULTS_PATH = REPO_ROOT / "benchmarks" / "results" / "vector_backends.json"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "queries": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(args, org_id: int, embeddings: list) -> dict:
+    retriever = InMemoryDenseRetriever(
+        max_rows_per_org=args.max_rows,
+        max_bytes=settings.MEMORY_VECTOR_INDEX_MAX_MB * 1024 * 1024,
+    )
+    latencies = {"pgvector": [], "memory": []}
+    hits = 0
+
+    async with AsyncSessionLocal() as db:
+        rss_before = rss_mb()
+        started = time.perf_counter()
+        await retriever.search(
+            db, organization_id=org_id, query_embedding=embeddings[0], limit=args.k
+        )
+        cold_load = time.perf_counter() - started
+        rss_after = rss_mb()
+        if retriever.stats()["postgres_fallbacks"]:
+            raise SystemExit(
+                f"eval org holds more than --max-rows {args.max_rows} chunks"
+            )
+
+        for embedding in embeddings:
+            for _ in range(args.repeats):
+                started = time.perf_counter()
+                pg = await async_similarity_search(
+                    db, organization_id=org_id, query_embedding=embedding, limit=args.k
+                )
+                latencies["pgvector"].append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                exact = await retriever.search(
+                    db, organization_id=org_id, query_embedding=embedding, limit=args.k
+                )
+                latencies["memory"].append(time.perf_counter() - started)
+            hits += len({r.id for r in pg} & {r.id for r in exact})
+
+        snapshot_load = None
+        if args.snapshot:
+            seeded = InMemoryDenseRetriever(
+                max_rows_per_org=args.max_rows,
+                max_bytes=settings.MEMORY_VECTOR_INDEX_MAX_MB * 1024 * 1024,
+                snapshots=SnapshotSource(args.snapshot),
+            )
+            started = time.perf_counter()
+            await seeded.search(
+                db, organization_id=org_id, query_embedding=embeddings[0], limit=args.k
+            )
+            snapshot_load = round(time.perf_counter() - started, 3)
+            if not seeded.stats()["snapshot_loads"]:
+                raise SystemExit("the snapshot is not current for the eval org")
+
+    stats = retriever.stats()
+    return {
+        "k": args.k,
+        "repeats": args.repeats,
+        "questions": len(embeddings),
+        "chunks": stats["rows"],
+        "pgvector": summarize(latencies["pgvector"]),
+        "memory": summarize(latencies["memory"]),
+        "pgvector_recall_at_k": round(hits / (args.k * len(embeddings)), 4),
+        "memory_cold_load_s": round(cold_load, 2),
+        "memory_snapshot_load_s": snapshot_load,
+        "memory_held_mb": round(stats["bytes"] / 1024 / 1024, 1),
+        "memory_rss_growth_mb": round(rss_after - rss_before, 1),
+        "memory_backend": stats,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=settings.DEFAULT_TOP_K)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=settings.MEMORY_VECTOR_INDEX_MAX_ROWS_PER_ORG,
+    )
+    parser.add_argument("--snapshot", metavar="DIR")
+    args = parser.parse_args()
+
+    questions = [g["question"] for g in read_jsonl(GOLDEN_PATH)]
+    print(f"Embedding {len(questions)} golden questions...")
+    embedder = SentenceTransformerEmbeddingService()
+    embeddings = [embedder.embed_query(q) for q in questions]
+
+    db = SessionLocal()
+    try:
+        org_id = get_eval_user(db).organization_id
+    finally:
+        db.close()
+
+    report = asyncio.run(run(args, org_id, embeddings))
+    print(json.dumps(report, indent=2))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"saved -> {RESULTS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,19 +20,72 @@ Usage:
     python -m evals.retrieval_eval --hybrid           # dense + BM25-ish (RRF)
     python -m evals.retrieval_eval --rerank           # dense + cross-encoder
     python -m evals.retrieval_eval --hybrid --rerank  # full stack
+
+--rerank scores with the RERANK_BACKEND runtime, so the ONNX int8
+cross-encoder's recall is measured the same way (mode dense+rerank-onnx):
+    RERANK_BACKEND=onnx python -m evals.retrieval_eval --rerank
+
+HNSW tuning (dense only): --sweep-ef-search charts Recall@k against
+p50/p95 query latency at each hnsw.ef_search. --sweep-build also rebuilds
+the index per m:ef_construction, inside a rolled-back transaction (see
+sweep()):
+    python -m evals.retrieval_eval --sweep-ef-search 10,20,40,80,160
+    python -m evals.retrieval_eval --sweep-ef-search 20,40,80 \\
+        --sweep-build 16:64,32:128
+
+Index quantization (dense only): --sweep-quantization rebuilds the eval
+org's index in each VECTOR_INDEX_QUANTIZATION form (rolled back). It
+reports index size, p50/p95 latency, Recall@k, and overlap with exact
+top-k, so the recall cost of each byte saved is visible:
+    python -m evals.retrieval_eval --sweep-quantization none,halfvec,binary
+
+Adaptive reranking (dense + rerank): --sweep-skip-margin calibrates
+RERANK_SKIP_MARGIN. Every question is ranked both ways once; then, at
+each margin, questions whose dense rank-1 vs rank-k distance gap clears
+it keep the dense order. Reports the recall given up against always
+reranking, and the share of reranker calls saved. With no margins
+given, the observed gaps' deciles are tried:
+    python -m evals.retrieval_eval --rerank --sweep-skip-margin
+    python -m evals.retrieval_eval --rerank --sweep-skip-margin 0.05,0.1,0.2
+
+Snapshot (dense only): --snapshot ranks against the memory-mapped
+embedding snapshot (scripts/export_vector_snapshot.py) instead of
+querying pgvector: an exact search, with only the winners' text read
+from Postgres. Orgs whose corpus has changed since the export fall back
+to pgvector:
+    python -m evals.retrieval_eval --snapshot /var/lib/rag/vector-snapshots
 """
 
 import argparse
+import statistics
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.composition.singletons import get_embedding_service  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.composition.singletons import (  # noqa: E402
+    build_rerank_backend,
+    get_embedding_service,
+)
+from app.core.config import settings  # noqa: E402
+from app.db.hnsw import (  # noqa: E402
+    DEFAULT_EF_SEARCH,
+    QUANTIZATIONS,
+    search_ef_search,
+    tenant_index_ddl,
+    tenant_index_name,
+)
 from app.db.session import SessionLocal  # noqa: E402
+from app.infrastructure.vector_index.snapshot import (  # noqa: E402
+    SnapshotSource,
+    snapshot_similarity_search,
+)
 from app.services.embedding_service import (  # noqa: E402
-    lexical_search,
-    reciprocal_rank_fusion,
+    dense_margin,
+    hybrid_search,
     similarity_search,
 )
 from evals.common import (
@@ -57,20 +110,25 @@ def _doc_rank(ranked_filenames: list[str], golden_source: str) -> int | None:
 
 def _mode_name(use_hybrid: bool, use_rerank: bool) -> str:
     base = "hybrid" if use_hybrid else "dense"
-    return f"{base}+rerank" if use_rerank else base
+    if not use_rerank:
+        return base
+    backend = settings.RERANK_BACKEND.lower()
+    return f"{base}+rerank" if backend == "torch" else f"{base}+rerank-{backend}"
 
 
-def evaluate(*, candidates: int, use_hybrid: bool, use_rerank: bool) -> dict:
+def evaluate(
+    *,
+    candidates: int,
+    use_hybrid: bool,
+    use_rerank: bool,
+    snapshots: SnapshotSource | None = None,
+) -> dict:
     golden = [g for g in read_jsonl(GOLDEN_PATH) if g["type"] == "answerable"]
     if not golden:
         raise SystemExit("No answerable golden questions found.")
 
     embedder = get_embedding_service()
-    reranker = None
-    if use_rerank:
-        from app.infrastructure.rerank.cross_encoder import CrossEncoderReranker
-
-        reranker = CrossEncoderReranker()
+    reranker = build_rerank_backend() if use_rerank else None
 
     db = SessionLocal()
     try:
@@ -80,24 +138,31 @@ def evaluate(*, candidates: int, use_hybrid: bool, use_rerank: bool) -> dict:
         for item in golden:
             question = item["question"]
             embedding = embedder.embed_query(question)
-            dense = similarity_search(
-                db=db,
-                organization_id=org_id,
-                query_embedding=embedding,
-                limit=candidates,
-            )
             if use_hybrid:
-                lexical = lexical_search(
+                # Fuse the dense and keyword rankings; keep the same pool
+                # size so Recall@k is compared like-for-like against dense.
+                matches = hybrid_search(
                     db=db,
                     organization_id=org_id,
+                    query_embedding=embedding,
                     query_text=question,
                     limit=candidates,
                 )
-                # Fuse the dense and keyword rankings; keep the same pool
-                # size so Recall@k is compared like-for-like against dense.
-                matches = reciprocal_rank_fusion(dense, lexical, limit=candidates)
+            elif snapshots is not None:
+                matches = snapshot_similarity_search(
+                    db,
+                    snapshots,
+                    organization_id=org_id,
+                    query_embedding=embedding,
+                    limit=candidates,
+                )
             else:
-                matches = dense
+                matches = similarity_search(
+                    db=db,
+                    organization_id=org_id,
+                    query_embedding=embedding,
+                    limit=candidates,
+                )
             if reranker is not None:
                 order = reranker.rerank(
                     query=question,
@@ -110,38 +175,499 @@ def evaluate(*, candidates: int, use_hybrid: bool, use_rerank: bool) -> dict:
             # relevant doc from deeper in the pool into that top-5.
             ranks.append(_doc_rank([m.filename for m in matches], item["source"]))
 
-        total = len(ranks)
-        recall = {
-            k: sum(1 for r in ranks if r is not None and r <= k) / total
-            for k in RECALL_KS
-            if k <= candidates
-        }
-        mrr = sum((1.0 / r) for r in ranks if r is not None) / total
-        found_in_pool = sum(1 for r in ranks if r is not None) / total
-
+        mode = _mode_name(use_hybrid, use_rerank)
+        if snapshots is not None:
+            mode += "+snapshot"
+            print(f"snapshot: {snapshots.stats()}")
         return {
-            "mode": _mode_name(use_hybrid, use_rerank),
+            "mode": mode,
             "candidates": candidates,
-            "questions": total,
-            "recall_at_k": recall,
-            "mrr": round(mrr, 4),
-            "recall_in_candidate_pool": round(found_in_pool, 4),
+            **_rank_metrics(ranks, candidates),
         }
     finally:
         db.close()
 
 
+def _rank_metrics(ranks: list[int | None], candidates: int) -> dict:
+    total = len(ranks)
+    recall = {
+        k: sum(1 for r in ranks if r is not None and r <= k) / total
+        for k in RECALL_KS
+        if k <= candidates
+    }
+    mrr = sum((1.0 / r) for r in ranks if r is not None) / total
+    found_in_pool = sum(1 for r in ranks if r is not None) / total
+    return {
+        "questions": total,
+        "recall_at_k": recall,
+        "mrr": round(mrr, 4),
+        "recall_in_candidate_pool": round(found_in_pool, 4),
+    }
+
+
+def skip_margin_sweep(
+    *,
+    candidates: int,
+    k: int,
+    margins: list[float],
+    max_recall_loss: float,
+) -> dict:
+    """Recall and reranker calls saved at each RERANK_SKIP_MARGIN.
+
+    Each question is retrieved once and reranked once. At margin m, a
+    question whose dense_margin (rank 1 vs rank k) is >= m is scored on
+    its dense ranking, as the chat path would serve it, and the rest on
+    the reranked one. recall_cost is Recall@k lost against always
+    reranking. The recommended margin is the smallest one (most calls
+    saved) whose cost stays within `max_recall_loss`.
+    """
+    golden = [g for g in read_jsonl(GOLDEN_PATH) if g["type"] == "answerable"]
+    if not golden:
+        raise SystemExit("No answerable golden questions found.")
+    embedder = get_embedding_service()
+    reranker = build_rerank_backend()
+
+    db = SessionLocal()
+    try:
+        org_id = get_eval_user(db).organization_id
+        questions = []
+        for item in golden:
+            matches = similarity_search(
+                db=db,
+                organization_id=org_id,
+                query_embedding=embedder.embed_query(item["question"]),
+                limit=candidates,
+            )
+            order = reranker.rerank(
+                query=item["question"], passages=[m.content for m in matches]
+            )
+            questions.append(
+                (
+                    dense_margin(matches, k=k),
+                    _doc_rank([m.filename for m in matches], item["source"]),
+                    _doc_rank([matches[i].filename for i in order], item["source"]),
+                )
+            )
+    finally:
+        db.close()
+
+    observed = sorted(m for m, _, _ in questions if m is not None)
+    if not margins:
+        margins = sorted(
+            {round(_percentile(observed, p), 4) for p in range(10, 100, 10)}
+        )
+
+    def recall_at_k(ranks):
+        return sum(1 for r in ranks if r is not None and r <= k) / len(ranks)
+
+    always = recall_at_k([reranked for _, _, reranked in questions])
+    points = []
+    for margin in margins:
+        ranks, skipped = [], 0
+        for gap, dense, reranked in questions:
+            if gap is not None and gap >= margin:
+                ranks.append(dense)
+                skipped += 1
+            else:
+                ranks.append(reranked)
+        points.append(
+            {
+                "margin": margin,
+                "reranker_calls_saved": round(skipped / len(questions), 4),
+                "recall_cost": round(always - recall_at_k(ranks), 4),
+                **_rank_metrics(ranks, candidates),
+            }
+        )
+    within = [p for p in points if p["recall_cost"] <= max_recall_loss]
+    recommended = min(within, key=lambda p: p["margin"]) if within else None
+    return {
+        "k": k,
+        "candidates": candidates,
+        "max_recall_loss": max_recall_loss,
+        "always_rerank_recall_at_k": round(always, 4),
+        "never_rerank_recall_at_k": round(
+            recall_at_k([dense for _, dense, _ in questions]), 4
+        ),
+        "observed_margins": {
+            "p10": round(_percentile(observed, 10), 4),
+            "p50": round(_percentile(observed, 50), 4),
+            "p90": round(_percentile(observed, 90), 4),
+        },
+        "points": points,
+        "recommended_margin": recommended["margin"] if recommended else None,
+    }
+
+
+def _print_skip_margin_sweep(result: dict) -> None:
+    k = result["k"]
+    print(
+        f"  always rerank R@{k} = {result['always_rerank_recall_at_k']:.1%}, "
+        f"never = {result['never_rerank_recall_at_k']:.1%}; "
+        f"margins p10/p50/p90 = {result['observed_margins']}"
+    )
+    header = ["margin", "saved", f"R@{k} cost", "R@1", "MRR"]
+    print("\n" + "  ".join(f"{h:>9}" for h in header))
+    for p in result["points"]:
+        cells = [
+            p["margin"],
+            f"{p['reranker_calls_saved']:.1%}",
+            f"{p['recall_cost']:.1%}",
+            f"{p['recall_at_k'][1]:.1%}",
+            p["mrr"],
+        ]
+        print("  ".join(f"{c:>9}" for c in cells))
+    if result["recommended_margin"] is None:
+        print(f"\n  no margin keeps the R@{k} cost within the budget")
+    else:
+        print(f"\n  RERANK_SKIP_MARGIN={result['recommended_margin']}")
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) + 1)) - 1)
+    return ordered[max(idx, 0)]
+
+
+def sweep(
+    *,
+    candidates: int,
+    ef_searches: list[int],
+    builds: list[tuple[int, int]],
+    repeats: int,
+) -> list[dict]:
+    """Dense Recall@k and query latency for each (m, ef_construction,
+    ef_search) point.
+
+    For each build in `builds`, the eval org's HNSW index is dropped and
+    rebuilt with those parameters INSIDE a transaction that is rolled back
+    afterwards. Postgres DDL is transactional, so the real index is left
+    untouched. The rebuild holds an exclusive lock on document_embeddings
+    until then, so run it against the eval database, not production. With
+    no builds given, the existing index is measured as-is.
+
+    Every query is timed `repeats` times after one untimed warm-up, and
+    p50/p95 are taken over all timed runs. The timing covers the SET
+    LOCAL and the search round trips; embeddings are computed up front.
+    """
+    golden = [g for g in read_jsonl(GOLDEN_PATH) if g["type"] == "answerable"]
+    if not golden:
+        raise SystemExit("No answerable golden questions found.")
+    embedder = get_embedding_service()
+    embeddings = [embedder.embed_query(g["question"]) for g in golden]
+
+    db = SessionLocal()
+    points = []
+    try:
+        org_id = get_eval_user(db).organization_id
+        for build in builds or [None]:
+            build_seconds = None
+            if build is not None:
+                m, ef_construction = build
+                started = time.perf_counter()
+                db.execute(text(f"DROP INDEX IF EXISTS {tenant_index_name(org_id)}"))
+                db.execute(
+                    text(tenant_index_ddl(org_id, m=m, ef_construction=ef_construction))
+                )
+                build_seconds = round(time.perf_counter() - started, 2)
+            for ef_search in ef_searches:
+                ranks, latencies = [], []
+                for item, embedding in zip(golden, embeddings):
+                    for attempt in range(repeats + 1):
+                        started = time.perf_counter()
+                        matches = similarity_search(
+                            db=db,
+                            organization_id=org_id,
+                            query_embedding=embedding,
+                            limit=candidates,
+                            ef_search=ef_search,
+                        )
+                        if attempt:  # the first run only warms caches
+                            latencies.append(time.perf_counter() - started)
+                    ranks.append(
+                        _doc_rank([m.filename for m in matches], item["source"])
+                    )
+                points.append(
+                    {
+                        "m": build[0] if build else None,
+                        "ef_construction": build[1] if build else None,
+                        "build_seconds": build_seconds,
+                        # What actually ran: raised to the pool size.
+                        "ef_search": search_ef_search(
+                            limit=candidates, ef_search=ef_search
+                        ),
+                        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+                        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+                        **_rank_metrics(ranks, candidates),
+                    }
+                )
+            if build is not None:
+                db.rollback()  # the original index comes back untouched
+    finally:
+        db.rollback()
+        db.close()
+    return points
+
+
+def quantization_sweep(
+    *,
+    candidates: int,
+    quantizations: list[str],
+    repeats: int,
+) -> list[dict]:
+    """Dense retrieval with the eval org's index built in each form.
+
+    Like sweep(), each index is built inside a transaction that is rolled
+    back, so the same locking caveat applies. Exact top-`candidates` rows
+    (index scans off) are the baseline for overlap_with_exact, which is
+    the fraction of them each form still returns. Recall@k is the usual
+    golden-document metric. The pool is re-ranked at full precision in
+    the compact forms, as in production (QUANTIZED_CANDIDATES_FACTOR).
+    """
+    golden = [g for g in read_jsonl(GOLDEN_PATH) if g["type"] == "answerable"]
+    if not golden:
+        raise SystemExit("No answerable golden questions found.")
+    embedder = get_embedding_service()
+    embeddings = [embedder.embed_query(g["question"]) for g in golden]
+    set_config = text("SELECT set_config(:name, :value, true)")
+
+    db = SessionLocal()
+    points = []
+    try:
+        org_id = get_eval_user(db).organization_id
+        db.execute(set_config, {"name": "enable_indexscan", "value": "off"})
+        exact = [
+            {
+                r.id
+                for r in similarity_search(
+                    db=db,
+                    organization_id=org_id,
+                    query_embedding=embedding,
+                    limit=candidates,
+                    quantization="none",
+                )
+            }
+            for embedding in embeddings
+        ]
+        db.rollback()
+
+        for quantization in quantizations:
+            for form in QUANTIZATIONS:
+                name = tenant_index_name(org_id, form)
+                db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            started = time.perf_counter()
+            db.execute(text(tenant_index_ddl(org_id, quantization=quantization)))
+            build_seconds = round(time.perf_counter() - started, 2)
+            index_bytes = db.execute(
+                text("SELECT pg_relation_size(CAST(:name AS regclass))"),
+                {"name": tenant_index_name(org_id, quantization)},
+            ).scalar()
+
+            ranks, latencies, overlap = [], [], 0
+            for item, embedding, truth in zip(golden, embeddings, exact):
+                for attempt in range(repeats + 1):
+                    started = time.perf_counter()
+                    matches = similarity_search(
+                        db=db,
+                        organization_id=org_id,
+                        query_embedding=embedding,
+                        limit=candidates,
+                        quantization=quantization,
+                    )
+                    if attempt:  # the first run only warms caches
+                        latencies.append(time.perf_counter() - started)
+                overlap += len(truth & {m.id for m in matches})
+                ranks.append(_doc_rank([m.filename for m in matches], item["source"]))
+            points.append(
+                {
+                    "quantization": quantization,
+                    "index_mb": round(index_bytes / 2**20, 2),
+                    "build_seconds": build_seconds,
+                    "p50_ms": round(statistics.median(latencies) * 1000, 2),
+                    "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+                    "overlap_with_exact": round(
+                        overlap / max(sum(len(t) for t in exact), 1), 4
+                    ),
+                    **_rank_metrics(ranks, candidates),
+                }
+            )
+            db.rollback()  # the original index comes back untouched
+    finally:
+        db.rollback()
+        db.close()
+    return points
+
+
+def _print_quantization_sweep(points: list[dict]) -> None:
+    ks = list(points[0]["recall_at_k"])
+    header = ["form", "index MB", "p50 ms", "p95 ms", "vs exact"]
+    header += [f"R@{k}" for k in ks]
+    print("\n" + "  ".join(f"{h:>9}" for h in header))
+    for p in points:
+        cells = [
+            p["quantization"],
+            p["index_mb"],
+            p["p50_ms"],
+            p["p95_ms"],
+            f"{p['overlap_with_exact']:.1%}",
+            *(f"{p['recall_at_k'][k]:.1%}" for k in ks),
+        ]
+        print("  ".join(f"{c:>9}" for c in cells))
+
+
+def _print_sweep(points: list[dict]) -> None:
+    ks = list(points[0]["recall_at_k"])
+    header = ["m", "ef_constr", "ef_search", "p50 ms", "p95 ms"]
+    header += [f"R@{k}" for k in ks]
+    print("\n" + "  ".join(f"{h:>9}" for h in header))
+    for p in points:
+        cells = [
+            p["m"] or "-",
+            p["ef_construction"] or "-",
+            p["ef_search"],
+            p["p50_ms"],
+            p["p95_ms"],
+            *(f"{p['recall_at_k'][k]:.1%}" for k in ks),
+        ]
+        print("  ".join(f"{c:>9}" for c in cells))
+
+
+def _plot_sweep(points: list[dict], out: Path) -> Path | None:
+    """Recall@k (k = the pool size) against p50 and p95 latency, one line
+    per index build. matplotlib is optional; None if it is missing."""
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return None
+
+    k = max(points[0]["recall_at_k"])
+    fig, axes = plt.subplots(1, 2, figsize=(11, 4), sharey=True)
+    builds = sorted({(p["m"], p["ef_construction"]) for p in points}, key=str)
+    for ax, metric in zip(axes, ("p50_ms", "p95_ms")):
+        for m, ef_construction in builds:
+            series = [
+                p
+                for p in points
+                if (p["m"], p["ef_construction"]) == (m, ef_construction)
+            ]
+            label = f"m={m}, ef_c={ef_construction}" if m else "current index"
+            ax.plot(
+                [p[metric] for p in series],
+                [p["recall_at_k"][k] for p in series],
+                marker="o",
+                label=label,
+            )
+            for p in series:
+                ax.annotate(
+                    str(p["ef_search"]),
+                    (p[metric], p["recall_at_k"][k]),
+                    fontsize=7,
+                )
+        ax.set_xlabel(f"{metric.split('_')[0]} latency (ms)")
+        ax.grid(alpha=0.3)
+    axes[0].set_ylabel(f"Recall@{k}")
+    axes[1].legend(fontsize=8)
+    fig.suptitle("HNSW sweep: Recall@k vs query latency (labels: ef_search)")
+    fig.tight_layout()
+    fig.savefig(out, dpi=120)
+    return out
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _build_list(value: str) -> list[tuple[int, int]]:
+    """'16:64,32:128' -> [(16, 64), (32, 128)]"""
+    builds = []
+    for pair in value.split(","):
+        m, ef_construction = pair.split(":")
+        builds.append((int(m), int(ef_construction)))
+    return builds
+
+
+def _float_list(value: str) -> list[float]:
+    return [float(v) for v in value.split(",") if v]
+
+
+def _quantization_list(value: str) -> list[str]:
+    forms = [v for v in value.split(",") if v]
+    unknown = set(forms) - set(QUANTIZATIONS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown form(s): {', '.join(unknown)}")
+    return forms
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--candidates", type=int, default=20)
     parser.add_argument("--hybrid", action="store_true")
     parser.add_argument("--rerank", action="store_true")
+    parser.add_argument(
+        "--sweep-ef-search",
+        type=_int_list,
+        metavar="EF,EF,...",
+        help="dense Recall@k vs latency at each hnsw.ef_search",
+    )
+    parser.add_argument(
+        "--sweep-build",
+        type=_build_list,
+        default=[],
+        metavar="M:EFC,...",
+        help="also rebuild the index (rolled back) per m:ef_construction",
+    )
+    parser.add_argument(
+        "--sweep-quantization",
+        type=_quantization_list,
+        metavar="FORM,FORM,...",
+        help=f"dense retrieval per index form ({', '.join(QUANTIZATIONS)})",
+    )
+    parser.add_argument(
+        "--snapshot",
+        nargs="?",
+        const=settings.VECTOR_SNAPSHOT_DIR or "",
+        metavar="DIR",
+        help="dense retrieval from the embedding snapshot in DIR "
+        "(default VECTOR_SNAPSHOT_DIR)",
+    )
+    parser.add_argument(
+        "--sweep-skip-margin",
+        type=_float_list,
+        nargs="?",
+        const=[],
+        metavar="M,M,...",
+        help="calibrate RERANK_SKIP_MARGIN (needs --rerank; default: deciles)",
+    )
+    parser.add_argument("--k", type=int, default=settings.DEFAULT_TOP_K)
+    parser.add_argument(
+        "--max-recall-loss",
+        type=float,
+        default=0.0,
+        help="Recall@k a skipped rerank may cost, for the recommended margin",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
     args = parser.parse_args()
+    if args.snapshot == "":
+        parser.error("--snapshot needs DIR when VECTOR_SNAPSHOT_DIR is unset")
+    if args.snapshot and args.hybrid:
+        parser.error("--snapshot serves the dense arm only; drop --hybrid")
+
+    if args.sweep_skip_margin is not None:
+        if not args.rerank or args.hybrid or args.snapshot:
+            parser.error("--sweep-skip-margin calibrates dense --rerank only")
+        return _run_skip_margin_sweep(args)
+    if args.sweep_quantization:
+        return _run_quantization_sweep(args)
+    if args.sweep_ef_search or args.sweep_build:
+        return _run_sweep(args)
 
     result = evaluate(
         candidates=args.candidates,
         use_hybrid=args.hybrid,
         use_rerank=args.rerank,
+        snapshots=SnapshotSource(args.snapshot) if args.snapshot else None,
     )
 
     print(
@@ -165,5 +691,75 @@ def main() -> int:
     return 0
 
 
+def _run_sweep(args) -> int:
+    import json
+
+    points = sweep(
+        candidates=args.candidates,
+        ef_searches=args.sweep_ef_search or [DEFAULT_EF_SEARCH],
+        builds=args.sweep_build,
+        repeats=args.repeats,
+    )
+    print(
+        f"\nHNSW sweep — dense (pool={args.candidates}, "
+        f"n={points[0]['questions']}, repeats={args.repeats})"
+    )
+    _print_sweep(points)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out = RESULTS_DIR / "retrieval_hnsw_sweep.json"
+    out.write_text(json.dumps(points, indent=2), encoding="utf-8")
+    print(f"  saved -> {out}")
+    chart = _plot_sweep(points, RESULTS_DIR / "retrieval_hnsw_sweep.png")
+    if chart is not None:
+        print(f"  chart -> {chart}")
+    else:
+        print("  (install matplotlib for the recall/latency chart)")
+    return 0
+
+
+def _run_quantization_sweep(args) -> int:
+    import json
+
+    points = quantization_sweep(
+        candidates=args.candidates,
+        quantizations=args.sweep_quantization,
+        repeats=args.repeats,
+    )
+    print(
+        f"\nIndex quantization — dense (pool={args.candidates}, "
+        f"n={points[0]['questions']}, repeats={args.repeats})"
+    )
+    _print_quantization_sweep(points)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out = RESULTS_DIR / "retrieval_quantization.json"
+    out.write_text(json.dumps(points, indent=2), encoding="utf-8")
+    print(f"  saved -> {out}")
+    return 0
+
+
+def _run_skip_margin_sweep(args) -> int:
+    import json
+
+    result = skip_margin_sweep(
+        candidates=args.candidates,
+        k=args.k,
+        margins=args.sweep_skip_margin,
+        max_recall_loss=args.max_recall_loss,
+    )
+    print(
+        f"\nAdaptive rerank — dense+rerank (pool={args.candidates}, "
+        f"k={args.k}, n={result['points'][0]['questions']})"
+    )
+    _print_skip_margin_sweep(result)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out = RESULTS_DIR / "retrieval_rerank_skip.json"
+    out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"  saved -> {out}")
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -7,6 +7,7 @@ import {
   signup,
   streamChat,
   uploadPdf,
+  waitForIngestion,
 } from "./api.js";
 
 export default function App() {
@@ -122,8 +123,14 @@ function Chat({ onLogout }) {
     if (!file) return;
     setNotice(`Uploading ${file.name}…`);
     try {
-      const result = await uploadPdf(file);
-      setNotice(`Ingested ${result.filename} (${result.chunks_stored} chunks)`);
+      const accepted = await uploadPdf(file);
+      const job = await waitForIngestion(accepted.job_id, (status) =>
+        setNotice(
+          `${status.stage === "embedding" ? "Embedding" : "Processing"} ` +
+            `${accepted.filename}… (${status.chunks_done} chunks)`,
+        ),
+      );
+      setNotice(`Ingested ${job.filename} (${job.chunks_done} chunks)`);
       refreshDocuments();
     } catch (err) {
       setNotice(err.message);
@@ -100,9 +100,28 @@ export async function uploadPdf(file) {
     body: form,
   });
   if (!res.ok) throw new Error((await res.json()).detail || "Upload failed");
+  return res.json(); // 202 {job_id, filename, stage}: ingestion runs in a worker
+}
+
+export async function fetchIngestionJob(jobId) {
+  const res = await apiFetch(`/documents/jobs/${jobId}`);
+  if (!res.ok) throw new Error("Could not load ingestion status");
   return res.json();
 }
 
+// Polls an ingestion job until the worker finishes it; calls onUpdate
+// with each intermediate status. Resolves with the final job, or throws
+// with the worker's error message if ingestion failed.
+export async function waitForIngestion(jobId, onUpdate, intervalMs = 1000) {
+  while (true) {
+    const job = await fetchIngestionJob(jobId);
+    if (job.stage === "done") return job;
+    if (job.stage === "failed") throw new Error(job.error || "Ingestion failed");
+    onUpdate?.(job);
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 // Yields {event, data} objects parsed from the SSE stream:
 // several {event: "token", data: {text}} then {event: "done",
 // data: {sources, confidence}}.
@@ -0,0 +1,61 @@
+"""Export document_embeddings as a memory-mapped snapshot and publish it.
+
+Writes a new snapshot directory under --dir (VECTOR_SNAPSHOT_DIR by
+default) and points CURRENT at it (app/infrastructure/vector_index/
+snapshot.py). Running processes pick it up the next time one of their
+orgs' corpus generation has moved past the snapshot they hold. Run it on
+a schedule (cron), or after a bulk ingest; reads and writes continue
+while it runs.
+
+Older snapshots beyond --keep are deleted. A process still mapping one
+keeps its pages until it reopens, so deleting is safe.
+
+Usage:
+    python scripts/export_vector_snapshot.py
+    python scripts/export_vector_snapshot.py --dir /var/lib/rag/vector-snapshots --keep 2
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.infrastructure.vector_index.snapshot import (  # noqa: E402
+    VectorSnapshot,
+    export_snapshot,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", default=settings.VECTOR_SNAPSHOT_DIR)
+    parser.add_argument(
+        "--keep", type=int, default=2, help="snapshots to keep, newest first"
+    )
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("--dir is required when VECTOR_SNAPSHOT_DIR is unset")
+
+    started = time.perf_counter()
+    path = export_snapshot(engine, args.dir)
+    snapshot = VectorSnapshot(path)
+    size_mb = sum(f.stat().st_size for f in path.iterdir()) / 2**20
+    print(
+        f"published {snapshot.name}: {snapshot.rows} rows, {size_mb:.1f} MB "
+        f"({time.perf_counter() - started:.1f}s)"
+    )
+
+    snapshots = sorted(Path(args.dir).glob("snapshot-*"), reverse=True)
+    for old in snapshots[max(args.keep, 1) :]:
+        shutil.rmtree(old)
+        print(f"deleted {old.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
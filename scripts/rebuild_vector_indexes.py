@@ -0,0 +1,74 @@
+"""Build every large org's HNSW index in a given quantization form.
+
+This is the online way to change VECTOR_INDEX_QUANTIZATION, with no
+downtime:
+
+  1. python scripts/rebuild_vector_indexes.py --quantization halfvec
+     builds the halfvec index beside each existing one (CONCURRENTLY;
+     reads and writes continue). The running app keeps using the old
+     form.
+  2. Set VECTOR_INDEX_QUANTIZATION=halfvec and restart the app and the
+     workers. Queries now order by the halfvec distance.
+  3. python scripts/rebuild_vector_indexes.py --quantization halfvec --drop-stale
+     drops the old form's indexes and frees their memory.
+
+Orgs below TENANT_VECTOR_INDEX_MIN_CHUNKS are skipped. They are searched
+exactly in every mode. Safe to rerun: finished indexes are skipped, and
+invalid leftovers are rebuilt.
+
+Usage:
+    python scripts/rebuild_vector_indexes.py --quantization binary
+    python scripts/rebuild_vector_indexes.py --quantization binary --drop-stale
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.db.hnsw import QUANTIZATIONS  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.db.tenant_vector_index import (  # noqa: E402
+    ensure_tenant_vector_index,
+    orgs_needing_vector_index,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--quantization",
+        choices=QUANTIZATIONS,
+        default=settings.VECTOR_INDEX_QUANTIZATION,
+    )
+    parser.add_argument(
+        "--drop-stale",
+        action="store_true",
+        help="drop each org's indexes in other forms once this one exists",
+    )
+    args = parser.parse_args()
+
+    min_chunks = settings.TENANT_VECTOR_INDEX_MIN_CHUNKS
+    with engine.connect() as conn:
+        orgs = orgs_needing_vector_index(conn, min_chunks=min_chunks)
+    print(f"{len(orgs)} orgs with >= {min_chunks} chunks")
+
+    for org_id in orgs:
+        started = time.perf_counter()
+        built = ensure_tenant_vector_index(
+            engine,
+            organization_id=org_id,
+            min_chunks=min_chunks,
+            quantization=args.quantization,
+            drop_stale=args.drop_stale,
+        )
+        status = "built" if built else "unchanged"
+        print(f"org {org_id}: {status} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Semantic answer cache: the cache's matching/eviction rules, and its
+wiring into the RAG use case (a hit must skip retrieval AND the LLM)."""
+
+import pytest
+
+import app.use_cases.chat_with_kb as chat_module
+from app.db.models.user import User
+from app.domain.answer_cache import CachedAnswer
+from app.domain.llm_service import GroundedAnswer
+from app.infrastructure.cache.semantic_answer_cache import SemanticAnswerCache
+from app.use_cases.chat_with_kb import ChatWithKnowledgeBaseUseCase
+
+SCOPE = (5, ())
+ANSWER = CachedAnswer(answer="cached", confidence="high", sources=("a.pdf",))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(clock=None, **overrides):
+    kwargs = dict(similarity_threshold=0.95, ttl_seconds=60, max_entries_per_org=2)
+    kwargs.update(overrides)
+    return SemanticAnswerCache(clock=clock or FakeClock(), **kwargs)
+
+
+def lookup(cache, vector, *, org=1, scope=SCOPE, generation=0):
+    return cache.lookup(
+        organization_id=org, query_embedding=vector, scope=scope, generation=generation
+    )
+
+
+def store(cache, vector, *, org=1, scope=SCOPE, generation=0, answer=ANSWER):
+    cache.store(
+        organization_id=org,
+        query_embedding=vector,
+        scope=scope,
+        generation=generation,
+        answer=answer,
+    )
+
+
+def test_near_duplicate_hits_and_dissimilar_misses():
+    cache = make_cache()
+    store(cache, [1.0, 0.0, 0.0])
+
+    assert lookup(cache, [0.99, 0.05, 0.0]) == ANSWER  # cosine ~0.999
+    assert lookup(cache, [0.0, 1.0, 0.0]) is None  # orthogonal question
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entries_are_isolated_per_org_and_scope():
+    cache = make_cache()
+    store(cache, [1.0, 0.0])
+
+    assert lookup(cache, [1.0, 0.0], org=2) is None
+    assert lookup(cache, [1.0, 0.0], scope=(5, (3,))) is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = make_cache(clock=clock)
+    store(cache, [1.0, 0.0])
+
+    clock.now = 61
+    assert lookup(cache, [1.0, 0.0]) is None
+
+
+def test_lru_evicts_least_recently_used():
+    cache = make_cache(max_entries_per_org=2)
+    a = CachedAnswer(answer="a", confidence="high", sources=())
+    b = CachedAnswer(answer="b", confidence="high", sources=())
+    c = CachedAnswer(answer="c", confidence="high", sources=())
+    store(cache, [1.0, 0.0, 0.0], answer=a)
+    store(cache, [0.0, 1.0, 0.0], answer=b)
+    assert lookup(cache, [1.0, 0.0, 0.0]) == a  # a is now most recent
+
+    store(cache, [0.0, 0.0, 1.0], answer=c)  # over capacity: b goes
+
+    assert lookup(cache, [0.0, 1.0, 0.0]) is None
+    assert lookup(cache, [1.0, 0.0, 0.0]) == a
+
+
+def test_newer_corpus_generation_invalidates_the_org():
+    cache = make_cache()
+    store(cache, [1.0, 0.0], generation=3)
+
+    assert lookup(cache, [1.0, 0.0], generation=4) is None
+    # and an answer computed against the old corpus is not stored back
+    store(cache, [1.0, 0.0], generation=3)
+    assert lookup(cache, [1.0, 0.0], generation=4) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+# --- wiring into ChatWithKnowledgeBaseUseCase -------------------------------
+
+
+class Row:
+    content = "About Acme."
+    filename = "company.pdf"
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_grounded_answer(self, *, question, context):
+        self.calls += 1
+        return GroundedAnswer(answer="Acme makes SaaS.", confidence="high")
+
+
+class FakeEmbeddingService:
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+class FakeChatHistory:
+    def __init__(self):
+        self.saved = []
+
+    async def get_recent_history(self, *, user_id):
+        return []
+
+    async def save_message(self, *, user_id, organization_id, role, message):
+        self.saved.append((role, message))
+
+
+@pytest.fixture()
+def searches(monkeypatch):
+    calls = []
+
+    async def fake_search(**kwargs):
+        calls.append(kwargs)
+        return [Row()]
+
+    async def fake_generation(db, **kwargs):
+        return 0
+
+    monkeypatch.setattr(chat_module, "async_similarity_search", fake_search)
+    monkeypatch.setattr(chat_module, "async_get_corpus_generation", fake_generation)
+    return calls
+
+
+def make_user(user_id=1):
+    return User(id=user_id, email="e", hashed_password="x", organization_id=1)
+
+
+@pytest.mark.anyio
+async def test_repeat_question_is_served_from_cache(searches):
+    llm, history = CountingLLM(), FakeChatHistory()
+    uc = ChatWithKnowledgeBaseUseCase(
+        embedding_service=FakeEmbeddingService(),
+        llm_service=llm,
+        chat_history=history,
+        db=None,
+        answer_cache=make_cache(),
+    )
+
+    first = await uc.execute(question="what is acme?", user=make_user())
+    second = await uc.execute(question="what is acme?", user=make_user())
+
+    assert llm.calls == 1 and len(searches) == 1  # no retrieval, no LLM
+    assert second["answer"] == first["answer"]
+    assert second["sources"] == ["company.pdf"]
+    # the cached exchange is still part of the user's conversation
+    assert history.saved[-2:] == [
+        ("user", "what is acme?"),
+        ("assistant", "Acme makes SaaS."),
+    ]
+
+
+@pytest.mark.anyio
+async def test_stream_replays_a_cached_answer(searches):
+    llm = CountingLLM()
+    uc = ChatWithKnowledgeBaseUseCase(
+        embedding_service=FakeEmbeddingService(),
+        llm_service=llm,
+        chat_history=FakeChatHistory(),
+        db=None,
+        answer_cache=make_cache(),
+    )
+    await uc.execute(question="what is acme?", user=make_user())
+
+    events = [
+        event
+        async for event in uc.execute_stream(question="what is acme?", user=make_user())
+    ]
+
+    assert events == [
+        ("token", {"text": "Acme makes SaaS."}),
+        ("done", {"sources": ["company.pdf"], "confidence": "high"}),
+    ]
+    assert llm.calls == 1
+
+
+@pytest.mark.anyio
+async def test_answers_are_not_shared_between_users_of_one_org(searches):
+    # Each answer was written with its asker's history and summary.
+    llm = CountingLLM()
+    uc = ChatWithKnowledgeBaseUseCase(
+        embedding_service=FakeEmbeddingService(),
+        llm_service=llm,
+        chat_history=FakeChatHistory(),
+        db=None,
+        answer_cache=make_cache(),
+    )
+
+    await uc.execute(question="what is acme?", user=make_user(1))
+    await uc.execute(question="what is acme?", user=make_user(2))
+
+    assert llm.calls == 2 and len(searches) == 2
@@ -1,3 +1,5 @@
+import pytest
+
 import app.use_cases.chat_with_kb as chat_module
 from app.use_cases.chat_with_kb import ChatWithKnowledgeBaseUseCase
 from app.db.models.user import User
@@ -11,7 +13,7 @@ class FakeEmbeddingService:
 
 
 class FakeStreamingLLMService:
-    def stream_grounded_answer(self, *, question: str, context: str):
+    async def stream_grounded_answer(self, *, question: str, context: str):
         # tiny fragments on purpose: the CONFIDENCE marker must survive
         # being split across chunk boundaries
         full = f"{ANSWER}\nCONFIDENCE: MEDIUM"
@@ -23,10 +25,10 @@ class FakeChatHistoryRepository:
     def __init__(self):
         self.saved = []
 
-    def get_recent_history(self, *, user_id: int):
+    async def get_recent_history(self, *, user_id: int):
         return []
 
-    def save_message(self, *, user_id, organization_id, role, message):
+    async def save_message(self, *, user_id, organization_id, role, message):
         self.saved.append((role, message))
 
 
@@ -39,16 +41,20 @@ class FakeSummaryRepo:
     def __init__(self, summary=None):
         self.summary = summary
 
-    def get_summary(self, *, user_id: int):
+    async def get_summary(self, *, user_id: int):
         return self.summary
 
 
+async def fake_similarity_search(**kwargs):
+    return [FakeRetrievalResult()]
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
 def make_use_case(monkeypatch, **overrides):
-    monkeypatch.setattr(
-        chat_module,
-        "similarity_search",
-        lambda **kwargs: [FakeRetrievalResult()],
-    )
+    monkeypatch.setattr(chat_module, "async_similarity_search", fake_similarity_search)
     defaults = dict(
         embedding_service=FakeEmbeddingService(),
         llm_service=FakeStreamingLLMService(),
@@ -69,11 +75,14 @@ def make_user():
     )
 
 
-def test_stream_emits_answer_without_confidence_marker(monkeypatch):
+@pytest.mark.anyio
+async def test_stream_emits_answer_without_confidence_marker(monkeypatch):
     history = FakeChatHistoryRepository()
     use_case = make_use_case(monkeypatch, chat_history=history)
 
-    events = list(use_case.execute_stream(question="about acme", user=make_user()))
+    events = await collect(
+        use_case.execute_stream(question="about acme", user=make_user())
+    )
 
     tokens = "".join(d["text"] for e, d in events if e == "token")
     assert tokens.strip() == ANSWER
@@ -90,7 +99,8 @@ def test_stream_emits_answer_without_confidence_marker(monkeypatch):
     ]
 
 
-def test_stream_schedules_summary_update(monkeypatch):
+@pytest.mark.anyio
+async def test_stream_schedules_summary_update(monkeypatch):
     scheduled = []
     use_case = make_use_case(
         monkeypatch,
@@ -99,30 +109,35 @@ def test_stream_schedules_summary_update(monkeypatch):
         ),
     )
 
-    list(use_case.execute_stream(question="about acme", user=make_user()))
+    await collect(use_case.execute_stream(question="about acme", user=make_user()))
 
     assert scheduled == [(1, 1)]
 
 
-def test_stream_survives_broken_summary_scheduler(monkeypatch):
+@pytest.mark.anyio
+async def test_stream_survives_broken_summary_scheduler(monkeypatch):
     def boom(user_id, org_id):
         raise ConnectionError("broker down")
 
     use_case = make_use_case(monkeypatch, schedule_summary_update=boom)
 
-    events = list(use_case.execute_stream(question="about acme", user=make_user()))
+    events = await collect(
+        use_case.execute_stream(question="about acme", user=make_user())
+    )
     assert events[-1][0] == "done"  # answer still completed
 
 
-def test_summary_injected_into_context(monkeypatch):
+@pytest.mark.anyio
+async def test_summary_injected_into_context(monkeypatch):
     captured = {}
 
     class CapturingLLM(FakeStreamingLLMService):
-        def stream_grounded_answer(self, *, question, context):
+        async def stream_grounded_answer(self, *, question, context):
             captured["context"] = context
-            yield from super().stream_grounded_answer(
+            async for fragment in super().stream_grounded_answer(
                 question=question, context=context
-            )
+            ):
+                yield fragment
 
     use_case = make_use_case(
         monkeypatch,
@@ -130,26 +145,28 @@ def test_summary_injected_into_context(monkeypatch):
         summary_repo=FakeSummaryRepo("User is evaluating Acme for a 50-seat team."),
     )
 
-    list(use_case.execute_stream(question="about acme", user=make_user()))
+    await collect(use_case.execute_stream(question="about acme", user=make_user()))
 
     assert "Important facts from earlier conversation:" in captured["context"]
     assert "50-seat team" in captured["context"]
 
 
-def test_no_summary_block_when_repo_empty(monkeypatch):
+@pytest.mark.anyio
+async def test_no_summary_block_when_repo_empty(monkeypatch):
     captured = {}
 
     class CapturingLLM(FakeStreamingLLMService):
-        def stream_grounded_answer(self, *, question, context):
+        async def stream_grounded_answer(self, *, question, context):
             captured["context"] = context
-            yield from super().stream_grounded_answer(
+            async for fragment in super().stream_grounded_answer(
                 question=question, context=context
-            )
+            ):
+                yield fragment
 
     use_case = make_use_case(
         monkeypatch, llm_service=CapturingLLM(), summary_repo=FakeSummaryRepo(None)
     )
 
-    list(use_case.execute_stream(question="about acme", user=make_user()))
+    await collect(use_case.execute_stream(question="about acme", user=make_user()))
 
     assert "Important facts" not in captured["context"]
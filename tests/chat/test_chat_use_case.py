@@ -1,3 +1,5 @@
+import pytest
+
 from app.domain.llm_service import GroundedAnswer
 from app.use_cases.chat_with_kb import ChatWithKnowledgeBaseUseCase
 from app.db.models.user import User
@@ -9,10 +11,7 @@ class FakeEmbeddingService:
 
 
 class FakeLLMService:
-    def generate_answer(self, *, question: str, context: str) -> str:
-        return "Acme Corp is a software company providing SaaS products."
-
-    def generate_grounded_answer(
+    async def generate_grounded_answer(
         self, *, question: str, context: str
     ) -> GroundedAnswer:
         return GroundedAnswer(
@@ -25,10 +24,10 @@ class FakeChatHistoryRepository:
     def __init__(self):
         self.saved = []
 
-    def get_recent_history(self, *, user_id: int):
+    async def get_recent_history(self, *, user_id: int):
         return []
 
-    def save_message(self, *, user_id, organization_id, role, message):
+    async def save_message(self, *, user_id, organization_id, role, message):
         self.saved.append((role, message))
 
 
@@ -38,7 +37,7 @@ class FakeRetrievalResult:
         self.filename = filename
 
 
-def fake_similarity_search(
+async def fake_similarity_search(
     *, db, organization_id, query_embedding, limit, document_ids=None
 ):
     return [
@@ -49,9 +48,10 @@ def fake_similarity_search(
     ]
 
 
-def test_chat_returns_company_description(monkeypatch):
+@pytest.mark.anyio
+async def test_chat_returns_company_description(monkeypatch):
     monkeypatch.setattr(
-        "app.use_cases.chat_with_kb.similarity_search",
+        "app.use_cases.chat_with_kb.async_similarity_search",
         fake_similarity_search,
     )
 
@@ -70,8 +70,46 @@ def test_chat_returns_company_description(monkeypatch):
         db=None,
     )
 
-    result = use_case.execute(question="about", user=user)
+    result = await use_case.execute(question="about", user=user)
 
     assert "Acme Corp" in result["answer"]
     assert result["sources"] == ["company.pdf"]
     assert result["confidence"] == "high"
+
+
+class FakeDenseRetriever:
+    def __init__(self):
+        self.calls = []
+
+    async def search(self, db, *, organization_id, query_embedding, limit, **kw):
+        self.calls.append((organization_id, limit))
+        return await fake_similarity_search(
+            db=db,
+            organization_id=organization_id,
+            query_embedding=query_embedding,
+            limit=limit,
+        )
+
+
+@pytest.mark.anyio
+async def test_wired_dense_retriever_replaces_pgvector(monkeypatch):
+    async def pgvector_must_not_run(**kwargs):
+        raise AssertionError("searched Postgres despite a dense retriever")
+
+    monkeypatch.setattr(
+        "app.use_cases.chat_with_kb.async_similarity_search", pgvector_must_not_run
+    )
+    retriever = FakeDenseRetriever()
+    use_case = ChatWithKnowledgeBaseUseCase(
+        embedding_service=FakeEmbeddingService(),
+        llm_service=FakeLLMService(),
+        chat_history=FakeChatHistoryRepository(),
+        db=None,
+        dense_retriever=retriever,
+    )
+    user = User(id=1, email="t@acme.com", hashed_password="x", organization_id=7)
+
+    result = await use_case.execute(question="about", user=user, top_k=3)
+
+    assert retriever.calls == [(7, 3)]
+    assert result["sources"] == ["company.pdf"]
@@ -0,0 +1,162 @@
+"""Concurrent hybrid arms: the keyword query is in flight before the
+question is embedded, the two arms overlap on separate sessions, and
+each arm's timing is recorded.
+
+The search functions are patched with fakes that rendezvous across
+threads — if the arms ran one after the other, the barrier would time
+out instead of passing.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.infrastructure.db.concurrent_hybrid_retriever as retriever_module
+from app.core.config import settings
+from app.db.models.user import User
+from app.infrastructure.db.concurrent_hybrid_retriever import (
+    ConcurrentHybridRetriever,
+)
+from app.services.embedding_service import reciprocal_rank_fusion
+from app.use_cases.chat_with_kb import ChatWithKnowledgeBaseUseCase
+
+
+def row(cid):
+    return SimpleNamespace(id=cid, content=f"c{cid}", filename=f"{cid}.pdf")
+
+
+DENSE = [row(1), row(2)]
+LEXICAL = [row(9), row(1)]
+
+
+class Sessions:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        session = SimpleNamespace(closed=False)
+        session.close = lambda: setattr(session, "closed", True)
+        self.opened.append(session)
+        return session
+
+
+@pytest.fixture()
+def arms(monkeypatch):
+    """Both arms must be running at once to get past the barrier."""
+    both_running = threading.Barrier(2, timeout=5)
+    lexical_started = threading.Event()
+    seen = {}
+
+    def fake_lexical(db, *, organization_id, query_text, limit, document_ids):
+        lexical_started.set()
+        seen["lexical"] = (db, query_text, limit)
+        both_running.wait()
+        return LEXICAL
+
+    def fake_dense(db, *, organization_id, query_embedding, limit, document_ids):
+        seen["dense"] = (db, query_embedding, limit)
+        both_running.wait()
+        return DENSE
+
+    monkeypatch.setattr(retriever_module, "lexical_search", fake_lexical)
+    monkeypatch.setattr(retriever_module, "similarity_search", fake_dense)
+    return SimpleNamespace(lexical_started=lexical_started, seen=seen)
+
+
+def test_arms_overlap_on_separate_sessions_and_fuse(arms):
+    sessions = Sessions()
+    retriever = ConcurrentHybridRetriever(sessions)
+    query = np.ones(3, dtype=np.float32)
+
+    def embed():
+        # The keyword arm was submitted before the encoder ran.
+        assert arms.lexical_started.wait(timeout=5)
+        return query
+
+    fused = retriever.retrieve(
+        organization_id=1, query_text="krona", embed=embed, limit=20
+    )
+
+    assert [r.id for r in fused] == [
+        r.id for r in reciprocal_rank_fusion(DENSE, LEXICAL, limit=20)
+    ]
+    assert arms.seen["dense"][1] is query
+    assert arms.seen["lexical"][0] is not arms.seen["dense"][0]
+    assert len(sessions.opened) == 2
+    assert all(s.closed for s in sessions.opened)  # connections returned
+
+
+def test_per_arm_timings_are_recorded(arms):
+    retriever = ConcurrentHybridRetriever(Sessions())
+    retriever.retrieve(
+        organization_id=1,
+        query_text="krona",
+        embed=lambda: np.zeros(3, dtype=np.float32),
+        limit=5,
+    )
+
+    stats = retriever.stats()
+    assert set(stats) == {"embed", "dense", "lexical", "total"}
+    assert all(s["count"] == 1 for s in stats.values())
+
+
+def test_embedding_failure_propagates_and_releases_sessions(monkeypatch):
+    monkeypatch.setattr(retriever_module, "lexical_search", lambda db, **kw: LEXICAL)
+    sessions = Sessions()
+    retriever = ConcurrentHybridRetriever(sessions)
+
+    def broken_embed():
+        raise RuntimeError("encoder down")
+
+    with pytest.raises(RuntimeError):
+        retriever.retrieve(
+            organization_id=1, query_text="q", embed=broken_embed, limit=5
+        )
+    retriever._executor.shutdown(wait=True)
+    assert all(s.closed for s in sessions.opened)
+
+
+class RecordingRetriever:
+    def __init__(self):
+        self.calls = []
+
+    def retrieve(self, *, organization_id, query_text, embed, limit, document_ids):
+        self.calls.append((organization_id, query_text, limit))
+        embed()
+        return [row(3)]
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return np.zeros(3, dtype=np.float32)
+
+
+@pytest.mark.anyio
+async def test_use_case_routes_hybrid_through_the_retriever(monkeypatch):
+    monkeypatch.setattr(settings, "RERANK_CANDIDATES", 20)
+    monkeypatch.setattr(
+        "app.use_cases.chat_with_kb.async_hybrid_search",
+        lambda **kw: pytest.fail("fused statement used"),
+    )
+    retriever, embedder = RecordingRetriever(), CountingEmbedder()
+    uc = ChatWithKnowledgeBaseUseCase(
+        embedding_service=embedder,
+        llm_service=object(),
+        chat_history=object(),
+        db=None,
+        use_hybrid=True,
+        hybrid_retriever=retriever,
+    )
+    user = User(id=1, email="e", hashed_password="x", organization_id=4)
+
+    result = await uc._retrieve(question="krona", user=user, top_k=5, document_ids=None)
+
+    assert [r.id for r in result] == [3]
+    assert retriever.calls == [(4, "krona", 20)]
+    assert embedder.calls == 1  # embedded once, inside the retriever's call
@@ -1,9 +1,21 @@
 """Unit tests for the hybrid-retrieval building blocks: the RRF fusion
-math and the injection-safe tsquery construction in lexical_search."""
+math, the injection-safe tsquery construction in lexical_search, and the
+single-statement hybrid_search (and its async twin)."""
 
 from types import SimpleNamespace
 
-from app.services.embedding_service import lexical_search, reciprocal_rank_fusion
+import numpy as np
+import pytest
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects import postgresql
+
+from app.services.embedding_service import (
+    RRF_K,
+    async_hybrid_search,
+    hybrid_search,
+    lexical_search,
+    reciprocal_rank_fusion,
+)
 
 
 def row(cid):
@@ -66,3 +78,94 @@ def test_lexical_search_empty_query_returns_empty_without_db():
             raise AssertionError("must not query on an empty tsquery")
 
     assert lexical_search(Boom(), organization_id=1, query_text="!!! ??? ...") == []
+
+
+class _CompilingDB:
+    """Records every statement, compiled for psycopg2, and its params."""
+
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params):
+        dialect = postgresql.psycopg2.dialect()
+        self.calls.append((sql.compile(dialect=dialect), str(sql), params))
+
+        class _Result:
+            def fetchall(self_inner):
+                return []
+
+        return _Result()
+
+
+QUERY = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+
+
+def test_hybrid_search_is_one_statement_with_both_arms_org_scoped():
+    db = _CompilingDB()
+    hybrid_search(
+        db,
+        organization_id=7,
+        query_embedding=QUERY,
+        query_text="Krona exchange rate",
+        limit=5,
+        candidates=20,
+    )
+
+    assert len(db.calls) == 1  # one round-trip
+    compiled, sql, params = db.calls[0]
+    # Tenant isolation holds in BOTH candidate arms.
+    assert sql.count("de.organization_id = :org_id") == 2
+    assert "document_id IN" not in sql
+    assert isinstance(compiled.binds["query_embedding"].type, Vector)
+    assert params["ts_query"] == "krona | exchange | rate"
+    assert (params["org_id"], params["candidates"], params["limit"]) == (7, 20, 5)
+    assert params["rrf_k"] == RRF_K
+
+
+def test_hybrid_search_narrows_both_arms_by_document():
+    db = _CompilingDB()
+    hybrid_search(
+        db,
+        organization_id=7,
+        query_embedding=QUERY,
+        query_text="krona",
+        limit=5,
+        document_ids=[3, 4],
+    )
+
+    (set_sql, _, set_params), (compiled, sql, params) = db.calls
+    assert "hnsw.iterative_scan" in str(set_sql)  # the dense arm never starves
+    assert set_params == {"mode": "strict_order"}
+    assert sql.count("de.document_id IN") == 2
+    assert params["doc_ids"] == [3, 4]
+    assert params["candidates"] == 5  # defaults to limit
+
+
+def test_hybrid_search_without_keywords_is_plain_dense_search():
+    db = _CompilingDB()
+    hybrid_search(
+        db, organization_id=7, query_embedding=QUERY, query_text="?!", limit=5
+    )
+
+    compiled, sql, params = db.calls[0]
+    assert "to_tsquery" not in sql and "ts_query" not in params
+    assert params["limit"] == 5
+
+
+@pytest.mark.anyio
+async def test_async_hybrid_search_sends_the_same_statement():
+    sync_db, calls = _CompilingDB(), []
+
+    class AsyncDB:
+        async def execute(self, sql, params):
+            return sync_db.execute(sql, params)
+
+    kwargs = dict(organization_id=7, query_embedding=QUERY, query_text="krona", limit=5)
+    hybrid_search(sync_db, **kwargs)
+    calls.append(sync_db.calls.pop())
+    await async_hybrid_search(AsyncDB(), **kwargs)
+    calls.append(sync_db.calls.pop())
+
+    (_, sync_sql, sync_params), (_, async_sql, async_params) = calls
+    assert async_sql == sync_sql
+    assert async_params == sync_params
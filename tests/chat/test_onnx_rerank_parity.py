@@ -0,0 +1,123 @@
+"""ONNX cross-encoder: input plumbing and ordering (always runs) and rank
+parity with the torch backend over golden-set pools (runs where
+onnxruntime and the model are available)."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.infrastructure.rerank.onnx_cross_encoder import OnnxCrossEncoderReranker
+
+GOLDEN_PATH = Path(__file__).resolve().parents[2] / "evals" / "golden_qa.jsonl"
+POOL_SIZE = 20
+
+
+class FakeTokenizer:
+    def __call__(self, queries, passages, **kwargs):
+        self.queries, self.passages, self.kwargs = queries, passages, kwargs
+        n = len(queries)
+        return {
+            "input_ids": np.ones((n, 3)),
+            "attention_mask": np.ones((n, 3)),
+            "token_type_ids": np.zeros((n, 3)),
+        }
+
+
+class FakeSession:
+    """One logit per pair: the passage's length."""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def run(self, outputs, feeds):
+        assert set(feeds) == {"input_ids", "attention_mask"}
+        assert all(v.dtype == np.int64 for v in feeds.values())
+        return [np.array([[float(len(p))] for p in self.tokenizer.passages])]
+
+
+def test_pairs_are_truncated_and_ordered_by_logit():
+    svc = OnnxCrossEncoderReranker.__new__(OnnxCrossEncoderReranker)
+    svc.max_seq_length = 128
+    svc.tokenizer = FakeTokenizer()
+    svc.session = FakeSession(svc.tokenizer)
+    svc.input_names = {"input_ids", "attention_mask"}  # no token_type_ids
+
+    order = svc.rerank(query="q", passages=["aa", "a", "aaaa", "aaa"])
+
+    assert order == [2, 3, 0, 1]
+    assert svc.tokenizer.queries == ["q"] * 4
+    assert svc.tokenizer.kwargs["max_length"] == 128
+    assert svc.rerank(query="q", passages=[]) == []
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    from app.composition import singletons
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "RERANK_BACKEND", "tensorflow")
+    with pytest.raises(RuntimeError, match="RERANK_BACKEND"):
+        singletons.build_rerank_backend()
+
+
+# --- rank parity against the torch backend ----------------------------------
+
+
+def golden_pools() -> list[tuple[str, list[str]]]:
+    """Each answerable question against POOL_SIZE golden statements: its
+    own plus its neighbours', as a stand-in for a retrieved pool."""
+    items = [json.loads(line) for line in GOLDEN_PATH.read_text().splitlines()]
+    items = [i for i in items if i["type"] == "answerable"]
+    statements = [f"{i['question']} {i['reference_answer']}" for i in items]
+    return [
+        (
+            item["question"],
+            [statements[(n + j) % len(items)] for j in range(POOL_SIZE)],
+        )
+        for n, item in enumerate(items)
+    ]
+
+
+def spearman(a, b) -> float:
+    ra = np.argsort(np.argsort(a)).astype(float)
+    rb = np.argsort(np.argsort(b)).astype(float)
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+@pytest.fixture(scope="module")
+def torch_scores():
+    pytest.importorskip("onnxruntime")
+    from app.infrastructure.rerank.cross_encoder import CrossEncoderReranker
+
+    try:
+        svc = CrossEncoderReranker()
+    except OSError as exc:  # offline: model not cached
+        pytest.skip(f"cross-encoder unavailable: {exc}")
+    return [svc.score_pairs([(q, p) for p in pool]) for q, pool in golden_pools()]
+
+
+def _onnx_scores(quantize: bool):
+    try:
+        svc = OnnxCrossEncoderReranker(quantize=quantize)
+    except OSError as exc:
+        pytest.skip(f"ONNX export unavailable: {exc}")
+    return [svc.score_pairs([(q, p) for p in pool]) for q, pool in golden_pools()]
+
+
+def _agreement(reference, scores):
+    top1 = np.mean([np.argmax(r) == np.argmax(s) for r, s in zip(reference, scores)])
+    rho = [spearman(r, s) for r, s in zip(reference, scores)]
+    return top1, rho
+
+
+def test_onnx_fp32_ranks_like_torch(torch_scores):
+    top1, rho = _agreement(torch_scores, _onnx_scores(quantize=False))
+    assert top1 == 1.0
+    assert min(rho) > 0.99
+
+
+def test_onnx_int8_ranks_close_to_torch(torch_scores):
+    top1, rho = _agreement(torch_scores, _onnx_scores(quantize=True))
+    assert top1 >= 0.95
+    assert np.mean(rho) > 0.95
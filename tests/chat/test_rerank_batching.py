@@ -0,0 +1,98 @@
+"""Micro-batching reranker: concurrent rerank calls share one scoring
+pass, and each caller still gets the ordering of its own passages."""
+
+import threading
+import time
+
+import pytest
+
+from app.infrastructure.rerank.batcher import MicroBatchingReranker
+
+
+class SlowPairScorer:
+    """score_pairs takes a while, like a real forward pass, records every
+    batch, and scores a pair by its passage's length."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+
+    def score_pairs(self, pairs):
+        self.batches.append(list(pairs))
+        time.sleep(self.delay)
+        return [float(len(passage)) for _, passage in pairs]
+
+
+def run_concurrently(reranker, requests):
+    results = {}
+
+    def call(query, passages):
+        results[query] = reranker.rerank(query=query, passages=passages)
+
+    threads = [threading.Thread(target=call, args=r) for r in requests]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results
+
+
+def requests(n, *, passages=5):
+    # query i's passages are ordered so its best (longest) one sits at i % 5
+    return [
+        (f"q{i}", ["x" * (10 if j == i % passages else j + 1) for j in range(passages)])
+        for i in range(n)
+    ]
+
+
+def test_concurrent_requests_share_a_pass():
+    scorer = SlowPairScorer()
+    reranker = MicroBatchingReranker(scorer, max_batch_pairs=1000, max_wait_ms=20)
+
+    results = run_concurrently(reranker, requests(12))
+
+    # every caller got the ordering of ITS passages, not a neighbour's
+    assert all(order[0] == int(q[1:]) % 5 for q, order in results.items())
+    assert all(sorted(order) == list(range(5)) for order in results.values())
+    assert sum(len(b) for b in scorer.batches) == 60
+    assert len(scorer.batches) < 12  # fewer forward passes than requests
+    stats = reranker.stats()
+    assert stats["batch_requests"]["count"] == len(scorer.batches)
+    assert stats["batch_pairs"]["sum"] == 60
+
+
+def test_batches_stay_within_the_pair_cap_without_splitting_requests():
+    scorer = SlowPairScorer()
+    reranker = MicroBatchingReranker(scorer, max_batch_pairs=12, max_wait_ms=20)
+
+    results = run_concurrently(reranker, requests(9))
+
+    assert len(results) == 9
+    assert all(len(b) <= 12 and len(b) % 5 == 0 for b in scorer.batches)
+
+
+def test_oversized_request_runs_alone():
+    scorer = SlowPairScorer(delay=0)
+    reranker = MicroBatchingReranker(scorer, max_batch_pairs=4, max_wait_ms=0)
+    order = reranker.rerank(query="q", passages=["a", "ccc", "bb", "dddd", "e"])
+    assert order[:2] == [3, 1]
+    assert [len(b) for b in scorer.batches] == [5]
+
+
+def test_scorer_failure_reaches_every_waiter():
+    class Broken:
+        def score_pairs(self, pairs):
+            raise RuntimeError("model crashed")
+
+    reranker = MicroBatchingReranker(Broken(), max_wait_ms=0)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        reranker.rerank(query="q", passages=["a"])
+    # the worker thread survives and serves the next call
+    with pytest.raises(RuntimeError):
+        reranker.rerank(query="q2", passages=["b"])
+
+
+def test_empty_pool_skips_the_queue():
+    reranker = MicroBatchingReranker(SlowPairScorer())
+    assert reranker.rerank(query="q", passages=[]) == []
+    assert reranker._thread is None
@@ -0,0 +1,94 @@
+"""Rerank score cache: cached (query, chunk) pairs skip the model, only
+misses are scored, LRU bounds, and invalidation by chunk id."""
+
+from app.infrastructure.rerank.score_cache import RerankScoreCache
+
+
+class CountingPairScorer:
+    """Scores a pair by its passage's length and records every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def score_pairs(self, pairs):
+        self.calls.append(list(pairs))
+        return [float(len(passage)) for _, passage in pairs]
+
+
+PASSAGES = ["aa", "a", "aaaa", "aaa"]
+IDS = [10, 11, 12, 13]
+
+
+def rerank(cache, query="What is X?", passages=PASSAGES, ids=IDS):
+    return cache.rerank(query=query, passages=passages, passage_ids=ids)
+
+
+def test_repeat_query_skips_the_model():
+    scorer = CountingPairScorer()
+    cache = RerankScoreCache(scorer, max_entries=100)
+
+    assert rerank(cache) == [2, 3, 0, 1]
+    assert rerank(cache, query="  what is x? ") == [2, 3, 0, 1]  # normalized
+
+    assert len(scorer.calls) == 1
+    # normalization is for the key only; the model scores the query as asked
+    assert scorer.calls[0][0][0] == "What is X?"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (4, 4)
+    assert stats["hit_rate"] == 0.5
+    assert stats["model_calls_saved"] == 1
+
+
+def test_only_missing_pairs_are_scored():
+    scorer = CountingPairScorer()
+    cache = RerankScoreCache(scorer, max_entries=100)
+    rerank(cache, passages=PASSAGES[:2], ids=IDS[:2])
+
+    order = rerank(cache)
+
+    assert [p for _, p in scorer.calls[1]] == ["aaaa", "aaa"]
+    assert order == [2, 3, 0, 1]  # cached and fresh scores merged
+
+
+def test_scores_are_per_query():
+    scorer = CountingPairScorer()
+    cache = RerankScoreCache(scorer, max_entries=100)
+    rerank(cache, query="q1")
+    rerank(cache, query="q2")
+    assert len(scorer.calls) == 2
+
+
+def test_without_ids_passes_through():
+    scorer = CountingPairScorer()
+    cache = RerankScoreCache(scorer, max_entries=100)
+    for _ in range(2):
+        assert cache.rerank(query="q", passages=PASSAGES) == [2, 3, 0, 1]
+    assert len(scorer.calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_scores_are_evicted():
+    scorer = CountingPairScorer()
+    cache = RerankScoreCache(scorer, max_entries=6)
+    rerank(cache, query="q1")
+    rerank(cache, query="q2")  # evicts two of q1's four
+
+    stats = cache.stats()
+    assert stats["entries"] == 6
+    assert stats["evictions"] == 2
+    rerank(cache, query="q1")
+    assert len(scorer.calls[-1]) == 2  # only the evicted pairs re-scored
+
+
+def test_invalidated_chunks_are_rescored():
+    scorer = CountingPairScorer()
+    cache = RerankScoreCache(scorer, max_entries=100)
+    rerank(cache, query="q1")
+    rerank(cache, query="q2")
+
+    cache.invalidate_chunks([10, 12, 99])
+
+    assert cache.stats()["invalidations"] == 4
+    assert cache.stats()["entries"] == 4
+    rerank(cache, query="q1")
+    assert [p for _, p in scorer.calls[-1]] == ["aa", "aaaa"]
@@ -6,13 +6,17 @@ and cut to top_k. (The model's real quality is measured separately in
 evals/retrieval_eval.py.)
 """
 
+import pytest
+
 from app.core.config import settings
 from app.db.models.user import User
+from app.services.embedding_service import reciprocal_rank_fusion
 from app.use_cases.chat_with_kb import ChatWithKnowledgeBaseUseCase
 
 
 class Row:
     def __init__(self, content, filename):
+        self.id = hash(content)
         self.content = content
         self.filename = filename
 
@@ -26,25 +30,34 @@ class ReverseReranker:
     """Deterministic stand-in: reverses the pool order, so the test can
     assert the use case actually applied the reranker's ordering."""
 
-    def rerank(self, *, query, passages):
+    def rerank(self, *, query, passages, passage_ids=None):
+        self.passage_ids = passage_ids
         return list(range(len(passages)))[::-1]
 
 
 def _use_case(monkeypatch, pool, reranker, use_hybrid=False, lexical=None):
-    # similarity_search / lexical_search are module-level functions; patch
+    # async_similarity_search / async_hybrid_search are module-level functions; patch
     # them to return controlled pools and record the LIMIT asked for.
     calls = {}
 
-    def fake_search(*, db, organization_id, query_embedding, limit, document_ids=None):
+    async def fake_search(
+        *, db, organization_id, query_embedding, limit, document_ids=None
+    ):
         calls["dense_limit"] = limit
         return pool
 
-    def fake_lexical(*, db, organization_id, query_text, limit, document_ids=None):
-        calls["lexical_limit"] = limit
-        return lexical or []
+    async def fake_hybrid(
+        *, db, organization_id, query_embedding, query_text, limit, document_ids=None
+    ):
+        # Stands in for the single-statement fusion with the Python RRF
+        # it is specified to match.
+        calls["hybrid_limit"] = limit
+        return reciprocal_rank_fusion(pool, lexical or [], limit=limit)
 
-    monkeypatch.setattr("app.use_cases.chat_with_kb.similarity_search", fake_search)
-    monkeypatch.setattr("app.use_cases.chat_with_kb.lexical_search", fake_lexical)
+    monkeypatch.setattr(
+        "app.use_cases.chat_with_kb.async_similarity_search", fake_search
+    )
+    monkeypatch.setattr("app.use_cases.chat_with_kb.async_hybrid_search", fake_hybrid)
     uc = ChatWithKnowledgeBaseUseCase(
         embedding_service=FakeEmbeddingService(),
         llm_service=object(),
@@ -56,35 +69,41 @@ def _use_case(monkeypatch, pool, reranker, use_hybrid=False, lexical=None):
     return uc, calls
 
 
-def test_no_reranker_retrieves_exactly_top_k(monkeypatch):
+@pytest.mark.anyio
+async def test_no_reranker_retrieves_exactly_top_k(monkeypatch):
     pool = [Row(f"c{i}", f"{i}.pdf") for i in range(5)]
     uc, calls = _use_case(monkeypatch, pool, reranker=None)
     user = User(id=1, email="e", hashed_password="x", organization_id=1)
 
-    result = uc._retrieve(question="q", user=user, top_k=5, document_ids=None)
+    result = await uc._retrieve(question="q", user=user, top_k=5, document_ids=None)
 
     assert calls["dense_limit"] == 5  # dense path asks for exactly top_k
-    assert "lexical_limit" not in calls  # keyword arm not touched
+    assert "hybrid_limit" not in calls  # keyword arm not touched
     assert [r.filename for r in result] == ["0.pdf", "1.pdf", "2.pdf", "3.pdf", "4.pdf"]
 
 
-def test_reranker_widens_pool_and_reorders_then_cuts(monkeypatch):
+@pytest.mark.anyio
+async def test_reranker_widens_pool_and_reorders_then_cuts(monkeypatch):
     monkeypatch.setattr(settings, "RERANK_CANDIDATES", 20)
     pool = [Row(f"c{i}", f"{i}.pdf") for i in range(20)]
-    uc, calls = _use_case(monkeypatch, pool, reranker=ReverseReranker())
+    reranker = ReverseReranker()
+    uc, calls = _use_case(monkeypatch, pool, reranker=reranker)
     user = User(id=1, email="e", hashed_password="x", organization_id=1)
 
-    result = uc._retrieve(question="q", user=user, top_k=3, document_ids=None)
+    result = await uc._retrieve(question="q", user=user, top_k=3, document_ids=None)
 
     assert calls["dense_limit"] == 20  # wider candidate pool fetched
+    # chunk ids travel with the passages (the score cache keys on them)
+    assert reranker.passage_ids == [row.id for row in pool]
     # ReverseReranker puts index 19 first; top_k=3 keeps 19,18,17.
     assert [r.filename for r in result] == ["19.pdf", "18.pdf", "17.pdf"]
 
 
-def test_reranker_handles_empty_pool(monkeypatch):
+@pytest.mark.anyio
+async def test_reranker_handles_empty_pool(monkeypatch):
     uc, _ = _use_case(monkeypatch, pool=[], reranker=ReverseReranker())
     user = User(id=1, email="e", hashed_password="x", organization_id=1)
-    assert uc._retrieve(question="q", user=user, top_k=5, document_ids=None) == []
+    assert await uc._retrieve(question="q", user=user, top_k=5, document_ids=None) == []
 
 
 class IdRow:
@@ -96,7 +115,8 @@ class IdRow:
         self.content = f"content-{cid}"
 
 
-def test_hybrid_fuses_dense_and_lexical(monkeypatch):
+@pytest.mark.anyio
+async def test_hybrid_fuses_dense_and_lexical(monkeypatch):
     monkeypatch.setattr(settings, "RERANK_CANDIDATES", 20)
     # A doc the keyword arm ranks #1 that dense missed entirely — RRF
     # should surface it into the fused top_k.
@@ -107,15 +127,17 @@ def test_hybrid_fuses_dense_and_lexical(monkeypatch):
     )
     user = User(id=1, email="e", hashed_password="x", organization_id=1)
 
-    result = uc._retrieve(question="krona", user=user, top_k=3, document_ids=None)
+    result = await uc._retrieve(question="krona", user=user, top_k=3, document_ids=None)
 
-    assert calls["dense_limit"] == 20 and calls["lexical_limit"] == 20
+    assert calls["hybrid_limit"] == 20  # one fused query, not two arms
+    assert "dense_limit" not in calls
     files = {r.filename for r in result}
     # doc 1 (in both arms) and the lexical-only doc 9 both present
     assert "a.pdf" in files and "keyword-hit.pdf" in files
 
 
-def test_hybrid_composes_with_rerank(monkeypatch):
+@pytest.mark.anyio
+async def test_hybrid_composes_with_rerank(monkeypatch):
     monkeypatch.setattr(settings, "RERANK_CANDIDATES", 20)
     dense = [IdRow(1, "a.pdf"), IdRow(2, "b.pdf")]
     lexical = [IdRow(9, "c.pdf")]
@@ -129,7 +151,7 @@ def test_hybrid_composes_with_rerank(monkeypatch):
     user = User(id=1, email="e", hashed_password="x", organization_id=1)
 
     # Fused pool then reversed by the reranker, cut to top_k=2.
-    result = uc._retrieve(question="q", user=user, top_k=2, document_ids=None)
+    result = await uc._retrieve(question="q", user=user, top_k=2, document_ids=None)
     assert len(result) == 2
 
 
@@ -148,3 +170,69 @@ def test_cross_encoder_orders_by_descending_score(monkeypatch):
     order = svc.rerank(query="q", passages=["aa", "a", "aaaa", "aaa"])
     assert order == [2, 3, 0, 1]  # indices of "aaaa","aaa","aa","a"
     assert svc.rerank(query="q", passages=[]) == []
+
+
+class DistRow(Row):
+    def __init__(self, content, distance):
+        super().__init__(content, f"{content}.pdf")
+        self.distance = distance
+
+
+class CountingReranker(ReverseReranker):
+    calls = 0
+
+    def rerank(self, **kwargs):
+        self.calls += 1
+        return super().rerank(**kwargs)
+
+
+def test_dense_margin_is_rank_1_to_rank_k_gap():
+    from app.services.embedding_service import dense_margin
+
+    pool = [DistRow(f"c{i}", d) for i, d in enumerate([0.2, 0.5, 0.6, 0.9])]
+    assert dense_margin(pool, k=3) == pytest.approx(0.4)
+    assert dense_margin(pool, k=10) == pytest.approx(0.7)  # capped at the pool
+    assert dense_margin(pool, k=1) == pytest.approx(0.3)  # at least rank 2
+    assert dense_margin(pool[:1], k=3) is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "margin, distances, reranked",
+    [
+        (None, [0.1, 0.9, 0.95], True),  # unset: always rerank
+        (0.5, [0.1, 0.9, 0.95], False),  # rank 1 far ahead: dense order kept
+        (0.5, [0.4, 0.5, 0.6], True),  # close call: rerank
+    ],
+)
+async def test_confident_dense_pool_skips_the_reranker(
+    monkeypatch, margin, distances, reranked
+):
+    monkeypatch.setattr(settings, "RERANK_SKIP_MARGIN", margin)
+    pool = [DistRow(f"c{i}", d) for i, d in enumerate(distances)]
+    reranker = CountingReranker()
+    uc, _ = _use_case(monkeypatch, pool, reranker=reranker)
+    user = User(id=1, email="e", hashed_password="x", organization_id=1)
+
+    result = await uc._retrieve(question="q", user=user, top_k=3, document_ids=None)
+
+    assert reranker.calls == int(reranked)
+    expected = ["c2", "c1", "c0"] if reranked else ["c0", "c1", "c2"]
+    assert [r.content for r in result] == expected
+
+
+@pytest.mark.anyio
+async def test_hybrid_pool_is_always_reranked(monkeypatch):
+    monkeypatch.setattr(settings, "RERANK_SKIP_MARGIN", 0.0)
+    reranker = CountingReranker()
+    uc, _ = _use_case(
+        monkeypatch,
+        pool=[IdRow(1, "a.pdf"), IdRow(2, "b.pdf")],
+        reranker=reranker,
+        use_hybrid=True,
+    )
+    user = User(id=1, email="e", hashed_password="x", organization_id=1)
+
+    await uc._retrieve(question="q", user=user, top_k=2, document_ids=None)
+
+    assert reranker.calls == 1  # fused rows have no distance to judge by
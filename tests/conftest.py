@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    # The app is served by uvicorn on asyncio; async tests run there only.
+    return "asyncio"
@@ -0,0 +1,53 @@
+"""GET /metrics: operator-only (METRICS_TOKEN) snapshot of the registered
+collectors. The counters span every tenant, so an org admin's session is
+not enough."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.metrics import register_collector
+from app.db.models.user import User
+from app.main import app
+
+TOKEN = "operator-metrics-token"
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", TOKEN)
+
+
+def test_operator_token_sees_registered_collectors(metrics_token):
+    register_collector("test_component", lambda: {"hits": 3})
+    resp = TestClient(app).get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert resp.status_code == 200
+    assert resp.json()["test_component"] == {"hits": 3}
+
+
+def test_org_admin_session_is_refused(metrics_token):
+    admin = User(
+        id=1,
+        email="user@example.com",
+        hashed_password="x",
+        organization_id=1,
+        is_active=True,
+        is_admin=True,
+    )
+    app.dependency_overrides[get_current_user] = lambda: admin
+    try:
+        assert TestClient(app).get("/metrics").status_code == 401
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_wrong_token_is_refused(metrics_token):
+    resp = TestClient(app).get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert resp.status_code == 401
+
+
+def test_endpoint_is_off_without_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    resp = TestClient(app).get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert resp.status_code == 404
@@ -2,8 +2,9 @@
 
 
 class _CountQuery:
-    def __init__(self, count):
+    def __init__(self, count, first=None):
         self._count = count
+        self._first = first
 
     def filter(self, *a, **k):
         return self
@@ -11,6 +12,9 @@ class _CountQuery:
     def count(self):
         return self._count
 
+    def first(self):
+        return self._first
+
 
 class UnderQuotaDB:
     """Minimal DB double for tests that exercise the file-handling path.
@@ -20,8 +24,66 @@ class UnderQuotaDB:
     Reports zero documents, i.e. always under quota.
     """
 
-    def __init__(self, count: int = 0):
+    def __init__(self, count: int = 0, existing=None):
         self.count = count
+        self.existing = existing  # what a content-hash lookup finds
 
     def query(self, *a, **k):
-        return _CountQuery(self.count)
+        return _CountQuery(self.count, self.existing)
+
+
+class InMemoryJobs:
+    """IngestionJobRepository double; records every progress update."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.progress = []
+
+    def create(self, *, organization_id, uploaded_by, filename, file_path):
+        from app.domain.ingestion_job_repository import IngestionJobRecord, JobStage
+
+        job = IngestionJobRecord(
+            id=len(self.jobs) + 1,
+            organization_id=organization_id,
+            uploaded_by=uploaded_by,
+            filename=filename,
+            file_path=file_path,
+            stage=JobStage.QUEUED,
+            chunks_done=0,
+            document_id=None,
+            error_type=None,
+            error=None,
+            created_at=None,
+            updated_at=None,
+        )
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, *, job_id):
+        return self.jobs.get(job_id)
+
+    def count_active(self, *, organization_id):
+        from app.domain.ingestion_job_repository import JobStage
+
+        return sum(
+            1
+            for job in self.jobs.values()
+            if job.organization_id == organization_id and job.stage in JobStage.ACTIVE
+        )
+
+    def _set(self, job_id, **values):
+        from dataclasses import replace
+
+        self.jobs[job_id] = replace(self.jobs[job_id], **values)
+
+    def update_progress(self, *, job_id, stage, chunks_done):
+        self.progress.append((stage, chunks_done))
+        self._set(job_id, stage=stage, chunks_done=chunks_done)
+
+    def mark_done(self, *, job_id, document_id, chunks_done):
+        self._set(
+            job_id, stage="done", document_id=document_id, chunks_done=chunks_done
+        )
+
+    def mark_failed(self, *, job_id, error_type, error):
+        self._set(job_id, stage="failed", error_type=error_type, error=error)
@@ -0,0 +1,237 @@
+"""Binary COPY writer for document_embeddings.
+
+No Postgres here, so the tests decode the stream exactly as COPY FROM
+STDIN (FORMAT binary) would: header, one 5-field tuple per chunk, trailer
+— with each vector checked through pgvector's own binary parser.
+"""
+
+import hashlib
+import struct
+
+import numpy as np
+import pytest
+from pgvector import Vector
+
+import app.services.embedding_service as embedding_module
+from app.db.bulk_copy import (
+    chunk_hash,
+    copy_document_embeddings,
+    encode_embedding_rows,
+)
+
+
+def decode(payload: bytes) -> list[tuple]:
+    assert payload.startswith(b"PGCOPY\n\xff\r\n\x00")
+    pos = 11 + 8  # signature, flags, header-extension length
+    rows = []
+    while True:
+        (fields,) = struct.unpack_from(">h", payload, pos)
+        pos += 2
+        if fields == -1:
+            assert pos == len(payload)
+            return rows
+        values = []
+        for _ in range(fields):
+            (length,) = struct.unpack_from(">i", payload, pos)
+            pos += 4
+            values.append(payload[pos : pos + length])
+            pos += length
+        org, doc, content, chunk_hash, vector = values
+        assert chunk_hash.decode("ascii") == hashlib.sha256(content).hexdigest()
+        rows.append(
+            (
+                struct.unpack(">i", org)[0],
+                struct.unpack(">i", doc)[0],
+                content.decode("utf-8"),
+                Vector.from_binary(vector).to_list(),
+            )
+        )
+
+
+def test_rows_round_trip_through_the_binary_format():
+    vectors = np.array([[0.5, -0.25, 1.0], [0.0, 2.0, -3.5]], dtype=np.float32)
+
+    payload = b"".join(
+        encode_embedding_rows(
+            organization_id=7,
+            document_id=42,
+            contents=["first chunk", "naïve café — ünïcode"],
+            vectors=vectors,
+        )
+    )
+
+    assert decode(payload) == [
+        (7, 42, "first chunk", [0.5, -0.25, 1.0]),
+        (7, 42, "naïve café — ünïcode", [0.0, 2.0, -3.5]),
+    ]
+
+
+def test_mismatched_rows_are_rejected():
+    with pytest.raises(ValueError):
+        list(
+            encode_embedding_rows(
+                organization_id=1,
+                document_id=1,
+                contents=["a", "b"],
+                vectors=np.zeros((1, 3), dtype=np.float32),
+            )
+        )
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, file, size):
+        self.log["sql"] = sql
+        blocks = []
+        while block := file.read(size):
+            assert len(block) <= size
+            blocks.append(block)
+        self.log["payload"] = b"".join(blocks)
+
+
+class FakeSession:
+    """Session whose connection() exposes a DBAPI connection, as
+    SQLAlchemy's does — the COPY must run on it, inside the session's
+    transaction."""
+
+    def __init__(self):
+        self.log = {}
+        dbapi = type("DBAPIConnection", (), {"cursor": lambda s: FakeCursor(self.log)})
+        self._connection = type("Connection", (), {"connection": dbapi()})()
+
+    def connection(self):
+        return self._connection
+
+
+def test_copy_streams_every_row_on_the_session_connection():
+    db = FakeSession()
+    contents = [f"chunk {i}" for i in range(500)]
+    vectors = np.random.default_rng(0).standard_normal((500, 384), dtype=np.float32)
+
+    copy_document_embeddings(
+        db, organization_id=3, document_id=9, contents=contents, vectors=vectors
+    )
+
+    assert db.log["sql"].startswith("COPY document_embeddings")
+    assert "FORMAT binary" in db.log["sql"]
+    rows = decode(db.log["payload"])
+    assert [r[2] for r in rows] == contents
+    np.testing.assert_array_equal(np.array([r[3] for r in rows]), vectors)
+
+
+def test_empty_document_issues_no_copy():
+    db = FakeSession()
+    copy_document_embeddings(
+        db,
+        organization_id=1,
+        document_id=1,
+        contents=[],
+        vectors=np.empty((0, 384), dtype=np.float32),
+    )
+    assert db.log == {}
+
+
+def test_store_embeddings_embeds_and_copies_one_batch_at_a_time(monkeypatch):
+    """A streamed document is never materialized: at most one batch of
+    chunks has been pulled from the generator but not yet written."""
+    pulled, written = [0], []
+
+    def chunk_stream():
+        for i in range(10):
+            pulled[0] += 1
+            assert pulled[0] - sum(written) <= 4
+            yield f"chunk {i}"
+
+    class Embedder:
+        def embed_texts(self, texts):
+            return np.zeros((len(texts), 3), dtype=np.float32)
+
+    class Session:
+        committed = False
+
+        def flush(self):
+            pass
+
+        def commit(self):
+            self.committed = True
+
+    monkeypatch.setattr(
+        embedding_module,
+        "copy_document_embeddings",
+        lambda db, **kw: written.append(len(kw["contents"])),
+    )
+    monkeypatch.setattr(
+        embedding_module, "bump_corpus_generation", lambda db, **kw: None
+    )
+    monkeypatch.setattr(embedding_module, "stored_vectors_by_hash", lambda db, **kw: {})
+    db = Session()
+
+    stored = embedding_module.store_embeddings(
+        db,
+        organization_id=1,
+        document=type("Doc", (), {"id": 5})(),
+        chunks=chunk_stream(),
+        embedding_service=Embedder(),
+        batch_size=4,
+    )
+
+    assert stored == 10
+    assert written == [4, 4, 2]
+    assert db.committed  # once, after the last batch
+
+
+def test_store_embeddings_reuses_stored_vectors_for_known_chunks(monkeypatch):
+    """Re-ingesting a revised file: unchanged chunks take the vector
+    already stored under their hash, and only new text (once, however
+    often it repeats) reaches the encoder."""
+    known = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    encoded, written = [], {}
+
+    class Embedder:
+        def embed_texts(self, texts):
+            encoded.extend(texts)
+            return np.full((len(texts), 3), 2.0, dtype=np.float32)
+
+    class Session:
+        def flush(self):
+            pass
+
+        def commit(self):
+            pass
+
+    def lookup(db, *, organization_id, hashes):
+        assert organization_id == 1
+        return {h: known for h in hashes if h == chunk_hash("unchanged")}
+
+    monkeypatch.setattr(embedding_module, "stored_vectors_by_hash", lookup)
+    monkeypatch.setattr(
+        embedding_module,
+        "copy_document_embeddings",
+        lambda db, **kw: written.update(kw),
+    )
+    monkeypatch.setattr(
+        embedding_module, "bump_corpus_generation", lambda db, **kw: None
+    )
+
+    stored = embedding_module.store_embeddings(
+        Session(),
+        organization_id=1,
+        document=type("Doc", (), {"id": 5})(),
+        chunks=["unchanged", "revised", "revised"],
+        embedding_service=Embedder(),
+    )
+
+    assert stored == 3
+    assert encoded == ["revised"]
+    assert written["contents"] == ["unchanged", "revised", "revised"]
+    np.testing.assert_array_equal(
+        written["vectors"], [[1.0, 0.0, 0.0], [2.0, 2.0, 2.0], [2.0, 2.0, 2.0]]
+    )
@@ -0,0 +1,140 @@
+"""Bulk-ingest parse stage: a failing PDF becomes a recorded failure and
+the stage always ends its stream, so the main loop can't wait forever.
+
+A thread pool stands in for the process pool (same Executor interface).
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from scripts import bulk_ingest
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    src, org_dir = tmp_path / "corpus", tmp_path / "org_1"
+    src.mkdir()
+    org_dir.mkdir()
+    pdfs = []
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (src / name).write_bytes(b"%PDF " + name.encode())
+        pdfs.append(src / name)
+    return pdfs, org_dir
+
+
+def run_parse_stage(pool, pdfs, org_dir) -> list:
+    out_q: queue.Queue = queue.Queue()
+    thread = threading.Thread(
+        target=bulk_ingest.parse_stage,
+        args=(pool, pdfs, org_dir, out_q),
+        kwargs={"max_in_flight": 2, "timer": bulk_ingest.StageTimer()},
+        daemon=True,
+    )
+    thread.start()
+    items = []
+    while (item := out_q.get(timeout=5)) is not bulk_ingest._DONE:
+        items.append(item)
+    thread.join(timeout=5)
+    return items
+
+
+def test_copy_oserror_is_recorded_and_the_stream_still_ends(monkeypatch, corpus):
+    pdfs, org_dir = corpus
+    real_copy = bulk_ingest.shutil.copyfile
+
+    def copyfile(source, target):
+        if source.endswith("b.pdf"):
+            raise OSError(28, "No space left on device")
+        return real_copy(source, target)
+
+    monkeypatch.setattr(bulk_ingest.shutil, "copyfile", copyfile)
+    monkeypatch.setattr(bulk_ingest, "extract_pdf_chunks", lambda path: ["chunk"])
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        items = run_parse_stage(pool, pdfs, org_dir)
+
+    assert [p.name for p in items] == ["a.pdf", "b.pdf", "c.pdf"]
+    a, b, c = items
+    assert a.error is None and a.chunks == ["chunk"] and a.content_hash
+    assert "No space left on device" in b.error
+    assert not (org_dir / "b.pdf").exists()
+    assert c.error is None
+
+
+def test_dead_worker_is_recorded_and_the_stream_still_ends(corpus):
+    pdfs, org_dir = corpus
+
+    class BrokenPool:
+        def submit(self, fn, *args):
+            future: Future = Future()
+            future.set_exception(RuntimeError("worker died"))
+            return future
+
+    items = run_parse_stage(BrokenPool(), pdfs, org_dir)
+
+    assert [p.name for p in items] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert all("worker died" in p.error for p in items)
+
+
+class FailingFirstFlushDB:
+    """SessionLocal stand-in whose first flush fails, like a lost
+    connection or a constraint violation."""
+
+    def __init__(self):
+        self.flushes = 0
+
+    def add(self, row):
+        row.id = self.flushes + 1
+
+    def flush(self):
+        self.flushes += 1
+        if self.flushes == 1:
+            raise RuntimeError("connection lost")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_writer_survives_a_failure_whose_copy_is_already_gone(monkeypatch, tmp_path):
+    monkeypatch.setattr(bulk_ingest, "SessionLocal", FailingFirstFlushDB)
+    monkeypatch.setattr(bulk_ingest, "insert_embeddings", lambda db, **kw: None)
+    gone = bulk_ingest.ParsedPdf(name="a.pdf", path=str(tmp_path / "a.pdf"))
+    ok = bulk_ingest.ParsedPdf(name="b.pdf", path=str(tmp_path / "b.pdf"))
+    ok.chunks = ["chunk"]
+    in_q: queue.Queue = queue.Queue()
+    for item in ((gone, []), (ok, [[0.0]]), bulk_ingest._DONE):
+        in_q.put(item)
+    result = {"docs_done": 0, "chunks_done": 0, "failures": []}
+
+    bulk_ingest.write_stage(
+        in_q, org_id=1, user_id=1, timer=bulk_ingest.StageTimer(), result=result
+    )
+
+    assert result["failures"] == ["a.pdf: storage failed: connection lost"]
+    assert (result["docs_done"], result["chunks_done"]) == (1, 1)
+    assert in_q.empty()  # drained through the sentinel
+
+
+def test_embed_failure_with_a_missing_copy_is_recorded(tmp_path):
+    class BrokenEmbedder:
+        def embed_texts(self, texts):
+            raise RuntimeError("out of memory")
+
+    parsed = bulk_ingest.ParsedPdf(name="a.pdf", path=str(tmp_path / "a.pdf"))
+    failures: list[str] = []
+
+    bulk_ingest.embed_batch(
+        BrokenEmbedder(),
+        [parsed],
+        queue.Queue(),
+        timer=bulk_ingest.StageTimer(),
+        failures=failures,
+    )
+
+    assert failures == ["a.pdf: embedding failed: out of memory"]
@@ -28,6 +28,14 @@ class FakeQuery:
     def first(self):
         return self.document
 
+    def all(self):
+        # the deleted document's chunk ids
+        return [(11,), (12,)]
+
+    def update(self, values, **kwargs):
+        # corpus-generation bump (cache invalidation), not an embedding delete
+        return 1
+
 
 class FakeSession:
     def __init__(self, document, events):
@@ -90,3 +98,29 @@ def test_missing_file_on_disk_is_tolerated(monkeypatch):
     )
     assert events == ["db-delete", "commit"]
     assert "message" in result
+
+
+class RecordingScoreCache:
+    def __init__(self, events):
+        self.events = events
+
+    def invalidate_chunks(self, chunk_ids):
+        self.events.append(("invalidate", list(chunk_ids)))
+
+
+def test_reranker_scores_for_deleted_chunks_are_dropped_after_commit(monkeypatch):
+    events = []
+    doc = Document(
+        id=5,
+        filename="a.pdf",
+        content_type="application/pdf",
+        organization_id=7,
+        uploaded_by=1,
+    )
+    monkeypatch.setattr(delete_module.os.path, "exists", lambda p: False)
+
+    DeleteDocumentUseCase(
+        FakeSession(doc, events), rerank_cache=RecordingScoreCache(events)
+    ).execute(document_id=5, user=make_user())
+
+    assert events == ["db-delete", "commit", ("invalidate", [11, 12])]
@@ -0,0 +1,314 @@
+"""Asynchronous ingestion: the web tier saves and enqueues, a worker
+ingests and records stage / chunk progress / failure on the job.
+
+The job store is an in-memory double, the PDF pipeline is monkeypatched —
+what's under test is the contract between enqueue(), the worker use case
+and the job status endpoint.
+"""
+
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.routes.documents as documents_routes
+import app.use_cases.upload_document as upload_module
+from app.api.deps import get_current_user, get_db
+from app.core.config import settings
+from app.core.ratelimit import limiter
+from app.db.models.ingestion_job import IngestionJob
+from app.db.models.user import User
+from app.main import app
+from app.use_cases.ingestion_jobs import (
+    GetIngestionJobUseCase,
+    IngestionJobNotFoundError,
+    RunIngestionJobUseCase,
+)
+from app.use_cases.upload_document import (
+    DocumentQuotaExceededError,
+    EmbeddingStorageError,
+    IngestionUnavailableError,
+    UnreadablePdfError,
+    UploadDocumentUseCase,
+)
+from tests.documents.fakes import InMemoryJobs, UnderQuotaDB
+
+
+class FakeUpload:
+    def __init__(self, data=b"%PDF-1.4 body", filename="report.pdf"):
+        self.file = io.BytesIO(data)
+        self.filename = filename
+        self.content_type = "application/pdf"
+
+
+def make_user(org_id=3, is_admin=True):
+    return User(
+        id=1,
+        email="u@x.com",
+        hashed_password="x",
+        organization_id=org_id,
+        is_active=True,
+        is_admin=is_admin,
+    )
+
+
+# --- enqueue: the request path --------------------------------------------
+
+
+def test_enqueue_saves_records_and_schedules_without_ingesting(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jobs, scheduled = InMemoryJobs(), []
+    use_case = UploadDocumentUseCase(
+        UnderQuotaDB(),
+        embedding_service=None,
+        jobs=jobs,
+        schedule_ingestion=scheduled.append,
+    )
+    monkeypatch.setattr(
+        use_case, "ingest_pdf", lambda **kw: pytest.fail("ingested in-request")
+    )
+
+    accepted = use_case.enqueue(file=FakeUpload(), user=make_user())
+
+    assert accepted == {"job_id": 1, "filename": "report.pdf", "stage": "queued"}
+    assert scheduled == [1]
+    job = jobs.get(job_id=1)
+    assert (tmp_path / job.file_path).read_bytes() == b"%PDF-1.4 body"
+
+
+def test_unschedulable_upload_fails_its_job_and_frees_its_quota(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jobs = InMemoryJobs()
+
+    def broker_down(job_id):
+        raise ConnectionError("broker unreachable")
+
+    use_case = UploadDocumentUseCase(
+        UnderQuotaDB(),
+        embedding_service=None,
+        jobs=jobs,
+        schedule_ingestion=broker_down,
+    )
+
+    with pytest.raises(IngestionUnavailableError):
+        use_case.enqueue(file=FakeUpload(), user=make_user())
+
+    job = jobs.get(job_id=1)
+    assert job.stage == "failed"
+    assert job.error_type == "IngestionUnavailableError"
+    assert not (tmp_path / job.file_path).exists()
+    assert jobs.count_active(organization_id=3) == 0
+
+
+def test_queued_uploads_count_against_the_document_quota(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "MAX_DOCUMENTS_PER_ORG", 3)
+    jobs = InMemoryJobs()
+    use_case = UploadDocumentUseCase(
+        UnderQuotaDB(count=1),
+        embedding_service=None,
+        jobs=jobs,
+        schedule_ingestion=lambda job_id: None,
+    )
+
+    use_case.enqueue(file=FakeUpload(), user=make_user())
+    use_case.enqueue(file=FakeUpload(), user=make_user())
+    with pytest.raises(DocumentQuotaExceededError):  # 1 stored + 2 queued
+        use_case.enqueue(file=FakeUpload(), user=make_user())
+
+
+# --- the worker -------------------------------------------------------------
+
+
+class ScriptedUpload:
+    """UploadDocumentUseCase stand-in: reports progress, then returns a
+    result or raises."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+
+    def ingest_pdf(self, *, file_path, organization_id, uploaded_by, on_progress):
+        self.calls += 1
+        on_progress("extracting", 0)
+        on_progress("embedding", 256)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def queued_job(jobs):
+    return jobs.create(
+        organization_id=3, uploaded_by=1, filename="r.pdf", file_path="r.pdf"
+    )
+
+
+def test_worker_records_progress_and_completion():
+    jobs = InMemoryJobs()
+    job = queued_job(jobs)
+    upload = ScriptedUpload({"id": 42, "chunks_stored": 300})
+
+    RunIngestionJobUseCase(jobs, upload).execute(job_id=job.id)
+
+    assert jobs.progress == [("extracting", 0), ("embedding", 256)]
+    done = jobs.get(job_id=job.id)
+    assert (done.stage, done.document_id, done.chunks_done) == ("done", 42, 300)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [UnreadablePdfError("No readable content found"), EmbeddingStorageError("x")],
+)
+def test_pdf_ingest_errors_are_recorded_on_the_job(error):
+    jobs = InMemoryJobs()
+    job = queued_job(jobs)
+
+    RunIngestionJobUseCase(jobs, ScriptedUpload(error)).execute(job_id=job.id)
+
+    failed = jobs.get(job_id=job.id)
+    assert failed.stage == "failed"
+    assert failed.error_type == type(error).__name__
+    assert failed.error == str(error)
+
+
+def test_unexpected_errors_fail_the_job_and_propagate():
+    jobs = InMemoryJobs()
+    job = queued_job(jobs)
+
+    with pytest.raises(KeyError):
+        RunIngestionJobUseCase(jobs, ScriptedUpload(KeyError("bug"))).execute(
+            job_id=job.id
+        )
+    assert jobs.get(job_id=job.id).error_type == "InternalError"
+
+
+def test_redelivered_finished_job_is_not_ingested_twice():
+    jobs = InMemoryJobs()
+    job = queued_job(jobs)
+    upload = ScriptedUpload({"id": 42, "chunks_stored": 3})
+
+    RunIngestionJobUseCase(jobs, upload).execute(job_id=job.id)
+    RunIngestionJobUseCase(jobs, upload).execute(job_id=job.id)
+
+    assert upload.calls == 1
+
+
+def test_real_ingest_pdf_reports_each_stage(tmp_path, monkeypatch):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-fake")
+    monkeypatch.setattr(upload_module, "iter_pdf_chunks", lambda p: iter(["a", "b"]))
+
+    def store(*, on_batch, chunks, **kwargs):
+        on_batch(len(list(chunks)))
+
+    monkeypatch.setattr(upload_module, "store_embeddings", store)
+
+    class Session(UnderQuotaDB):
+        def add(self, obj):
+            obj.id = 9
+
+        def flush(self):
+            pass
+
+    stages = []
+    UploadDocumentUseCase(Session(), embedding_service=None).ingest_pdf(
+        file_path=str(pdf),
+        organization_id=1,
+        uploaded_by=1,
+        on_progress=lambda stage, n: stages.append((stage, n)),
+    )
+
+    assert stages == [("extracting", 0), ("embedding", 0), ("embedding", 2)]
+
+
+# --- status lookup ----------------------------------------------------------
+
+
+def test_another_orgs_job_reads_as_not_found():
+    jobs = InMemoryJobs()
+    job = queued_job(jobs)  # org 3
+
+    with pytest.raises(IngestionJobNotFoundError):
+        GetIngestionJobUseCase(jobs).execute(job_id=job.id, user=make_user(org_id=4))
+    assert GetIngestionJobUseCase(jobs).execute(job_id=job.id, user=make_user()) == job
+
+
+# --- routes -----------------------------------------------------------------
+
+
+class RouteDB(UnderQuotaDB):
+    """Enough of a Session for DBIngestionJobRepository on the routes."""
+
+    def __init__(self, job=None):
+        super().__init__()
+        self.job = job
+
+    def add(self, row):
+        row.id = 5
+        row.created_at = row.updated_at = None
+        self.job = row
+
+    def commit(self):
+        pass
+
+    def refresh(self, row):
+        pass
+
+    def get(self, model, job_id):
+        return self.job if self.job is not None and self.job.id == job_id else None
+
+
+@pytest.fixture()
+def client_for():
+    def build(db, user):
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_db] = lambda: db
+        limiter.reset()
+        return TestClient(app)
+
+    yield build
+    app.dependency_overrides.clear()
+    limiter.reset()
+
+
+def test_upload_returns_202_with_a_job_id(client_for, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    delayed = []
+    monkeypatch.setattr(
+        documents_routes.ingest_document_task,
+        "delay",
+        lambda job_id: delayed.append(job_id),
+    )
+
+    resp = client_for(RouteDB(), make_user()).post(
+        "/documents/upload",
+        files={"file": ("big.pdf", b"%PDF-1.4 test", "application/pdf")},
+    )
+
+    assert resp.status_code == 202
+    assert resp.json() == {"job_id": 5, "filename": "big.pdf", "stage": "queued"}
+    assert delayed == [5]
+
+
+def test_job_status_endpoint_is_org_scoped(client_for):
+    job = IngestionJob(
+        id=7,
+        organization_id=3,
+        uploaded_by=1,
+        filename="r.pdf",
+        file_path="uploads/org_3/r.pdf",
+        stage="embedding",
+        chunks_done=512,
+        document_id=None,
+        error_type=None,
+        error=None,
+    )
+
+    resp = client_for(RouteDB(job), make_user(is_admin=False)).get("/documents/jobs/7")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["stage"], body["chunks_done"]) == ("embedding", 512)
+    assert "file_path" not in body  # server paths never leave the API
+
+    other_org = client_for(RouteDB(job), make_user(org_id=4))
+    assert other_org.get("/documents/jobs/7").status_code == 404
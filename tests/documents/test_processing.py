@@ -2,7 +2,12 @@
 
 import pytest
 
-from app.services.document_processing import chunk_text, normalize_text
+from app.services.document_processing import (
+    chunk_text,
+    iter_chunks,
+    iter_normalized_text,
+    normalize_text,
+)
 
 
 def test_chunk_text_never_emits_empty_chunks():
@@ -35,3 +40,33 @@ def test_normalize_output_is_single_line():
     result = normalize_text(raw)
     assert "\n" not in result
     assert "  " not in result
+
+
+def test_streamed_pages_chunk_exactly_like_the_joined_text():
+    # Overlap windows straddle page boundaries; whitespace at the seams
+    # (and an empty page) must collapse just as in the joined document.
+    pages = [
+        "First page ends mid\nsentence ",
+        "",
+        "  and the second page  continues it. " * 7,
+        "\nThird.\n",
+    ]
+    whole = chunk_text(normalize_text("\n".join(pages)), chunk_size=40, overlap=15)
+
+    streamed = list(iter_chunks(iter_normalized_text(pages), chunk_size=40, overlap=15))
+
+    assert streamed == whole
+
+
+def test_chunks_are_yielded_before_later_pages_are_read():
+    pages_read = []
+
+    def pages():
+        for i in range(100):
+            pages_read.append(i)
+            yield "word " * 50
+
+    first = next(iter_chunks(iter_normalized_text(pages()), chunk_size=100, overlap=20))
+
+    assert first.startswith("word")
+    assert len(pages_read) == 1  # not the whole document
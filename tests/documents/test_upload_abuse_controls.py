@@ -71,10 +71,10 @@ def test_faq_generation_is_capped_to_max_chunks(monkeypatch):
     chunks = [f"chunk-{i}" for i in range(50)]
     scheduled = {}
 
-    monkeypatch.setattr(upload_module, "extract_text_from_pdf", lambda p: "raw")
-    monkeypatch.setattr(upload_module, "normalize_text", lambda t: t)
-    monkeypatch.setattr(upload_module, "chunk_text", lambda t: chunks)
-    monkeypatch.setattr(upload_module, "store_embeddings", lambda **kw: None)
+    monkeypatch.setattr(upload_module, "iter_pdf_chunks", lambda p: iter(chunks))
+    monkeypatch.setattr(
+        upload_module, "store_embeddings", lambda **kw: list(kw["chunks"])
+    )
     monkeypatch.setattr(upload_module.os, "remove", lambda p: None)
 
     class Doc:
@@ -85,10 +85,7 @@ def test_faq_generation_is_capped_to_max_chunks(monkeypatch):
         def add(self, obj):
             pass
 
-        def commit(self):
-            pass
-
-        def refresh(self, obj):
+        def flush(self):
             pass
 
     use_case = UploadDocumentUseCase(
@@ -97,6 +94,9 @@ def test_faq_generation_is_capped_to_max_chunks(monkeypatch):
         schedule_faq_generation=lambda c, d, o: scheduled.update(chunks=c),
     )
     monkeypatch.setattr(upload_module, "Document", lambda **kw: Doc())
+    # No file on disk and no prior copy: skip the content-hash dedup.
+    monkeypatch.setattr(upload_module, "file_sha256", lambda p: "0" * 64)
+    monkeypatch.setattr(use_case, "_find_by_hash", lambda org_id, h: None)
 
     use_case.ingest_pdf(file_path="x.pdf", organization_id=7, uploaded_by=1)
 
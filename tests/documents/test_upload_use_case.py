@@ -2,13 +2,17 @@
 
 Pure unit tests — the PDF text pipeline and embedding store are
 monkeypatched, the DB session is a fake. What's under test is the use
-case's contract: failures delete the file (and the row, if created),
+case's contract: failures delete the file (and roll back the row),
 success reports chunks and fires the injected scheduler exactly once.
 """
 
+import hashlib
+
 import pytest
 
 import app.use_cases.upload_document as upload_module
+from tests.documents.fakes import UnderQuotaDB
+from app.db.models.document import Document
 from app.use_cases.upload_document import (
     EmbeddingStorageError,
     UnreadablePdfError,
@@ -16,22 +20,21 @@ from app.use_cases.upload_document import (
 )
 
 
-class FakeSession:
-    def __init__(self):
+class FakeSession(UnderQuotaDB):
+    def __init__(self, existing=None):
+        super().__init__(existing=existing)
         self.added = []
-        self.deleted = []
+        self.rolled_back = False
 
     def add(self, obj):
         self.added.append(obj)
 
-    def delete(self, obj):
-        self.deleted.append(obj)
-
-    def commit(self):
-        pass
+    def flush(self):
+        for obj in self.added:
+            obj.id = 42
 
-    def refresh(self, obj):
-        obj.id = 42
+    def rollback(self):
+        self.rolled_back = True
 
 
 class FakeEmbeddingService:
@@ -46,16 +49,19 @@ def make_pdf(tmp_path):
 
 
 def patch_pipeline(monkeypatch, chunks):
-    monkeypatch.setattr(upload_module, "extract_text_from_pdf", lambda path: "raw")
-    monkeypatch.setattr(upload_module, "normalize_text", lambda text: "clean")
-    monkeypatch.setattr(upload_module, "chunk_text", lambda text: chunks)
+    monkeypatch.setattr(upload_module, "iter_pdf_chunks", lambda path: iter(chunks))
+
+
+def consume_store(**kwargs):
+    """store_embeddings stand-in: drains the chunk stream like the real one."""
+    return len(list(kwargs["chunks"]))
 
 
 def test_unreadable_pdf_raises_and_removes_file(tmp_path, monkeypatch):
     pdf = make_pdf(tmp_path)
     monkeypatch.setattr(
         upload_module,
-        "extract_text_from_pdf",
+        "iter_pdf_chunks",
         lambda path: (_ for _ in ()).throw(ValueError("bad pdf")),
     )
     use_case = UploadDocumentUseCase(
@@ -93,13 +99,13 @@ def test_embedding_failure_rolls_back_row_and_file(tmp_path, monkeypatch):
     with pytest.raises(EmbeddingStorageError):
         use_case.ingest_pdf(file_path=str(pdf), organization_id=1, uploaded_by=1)
     assert not pdf.exists()  # no orphaned file
-    assert db.deleted == db.added  # the Document row did not survive
+    assert db.rolled_back  # the Document row never committed
 
 
 def test_success_fires_injected_scheduler(tmp_path, monkeypatch):
     pdf = make_pdf(tmp_path)
     patch_pipeline(monkeypatch, chunks=["c1", "c2", "c3"])
-    monkeypatch.setattr(upload_module, "store_embeddings", lambda **kwargs: None)
+    monkeypatch.setattr(upload_module, "store_embeddings", consume_store)
 
     calls = []
     use_case = UploadDocumentUseCase(
@@ -118,10 +124,26 @@ def test_success_fires_injected_scheduler(tmp_path, monkeypatch):
     assert pdf.exists()
 
 
+def test_success_schedules_the_org_vector_index_check(tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path)
+    patch_pipeline(monkeypatch, chunks=["c1"])
+    monkeypatch.setattr(upload_module, "store_embeddings", consume_store)
+
+    orgs = []
+    use_case = UploadDocumentUseCase(
+        FakeSession(),
+        embedding_service=FakeEmbeddingService(),
+        schedule_vector_index=orgs.append,
+    )
+    use_case.ingest_pdf(file_path=str(pdf), organization_id=7, uploaded_by=1)
+
+    assert orgs == [7]
+
+
 def test_bulk_mode_none_scheduler_schedules_nothing(tmp_path, monkeypatch):
     pdf = make_pdf(tmp_path)
     patch_pipeline(monkeypatch, chunks=["c1"])
-    monkeypatch.setattr(upload_module, "store_embeddings", lambda **kwargs: None)
+    monkeypatch.setattr(upload_module, "store_embeddings", consume_store)
 
     use_case = UploadDocumentUseCase(
         FakeSession(),
@@ -130,3 +152,67 @@ def test_bulk_mode_none_scheduler_schedules_nothing(tmp_path, monkeypatch):
     )
     result = use_case.ingest_pdf(file_path=str(pdf), organization_id=1, uploaded_by=1)
     assert result["chunks_stored"] == 1  # and no AttributeError from a None call
+
+
+def test_page_failure_mid_stream_rolls_back_as_unreadable(tmp_path, monkeypatch):
+    """Chunks stream while storing, so a bad page can surface after the
+    Document row was flushed — it must still roll back and read as an
+    unreadable PDF, not an embedding failure."""
+    pdf = make_pdf(tmp_path)
+
+    def chunks_then_bad_page(path):
+        yield "c1"
+        yield "c2"
+        raise ValueError("bad page 7")
+
+    monkeypatch.setattr(upload_module, "iter_pdf_chunks", chunks_then_bad_page)
+    monkeypatch.setattr(upload_module, "store_embeddings", consume_store)
+    db = FakeSession()
+    use_case = UploadDocumentUseCase(db, embedding_service=FakeEmbeddingService())
+
+    with pytest.raises(UnreadablePdfError):
+        use_case.ingest_pdf(file_path=str(pdf), organization_id=1, uploaded_by=1)
+    assert db.rolled_back
+    assert not pdf.exists()
+
+
+def test_new_document_records_the_file_hash(tmp_path, monkeypatch):
+    pdf = make_pdf(tmp_path)
+    patch_pipeline(monkeypatch, chunks=["c1"])
+    monkeypatch.setattr(upload_module, "store_embeddings", consume_store)
+    db = FakeSession()
+
+    UploadDocumentUseCase(db, embedding_service=FakeEmbeddingService()).ingest_pdf(
+        file_path=str(pdf), organization_id=1, uploaded_by=1
+    )
+
+    assert db.added[0].content_hash == hashlib.sha256(b"%PDF-fake").hexdigest()
+
+
+def test_identical_file_resolves_to_the_existing_document(tmp_path, monkeypatch):
+    """Re-uploading the same bytes must not parse, embed or store anything:
+    the new copy is deleted and the org's existing document returned."""
+    pdf = make_pdf(tmp_path)
+    monkeypatch.setattr(
+        upload_module, "iter_pdf_chunks", lambda p: pytest.fail("re-parsed")
+    )
+    existing = Document(id=5, filename="doc.pdf", organization_id=1)
+    db = FakeSession(existing=existing)
+    calls = []
+    use_case = UploadDocumentUseCase(
+        db,
+        embedding_service=FakeEmbeddingService(),
+        schedule_faq_generation=lambda *a: calls.append(a),
+    )
+
+    result = use_case.ingest_pdf(file_path=str(pdf), organization_id=1, uploaded_by=1)
+
+    assert result == {
+        "id": 5,
+        "filename": "doc.pdf",
+        "organization_id": 1,
+        "chunks_stored": 0,
+        "duplicate": True,
+    }
+    assert not pdf.exists()
+    assert db.added == [] and calls == []
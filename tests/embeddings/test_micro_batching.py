@@ -0,0 +1,85 @@
+"""Micro-batching embedder: concurrent queries share one encode, and each
+caller still gets its own vector back."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.infrastructure.embeddings.batcher import MicroBatchingEmbeddingService
+
+
+class SlowBatchEmbedder:
+    """embed_texts takes a while, like a real forward pass, and records
+    every batch it was handed."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+
+    def embed_texts(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return np.array([[float(len(t))] for t in texts], dtype=np.float32)
+
+
+def run_concurrently(fn, args):
+    results = {}
+
+    def call(arg):
+        results[arg] = fn(arg)
+
+    threads = [threading.Thread(target=call, args=(a,)) for a in args]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results
+
+
+def test_concurrent_queries_are_coalesced():
+    inner = SlowBatchEmbedder()
+    batcher = MicroBatchingEmbeddingService(inner, max_batch_size=64, max_wait_ms=20)
+    texts = ["x" * n for n in range(1, 21)]
+
+    results = run_concurrently(batcher.embed_query, texts)
+
+    # every caller got the vector for ITS text, not a neighbour's
+    assert {t: v.tolist() for t, v in results.items()} == {
+        t: [float(len(t))] for t in texts
+    }
+    assert all(v.dtype == np.float32 and v.base is None for v in results.values())
+    assert sum(len(b) for b in inner.batches) == 20
+    assert len(inner.batches) < 20  # fewer forward passes than requests
+    snap = batcher.stats()["batch_size"]
+    assert snap["count"] == len(inner.batches)
+
+
+def test_batch_size_is_capped():
+    inner = SlowBatchEmbedder()
+    batcher = MicroBatchingEmbeddingService(inner, max_batch_size=4, max_wait_ms=20)
+
+    run_concurrently(batcher.embed_query, [str(i) for i in range(12)])
+
+    assert max(len(b) for b in inner.batches) <= 4
+
+
+def test_encoder_failure_reaches_every_waiter():
+    class Broken:
+        def embed_texts(self, texts):
+            raise RuntimeError("model crashed")
+
+    batcher = MicroBatchingEmbeddingService(Broken(), max_wait_ms=0)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.embed_query("q")
+    # the worker thread survives and serves the next call
+    with pytest.raises(RuntimeError):
+        batcher.embed_query("q2")
+
+
+def test_embed_texts_bypasses_the_queue():
+    inner = SlowBatchEmbedder(delay=0)
+    batcher = MicroBatchingEmbeddingService(inner)
+    assert batcher.embed_texts(["ab", "c"]).tolist() == [[2.0], [1.0]]
+    assert batcher._thread is None  # no worker started for ingestion
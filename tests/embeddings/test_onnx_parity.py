@@ -0,0 +1,105 @@
+"""ONNX backend: pooling math (always runs) and cosine parity with the
+torch backend (runs where onnxruntime and the model are available)."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.infrastructure.embeddings.onnx_embedder import OnnxEmbeddingService
+
+GOLDEN_PATH = Path(__file__).resolve().parents[2] / "evals" / "golden_qa.jsonl"
+
+
+class FakeTokenizer:
+    """Two texts; the second is one real token plus one pad."""
+
+    def __call__(self, texts, **kwargs):
+        return {
+            "input_ids": np.array([[1, 2], [3, 0]]),
+            "attention_mask": np.array([[1, 1], [1, 0]]),
+        }
+
+
+class FakeSession:
+    def __init__(self, token_embeddings):
+        self.token_embeddings = token_embeddings
+
+    def run(self, outputs, feeds):
+        assert set(feeds) == {"input_ids", "attention_mask"}
+        assert all(v.dtype == np.int64 for v in feeds.values())
+        return [self.token_embeddings]
+
+
+def test_mean_pooling_ignores_padding_and_normalizes():
+    svc = OnnxEmbeddingService.__new__(OnnxEmbeddingService)
+    svc.tokenizer = FakeTokenizer()
+    svc.input_names = {"input_ids", "attention_mask"}
+    svc.session = FakeSession(
+        np.array(
+            [
+                [[3.0, 0.0], [1.0, 0.0]],  # mean [2, 0]
+                [[0.0, 5.0], [9.0, 9.0]],  # pad token must not count
+            ],
+            dtype=np.float32,
+        )
+    )
+
+    vectors = svc.embed_texts(["a b", "c"])
+
+    assert vectors.dtype == np.float32
+    assert vectors.tolist() == [[1.0, 0.0], [0.0, 1.0]]
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    from app.composition import singletons
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "tensorflow")
+    with pytest.raises(RuntimeError, match="EMBEDDING_BACKEND"):
+        singletons._build_embedding_backend()
+
+
+# --- parity against the torch backend ---------------------------------------
+
+
+def _sample_texts() -> list[str]:
+    items = [json.loads(line) for line in GOLDEN_PATH.read_text().splitlines()]
+    questions = [i["question"] for i in items[:40]]
+    # long inputs exercise truncation at the 256-token limit
+    long_text = " ".join(i["answer"] for i in items[:60])
+    return questions + [long_text]
+
+
+@pytest.fixture(scope="module")
+def torch_vectors():
+    pytest.importorskip("onnxruntime")
+    from app.infrastructure.embeddings.sentence_transformer import (
+        SentenceTransformerEmbeddingService,
+    )
+
+    try:
+        svc = SentenceTransformerEmbeddingService()
+    except OSError as exc:  # offline: model not cached
+        pytest.skip(f"MiniLM unavailable: {exc}")
+    return svc.embed_texts(_sample_texts())
+
+
+def _onnx_vectors(quantize: bool) -> np.ndarray:
+    try:
+        svc = OnnxEmbeddingService(quantize=quantize)
+    except OSError as exc:
+        pytest.skip(f"ONNX export unavailable: {exc}")
+    return svc.embed_texts(_sample_texts())
+
+
+def test_onnx_fp32_matches_torch(torch_vectors):
+    cosines = (torch_vectors * _onnx_vectors(quantize=False)).sum(axis=1)
+    assert cosines.min() > 0.9999
+
+
+def test_onnx_int8_stays_close_to_torch(torch_vectors):
+    cosines = (torch_vectors * _onnx_vectors(quantize=True)).sum(axis=1)
+    assert cosines.mean() > 0.98
+    assert cosines.min() > 0.95
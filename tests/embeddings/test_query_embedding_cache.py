@@ -0,0 +1,127 @@
+"""Query-embedding memo: normalization, byte-bounded LRU, Redis tier.
+
+The inner embedder is a counting fake, so the tests can assert exactly
+when the (expensive) model would have run.
+"""
+
+import numpy as np
+import pytest
+
+from app.infrastructure.embeddings.query_cache import (
+    QueryEmbeddingCache,
+    normalize_query,
+)
+
+DIM = 4
+ENTRY_BYTES = DIM * 4 + 1 + 200  # float32 vector + 1-char key + overhead
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.queries = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return np.full(DIM, float(len(text)), dtype=np.float32)
+
+    def embed_texts(self, texts):
+        return np.zeros((len(texts), DIM), dtype=np.float32)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+class DownRedis:
+    def get(self, key):
+        raise ConnectionError("redis down")
+
+    def setex(self, key, ttl, value):
+        raise ConnectionError("redis down")
+
+
+def make_cache(inner, **kwargs):
+    kwargs.setdefault("max_bytes", 1024 * 1024)
+    return QueryEmbeddingCache(inner, namespace="test-model", **kwargs)
+
+
+def test_normalization_folds_case_and_whitespace():
+    assert normalize_query("  What is\tACME?\n") == "what is acme?"
+
+
+def test_repeat_query_skips_the_model():
+    inner = CountingEmbedder()
+    cache = make_cache(inner)
+
+    first = cache.embed_query("What is Acme?")
+    second = cache.embed_query("what is  acme?")
+
+    np.testing.assert_array_equal(first, second)
+    assert inner.queries == ["What is Acme?"]  # the key is normalized, not the text
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_is_bounded_by_bytes():
+    inner = CountingEmbedder()
+    cache = make_cache(inner, max_bytes=2 * ENTRY_BYTES)
+
+    cache.embed_query("a")
+    cache.embed_query("b")
+    cache.embed_query("a")  # refresh a; b is now least recent
+    cache.embed_query("c")  # over budget: b evicted
+
+    assert cache.stats()["bytes"] <= 2 * ENTRY_BYTES
+    cache.embed_query("a")
+    cache.embed_query("b")
+    assert inner.queries == ["a", "b", "c", "b"]
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_redis_tier_is_shared_between_workers():
+    redis = FakeRedis()
+    worker_1, worker_2 = CountingEmbedder(), CountingEmbedder()
+
+    make_cache(worker_1, redis_client=redis).embed_query("shared question")
+    cache_2 = make_cache(worker_2, redis_client=redis)
+    vector = cache_2.embed_query("Shared question")
+
+    assert worker_2.queries == []  # served from the other worker's encode
+    assert vector.tolist() == [float(len("shared question"))] * DIM
+    assert cache_2.stats()["redis_hits"] == 1
+
+
+def test_redis_outage_falls_back_to_local_encoding():
+    inner = CountingEmbedder()
+    cache = make_cache(inner, redis_client=DownRedis())
+
+    assert cache.embed_query("q").tolist() == [1.0] * DIM
+    assert cache.embed_query("q").tolist() == [1.0] * DIM  # tier 1 still works
+    assert inner.queries == ["q"]
+    assert cache.stats()["redis_errors"] == 2
+
+
+def test_embed_texts_passes_through_uncached():
+    inner = CountingEmbedder()
+    cache = make_cache(inner)
+    assert cache.embed_texts(["x", "y"]).shape == (2, DIM)
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_vector_is_shared_read_only_float32():
+    cache = make_cache(CountingEmbedder())
+
+    vector = cache.embed_query("q")
+
+    assert vector.dtype == np.float32
+    assert cache.embed_query("q") is vector  # no per-hit copy or list
+    with pytest.raises(ValueError):
+        vector[0] = 0.0
@@ -0,0 +1,116 @@
+"""The async adapters the chat routes use must send the same requests as
+the sync ones, and the factory must pick the async twin of the
+configured provider. Fake clients capture the kwargs — no network."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.llm.anthropic_llm import AsyncAnthropicLLMService
+from app.infrastructure.llm.openai_compatible import (
+    AsyncOpenAICompatibleLLMService,
+)
+
+
+def _chunk(text):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]
+    )
+
+
+class _AsyncCompletions:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("stream"):
+
+            async def stream():
+                # a keep-alive chunk with no choices must be skipped
+                yield SimpleNamespace(choices=[])
+                for text in ("Acme ", "makes SaaS.", "\nCONFIDENCE: HIGH"):
+                    yield _chunk(text)
+
+            return stream()
+        message = SimpleNamespace(content='{"answer": "ok", "confidence": "high"}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _openai_service():
+    svc = AsyncOpenAICompatibleLLMService.__new__(AsyncOpenAICompatibleLLMService)
+    svc.client = SimpleNamespace(chat=SimpleNamespace(completions=_AsyncCompletions()))
+    svc.model = "test-model"
+    svc.temperature = 0.1
+    svc.max_tokens = 256
+    return svc
+
+
+@pytest.mark.anyio
+async def test_openai_grounded_answer_is_awaited():
+    svc = _openai_service()
+    result = await svc.generate_grounded_answer(question="q", context="c")
+    assert result.answer == "ok" and result.confidence == "high"
+    assert svc.client.chat.completions.calls[-1]["max_tokens"] == 256
+
+
+@pytest.mark.anyio
+async def test_openai_stream_yields_fragments():
+    svc = _openai_service()
+    fragments = [f async for f in svc.stream_grounded_answer(question="q", context="c")]
+    assert "".join(fragments) == "Acme makes SaaS.\nCONFIDENCE: HIGH"
+    assert svc.client.chat.completions.calls[-1]["stream"] is True
+
+
+class _AnthropicStream:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for text in ("Acme ", "makes SaaS."):
+            yield text
+
+
+@pytest.mark.anyio
+async def test_anthropic_stream_yields_fragments():
+    svc = AsyncAnthropicLLMService.__new__(AsyncAnthropicLLMService)
+    calls = []
+
+    def stream(**kwargs):
+        calls.append(kwargs)
+        return _AnthropicStream()
+
+    svc.client = SimpleNamespace(messages=SimpleNamespace(stream=stream))
+    svc.model, svc.temperature, svc.max_tokens = "test-model", 0.1, 300
+
+    fragments = [f async for f in svc.stream_grounded_answer(question="q", context="c")]
+    assert fragments == ["Acme ", "makes SaaS."]
+    assert calls[-1]["max_tokens"] == 300
+
+
+def test_factory_builds_the_async_twin(monkeypatch):
+    from app.core.config import settings
+    from app.infrastructure.llm import factory
+
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "groq")
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "LLM_MAX_TOKENS", 288)
+
+    svc = factory.build_async_llm_service()
+    assert isinstance(svc, AsyncOpenAICompatibleLLMService)
+    assert svc.max_tokens == 288
+    assert str(svc.client.base_url).startswith("https://api.groq.com")
+
+
+def test_factory_async_anthropic(monkeypatch):
+    from app.core.config import settings
+    from app.infrastructure.llm import factory
+
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "anthropic")
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "test-key")
+
+    assert isinstance(factory.build_async_llm_service(), AsyncAnthropicLLMService)
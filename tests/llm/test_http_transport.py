@@ -0,0 +1,127 @@
+"""LLM HTTP transport: the pooled clients keep connections alive (counted
+through httpcore's trace events against a local keep-alive server), take
+their timeouts from Settings, and reach the SDK clients."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.infrastructure.llm.anthropic_llm import AnthropicLLMService
+from app.infrastructure.llm.http_transport import (
+    LLMTransportStats,
+    build_async_http_client,
+    build_http_client,
+)
+from app.infrastructure.llm.openai_compatible import (
+    AsyncOpenAICompatibleLLMService,
+    OpenAICompatibleLLMService,
+)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keeps the connection open between requests
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def make_stats():
+    return LLMTransportStats(max_connections=10, http2=False)
+
+
+def test_sequential_requests_reuse_one_connection(server_url):
+    stats = make_stats()
+    with build_http_client(stats) as client:
+        for _ in range(3):
+            assert client.get(server_url).text == "ok"
+
+    snapshot = stats.stats()
+    assert snapshot["requests"] == 3
+    assert snapshot["new_connections"] == 1
+    assert snapshot["tls_handshakes"] == 0  # plain http
+    assert snapshot["connection_reuse_rate"] == pytest.approx(2 / 3, abs=1e-4)
+    assert snapshot["in_flight"] == 0
+    assert snapshot["in_flight_at_start"]["count"] == 3
+
+
+@pytest.mark.anyio
+async def test_async_client_is_counted_too(server_url):
+    stats = make_stats()
+    async with build_async_http_client(stats) as client:
+        for _ in range(2):
+            assert (await client.get(server_url)).text == "ok"
+
+    assert stats.stats()["requests"] == 2
+    assert stats.stats()["new_connections"] == 1
+
+
+def test_trace_events_are_classified():
+    stats = make_stats()
+    for event in (
+        "connection.connect_tcp.started",
+        "connection.connect_tcp.complete",
+        "connection.start_tls.complete",
+        "http2.send_request_headers.started",
+        "http2.send_request_headers.started",  # multiplexed on one connection
+        "http2.response_closed.complete",
+        "connection.connect_tcp.failed",
+    ):
+        stats.trace(event, {})
+
+    snapshot = stats.stats()
+    assert snapshot["new_connections"] == 1
+    assert snapshot["tls_handshakes"] == 1
+    assert snapshot["connect_failures"] == 1
+    assert snapshot["http2_requests"] == 2
+    assert snapshot["peak_in_flight"] == 2
+    assert snapshot["in_flight"] == 1
+
+
+def test_timeouts_come_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HTTP_CONNECT_TIMEOUT_SECONDS", 2.5)
+    monkeypatch.setattr(settings, "LLM_HTTP_READ_TIMEOUT_SECONDS", 45.0)
+
+    with build_http_client(make_stats()) as client:
+        assert client.timeout.connect == 2.5
+        assert client.timeout.read == 45.0
+
+
+@pytest.mark.parametrize(
+    "adapter, build",
+    [
+        (OpenAICompatibleLLMService, build_http_client),
+        (AsyncOpenAICompatibleLLMService, build_async_http_client),
+        (AnthropicLLMService, build_http_client),
+    ],
+)
+def test_adapters_send_through_the_shared_client(adapter, build):
+    http_client = build(make_stats())
+    try:
+        svc = adapter(api_key="k", model="m", http_client=http_client)
+    except TypeError as exc:
+        if "httpx2" not in str(exc):
+            raise
+        pytest.skip("installed SDK is built on httpx2, not the pinned httpx")
+
+    assert svc.client._client is http_client
+    # the SDK would otherwise keep its own 10-minute timeout
+    assert svc.client.timeout == http_client.timeout
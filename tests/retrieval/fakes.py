@@ -0,0 +1,55 @@
+import struct
+
+import numpy as np
+
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+
+
+def copy_stream(ids, document_ids, organization_ids, vectors) -> bytes:
+    """What COPY (SELECT id, document_id, organization_id, embedding ...)
+    TO STDOUT WITH (FORMAT binary) sends for these rows."""
+    vectors = np.asarray(vectors, dtype=">f4")
+    dim = vectors.shape[1]
+    out = [COPY_HEADER]
+    for row_id, doc, org, vector in zip(ids, document_ids, organization_ids, vectors):
+        out.append(struct.pack(">hiiiiii", 4, 4, row_id, 4, doc, 4, org))
+        out.append(struct.pack(">ihh", 4 + 4 * dim, dim, 0))
+        out.append(vector.tobytes())
+    out.append(COPY_TRAILER)
+    return b"".join(out)
+
+
+def chunked(data: bytes, size: int):
+    """A copy_out callable feeding `data` to the sink `size` bytes at a
+    time, as psycopg2 does in arbitrary blocks."""
+
+    def copy_out(sink):
+        for start in range(0, len(data), size):
+            sink.write(data[start : start + size])
+
+    return copy_out
+
+
+class RecordingDB:
+    """Session double that records (sql, params) for every statement and
+    returns no rows. A scalar lookup, such as the org's compact-index
+    check, answers `index_valid` (True: the org has an index in the form
+    asked for)."""
+
+    def __init__(self, index_valid=True):
+        self.statements = []
+        self.index_valid = index_valid
+
+    def execute(self, sql, params=None):
+        self.statements.append((str(sql), params))
+        index_valid = self.index_valid
+
+        class _Result:
+            def fetchall(self_inner):
+                return []
+
+            def scalar(self_inner):
+                return index_valid
+
+        return _Result()
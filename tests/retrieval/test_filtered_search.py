@@ -0,0 +1,130 @@
+"""Filtered (document_ids) dense search: iterative scans are requested
+only for filtered searches, and a short result is counted, then
+re-ranked exactly only when the filter lost rows and the filtered set is
+small enough."""
+
+import numpy as np
+import pytest
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.services.embedding_service import (
+    _short_result_plan,
+    async_similarity_search,
+    similarity_search,
+)
+
+QUERY = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+
+
+class ScriptedDB:
+    """Answers searches from `results` in order, and the count with
+    `filtered_rows`."""
+
+    def __init__(self, *results, filtered_rows=0):
+        self.results = list(results)
+        self.filtered_rows = filtered_rows
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        sql = str(sql)
+        self.statements.append(sql)
+        rows = self.results.pop(0) if "ORDER BY" in sql else []
+        filtered_rows = self.filtered_rows
+
+        class _Result:
+            def fetchall(self_inner):
+                return rows
+
+            def scalar(self_inner):
+                return filtered_rows
+
+        return _Result()
+
+    def searches(self):
+        return [s for s in self.statements if "ORDER BY" in s]
+
+
+class AsyncScriptedDB(ScriptedDB):
+    async def execute(self, sql, params=None):
+        return ScriptedDB.execute(self, sql, params)
+
+
+def rows(n):
+    return [SimpleNamespace(id=i) for i in range(n)]
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(settings, "HNSW_EF_SEARCH", None)
+    monkeypatch.setattr(settings, "HNSW_ITERATIVE_SCAN", "strict_order")
+    monkeypatch.setattr(settings, "FILTERED_EXACT_SCAN_MAX_ROWS", 1000)
+
+
+def search(db, **kwargs):
+    return similarity_search(
+        db, organization_id=1, query_embedding=QUERY, limit=5, **kwargs
+    )
+
+
+def test_unfiltered_search_is_one_statement_even_when_short():
+    db = ScriptedDB(rows(2))
+    assert len(search(db)) == 2
+    assert len(db.statements) == 1
+
+
+def test_filtered_search_requests_an_iterative_scan_first():
+    db = ScriptedDB(rows(5))
+    search(db, document_ids=[3])
+    set_sql, search_sql = db.statements
+    assert "set_config('hnsw.iterative_scan', :mode, true)" in set_sql
+    assert "ORDER BY de.embedding <#>" in search_sql
+
+
+def test_iterative_scan_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(settings, "HNSW_ITERATIVE_SCAN", None)
+    db = ScriptedDB(rows(5))
+    search(db, document_ids=[3])
+    assert len(db.statements) == 1
+
+
+def test_short_result_over_a_small_set_is_reranked_exactly():
+    db = ScriptedDB(rows(2), rows(5), filtered_rows=40)
+    assert len(search(db, document_ids=[3])) == 5
+    hnsw, exact = db.searches()
+    assert "ORDER BY de.embedding <#>" in hnsw
+    # Ordered by the reported distance, which no index can serve.
+    assert "ORDER BY distance" in exact
+
+
+def test_short_result_that_is_the_whole_set_is_kept():
+    db = ScriptedDB(rows(2), filtered_rows=2)
+    assert len(search(db, document_ids=[3])) == 2
+    assert len(db.searches()) == 1
+
+
+def test_plans():
+    assert _short_result_plan(found=2, limit=5, filtered_rows=2) == "complete"
+    assert _short_result_plan(found=2, limit=5, filtered_rows=1000) == "exact"
+    assert _short_result_plan(found=2, limit=5, filtered_rows=1001) == "short"
+
+
+def test_too_large_a_set_returns_the_short_result_and_warns(caplog):
+    db = ScriptedDB(rows(2), filtered_rows=1001)
+    with caplog.at_level("INFO", logger="app.services.embedding_service"):
+        assert len(search(db, document_ids=[3])) == 2
+    assert len(db.searches()) == 1
+    (record,) = caplog.records
+    assert record.levelname == "WARNING"
+    assert "2/5 rows" in record.getMessage()
+    assert "filtered rows=>1000" in record.getMessage()
+
+
+@pytest.mark.anyio
+async def test_async_search_falls_back_the_same_way():
+    db = AsyncScriptedDB(rows(1), rows(5), filtered_rows=9)
+    found = await async_similarity_search(
+        db, organization_id=1, query_embedding=QUERY, limit=5, document_ids=[3]
+    )
+    assert len(found) == 5
+    assert "ORDER BY distance" in db.searches()[-1]
@@ -0,0 +1,100 @@
+"""HNSW tuning: hnsw.ef_search is set per transaction, only when the
+server default would not serve the query, and never below the number
+of rows asked for; the index build parameters reach the DDL of the
+per-tenant partial indexes."""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.db.hnsw import (
+    HNSW_INDEX_NAME,
+    TENANT_INDEX_PREFIX,
+    search_ef_search,
+    tenant_index_ddl,
+)
+from app.db.models.embedding import DocumentEmbedding
+from app.services.embedding_service import hybrid_search, similarity_search
+from tests.retrieval.fakes import RecordingDB
+
+QUERY = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+
+
+def test_ef_search_resolution():
+    assert search_ef_search(limit=5, ef_search=None) is None  # server default
+    assert search_ef_search(limit=100, ef_search=None) == 100  # default too small
+    assert search_ef_search(limit=5, ef_search=200) == 200
+    assert search_ef_search(limit=50, ef_search=20) == 50  # never below limit
+
+
+def test_default_search_sends_no_set(monkeypatch):
+    monkeypatch.setattr(settings, "HNSW_EF_SEARCH", None)
+    db = RecordingDB()
+    similarity_search(db, organization_id=1, query_embedding=QUERY, limit=5)
+    assert len(db.statements) == 1
+
+
+def test_per_call_ef_search_is_set_local_before_the_search(monkeypatch):
+    monkeypatch.setattr(settings, "HNSW_EF_SEARCH", 64)
+    db = RecordingDB()
+    similarity_search(
+        db, organization_id=1, query_embedding=QUERY, limit=5, ef_search=200
+    )
+
+    (set_sql, set_params), (search_sql, _) = db.statements
+    assert "set_config('hnsw.ef_search', :ef_search, true)" in set_sql
+    assert set_params == {"ef_search": "200"}  # the argument beats settings
+    assert "ORDER BY de.embedding <#>" in search_sql
+
+
+def test_hybrid_sizes_ef_search_to_the_candidate_pool(monkeypatch):
+    monkeypatch.setattr(settings, "HNSW_EF_SEARCH", 16)
+    db = RecordingDB()
+    hybrid_search(
+        db,
+        organization_id=1,
+        query_embedding=QUERY,
+        query_text="krona",
+        limit=5,
+        candidates=60,
+    )
+    assert db.statements[0][1] == {"ef_search": "60"}
+
+
+def test_model_declares_no_global_vector_index():
+    # Replaced by runtime per-tenant partial indexes (migration 9e4c7a2d5b18).
+    names = {i.name for i in DocumentEmbedding.__table__.indexes}
+    assert HNSW_INDEX_NAME not in names
+    assert not any(n.startswith(TENANT_INDEX_PREFIX) for n in names)
+
+
+def test_tenant_index_ddl():
+    assert tenant_index_ddl(7, m=32, ef_construction=128) == (
+        f"CREATE INDEX {TENANT_INDEX_PREFIX}7 ON document_embeddings "
+        "USING hnsw (embedding vector_ip_ops) "
+        "WITH (m = 32, ef_construction = 128) "
+        "WHERE organization_id = 7"
+    )
+    online = tenant_index_ddl(7, concurrently=True, if_not_exists=True)
+    assert online.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ")
+    assert "WITH (m = 16, ef_construction = 64)" in online
+
+
+def test_tenant_index_ddl_only_takes_integer_org_ids():
+    # The org id is inlined into DDL, so it must never be free text.
+    with pytest.raises(ValueError):
+        tenant_index_ddl("1; DROP TABLE users")
+
+
+def test_distance_is_still_reported_in_l2_units():
+    db = RecordingDB()
+    similarity_search(db, organization_id=1, query_embedding=QUERY, limit=5)
+    ((sql, _),) = db.statements
+    # |a - b| for unit vectors, from the negative inner product the
+    # vector_ip_ops index orders by.
+    assert "sqrt(GREATEST(2 + 2 * (de.embedding <#>" in sql
+    assert "<->" not in sql
+
+    a, b = QUERY / np.linalg.norm(QUERY), np.array([0.3, 0.2, 0.1])
+    b = b / np.linalg.norm(b)
+    assert np.isclose(np.sqrt(2 + 2 * -(a @ b)), np.linalg.norm(a - b))
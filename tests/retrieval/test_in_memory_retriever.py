@@ -0,0 +1,264 @@
+"""In-memory dense retrieval (VECTOR_BACKEND=memory): exact top-k in the
+same shape and distance units as similarity_search, tenant isolation,
+incremental sync when the corpus generation moves, the fallbacks to
+pgvector for orgs too large to hold, and first loads from a snapshot."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.infrastructure.vector_index.in_memory as in_memory
+from app.db.hnsw import EMBEDDING_DIM
+from app.infrastructure.vector_index.in_memory import InMemoryDenseRetriever
+from app.infrastructure.vector_index.snapshot import SnapshotSource, _write
+from tests.retrieval.fakes import chunked, copy_stream
+
+DIM = 8
+
+
+def unit_vectors(rng, n, dim=DIM):
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+class _Result:
+    def __init__(self, rows=(), scalar=None):
+        self._rows = list(rows)
+        self._scalar = scalar
+
+    def all(self):
+        return self._rows
+
+    def scalar(self):
+        return self._scalar
+
+
+class FakeCorpusDB:
+    """document_embeddings and organizations.corpus_generation in memory,
+    answering the retriever's statements and recording their kinds."""
+
+    def __init__(self):
+        self.rows = []
+        self.generations = {}
+        self.statements = []
+        self._next_id = 0
+
+    def add_document(self, org, document_id, vectors):
+        for v in vectors:
+            self._next_id += 1
+            self.rows.append(
+                SimpleNamespace(
+                    id=self._next_id,
+                    organization_id=org,
+                    document_id=document_id,
+                    content=f"doc {document_id} row {self._next_id}",
+                    embedding=v,
+                    filename=f"{document_id}.pdf",
+                )
+            )
+        self.bump(org)
+
+    def delete_document(self, org, document_id):
+        self.rows = [r for r in self.rows if r.document_id != document_id]
+        self.bump(org)
+
+    def bump(self, org):
+        self.generations[org] = self.generations.get(org, 0) + 1
+
+    def org_rows(self, org):
+        return [r for r in self.rows if r.organization_id == org]
+
+    @staticmethod
+    def _params(stmt, params):
+        if params is not None:
+            return params
+        compiled = stmt.compile().params
+        org = next(v for k, v in compiled.items() if k != "doc_ids")
+        return {"org_id": org, "doc_ids": compiled.get("doc_ids")}
+
+    async def scalar(self, stmt):
+        self.statements.append("generation")
+        return self.generations.get(self._params(stmt, None)["org_id"], 0)
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        params = self._params(stmt, params)
+        rows = self.org_rows(params["org_id"])
+        if "LIMIT :cap" in sql:
+            self.statements.append("count")
+            return _Result(scalar=min(len(rows), params["cap"]))
+        if "GROUP BY document_id" in sql:
+            self.statements.append("signatures")
+            docs = {}
+            for r in rows:
+                count, max_id = docs.get(r.document_id, (0, 0))
+                docs[r.document_id] = (count + 1, max(max_id, r.id))
+            return _Result([(d, c, m) for d, (c, m) in docs.items()])
+        vectors = "document_embeddings.embedding" in sql
+        self.statements.append("rows" if vectors else "texts")
+        if params["doc_ids"] is not None:
+            rows = [r for r in rows if r.document_id in params["doc_ids"]]
+        self.fetched = len(rows)
+        return _Result(rows)
+
+
+def make_retriever(**overrides):
+    kwargs = dict(max_rows_per_org=1000, max_bytes=10**9)
+    kwargs.update(overrides)
+    return InMemoryDenseRetriever(**kwargs)
+
+
+async def search(retriever, db, query, *, org=1, limit=5, document_ids=None):
+    return await retriever.search(
+        db,
+        organization_id=org,
+        query_embedding=query,
+        limit=limit,
+        document_ids=document_ids,
+    )
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.mark.anyio
+async def test_exact_top_k_with_l2_distances(rng):
+    db = FakeCorpusDB()
+    db.add_document(1, 10, unit_vectors(rng, 40))
+    db.add_document(1, 11, unit_vectors(rng, 40))
+    query = unit_vectors(rng, 1)[0]
+
+    hits = await search(make_retriever(), db, query)
+
+    rows = db.org_rows(1)
+    matrix = np.stack([r.embedding for r in rows])
+    truth = np.argsort(np.linalg.norm(matrix - query, axis=1))[:5]
+    assert [h.id for h in hits] == [rows[i].id for i in truth]
+    assert np.allclose(
+        [h.distance for h in hits], np.linalg.norm(matrix[truth] - query, axis=1)
+    )
+    assert {h.filename for h in hits} <= {"10.pdf", "11.pdf"}
+
+
+@pytest.mark.anyio
+async def test_filter_and_tenant_isolation(rng):
+    db = FakeCorpusDB()
+    db.add_document(1, 10, unit_vectors(rng, 20))
+    db.add_document(1, 11, unit_vectors(rng, 20))
+    db.add_document(2, 20, unit_vectors(rng, 20))
+    retriever = make_retriever()
+    query = unit_vectors(rng, 1)[0]
+
+    filtered = await search(retriever, db, query, limit=50, document_ids=[11, 20])
+    assert len(filtered) == 20
+    assert {h.document_id for h in filtered} == {11}  # org 2's doc never shows
+
+    everything = await search(retriever, db, query, limit=100)
+    assert {h.document_id for h in everything} == {10, 11}
+
+
+@pytest.mark.anyio
+async def test_unchanged_generation_reads_nothing_but_the_generation(rng):
+    db = FakeCorpusDB()
+    db.add_document(1, 10, unit_vectors(rng, 10))
+    retriever = make_retriever()
+    query = unit_vectors(rng, 1)[0]
+
+    await search(retriever, db, query)
+    db.statements.clear()
+    await search(retriever, db, query)
+
+    assert db.statements == ["generation"]
+
+
+@pytest.mark.anyio
+async def test_sync_fetches_only_changed_documents(rng):
+    db = FakeCorpusDB()
+    db.add_document(1, 10, unit_vectors(rng, 30))
+    db.add_document(1, 11, unit_vectors(rng, 30))
+    retriever = make_retriever()
+    query = unit_vectors(rng, 1)[0]
+    await search(retriever, db, query)
+
+    db.add_document(1, 12, unit_vectors(rng, 5))
+    db.add_document(1, 10, unit_vectors(rng, 2))  # FAQ chunks appended
+    db.delete_document(1, 11)
+    hits = await search(retriever, db, query, limit=100)
+
+    assert db.fetched == 37  # docs 10 and 12 only; 11 is dropped unread
+    assert sorted(h.id for h in hits) == sorted(r.id for r in db.org_rows(1))
+    assert retriever.stats()["rows"] == 37
+
+
+@pytest.mark.anyio
+async def test_oversized_org_is_searched_by_postgres(rng, monkeypatch):
+    calls = []
+
+    async def fake_similarity_search(db, **kwargs):
+        calls.append(kwargs)
+        return ["pg row"]
+
+    monkeypatch.setattr(in_memory, "async_similarity_search", fake_similarity_search)
+    db = FakeCorpusDB()
+    db.add_document(1, 10, unit_vectors(rng, 11))
+    retriever = make_retriever(max_rows_per_org=10)
+    query = unit_vectors(rng, 1)[0]
+
+    assert await search(retriever, db, query) == ["pg row"]
+    db.statements.clear()
+    assert await search(retriever, db, query) == ["pg row"]
+    assert db.statements == ["generation"]  # not recounted until it changes
+    assert calls[0]["organization_id"] == 1
+
+    db.delete_document(1, 10)
+    db.add_document(1, 11, unit_vectors(rng, 3))
+    assert len(await search(retriever, db, query)) == 3  # shrank: held now
+    assert retriever.stats()["postgres_fallbacks"] == 2
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_org_is_evicted_over_budget(rng):
+    db = FakeCorpusDB()
+    for org in (1, 2, 3):
+        db.add_document(org, org * 10, unit_vectors(rng, 50))
+    retriever = make_retriever(max_bytes=1)  # room for one org at a time
+    query = unit_vectors(rng, 1)[0]
+
+    for org in (1, 2, 3):
+        await search(retriever, db, query, org=org)
+
+    stats = retriever.stats()
+    assert stats["orgs"] == 1
+    assert stats["evictions"] == 2
+
+
+@pytest.mark.anyio
+async def test_first_load_maps_vectors_from_a_current_snapshot(rng, tmp_path):
+    db = FakeCorpusDB()
+    db.add_document(1, 10, unit_vectors(rng, 20, EMBEDDING_DIM))
+    db.add_document(1, 11, unit_vectors(rng, 20, EMBEDDING_DIM))
+    rows = db.org_rows(1)
+    stream = copy_stream(
+        [r.id for r in rows],
+        [r.document_id for r in rows],
+        [1] * len(rows),
+        np.stack([r.embedding for r in rows]),
+    )
+    _write(tmp_path, dict(db.generations), chunked(stream, 4096))
+    retriever = make_retriever(snapshots=SnapshotSource(tmp_path))
+    query = rows[7].embedding
+
+    hits = await search(retriever, db, query)
+
+    assert "rows" not in db.statements  # text only; no vector parsed
+    assert hits[0].id == rows[7].id and hits[0].content == rows[7].content
+    assert retriever.stats()["snapshot_loads"] == 1
+    assert retriever.stats()["bytes"] < 40 * EMBEDDING_DIM * 4  # mapped, shared
+
+    db.add_document(1, 12, unit_vectors(rng, 3, EMBEDDING_DIM))
+    hits = await search(retriever, db, query, limit=100)
+    assert db.fetched == 3  # then synced incrementally as usual
+    assert len(hits) == 43
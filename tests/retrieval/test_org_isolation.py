@@ -2,7 +2,7 @@
 
 The SQL sent to the database must filter on organization_id
 UNCONDITIONALLY — with or without a document_ids narrowing filter.
-These tests capture the statement a fake session receives; if someone
+These tests capture the statements a fake session receives; if someone
 ever makes the org filter conditional, they fail.
 """
 
@@ -10,19 +10,37 @@ from app.services.embedding_service import similarity_search
 
 
 class FakeResult:
+    def __init__(self, count):
+        self.count = count
+
     def fetchall(self):
         return []
 
+    def scalar(self):
+        return self.count
+
 
 class CapturingDB:
-    def __init__(self):
-        self.sql = None
-        self.params = None
+    """Records every statement. `sql`/`params` are the last search's."""
+
+    def __init__(self, filtered_rows=0):
+        self.filtered_rows = filtered_rows
+        self.statements = []
 
     def execute(self, sql, params):
-        self.sql = str(sql)
-        self.params = params
-        return FakeResult()
+        self.statements.append((str(sql), params))
+        return FakeResult(self.filtered_rows)
+
+    def _last_search(self):
+        return [s for s in self.statements if "ORDER BY" in s[0]][-1]
+
+    @property
+    def sql(self):
+        return self._last_search()[0]
+
+    @property
+    def params(self):
+        return self._last_search()[1]
 
 
 QUERY_EMBEDDING = [0.1, 0.2, 0.3]
@@ -51,6 +69,24 @@ def test_document_filter_narrows_within_the_org_filter():
     assert db.params["doc_ids"] == [3, 4]
 
 
+def test_short_filtered_result_fallbacks_stay_org_scoped():
+    # An empty result over documents holding 3 rows triggers the count
+    # and the exact re-rank; both must filter on the org too.
+    db = CapturingDB(filtered_rows=3)
+    similarity_search(
+        db,
+        organization_id=7,
+        query_embedding=QUERY_EMBEDDING,
+        limit=5,
+        document_ids=[3, 4],
+    )
+    reads = [(sql, p) for sql, p in db.statements if "document_embeddings" in sql]
+    assert len(reads) == 3  # search, count, exact re-rank
+    for sql, params in reads:
+        assert "organization_id = :org_id" in sql
+        assert params["org_id"] == 7
+
+
 def test_no_document_filter_without_document_ids():
     db = CapturingDB()
     similarity_search(db, organization_id=7, query_embedding=QUERY_EMBEDDING, limit=5)
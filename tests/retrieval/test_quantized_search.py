@@ -0,0 +1,139 @@
+"""Quantized index forms: the DDL indexes the compact expression, and
+searches of an org with that index order the first pass by that same
+expression (or the planner could not use the index), fetch a wider pool,
+and re-rank it by the full-precision distance. Orgs without it are
+ranked exactly."""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.db.hnsw import quantized_distance, tenant_index_ddl, tenant_index_name
+from app.services.embedding_service import hybrid_search, similarity_search
+from tests.retrieval.fakes import RecordingDB
+
+QUERY = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+
+
+def search_statement(db):
+    return db.statements[-1]
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(settings, "HNSW_EF_SEARCH", None)
+    monkeypatch.setattr(settings, "QUANTIZED_CANDIDATES_FACTOR", 4)
+
+
+@pytest.mark.parametrize(
+    "form, key",
+    [
+        ("halfvec", "((embedding::halfvec(384)) halfvec_ip_ops)"),
+        ("binary", "((binary_quantize(embedding)::bit(384)) bit_hamming_ops)"),
+    ],
+)
+def test_ddl_indexes_the_compact_expression(form, key):
+    ddl = tenant_index_ddl(7, quantization=form)
+    assert f"CREATE INDEX {tenant_index_name(7, form)} " in ddl
+    assert f"USING hnsw {key}" in ddl
+    assert ddl.endswith("WHERE organization_id = 7")
+
+
+def test_each_form_has_its_own_index_name():
+    names = {tenant_index_name(7, form) for form in ("none", "halfvec", "binary")}
+    assert len(names) == 3
+
+
+def test_unknown_form_is_rejected():
+    with pytest.raises(ValueError, match="halfvec"):
+        tenant_index_ddl(7, quantization="pq")
+
+
+@pytest.mark.parametrize("form", ["halfvec", "binary"])
+def test_first_pass_orders_by_the_indexed_expression(form):
+    db = RecordingDB()
+    similarity_search(
+        db, organization_id=1, query_embedding=QUERY, limit=5, quantization=form
+    )
+    (check_sql, check_params), (sql, params) = db.statements
+    assert "pg_index" in check_sql
+    assert check_params == {"name": tenant_index_name(1, form)}
+    order = quantized_distance(
+        form, column="de.embedding", query="CAST(:query_embedding AS vector)"
+    )
+    assert f"ORDER BY {order}" in sql
+    assert "LIMIT :pool" in sql
+    assert params["pool"] == 20 and params["limit"] == 5
+    # Re-ranked at full precision (distance is computed from <#>).
+    assert sql.rstrip().endswith("ORDER BY distance LIMIT :limit")
+
+
+def test_unquantized_search_keeps_its_single_scan():
+    db = RecordingDB()
+    similarity_search(
+        db, organization_id=1, query_embedding=QUERY, limit=5, quantization="none"
+    )
+    ((sql, params),) = db.statements
+    assert "pool" not in params
+    assert "ORDER BY de.embedding <#> CAST(:query_embedding AS vector)" in sql
+
+
+def test_ef_search_covers_the_wider_pool():
+    db = RecordingDB()
+    similarity_search(
+        db, organization_id=1, query_embedding=QUERY, limit=20, quantization="binary"
+    )
+    assert db.statements[1][1] == {"ef_search": "80"}
+
+
+def test_setting_selects_the_form(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_INDEX_QUANTIZATION", "halfvec")
+    db = RecordingDB()
+    similarity_search(db, organization_id=1, query_embedding=QUERY, limit=5)
+    assert "::halfvec(384)" in search_statement(db)[0]
+
+
+@pytest.mark.parametrize("form", ["halfvec", "binary"])
+def test_org_without_a_compact_index_is_ranked_exactly(form):
+    # Below TENANT_VECTOR_INDEX_MIN_CHUNKS there is no index to serve the
+    # compact ordering; a lossy pool of it would only cost recall.
+    db = RecordingDB(index_valid=None)
+    similarity_search(
+        db, organization_id=1, query_embedding=QUERY, limit=5, quantization=form
+    )
+    sql, params = search_statement(db)
+    assert "pool" not in params
+    assert "ORDER BY de.embedding <#> CAST(:query_embedding AS vector)" in sql
+    assert "::halfvec" not in sql and "binary_quantize" not in sql
+
+
+def test_hybrid_dense_arm_of_a_small_org_is_exact():
+    db = RecordingDB(index_valid=None)
+    hybrid_search(
+        db,
+        organization_id=1,
+        query_embedding=QUERY,
+        query_text="krona",
+        limit=5,
+        candidates=10,
+        quantization="binary",
+    )
+    sql, params = search_statement(db)
+    assert "binary_quantize" not in sql and "pool" not in params
+
+
+def test_hybrid_dense_arm_is_reranked_before_fusion():
+    db = RecordingDB()
+    hybrid_search(
+        db,
+        organization_id=1,
+        query_embedding=QUERY,
+        query_text="krona",
+        limit=5,
+        candidates=10,
+        quantization="binary",
+    )
+    sql, params = search_statement(db)
+    assert "binary_quantize(de.embedding)" in sql
+    assert "ORDER BY distance LIMIT :candidates" in sql
+    assert params["pool"] == 40
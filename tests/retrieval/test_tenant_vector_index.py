@@ -0,0 +1,136 @@
+"""ensure_tenant_vector_index: builds an org's partial HNSW index only
+when the org is large enough and it does not already exist, replaces an
+invalid leftover, never races another worker, and drops other
+quantization forms only when asked."""
+
+from app.db.hnsw import tenant_index_name
+from app.db.tenant_vector_index import ensure_tenant_vector_index
+
+
+class FakeConnection:
+    def __init__(self, *, lock=True, indexes=None, rows=0):
+        self.lock = lock
+        self.indexes = indexes or {}  # name -> indisvalid
+        self.rows = rows
+        self.statements = []
+        self.isolation_level = None
+
+    def execution_options(self, *, isolation_level):
+        self.isolation_level = isolation_level
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        sql = str(sql)
+        self.statements.append((sql, params))
+        if "pg_try_advisory_lock" in sql:
+            value = self.lock
+        elif "indisvalid" in sql:
+            value = self.indexes.get(params["name"])
+        elif "count(*)" in sql:
+            value = min(self.rows, params["cap"])
+        else:
+            value = None
+
+        class _Result:
+            def scalar(self_inner):
+                return value
+
+        return _Result()
+
+    def ddl(self):
+        return [s for s, _ in self.statements if "INDEX" in s]
+
+
+class FakeEngine:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def connect(self):
+        return self.conn
+
+
+def ensure(conn, **kwargs):
+    kwargs.setdefault("quantization", "none")
+    return ensure_tenant_vector_index(
+        FakeEngine(conn), organization_id=7, min_chunks=100, **kwargs
+    )
+
+
+NAME = tenant_index_name(7)
+
+
+def test_builds_concurrently_once_the_org_is_large_enough():
+    conn = FakeConnection(rows=250)
+    assert ensure(conn) is True
+    assert conn.isolation_level == "AUTOCOMMIT"
+    (ddl,) = conn.ddl()
+    assert ddl.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ")
+    assert ddl.endswith("WHERE organization_id = 7")
+    assert "pg_advisory_unlock" in conn.statements[-1][0]
+
+
+def test_small_org_gets_no_index():
+    conn = FakeConnection(rows=99)
+    assert ensure(conn) is False
+    assert conn.ddl() == []
+    assert "pg_advisory_unlock" in conn.statements[-1][0]
+
+
+def test_existing_valid_index_is_left_alone():
+    conn = FakeConnection(indexes={NAME: True}, rows=10_000)
+    assert ensure(conn) is False
+    assert conn.ddl() == []
+
+
+def test_invalid_leftover_is_dropped_and_rebuilt():
+    conn = FakeConnection(indexes={NAME: False}, rows=10_000)
+    assert ensure(conn) is True
+    drop, create = conn.ddl()
+    assert drop == f"DROP INDEX CONCURRENTLY IF EXISTS {NAME}"
+    assert create.startswith("CREATE INDEX CONCURRENTLY")
+
+
+def test_another_worker_holding_the_lock_wins():
+    conn = FakeConnection(lock=False, rows=10_000)
+    assert ensure(conn) is False
+    assert len(conn.statements) == 1  # no unlock of a lock never taken
+
+
+def test_builds_the_configured_quantization_form():
+    conn = FakeConnection(rows=250)
+    assert ensure(conn, quantization="halfvec") is True
+    (ddl,) = conn.ddl()
+    assert tenant_index_name(7, "halfvec") in ddl
+    assert "((embedding::halfvec(384)) halfvec_ip_ops)" in ddl
+
+
+def test_other_forms_survive_unless_drop_stale():
+    others = {NAME: True, tenant_index_name(7, "binary"): True}
+
+    conn = FakeConnection(indexes=dict(others), rows=250)
+    ensure(conn, quantization="halfvec")
+    assert not any(s.startswith("DROP") for s in conn.ddl())
+
+    conn = FakeConnection(indexes=dict(others), rows=250)
+    ensure(conn, quantization="halfvec", drop_stale=True)
+    create, *drops = conn.ddl()
+    assert create.startswith("CREATE INDEX")
+    assert drops == [
+        f"DROP INDEX CONCURRENTLY IF EXISTS {NAME}",
+        f"DROP INDEX CONCURRENTLY IF EXISTS {tenant_index_name(7, 'binary')}",
+    ]
+
+
+def test_stale_forms_stay_while_the_new_one_is_missing():
+    # A small org gets no index in any form, so its exact searches keep
+    # working, and a big org's old index is not dropped before the
+    # replacement exists.
+    conn = FakeConnection(indexes={NAME: True}, rows=5)
+    ensure(conn, quantization="binary", drop_stale=True)
+    assert conn.ddl() == []
@@ -0,0 +1,37 @@
+"""Query vectors reach pgvector as float32 arrays, not Python lists.
+
+similarity_search types its :query_embedding parameter as the embedding
+column's pgvector type, so psycopg2 receives vector text serialized from
+the array rather than a float8[] literal built from a list.
+"""
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects import postgresql
+
+from app.services.embedding_service import similarity_search
+
+
+class FakeResult:
+    def fetchall(self):
+        return []
+
+
+class CompilingDB:
+    def execute(self, sql, params):
+        self.compiled = sql.compile(dialect=postgresql.psycopg2.dialect())
+        self.params = params
+        return FakeResult()
+
+
+def test_query_embedding_is_bound_as_a_vector():
+    db = CompilingDB()
+    query = np.array([0.25, -0.5, 1.0], dtype=np.float32)
+
+    similarity_search(db, organization_id=1, query_embedding=query, limit=5)
+
+    bind_type = db.compiled.binds["query_embedding"].type
+    assert isinstance(bind_type, Vector)
+    assert db.params["query_embedding"] is query  # no list conversion
+    process = bind_type.bind_processor(postgresql.psycopg2.dialect())
+    assert process(query) == "[0.25,-0.5,1.0]"
@@ -0,0 +1,139 @@
+"""Memory-mapped embedding snapshots: the binary COPY stream is decoded
+in whatever blocks it arrives, each org is a zero-copy slice tagged with
+its corpus generation, a stale slice is never served, and a newly
+published snapshot is picked up when the generation moves."""
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.infrastructure.vector_index.snapshot as snapshot_module
+from app.db.hnsw import EMBEDDING_DIM
+from app.infrastructure.vector_index.snapshot import (
+    CURRENT_FILE,
+    MANIFEST_FILE,
+    SnapshotSource,
+    VectorSnapshot,
+    _write,
+    snapshot_similarity_search,
+)
+from tests.retrieval.fakes import chunked, copy_stream
+
+
+def unit_vectors(rng, n):
+    v = rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    # Sorted by (organization_id, id), as the export's COPY orders them.
+    return {
+        "ids": [1, 2, 5, 3, 4],
+        "document_ids": [10, 10, 11, 20, 20],
+        "organization_ids": [1, 1, 1, 2, 2],
+        "vectors": unit_vectors(rng, 5),
+    }
+
+
+def publish(directory, corpus, generations, block=997):
+    return _write(directory, generations, chunked(copy_stream(**corpus), block))
+
+
+def test_round_trip_in_arbitrary_blocks(tmp_path, corpus):
+    publish(tmp_path, corpus, {1: 3, 2: 1}, block=7)
+
+    snapshot = VectorSnapshot.current(tmp_path)
+    org = snapshot.org(1)
+    assert org.generation == 3
+    assert org.ids.tolist() == [1, 2, 5]
+    assert org.document_ids.tolist() == [10, 10, 11]
+    assert np.array_equal(org.matrix, corpus["vectors"][:3])
+    assert isinstance(org.matrix, np.memmap)  # a view of the file, not a copy
+    assert snapshot.org(2).ids.tolist() == [3, 4]
+    assert snapshot.org(3) is None
+
+
+def test_truncated_stream_publishes_nothing(tmp_path, corpus):
+    data = copy_stream(**corpus)[:-5]
+    with pytest.raises(ValueError):
+        _write(tmp_path, {}, chunked(data, 64))
+    assert not (tmp_path / CURRENT_FILE).exists()
+
+
+def test_other_formats_are_refused(tmp_path, corpus):
+    path = publish(tmp_path, corpus, {})
+    manifest = json.loads((path / MANIFEST_FILE).read_text())
+    manifest["format"] = 99
+    (path / MANIFEST_FILE).write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="format"):
+        VectorSnapshot(path)
+
+
+def test_source_reopens_when_an_org_moves_past_its_snapshot(tmp_path, corpus):
+    publish(tmp_path, corpus, {1: 1})
+    source = SnapshotSource(tmp_path)
+
+    assert source.org(1, 1).generation == 1
+    assert source.org(1, 2) is None  # an upload since the export
+
+    publish(tmp_path, corpus, {1: 2})
+    assert source.org(1, 2).generation == 2
+    stats = source.stats()
+    assert (stats["hits"], stats["stale"], stats["reloads"]) == (2, 1, 2)
+
+
+class HydratingDB:
+    def __init__(self, corpus):
+        self.corpus = corpus
+
+    def execute(self, sql, params):
+        assert params["org_id"] == 1
+        return [
+            SimpleNamespace(
+                id=i, content=f"chunk {i}", document_id=d, filename=f"{d}.pdf"
+            )
+            for i, d in zip(self.corpus["ids"], self.corpus["document_ids"])
+            if i in params["ids"]
+        ]
+
+
+def test_search_ranks_the_slice_and_reads_only_the_winners(
+    tmp_path, corpus, monkeypatch
+):
+    publish(tmp_path, corpus, {1: 4})
+    monkeypatch.setattr(snapshot_module, "get_corpus_generation", lambda db, **kw: 4)
+    query = corpus["vectors"][2]
+
+    hits = snapshot_similarity_search(
+        HydratingDB(corpus),
+        SnapshotSource(tmp_path),
+        organization_id=1,
+        query_embedding=query,
+        limit=2,
+    )
+
+    assert hits[0].id == 5 and hits[0].content == "chunk 5"
+    assert hits[0].filename == "11.pdf"
+    assert hits[0].distance == pytest.approx(0.0, abs=1e-3)
+    assert len(hits) == 2 and {h.id for h in hits} <= {1, 2, 5}
+
+
+def test_search_falls_back_to_pgvector_when_stale(tmp_path, corpus, monkeypatch):
+    publish(tmp_path, corpus, {1: 4})
+    monkeypatch.setattr(snapshot_module, "get_corpus_generation", lambda db, **kw: 5)
+    monkeypatch.setattr(
+        snapshot_module, "similarity_search", lambda db, **kw: ["pg row"]
+    )
+
+    hits = snapshot_similarity_search(
+        None,
+        SnapshotSource(tmp_path),
+        organization_id=1,
+        query_embedding=corpus["vectors"][0],
+        limit=2,
+    )
+    assert hits == ["pg row"]